@@ -25,6 +25,7 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.core.config import settings
+from src.core.json_response import FastJSONResponse
 from src.database.connection import db_manager, get_db_pool, close_db_pool
 from src.api import create_api_router
 from src.api.v1 import create_v1_router
@@ -122,6 +123,17 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.warning(f"Analytics schema initialization error: {e}")
 
+        # Tombstone table for background deletes, and the FK graph the
+        # cascading deletes are planned from (loaded once, after all schemas)
+        if db_connected:
+            try:
+                from src.database.cascade_delete import get_delete_graph, init_cascade_delete_schema
+                await init_cascade_delete_schema()
+                await get_delete_graph()
+                logger.info("Cascade delete graph loaded")
+            except Exception as e:
+                logger.warning(f"Cascade delete graph initialization error: {e}")
+
         # Start session cleanup background task
         import asyncio
         try:
@@ -132,14 +144,17 @@ async def lifespan(app: FastAPI):
             logger.warning(f"Failed to start session cleanup task: {e}")
             cleanup_task = None
 
-        # Start analytics heartbeat cleanup background task
-        analytics_cleanup_task = None
-        try:
-            from src.api.analytics import start_heartbeat_cleanup_task
-            analytics_cleanup_task = asyncio.create_task(start_heartbeat_cleanup_task())
-            logger.info("Analytics heartbeat cleanup task started")
-        except Exception as e:
-            logger.warning(f"Failed to start analytics cleanup task: {e}")
+        # Start the background job runner (scheduled jobs such as heartbeat cleanup)
+        job_runner = None
+        if db_connected and settings.agent_jobs_enabled:
+            try:
+                from src.agent.jobs import job_runner as runner, register_builtin_jobs
+                register_builtin_jobs(runner)
+                await runner.start()
+                job_runner = runner
+                logger.info("Background job runner started")
+            except Exception as e:
+                logger.warning(f"Failed to start background job runner: {e}")
 
         logger.info("Application startup complete")
         print("Server is ready at http://0.0.0.0:8000")
@@ -149,8 +164,8 @@ async def lifespan(app: FastAPI):
         # Cancel cleanup tasks on shutdown
         if cleanup_task:
             cleanup_task.cancel()
-        if analytics_cleanup_task:
-            analytics_cleanup_task.cancel()
+        if job_runner:
+            await job_runner.stop()
         
     except KeyboardInterrupt:
         logger.info("🛑 Shutdown requested by user")
@@ -164,6 +179,17 @@ async def lifespan(app: FastAPI):
     finally:
         logger.info("🔄 Shutting down application...")
         print("🔄 Shutting down application...")
+        try:
+            from src.core.storage import close_storage_clients
+            await close_storage_clients()
+        except Exception as e:
+            logger.warning(f"Error closing storage clients: {e}")
+        try:
+            # Deliver queued agent audit rows before the pool goes away
+            from src.agent.repositories.telemetry import agent_telemetry
+            await agent_telemetry.close()
+        except Exception as e:
+            logger.warning(f"Error flushing agent telemetry: {e}")
         try:
             if db_connected:
                 await close_db_pool()
@@ -178,7 +204,8 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="Proesphere API", 
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add debug logging middleware (development only)
@@ -190,6 +217,10 @@ if not IS_PRODUCTION:
 from src.middleware.request_tracking import RequestTrackingMiddleware
 app.add_middleware(RequestTrackingMiddleware)
 
+# Add read-replica routing middleware (read-your-writes per session)
+from src.middleware.read_routing import ReadRoutingMiddleware
+app.add_middleware(ReadRoutingMiddleware)
+
 # Add analytics tracking middleware (counts API actions per user)
 from src.middleware.analytics_tracking import AnalyticsTrackingMiddleware
 app.add_middleware(AnalyticsTrackingMiddleware)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark tool-result encoding for the agent's LLM context.
+
+Builds fixture results shaped like the get_tasks, get_issues, get_materials
+and query_database tools, then compares the previous encoding (indented
+JSON truncated at 8000 characters) with the compact tabular encoding in
+src.agent.core.result_encoder. Reports estimated tokens per result, rows
+visible to the model and tokens per visible row. No database is needed.
+
+Usage:
+    python scripts/bench_result_encoding.py --rows 25 50 200
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agent.core.context_window import estimate_tokens
+from src.agent.core.result_encoder import encode_tool_result
+
+MAX_CHARS = 8000
+STATUSES = ["pending", "in-progress", "completed", "blocked"]
+
+
+def tasks_result(n: int) -> dict:
+    return {
+        "projectId": "7d1f4c8e-2b1a-4d0e-9a57-3f0c1e2d4b6a",
+        "tasks": [
+            {
+                "id": f"5b0e{i:04d}-9c3d-4f1a-8e2b-6d7c8a9b0c1d",
+                "title": f"Frame interior walls - unit {i}",
+                "description": None if i % 3 else "Use 2x4 studs at 16in centers per plan A-201",
+                "status": STATUSES[i % 4],
+                "priority": "high" if i % 5 == 0 else "medium",
+                "assigneeId": None,
+                "dueDate": str(date(2026, 3, 1) + timedelta(days=i % 60)),
+                "isMilestone": i % 10 == 0,
+                "category": "framing",
+            }
+            for i in range(n)
+        ],
+        "summary": {"totalTasks": n, "pending": n // 4, "inProgress": n // 4, "completed": n // 4, "blocked": n // 4},
+        "filters": {"status": None, "assignee": None, "priority": None},
+    }
+
+
+def issues_result(n: int) -> dict:
+    return {
+        "issues": [
+            {
+                "id": f"9a8b{i:04d}-1c2d-4e3f-8a9b-0c1d2e3f4a5b",
+                "title": f"Water stain on ceiling, room {i}",
+                "description": "Reported after the last rain; check roof flashing above.",
+                "status": "open" if i % 2 else "in_progress",
+                "priority": "critical" if i % 7 == 0 else "high",
+                "projectId": "7d1f4c8e-2b1a-4d0e-9a57-3f0c1e2d4b6a",
+                "projectName": "Maple Street Duplex",
+                "assignedTo": None,
+                "assignedUserName": None,
+                "createdAt": str(datetime(2026, 2, 1, 9, 30) + timedelta(hours=i)),
+            }
+            for i in range(n)
+        ],
+        "summary": {"totalIssues": n, "open": n // 2, "inProgress": n - n // 2, "critical": n // 7},
+        "filters": {"project": None, "status": None, "priority": None, "assignedTo": None, "urgentOnly": None},
+    }
+
+
+def materials_result(n: int) -> dict:
+    materials = [
+        {
+            "id": f"m-{i:05d}",
+            "name": f"Porcelain tile 12x24 lot {i}",
+            "area": ["Kitchen", "Primary Bath", "Laundry"][i % 3],
+            "quantity": 40 + i,
+            "unit": "sqft",
+            "unitCost": 4.25,
+            "totalCost": round((40 + i) * 4.25, 2),
+            "vendor": "Tile Depot",
+            "status": "ordered" if i % 2 else "pending",
+            "approvalStatus": "approved",
+            "notes": None,
+        }
+        for i in range(n)
+    ]
+    by_area = {}
+    for item in materials:
+        by_area.setdefault(item["area"], []).append(item)
+    return {
+        "projectId": "7d1f4c8e-2b1a-4d0e-9a57-3f0c1e2d4b6a",
+        "materials": materials,
+        "materialsByArea": by_area,
+        "summary": {"totalItems": n, "totalCost": round(sum(m["totalCost"] for m in materials), 2)},
+        "filters": {"stageId": None, "areaName": None, "status": None, "approvalStatus": None},
+    }
+
+
+def query_result(n: int) -> dict:
+    return {
+        "data_type": "payments",
+        "table": "payment_installments",
+        "results": [
+            {
+                "id": f"pi-{i:05d}",
+                "company_id": "c0ffee00-0000-4000-8000-000000000001",
+                "project_id": "7d1f4c8e-2b1a-4d0e-9a57-3f0c1e2d4b6a",
+                "name": f"Draw {i + 1}",
+                "amount": 12500.0,
+                "status": "paid" if i % 3 == 0 else "pending",
+                "due_date": str(date(2026, 1, 15) + timedelta(days=30 * i)),
+                "paid_date": None,
+                "created_by": "a1b2c3d4-0000-4000-8000-000000000002",
+                "updated_at": "2026-01-02T10:00:00+00:00",
+            }
+            for i in range(n)
+        ],
+        "count": n,
+    }
+
+
+FIXTURES = {
+    "get_tasks": (tasks_result, "tasks"),
+    "get_issues": (issues_result, "issues"),
+    "get_materials": (materials_result, "materials"),
+    "query_database": (query_result, "results"),
+}
+
+
+def legacy_encode(result: dict) -> str:
+    text = json.dumps(result, indent=2, default=str)
+    if len(text) > MAX_CHARS:
+        return text[:MAX_CHARS] + "\n... (truncated - data continues)"
+    return text
+
+
+def legacy_visible_rows(text: str, result: dict, key: str) -> int:
+    """Rows whose last field made it into the truncated JSON."""
+    rows = result[key]
+    last_field = list(rows[0].keys())[-1]
+    return min(len(rows), text.count(f'"{last_field}":'))
+
+
+def compact_visible_rows(text: str, result: dict, key: str) -> int:
+    ids = {str(row["id"]) for row in result[key]}
+    return len({line.split("|", 1)[0] for line in text.splitlines()} & ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    header = f"{'tool':<15}{'rows':>6}  {'json tok':>9}{'json rows':>10}{'tok/row':>9}  {'compact tok':>12}{'rows':>6}{'tok/row':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, (build, key) in FIXTURES.items():
+        for n in args.rows:
+            result = build(n)
+            legacy = legacy_encode(result)
+            compact = encode_tool_result(result, max_chars=MAX_CHARS)
+            legacy_tokens = estimate_tokens(legacy)
+            compact_tokens = estimate_tokens(compact)
+            legacy_rows = legacy_visible_rows(legacy, result, key)
+            compact_rows = compact_visible_rows(compact, result, key)
+            print(
+                f"{name:<15}{n:>6}  "
+                f"{legacy_tokens:>9}{legacy_rows:>10}{legacy_tokens / max(legacy_rows, 1):>9.1f}  "
+                f"{compact_tokens:>12}{compact_rows:>6}{compact_tokens / max(compact_rows, 1):>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,18 @@
 Agent chat API endpoint with SSE streaming.
 """
 
-import json
 import logging
 from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from ..core.orchestrator import agent_orchestrator
 from ..core.context_builder import context_builder
 from ..repositories.agent_repository import agent_repo
+from ..repositories.telemetry import agent_telemetry
+from .sse import AgentStream, agent_streams, parse_last_event_id, sse_frames
 from src.api.auth import get_current_user_dependency
 
 logger = logging.getLogger(__name__)
@@ -63,42 +64,63 @@ class FeedbackRequest(BaseModel):
     notes: Optional[str] = Field(None, max_length=1000, description="Optional feedback notes")
 
 
-async def generate_sse_response(
-    message: str,
-    conversation_id: Optional[str],
-    project_id: Optional[str],
-    user_context: Dict[str, Any],
-):
-    """Generate SSE response stream from orchestrator."""
-    try:
-        async for event in agent_orchestrator.process_message(
-            message=message,
-            conversation_id=conversation_id,
-            project_id=project_id,
-            user_context=user_context,
-        ):
-            event_type = event.get("type", "message")
-            event_data = event.get("data", {})
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable nginx buffering
+}
+
+
+def _require_agent_user(current_user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the user context, rejecting anonymous and client users."""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # Build user context
+    user_context = context_builder.build_user_context(current_user)
+
+    # Check if client role is trying to use agent (disabled per PRD section 11)
+    if user_context.get("role") == "client":
+        raise HTTPException(
+            status_code=403,
+            detail="Agent chat is not available for client users"
+        )
+    return user_context
+
+
+def _stream_response(stream: AgentStream, after_seq: int, http_request: Request) -> StreamingResponse:
+    return StreamingResponse(
+        sse_frames(stream, after_seq=after_seq, request=http_request),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, "X-Stream-ID": stream.id},
+    )
 
-            # Format as SSE (use default=str to handle UUIDs and other non-serializable types)
-            yield f"event: {event_type}\n"
-            yield f"data: {json.dumps(event_data, default=str)}\n\n"
 
-    except Exception as e:
-        logger.exception(f"SSE generation error: {e}")
-        yield f"event: error\n"
-        yield f"data: {json.dumps({'message': str(e)})}\n\n"
+def _resume(last_event_id: Optional[str], user_context: Dict[str, Any], http_request: Request):
+    """Resume an existing stream from a Last-Event-ID, or None if not a resume."""
+    cursor = parse_last_event_id(last_event_id)
+    if not cursor:
+        return None
+    stream_id, after_seq = cursor
+    stream = agent_streams.get(stream_id)
+    if not stream or stream.user_id != user_context.get("user_id"):
+        raise HTTPException(status_code=404, detail="Stream not found or expired")
+    return _stream_response(stream, after_seq, http_request)
 
 
 @router.post("/chat")
 async def chat(
     request: ChatRequest,
+    http_request: Request,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
 ):
     """Chat with the AI agent using Server-Sent Events (SSE).
 
     This endpoint streams responses in real-time as the agent processes
-    the request, executes tools, and generates responses.
+    the request, executes tools, and generates responses. The turn runs
+    in the background; every event carries an id ("<stream_id>:<seq>")
+    and a request with a Last-Event-ID header resumes that stream instead
+    of starting a new turn.
 
     Event types:
     - content: Text content chunks
@@ -106,35 +128,45 @@ async def chat(
     - tool_result: Tool execution completed
     - confirmation_required: Operation needs user confirmation
     - error: An error occurred
+    - replay_gap: Some events were dropped from the replay buffer
     - done: Processing complete
     """
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    # Build user context
-    user_context = context_builder.build_user_context(current_user)
+    user_context = _require_agent_user(current_user)
 
-    # Check if client role is trying to use agent (disabled per PRD section 11)
-    if user_context.get("role") == "client":
-        raise HTTPException(
-            status_code=403,
-            detail="Agent chat is not available for client users"
-        )
+    resumed = _resume(http_request.headers.get("last-event-id"), user_context, http_request)
+    if resumed:
+        return resumed
 
-    return StreamingResponse(
-        generate_sse_response(
+    stream = agent_streams.create(
+        user_id=user_context.get("user_id"),
+        source=agent_orchestrator.process_message(
             message=request.message,
             conversation_id=request.conversation_id,
             project_id=request.project_id,
             user_context=user_context,
         ),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        },
     )
+    return _stream_response(stream, 0, http_request)
+
+
+@router.get("/chat/streams/{stream_id}")
+async def resume_chat_stream(
+    stream_id: str,
+    http_request: Request,
+    last_event_id: Optional[str] = Query(None, alias="lastEventId"),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+):
+    """Reattach to a running or recently finished chat stream.
+
+    EventSource-compatible: browsers send Last-Event-ID automatically on
+    reconnect; lastEventId can be passed explicitly for the first attach.
+    """
+    user_context = _require_agent_user(current_user)
+    cursor = http_request.headers.get("last-event-id") or last_event_id or f"{stream_id}:0"
+    parsed = parse_last_event_id(cursor)
+    if not parsed or parsed[0] != stream_id:
+        raise HTTPException(status_code=400, detail="Last-Event-ID does not belong to this stream")
+    return _resume(cursor, user_context, http_request)
 
 
 @router.get("/conversations")
@@ -189,7 +221,8 @@ async def get_conversation(
     if conversation.get("userId") != user_context["user_id"]:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get messages
+    # Get messages (after any queued writes for this conversation land)
+    await agent_telemetry.wait_for_conversation(conversation_id)
     messages = await agent_repo.get_conversation_messages(
         conversation_id=conversation_id,
         limit=100,
@@ -323,6 +356,7 @@ async def submit_feedback(
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Get the message being rated and the preceding user query
+    await agent_telemetry.wait_for_conversation(request.conversation_id)
     messages = await agent_repo.get_conversation_messages(
         conversation_id=request.conversation_id,
         limit=50,
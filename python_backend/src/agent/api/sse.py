@@ -0,0 +1,299 @@
+"""
+Resumable Server-Sent Events streams for agent chat.
+
+The orchestrator runs in a background task per chat request (an AgentStream)
+instead of directly inside the HTTP response generator:
+
+- Coalescing: consecutive content chunks are merged for up to
+  agent_sse_coalesce_ms or agent_sse_coalesce_chars before they become one
+  event, so clients get a handful of frames per second instead of one per
+  token.
+- Event IDs: every event is tagged "<stream_id>:<seq>".
+- Replay: each stream keeps its last agent_sse_replay_events events. A client
+  whose connection dropped reconnects with Last-Event-ID and receives the
+  events it missed, then continues live.
+- Heartbeats: idle connections get a ": keep-alive" comment so proxies and
+  mobile networks don't close them.
+- Backpressure: the orchestrator never writes to the socket; a slow client
+  only falls behind in a bounded buffer (and catches up with merged frames).
+- Disconnects: when the last client detaches, the stream waits
+  agent_sse_resume_grace_seconds for a reconnect and then cancels the
+  orchestrator task, which cancels the LLM request and any running tool.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.json_response import dumps_lenient
+
+logger = logging.getLogger(__name__)
+
+# Client reconnect delay advertised in the first frame (milliseconds)
+RETRY_MS = 3000
+
+_END = object()
+
+
+@dataclass
+class StreamEvent:
+    seq: int
+    type: str
+    data: Dict[str, Any]
+
+
+def format_event(stream_id: str, event: StreamEvent) -> str:
+    """Serialize one event as an SSE frame."""
+    return f"id: {stream_id}:{event.seq}\nevent: {event.type}\ndata: {dumps_lenient(event.data)}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Split a "<stream_id>:<seq>" Last-Event-ID; None if malformed."""
+    if not value or ":" not in value:
+        return None
+    stream_id, _, seq = value.rpartition(":")
+    try:
+        return stream_id, int(seq)
+    except ValueError:
+        return None
+
+
+def merge_content(events: List[StreamEvent]) -> List[StreamEvent]:
+    """Merge runs of content events (used when a client is catching up)."""
+    merged: List[StreamEvent] = []
+    for event in events:
+        if event.type == "content" and merged and merged[-1].type == "content":
+            previous = merged[-1]
+            merged[-1] = StreamEvent(
+                seq=event.seq,
+                type="content",
+                data={"content": previous.data.get("content", "") + event.data.get("content", "")},
+            )
+        else:
+            merged.append(event)
+    return merged
+
+
+class AgentStream:
+    """One agent turn running in the background with a bounded replay buffer."""
+
+    def __init__(
+        self,
+        user_id: str,
+        max_events: Optional[int] = None,
+        coalesce_seconds: Optional[float] = None,
+        coalesce_chars: Optional[int] = None,
+        resume_grace_seconds: Optional[float] = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.conversation_id: Optional[str] = None
+        self.coalesce_seconds = (
+            coalesce_seconds if coalesce_seconds is not None else settings.agent_sse_coalesce_ms / 1000
+        )
+        self.coalesce_chars = coalesce_chars or settings.agent_sse_coalesce_chars
+        self.resume_grace_seconds = (
+            resume_grace_seconds if resume_grace_seconds is not None
+            else settings.agent_sse_resume_grace_seconds
+        )
+        self.events: Deque[StreamEvent] = deque(maxlen=max_events or settings.agent_sse_replay_events)
+        self.last_seq = 0
+        self.finished = False
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._abandon_handle: Optional[asyncio.TimerHandle] = None
+
+    # ---------- Producer ----------
+
+    def start(self, source: AsyncIterator[Dict[str, Any]]) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run(source))
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        self.last_seq += 1
+        self.events.append(StreamEvent(self.last_seq, event_type, data))
+        if event_type == "done" and data.get("conversation_id"):
+            self.conversation_id = str(data["conversation_id"])
+        self._notify()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _run(self, source: AsyncIterator[Dict[str, Any]]) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for event in source:
+                    await queue.put(event)
+            except Exception as e:
+                logger.exception(f"SSE generation error: {e}")
+                await queue.put({"type": "error", "data": {"message": str(e)}})
+            finally:
+                await queue.put(_END)
+
+        pump_task = asyncio.create_task(pump())
+        loop = asyncio.get_running_loop()
+        pending: List[str] = []
+        pending_chars = 0
+        deadline = 0.0
+
+        def flush():
+            nonlocal pending, pending_chars
+            if pending:
+                self.publish("content", {"content": "".join(pending)})
+                pending, pending_chars = [], 0
+
+        try:
+            while True:
+                timeout = max(0.0, deadline - loop.time()) if pending else None
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    flush()
+                    continue
+                if event is _END:
+                    flush()
+                    break
+                if event.get("type") == "content":
+                    chunk = event.get("data", {}).get("content", "")
+                    if not pending:
+                        deadline = loop.time() + self.coalesce_seconds
+                    pending.append(chunk)
+                    pending_chars += len(chunk)
+                    if pending_chars >= self.coalesce_chars:
+                        flush()
+                else:
+                    flush()
+                    self.publish(event.get("type", "message"), event.get("data", {}))
+        finally:
+            if not pump_task.done():
+                # Cancels the orchestrator: LLM request and any running tool
+                pump_task.cancel()
+                try:
+                    await pump_task
+                except asyncio.CancelledError:
+                    pass
+            self.finished = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def cancel(self) -> None:
+        if self._task and not self._task.done():
+            self.cancelled = True
+            self._task.cancel()
+
+    # ---------- Subscribers ----------
+
+    def events_after(self, seq: int) -> List[StreamEvent]:
+        return [event for event in self.events if event.seq > seq]
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for events published after this call; False on timeout.
+
+        Events published before the call don't wake it, so check last_seq first.
+        """
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def attach(self) -> None:
+        self.subscribers += 1
+        if self._abandon_handle:
+            self._abandon_handle.cancel()
+            self._abandon_handle = None
+
+    def detach(self) -> None:
+        self.subscribers -= 1
+        if self.subscribers <= 0 and not self.finished:
+            loop = asyncio.get_running_loop()
+            self._abandon_handle = loop.call_later(self.resume_grace_seconds, self._cancel_if_abandoned)
+
+    def _cancel_if_abandoned(self) -> None:
+        self._abandon_handle = None
+        if self.subscribers <= 0 and not self.finished:
+            logger.info(f"Agent stream {self.id} abandoned by client; cancelling")
+            self.cancel()
+
+
+async def sse_frames(
+    stream: AgentStream,
+    after_seq: int = 0,
+    request: Any = None,
+    heartbeat_seconds: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """Yield SSE frames for a stream from after_seq, live until it finishes."""
+    heartbeat = heartbeat_seconds or settings.agent_sse_heartbeat_seconds
+    stream.attach()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        cursor = after_seq
+        while True:
+            events = stream.events_after(cursor)
+            if events and events[0].seq > cursor + 1 and cursor > 0:
+                # The client fell further behind than the replay buffer holds
+                yield f"event: replay_gap\ndata: {dumps_lenient({'missedFrom': cursor + 1, 'resumedAt': events[0].seq})}\n\n"
+            for event in merge_content(events):
+                yield format_event(stream.id, event)
+                cursor = event.seq
+            if stream.finished and cursor >= stream.last_seq:
+                return
+            if stream.last_seq > cursor:
+                # Published while this generator was paused at a yield; the
+                # wakeup for those events has already fired
+                continue
+            if not await stream.wait(heartbeat):
+                if request is not None and await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+    finally:
+        stream.detach()
+
+
+class AgentStreamRegistry:
+    """Running and recently finished streams, for Last-Event-ID resumes."""
+
+    def __init__(self, max_streams: int = 1000, retain_seconds: float = 300):
+        self.max_streams = max_streams
+        self.retain_seconds = retain_seconds
+        self._streams: "OrderedDict[str, AgentStream]" = OrderedDict()
+
+    def create(self, user_id: str, source: AsyncIterator[Dict[str, Any]], **kwargs) -> AgentStream:
+        self._prune()
+        stream = AgentStream(user_id=user_id, **kwargs)
+        self._streams[stream.id] = stream
+        stream.start(source)
+        return stream
+
+    def get(self, stream_id: str) -> Optional[AgentStream]:
+        self._prune()
+        return self._streams.get(stream_id)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for stream_id, stream in list(self._streams.items()):
+            if stream.finished and now - (stream.finished_at or now) > self.retain_seconds:
+                del self._streams[stream_id]
+        while len(self._streams) > self.max_streams:
+            stream_id, stream = next(iter(self._streams.items()))
+            stream.cancel()
+            del self._streams[stream_id]
+
+    def stats(self) -> Dict[str, int]:
+        running = sum(1 for s in self._streams.values() if not s.finished)
+        return {"streams": len(self._streams), "running": running}
+
+
+# Global registry
+agent_streams = AgentStreamRegistry()
@@ -0,0 +1,111 @@
+"""
+In-process caches for the agent and the write-path hooks that invalidate them.
+
+Agent caches (system prompt sections, tool results) hold data derived from
+project and company rows. API handlers that change that data call
+notify_project_changed / notify_company_changed; every cache that registered
+a listener drops the affected entries. This module has no heavy imports so
+any API module can call the hooks without pulling in the agent runtime.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches the predicate. Returns the count."""
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ==================== Invalidation hooks ====================
+
+_project_listeners: List[Callable[[str], None]] = []
+_company_listeners: List[Callable[[str], None]] = []
+
+
+def on_project_changed(listener: Callable[[str], None]) -> None:
+    """Register a callback run with the project ID when project data changes."""
+    if listener not in _project_listeners:
+        _project_listeners.append(listener)
+
+
+def on_company_changed(listener: Callable[[str], None]) -> None:
+    """Register a callback run with the company ID when company data changes."""
+    if listener not in _company_listeners:
+        _company_listeners.append(listener)
+
+
+def _notify(listeners: List[Callable[[str], None]], key: Optional[str]) -> None:
+    if not key:
+        return
+    for listener in listeners:
+        try:
+            listener(str(key))
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener failed: {e}")
+
+
+def notify_project_changed(project_id: Optional[str]) -> None:
+    """Invalidate agent caches after a write to a project's stages, issues, etc."""
+    _notify(_project_listeners, project_id)
+
+
+def notify_company_changed(company_id: Optional[str]) -> None:
+    """Invalidate agent caches after a write to company-level data."""
+    _notify(_company_listeners, company_id)
@@ -3,11 +3,13 @@ Context builder for constructing system prompts and enriching agent context.
 """
 
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
 
+from src.core.config import settings
 from src.database.repositories import ProjectRepository
 from src.database.connection import db_manager
+from ..cache import TTLCache, on_company_changed, on_project_changed
 
 logger = logging.getLogger(__name__)
 
@@ -55,10 +57,10 @@ class ContextBuilder:
         ),
     }
 
+    # Static instructions, identical for every user and turn. Kept first and
+    # free of placeholders so provider-side prefix caching can reuse it.
     BASE_SYSTEM_PROMPT = """You are the Proesphere AI Assistant, an intelligent agent for construction project management. You help project managers, site leads, and contractors manage their projects efficiently through natural language.
 
-{company_identity}
-
 ## Your Capabilities
 - Query project status, stages, tasks, and materials
 - Provide insights on project progress and blockers
@@ -98,7 +100,7 @@ class ContextBuilder:
 
 **CORRECT BEHAVIOR:**
 - User asks: "What issues are open?"
-- Tool returns: [{{"title": "API Test Issue", "status": "open"}}]
+- Tool returns: [{"title": "API Test Issue", "status": "open"}]
 - CORRECT: "There is 1 open issue: API Test Issue"
 
 ## Response Format
@@ -135,8 +137,6 @@ When a user asks a question that requires specific context (like a project) that
 
 CRITICAL: When showing project options, you MUST use the actual project names returned by get_projects. Do not invent or assume project names.
 
-{date_context}
-
 ## Understanding Project Stages
 Stages are ordered sequentially by `orderIndex` or `order_index` (starting from 0).
 
@@ -195,15 +195,33 @@ When asked for a "project status summary", "project status", or similar, ALWAYS
 6. **Payment Status** (if asked or relevant): Overdue payments from `payments.overdueInstallments`
 
 **CRITICAL: Do NOT omit open issues or overdue materials from status summaries.** These are essential for project management.
+"""
 
+    # Per-request sections appended after the static prefix, ordered from
+    # most to least stable (role, company, day, project)
+    DYNAMIC_PROMPT_TEMPLATE = """
 {role_guidelines}
 
+{company_identity}
+
+{date_context}
+
 {project_context}
 """
 
     def __init__(self):
         self.project_repo = ProjectRepository()
 
+        # Assembled prompts keyed by (company, role, project, date); the
+        # company and project sections are cached separately so a stage or
+        # issue change only re-queries that project
+        ttl = settings.agent_prompt_cache_ttl_seconds
+        self._prompt_cache = TTLCache(ttl_seconds=ttl, max_entries=2000)
+        self._company_cache = TTLCache(ttl_seconds=ttl, max_entries=500)
+        self._project_cache = TTLCache(ttl_seconds=ttl, max_entries=2000)
+        on_project_changed(self.invalidate_project)
+        on_company_changed(self.invalidate_company)
+
     async def build_system_prompt(
         self,
         user_context: Dict[str, Any],
@@ -219,32 +237,79 @@ When asked for a "project status summary", "project status", or similar, ALWAYS
             Complete system prompt string.
         """
         role = user_context.get("role", "user")
+        company_id = user_context.get("company_id")
+        cache_key = (company_id, role, project_id, date.today())
+
+        cached = self._prompt_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         role_guidelines = self.ROLE_GUIDELINES.get(
             role,
             "Provide helpful, accurate responses based on the user's queries."
         )
 
         # Build company identity section
-        company_identity = await self._build_company_identity(user_context)
+        company_identity = await self._get_company_identity(user_context)
 
         # Build project context section
         project_context = ""
         if project_id:
-            project_context = await self._build_project_context(project_id)
+            project_context = await self._get_project_context(project_id)
 
         # Build date context section
         date_context = self._build_date_context()
 
-        # Assemble full prompt
-        prompt = self.BASE_SYSTEM_PROMPT.format(
+        # Assemble full prompt: static prefix first, then per-request sections
+        prompt = self.BASE_SYSTEM_PROMPT + self.DYNAMIC_PROMPT_TEMPLATE.format(
             company_identity=company_identity,
             role_guidelines=f"## User Context\n{role_guidelines}",
             project_context=project_context,
             date_context=date_context,
         )
 
+        self._prompt_cache.set(cache_key, prompt)
         return prompt
 
+    async def _get_company_identity(self, user_context: Dict[str, Any]) -> str:
+        """Company identity section, cached per company."""
+        company_id = user_context.get("company_id")
+        cached = self._company_cache.get(company_id)
+        if cached is not None:
+            return cached
+        section = await self._build_company_identity(user_context)
+        if section:
+            self._company_cache.set(company_id, section)
+        return section
+
+    async def _get_project_context(self, project_id: str) -> str:
+        """Project context section, cached per project."""
+        cached = self._project_cache.get(project_id)
+        if cached is not None:
+            return cached
+        section = await self._build_project_context(project_id)
+        if section:
+            self._project_cache.set(project_id, section)
+        return section
+
+    def invalidate_project(self, project_id: str) -> None:
+        """Drop cached prompt sections after a project's stages or issues change."""
+        self._project_cache.invalidate(lambda key: key == project_id)
+        self._prompt_cache.invalidate(lambda key: key[2] == project_id)
+
+    def invalidate_company(self, company_id: str) -> None:
+        """Drop cached prompt sections after company data changes."""
+        self._company_cache.invalidate(lambda key: key == company_id)
+        self._prompt_cache.invalidate(lambda key: key[0] == company_id)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for the prompt caches."""
+        return {
+            "prompts": self._prompt_cache.stats(),
+            "companies": self._company_cache.stats(),
+            "projects": self._project_cache.stats(),
+        }
+
     async def _build_company_identity(self, user_context: Dict[str, Any]) -> str:
         """Build the company identity section to prevent context confusion.
 
@@ -0,0 +1,212 @@
+"""
+Token-budgeted conversation context for the agent.
+
+Selects the most recent turns that fit a token budget and folds everything
+older into a rolling summary stored in agent.conversations.metadata
+(key "contextSummary"). The summary is updated incrementally: each turn only
+folds in messages newer than the summary's watermark, so long conversations
+never rescan their full history.
+"""
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..repositories.agent_repository import agent_repo, AgentRepository
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead for role/formatting tokens in chat completion APIs
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Characters kept per turn when folding it into the summary
+SUMMARY_TURN_CHARS = 240
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string (~4 characters per token)."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
+
+
+def estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate tokens for one chat message including role overhead."""
+    return estimate_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Estimate total prompt tokens for a list of chat messages."""
+    return sum(estimate_message_tokens(m) for m in messages)
+
+
+def summarize_turn(role: str, content: str) -> str:
+    """Condense one message into a single summary line."""
+    text = _WHITESPACE_RE.sub(" ", content or "").strip()
+    if len(text) > SUMMARY_TURN_CHARS:
+        text = text[:SUMMARY_TURN_CHARS].rstrip() + "..."
+    speaker = "User" if role == "user" else "Assistant"
+    return f"- {speaker}: {text}"
+
+
+@dataclass
+class ContextWindow:
+    """Conversation history selected for one LLM call."""
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    summary: Optional[str] = None
+    history_tokens: int = 0
+    summary_tokens: int = 0
+    included_messages: int = 0
+    summarized_messages: int = 0
+
+    def to_llm_messages(self) -> List[Dict[str, str]]:
+        """History as chat messages, with the summary first when present."""
+        if not self.summary:
+            return list(self.messages)
+        return [
+            {"role": "system", "content": f"Summary of earlier conversation:\n{self.summary}"},
+            *self.messages,
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "history_tokens": self.history_tokens,
+            "summary_tokens": self.summary_tokens,
+            "included_messages": self.included_messages,
+            "summarized_messages": self.summarized_messages,
+        }
+
+
+class ContextWindowManager:
+    """Builds token-budgeted history with a rolling summary of older turns."""
+
+    def __init__(
+        self,
+        repo: Optional[AgentRepository] = None,
+        token_budget: Optional[int] = None,
+        summary_token_budget: Optional[int] = None,
+        max_messages: Optional[int] = None,
+    ):
+        self.repo = repo or agent_repo
+        self.token_budget = token_budget or settings.agent_context_token_budget
+        self.summary_token_budget = summary_token_budget or settings.agent_context_summary_tokens
+        self.max_messages = max_messages or settings.agent_context_max_messages
+
+    def _select_recent(self, rows: List[Dict[str, Any]]) -> int:
+        """Return the index of the oldest row that fits in the token budget."""
+        used = 0
+        start = len(rows)
+        for i in range(len(rows) - 1, -1, -1):
+            cost = estimate_message_tokens(rows[i])
+            if used + cost > self.token_budget and start < len(rows):
+                break
+            used += cost
+            start = i
+        return start
+
+    def _fold(self, summary_text: str, rows: List[Dict[str, Any]]) -> str:
+        """Append turns to the summary, dropping the oldest lines over budget."""
+        lines = summary_text.splitlines() if summary_text else []
+        lines.extend(summarize_turn(row["role"], row["content"]) for row in rows)
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_token_budget:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    async def _fetch_gap(
+        self, conversation_id: str, after: Optional[datetime], before: datetime
+    ) -> List[Dict[str, Any]]:
+        """Messages in (after, before) that can still appear in the summary.
+
+        Pages backwards from `before`, max_messages rows at a time, and stops
+        once the pages fill the summary budget: _fold would drop anything
+        older, so a long history without a watermark is never loaded at once.
+        """
+        pages: List[List[Dict[str, Any]]] = []
+        summary_tokens = 0
+        while summary_tokens <= self.summary_token_budget:
+            page = await self.repo.get_messages_between(
+                conversation_id, after, before, limit=self.max_messages
+            )
+            if not page:
+                break
+            pages.append(page)
+            summary_tokens += sum(
+                estimate_tokens(summarize_turn(row["role"], row["content"])) for row in page
+            )
+            if len(page) < self.max_messages:
+                break
+            before = page[0]["created_at"]
+        return [row for page in reversed(pages) for row in page]
+
+    async def build(self, conversation_id: str) -> ContextWindow:
+        """Select recent turns under the budget and refresh the summary."""
+        rows = await self.repo.get_recent_messages(conversation_id, self.max_messages)
+        if not rows:
+            return ContextWindow()
+
+        start = self._select_recent(rows)
+        recent = rows[start:]
+        evicted = rows[:start]
+
+        # A single oversized message is truncated rather than dropped
+        if recent and estimate_message_tokens(recent[0]) > self.token_budget:
+            max_chars = max(0, (self.token_budget - MESSAGE_OVERHEAD_TOKENS) * 4)
+            recent[0] = {**recent[0], "content": recent[0]["content"][:max_chars]}
+
+        stored = await self.repo.get_context_summary(conversation_id) or {}
+        summary_text = stored.get("text") or ""
+        watermark = _parse_timestamp(stored.get("through"))
+        summarized_count = int(stored.get("messageCount") or 0)
+
+        window_start = recent[0]["created_at"] if recent else None
+        to_fold = [row for row in evicted if watermark is None or row["created_at"] > watermark]
+
+        # Rows scanned didn't reach the watermark: fetch the gap in between
+        if len(rows) >= self.max_messages and window_start is not None:
+            oldest_scanned = rows[0]["created_at"]
+            if watermark is None or oldest_scanned > watermark:
+                gap = await self._fetch_gap(conversation_id, watermark, oldest_scanned)
+                to_fold = gap + to_fold
+
+        if to_fold:
+            summary_text = self._fold(summary_text, to_fold)
+            summarized_count += len(to_fold)
+            try:
+                await self.repo.save_context_summary(conversation_id, {
+                    "text": summary_text,
+                    "through": to_fold[-1]["created_at"].isoformat(),
+                    "messageCount": summarized_count,
+                })
+            except Exception as e:
+                logger.warning(f"Failed to save context summary: {e}")
+
+        messages = [{"role": row["role"], "content": row["content"]} for row in recent]
+        return ContextWindow(
+            messages=messages,
+            summary=summary_text or None,
+            history_tokens=estimate_messages_tokens(messages),
+            summary_tokens=estimate_tokens(summary_text),
+            included_messages=len(messages),
+            summarized_messages=summarized_count,
+        )
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Global instance
+context_window_manager = ContextWindowManager()
@@ -0,0 +1,302 @@
+"""
+Deterministic fast path for common agent lookups.
+
+Questions such as "what's overdue on Via Tesoro", "open issues on Maple" or
+"next stage" are structured lookups that otherwise take two LLM round trips
+(one to pick query_database, one to summarize its rows). The router matches
+the whole message against a few anchored templates, calls the tool directly
+through the executor (so permissions and the result cache still apply) and
+renders the answer with ResponseFormatter.
+
+A template only answers when it matches the entire message and any captured
+project name is a plain name (not the tail of a compound question). Anything
+else, or a tool result that needs a follow-up question (ambiguous or loosely
+matched project name, access denied), falls back to the full agent loop.
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .response_formatter import response_formatter
+from ..tools.executor import tool_executor, ToolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Trailing "on|for|in <project>" shared by the templates
+_PROJECT = r"(?: (?:on|for|in|at|of) (?:the )?(?P<project>[a-z0-9][a-z0-9 '&.-]{1,60}?)(?: project| job)?)?"
+_ASK = r"(?:(?:what|which)(?: is| are)?|show(?: me)?|list|any|get(?: me)?)?\s*(?:(?:the|my|all) )?"
+# A captured project name containing these is the rest of a compound
+# question ("... on via tesoro and why is it late"), not a name
+_COMPOUND_WORDS = re.compile(r"\b(?:and|or|but|then|also|why|how|who|what|when|where|which)\b")
+
+_ENTITY_DATA_TYPES = {
+    "task": "tasks",
+    "payment": "payments",
+    "installment": "payments",
+    "invoice": "invoices",
+    "issue": "issues",
+    "problem": "issues",
+}
+
+_DATE_FILTERS = {
+    "today": "today",
+    "this week": "this_week",
+    "this month": "this_month",
+    "next week": "next_7",
+}
+
+
+@dataclass
+class FastPathTemplate:
+    """An anchored pattern and how to turn its match into a tool call."""
+    name: str
+    pattern: "re.Pattern[str]"
+    build: Callable[[Dict[str, Optional[str]], Optional[str]], Optional[Dict[str, Any]]]
+
+
+@dataclass
+class FastPathAnswer:
+    """A rendered answer produced without the LLM."""
+    template: str
+    tool_name: str
+    params: Dict[str, Any]
+    result: Dict[str, Any]
+    content: str
+    execution_time_ms: int
+
+
+@dataclass
+class FastPathStats:
+    hits: int = 0
+    fallbacks: int = 0
+    misses: int = 0
+    hit_latency_ms: List[int] = field(default_factory=list)
+
+
+def normalize(message: str) -> str:
+    """Lower-case, expand "what's", collapse spaces and drop end punctuation."""
+    text = (message or "").lower().strip()
+    text = text.replace("’", "'").replace("what's", "what is").replace("whats ", "what is ")
+    text = re.sub(r"\s+", " ", text)
+    return text.rstrip(" ?.!")
+
+
+def _scope(params: Dict[str, Any], groups: Dict[str, Optional[str]], project_id: Optional[str]) -> None:
+    """Filter by the named project, else by the conversation's project."""
+    if groups.get("project"):
+        params["project_name"] = groups["project"].strip()
+    elif project_id:
+        params["project_id"] = project_id
+
+
+def _entity(value: Optional[str], default: str) -> str:
+    if not value:
+        return default
+    return _ENTITY_DATA_TYPES.get(value.rstrip("s"), default)
+
+
+def _build_overdue(groups, project_id):
+    params = {
+        "data_type": _entity(groups.get("entity") or groups.get("entity_after"), "tasks"),
+        "date_filter": "overdue",
+    }
+    _scope(params, groups, project_id)
+    return params
+
+
+def _build_open_issues(groups, project_id):
+    params: Dict[str, Any] = {"data_type": "issues"}
+    qualifier = groups.get("qualifier")
+    if qualifier == "open":
+        params["status"] = "open"
+    else:
+        params["priority"] = "critical" if qualifier == "critical" else "high"
+    _scope(params, groups, project_id)
+    return params
+
+
+def _build_due(groups, project_id):
+    params = {
+        "data_type": _entity(groups.get("entity"), "tasks"),
+        "date_filter": _DATE_FILTERS[groups["when"]],
+    }
+    _scope(params, groups, project_id)
+    return params
+
+
+def _build_stage(groups, project_id):
+    # Stage questions only make sense for one project
+    if groups.get("project"):
+        return {"data_type": "stages", "project_name": groups["project"].strip()}
+    if project_id:
+        return {"project_id": project_id}
+    return None
+
+
+TEMPLATES: List[FastPathTemplate] = [
+    FastPathTemplate(
+        name="overdue",
+        pattern=re.compile(
+            _ASK
+            + r"(?:(?P<entity>tasks?|payments?|installments?|invoices?|issues?) )?"
+            + r"(?:(?:are|is) )?(?:(?:still|currently) )?overdue"
+            + r"(?: (?P<entity_after>tasks|payments|installments|invoices|issues))?"
+            + _PROJECT
+        ),
+        build=_build_overdue,
+    ),
+    FastPathTemplate(
+        name="open_issues",
+        pattern=re.compile(
+            _ASK + r"(?P<qualifier>open|critical|high priority) (?:issues|problems)" + _PROJECT
+        ),
+        build=_build_open_issues,
+    ),
+    FastPathTemplate(
+        name="due",
+        pattern=re.compile(
+            _ASK
+            + r"(?P<entity>tasks|payments|installments) (?:(?:are|is) )?due "
+            + r"(?P<when>today|this week|this month|next week)"
+            + _PROJECT
+        ),
+        build=_build_due,
+    ),
+    FastPathTemplate(
+        name="stage",
+        pattern=re.compile(
+            r"(?:(?:what|which)(?: is)?|show(?: me)?)?\s*(?:the )?(?P<which>next|current) (?:stage|phase)"
+            + _PROJECT
+        ),
+        build=_build_stage,
+    ),
+]
+
+_HEADINGS = {
+    "overdue": "Overdue {entity}",
+    "open_issues": "{qualifier} issues",
+    "due": "{entity} due {when}",
+}
+
+
+class FastPathRouter:
+    """Answers templated lookups directly; returns None to use the full loop."""
+
+    def __init__(
+        self,
+        templates: Optional[List[FastPathTemplate]] = None,
+        executor: Optional[ToolExecutor] = None,
+    ):
+        self.templates = templates if templates is not None else TEMPLATES
+        self.executor = executor or tool_executor
+        self._stats = FastPathStats()
+
+    def match(self, message: str, project_id: Optional[str] = None):
+        """Return (template, groups, tool params) for a full-message match."""
+        text = normalize(message)
+        for template in self.templates:
+            m = template.pattern.fullmatch(text)
+            if not m:
+                continue
+            groups = m.groupdict()
+            if groups.get("project") and _COMPOUND_WORDS.search(groups["project"]):
+                return None
+            params = template.build(groups, project_id)
+            if params is not None:
+                return template, groups, params
+        return None
+
+    async def answer(
+        self,
+        message: str,
+        project_id: Optional[str],
+        context: Dict[str, Any],
+    ) -> Optional[FastPathAnswer]:
+        """Answer the message if a template matches and the tool result is usable."""
+        matched = self.match(message, project_id)
+        if not matched:
+            self._stats.misses += 1
+            return None
+        template, groups, params = matched
+        tool_name = "get_stages" if "project_id" in params and "data_type" not in params else "query_database"
+
+        start = time.time()
+        try:
+            result = await self.executor.execute(tool_name=tool_name, params=params, context=context)
+        except Exception as e:
+            # Permission or validation problems: let the full loop explain
+            logger.info(f"Fast path '{template.name}' fell back: {e}")
+            self._stats.fallbacks += 1
+            return None
+
+        if not isinstance(result, dict) or result.get("error"):
+            self._stats.fallbacks += 1
+            return None
+        # A named project must have resolved (the resolver only accepts exact,
+        # whole-word or high-scoring matches); otherwise let the LLM ask
+        if groups.get("project") and not result.get("projectFilter"):
+            self._stats.fallbacks += 1
+            return None
+
+        content = self._render(template.name, groups, result)
+        execution_time_ms = int((time.time() - start) * 1000)
+        self._stats.hits += 1
+        self._stats.hit_latency_ms.append(execution_time_ms)
+        del self._stats.hit_latency_ms[:-1000]
+        return FastPathAnswer(
+            template=template.name,
+            tool_name=tool_name,
+            params=params,
+            result=result,
+            content=content,
+            execution_time_ms=execution_time_ms,
+        )
+
+    def _render(self, template: str, groups: Dict[str, Optional[str]], result: Dict[str, Any]) -> str:
+        if template == "stage":
+            stages = result.get("stages")
+            if stages is None:
+                stages = [_stage_from_row(row) for row in result.get("results", [])]
+            project_name = result.get("projectFilter") if groups.get("project") else None
+            return response_formatter.format_stage_answer(stages, groups["which"], project_name)
+
+        entity = (result.get("dataType") or "items").replace("_", " ")
+        heading = _HEADINGS[template].format(
+            entity=entity,
+            qualifier=(groups.get("qualifier") or "").capitalize(),
+            when=groups.get("when") or "",
+        )
+        heading = heading[0].upper() + heading[1:]
+        if groups.get("project") and result.get("projectFilter"):
+            heading += f" on {result['projectFilter']}"
+        return response_formatter.format_query_response(result, heading)
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        matched = s.hits + s.fallbacks
+        total = matched + s.misses
+        latencies = s.hit_latency_ms
+        return {
+            "hits": s.hits,
+            "fallbacks": s.fallbacks,
+            "misses": s.misses,
+            "hit_rate": round(s.hits / total, 4) if total else 0.0,
+            "avg_hit_latency_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+        }
+
+
+def _stage_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a query_database project_stages row to the get_stages shape."""
+    return {
+        "name": row.get("name"),
+        "status": row.get("status"),
+        "plannedStartDate": row.get("planned_start_date"),
+        "plannedEndDate": row.get("planned_end_date"),
+    }
+
+
+# Global instance
+fast_path_router = FastPathRouter()
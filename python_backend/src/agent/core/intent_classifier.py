@@ -0,0 +1,309 @@
+"""
+Local intent classifier for agent model routing.
+
+A multinomial naive Bayes model over word unigrams and bigrams. It starts from
+a small built-in seed set and periodically retrains on logged conversations:
+each user message is labelled from the tools the agent called to answer it,
+and rated feedback adds (or, when negative, removes) examples. Training and
+prediction are pure Python and need no network; a retrain takes a few
+milliseconds on thousands of examples.
+
+The predicted intent feeds ModelRouter.select_model, so lookups go to the
+standard model and analysis/report requests go to the complex one.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..llm.model_router import ModelRouter
+from ..repositories.agent_repository import agent_repo, AgentRepository
+from ..tools.dynamic.schema_registry import resolve_table_name
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "in", "on",
+    "for", "and", "or", "me", "my", "i", "we", "our", "you", "your", "it",
+    "this", "that", "please", "can", "could", "would", "do", "does", "with",
+    "at", "by", "from", "all", "any", "there", "what", "s",
+})
+
+# Seed examples so routing works before any conversations are logged
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "lookup_tasks": [
+        "what tasks are overdue",
+        "show my tasks for today",
+        "which tasks are due this week",
+        "list open tasks on the project",
+        "what's on the punch list",
+        "who is assigned to the framing task",
+        "tasks blocked on site",
+    ],
+    "lookup_issues": [
+        "show open issues",
+        "any critical issues on this project",
+        "list unresolved problems",
+        "what issues were reported this week",
+        "who is assigned to the leak issue",
+    ],
+    "lookup_stages": [
+        "what is the next stage",
+        "which stage is the project in",
+        "show project stages",
+        "when does the drywall stage start",
+        "current phase of construction",
+    ],
+    "lookup_materials": [
+        "list materials for the kitchen",
+        "what materials are pending approval",
+        "show material orders",
+        "which supplies still need ordering",
+    ],
+    "lookup_payments": [
+        "what payments are due",
+        "show unpaid installments",
+        "when is the next payment",
+        "list invoices for the project",
+        "how much has the client paid",
+    ],
+    "lookup_projects": [
+        "list my projects",
+        "show active projects",
+        "project details for maple street",
+        "what is the status of the project",
+        "where is the project located",
+    ],
+    "smalltalk": [
+        "hi",
+        "hello there",
+        "thanks",
+        "thank you",
+        "good morning",
+        "what can you do",
+    ],
+    "analyze": [
+        "analyze why the project is behind schedule",
+        "compare progress across my projects",
+        "why are we over budget",
+        "what is causing the delays",
+        "explain the trend in open issues",
+    ],
+    "blocker_analysis": [
+        "what is blocking progress",
+        "find blockers across projects",
+        "what is holding up the schedule",
+    ],
+    "portfolio_health": [
+        "how healthy is my portfolio",
+        "which projects are at risk",
+        "overall health of all projects",
+    ],
+    "margin_risk": [
+        "which projects are losing money",
+        "margin risk on current jobs",
+        "are we going to exceed the budget",
+    ],
+    "generate_progress_report": [
+        "write a progress report",
+        "generate a weekly report for the client",
+        "summarize progress this month in a report",
+    ],
+    "generate_client_update_draft": [
+        "draft an update email to the client",
+        "write a message to the homeowner about the delay",
+        "prepare a client update",
+    ],
+    "generate_schedule": [
+        "create a schedule for the remaining work",
+        "plan the next two weeks of work",
+        "build a timeline for the renovation",
+    ],
+    "morning_briefing": [
+        "give me my morning briefing",
+        "what should i focus on today across all projects",
+        "daily briefing",
+    ],
+}
+
+# Tool used to answer a turn -> intent label for logged examples
+TOOL_INTENTS: Dict[str, str] = {
+    "get_tasks": "lookup_tasks",
+    "get_issues": "lookup_issues",
+    "get_stages": "lookup_stages",
+    "get_materials": "lookup_materials",
+    "get_installments": "lookup_payments",
+    "get_projects": "lookup_projects",
+    "get_project_detail": "lookup_projects",
+}
+
+# query_database table -> intent label
+TABLE_INTENTS: Dict[str, str] = {
+    "tasks": "lookup_tasks",
+    "issues": "lookup_issues",
+    "project_stages": "lookup_stages",
+    "materials": "lookup_materials",
+    "material_areas": "lookup_materials",
+    "payment_installments": "lookup_payments",
+    "payment_schedules": "lookup_payments",
+    "invoices": "lookup_payments",
+    "projects": "lookup_projects",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word unigrams plus bigrams, without stopwords."""
+    words = [w for w in _TOKEN_RE.findall((text or "").lower()) if w not in STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def label_from_tool_calls(tool_calls: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """Derive an intent label from the tools that answered a turn."""
+    names = []
+    for call in tool_calls or []:
+        name = call.get("name") if isinstance(call, dict) else None
+        if name:
+            names.append((name, call.get("input") or {}))
+    if not names:
+        return None
+    if len(names) >= 3 or any(name in ModelRouter.COMPLEX_TOOLS for name, _ in names):
+        return "analyze"
+    name, tool_input = names[0]
+    if name == "query_database":
+        table = resolve_table_name(str(tool_input.get("data_type", "")))
+        return TABLE_INTENTS.get(table)
+    return TOOL_INTENTS.get(name)
+
+
+@dataclass
+class IntentPrediction:
+    """Classifier output for one message."""
+    intent: Optional[str]
+    confidence: float
+
+    def routed_intent(self, min_confidence: float) -> Optional[str]:
+        """The intent to route on, or None when the prediction is weak."""
+        return self.intent if self.confidence >= min_confidence else None
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes with Laplace smoothing."""
+
+    def __init__(self, alpha: float = 1.0, retrain_seconds: Optional[int] = None):
+        self.alpha = alpha
+        self.retrain_seconds = retrain_seconds or settings.agent_intent_retrain_seconds
+        self._class_log_prior: Dict[str, float] = {}
+        self._token_log_prob: Dict[str, Dict[str, float]] = {}
+        self._unseen_log_prob: Dict[str, float] = {}
+        self._vocabulary: set = set()
+        self.trained_examples = 0
+        self._trained_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.fit(_seed_pairs())
+        # Seeds only so far: retrain from the logs on first use
+        self._trained_at = None
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> None:
+        """Train on (text, intent) pairs, replacing the current model."""
+        token_counts: Dict[str, Counter] = defaultdict(Counter)
+        class_counts: Counter = Counter()
+        for text, intent in examples:
+            tokens = tokenize(text)
+            if not tokens:
+                continue
+            class_counts[intent] += 1
+            token_counts[intent].update(tokens)
+
+        total = sum(class_counts.values())
+        vocabulary = set()
+        for counts in token_counts.values():
+            vocabulary.update(counts)
+        size = len(vocabulary) or 1
+
+        class_log_prior = {}
+        token_log_prob = {}
+        unseen_log_prob = {}
+        for intent, count in class_counts.items():
+            class_log_prior[intent] = math.log(count / total)
+            denominator = sum(token_counts[intent].values()) + self.alpha * size
+            token_log_prob[intent] = {
+                token: math.log((n + self.alpha) / denominator)
+                for token, n in token_counts[intent].items()
+            }
+            unseen_log_prob[intent] = math.log(self.alpha / denominator)
+
+        self._class_log_prior = class_log_prior
+        self._token_log_prob = token_log_prob
+        self._unseen_log_prob = unseen_log_prob
+        self._vocabulary = vocabulary
+        self.trained_examples = total
+        self._trained_at = time.monotonic()
+
+    def predict(self, text: str) -> IntentPrediction:
+        """Most likely intent and its posterior probability."""
+        tokens = [t for t in tokenize(text) if t in self._vocabulary]
+        if not tokens or not self._class_log_prior:
+            return IntentPrediction(intent=None, confidence=0.0)
+
+        scores = {}
+        for intent, prior in self._class_log_prior.items():
+            probs = self._token_log_prob[intent]
+            unseen = self._unseen_log_prob[intent]
+            scores[intent] = prior + sum(probs.get(t, unseen) for t in tokens)
+
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        norm = sum(math.exp(score - top) for score in scores.values())
+        return IntentPrediction(intent=best, confidence=round(1.0 / norm, 4))
+
+    # ---------- Training from logs ----------
+
+    async def train_from_logs(self, repo: Optional[AgentRepository] = None, limit: int = 2000) -> int:
+        """Retrain on seeds plus logged turns and feedback. Returns example count."""
+        rows = await (repo or agent_repo).get_intent_training_examples(limit=limit)
+        negative = {row["text"].strip().lower() for row in rows if row.get("is_positive") is False}
+
+        examples = _seed_pairs()
+        for row in rows:
+            text = (row.get("text") or "").strip()
+            if not text or text.lower() in negative:
+                continue
+            label = label_from_tool_calls(row.get("tool_calls"))
+            if label:
+                examples.append((text, label))
+
+        self.fit(examples)
+        logger.info(f"Intent classifier retrained on {self.trained_examples} examples")
+        return self.trained_examples
+
+    def schedule_refresh(self) -> None:
+        """Retrain in the background when the model is older than retrain_seconds."""
+        if self._trained_at is not None and time.monotonic() - self._trained_at < self.retrain_seconds:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        # Push the next attempt out even if this one fails
+        self._trained_at = time.monotonic()
+        self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self.train_from_logs()
+        except Exception as e:
+            logger.warning(f"Intent classifier retrain failed, keeping current model: {e}")
+
+
+def _seed_pairs() -> List[Tuple[str, str]]:
+    return [(text, intent) for intent, texts in SEED_EXAMPLES.items() for text in texts]
+
+
+# Global instance
+intent_classifier = IntentClassifier()
@@ -11,7 +11,12 @@ from ..llm.model_router import model_router
 from ..tools.registry import tool_registry, register_default_tools
 from ..tools.executor import tool_executor, PermissionDenied
 from ..repositories.agent_repository import agent_repo
+from ..repositories.telemetry import agent_telemetry
 from .context_builder import context_builder
+from .context_window import context_window_manager, estimate_messages_tokens, estimate_tokens
+from .intent_classifier import intent_classifier
+from .fast_path import fast_path_router, FastPathAnswer
+from .result_encoder import encode_tool_result
 from src.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -79,39 +84,61 @@ class AgentOrchestrator:
 
         conversation_id = conversation["id"]
 
+        # Make sure the previous turn's queued messages are written before
+        # reading history
+        await agent_telemetry.wait_for_conversation(conversation_id)
+
+        # Common structured lookups are answered directly, skipping the LLM
+        if settings.agent_fast_path_enabled and not attachments:
+            answer = await fast_path_router.answer(
+                message,
+                project_id or conversation.get("projectId"),
+                user_context,
+            )
+            if answer:
+                for event in self._fast_path_events(
+                    answer, message, conversation_id, user_context, start_time
+                ):
+                    yield event
+                return
+
         # 2. Build system prompt and context
         system_prompt = await context_builder.build_system_prompt(
             user_context=user_context,
             project_id=project_id or conversation.get("projectId"),
         )
 
-        # 3. Get conversation history
-        history = await agent_repo.get_messages_for_llm(
-            conversation_id,
-            limit=30,
-        )
+        # 3. Get conversation history (recent turns under the token budget,
+        #    older turns folded into a rolling summary)
+        context_window = await context_window_manager.build(conversation_id)
 
         # 4. Build messages for LLM
         messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history)
+        messages.extend(context_window.to_llm_messages())
         messages.append({"role": "user", "content": message})
+        prompt_tokens = estimate_messages_tokens(messages)
 
         # 5. Get available tools for user's role
         user_role = user_context.get("role", "user")
         tools = tool_registry.get_tool_definitions(user_role)
 
-        # 6. Select model based on message complexity
+        # 6. Select model from the locally classified intent (falls back to
+        #    message length when the classifier is not confident)
+        prediction = intent_classifier.predict(message)
+        intent = prediction.routed_intent(settings.agent_intent_min_confidence)
+        intent_classifier.schedule_refresh()
         selected_model = model_router.select_model(
-            intent=None,  # Could add intent classification here
+            intent=intent,
             tool_calls=[],
             message_length=sum(len(m.get("content", "")) for m in messages),
         )
 
-        # 7. Save user message
-        user_message = await agent_repo.save_message(
+        # 7. Save user message (queued; the ID is assigned immediately)
+        user_message_id = agent_telemetry.record_message(
             conversation_id=conversation_id,
             role="user",
             content=message,
+            token_count=prompt_tokens,
         )
 
         # 8. Agentic loop
@@ -129,8 +156,8 @@ class AgentOrchestrator:
                     messages=messages,
                     tools=tools if tools else None,
                     model=selected_model,
-                    temperature=model_router.get_temperature(),
-                    max_tokens=model_router.get_max_tokens(),
+                    temperature=model_router.get_temperature(intent),
+                    max_tokens=model_router.get_max_tokens(intent),
                     stream=True,
                 ):
                     chunk_type = chunk.get("type")
@@ -184,7 +211,7 @@ class AgentOrchestrator:
                                 tool_name=tool_name,
                                 params=tool_input,
                                 context=user_context,
-                                message_id=user_message["id"],
+                                message_id=user_message_id,
                                 conversation_id=conversation_id,
                             )
 
@@ -211,7 +238,7 @@ class AgentOrchestrator:
                             })
                             messages.append({
                                 "role": "user",
-                                "content": f"[ACTUAL DATABASE RESULTS - DO NOT FABRICATE OR MODIFY THIS DATA]\nTool '{tool_name}' returned the following REAL data from the database:\n{self._summarize_result(result)}\n[END DATABASE RESULTS - Only report what appears above]",
+                                "content": f"[ACTUAL DATABASE RESULTS - DO NOT FABRICATE OR MODIFY THIS DATA]\nTool '{tool_name}' returned the following REAL data from the database:\n{self._summarize_result(result, tool_input)}\n[END DATABASE RESULTS - Only report what appears above]",
                             })
 
                         except PermissionDenied as e:
@@ -278,7 +305,7 @@ class AgentOrchestrator:
         assistant_message_id = None
 
         if accumulated_content:
-            assistant_message = await agent_repo.save_message(
+            assistant_message_id = agent_telemetry.record_message(
                 conversation_id=conversation_id,
                 role="assistant",
                 content=accumulated_content,
@@ -286,28 +313,55 @@ class AgentOrchestrator:
                 model_used=selected_model,
                 latency_ms=latency_ms,
             )
-            assistant_message_id = assistant_message.get("id")
 
-        # 10. Record metrics
-        try:
-            await agent_repo.record_metric(
+        # 10. Record metrics (queued, written in the background)
+        route_label = intent or "unclassified"
+        agent_telemetry.record_metric(
+            company_id=user_context.get("company_id", "unknown"),
+            metric_type="conversation_latency",
+            metric_value=latency_ms,
+            user_id=user_context.get("user_id"),
+            dimension_1=selected_model,
+            dimension_2=route_label,
+        )
+
+        agent_telemetry.record_metric(
+            company_id=user_context.get("company_id", "unknown"),
+            metric_type="model_route",
+            metric_value=prediction.confidence,
+            user_id=user_context.get("user_id"),
+            dimension_1=selected_model,
+            dimension_2=prediction.intent or "unclassified",
+        )
+
+        agent_telemetry.record_metric(
+            company_id=user_context.get("company_id", "unknown"),
+            metric_type="estimated_cost_usd",
+            metric_value=self._estimate_cost(
+                selected_model,
+                prompt_tokens + estimate_tokens(accumulated_content),
+            ),
+            user_id=user_context.get("user_id"),
+            dimension_1=selected_model,
+            dimension_2=route_label,
+        )
+
+        agent_telemetry.record_metric(
+            company_id=user_context.get("company_id", "unknown"),
+            metric_type="prompt_tokens",
+            metric_value=prompt_tokens,
+            user_id=user_context.get("user_id"),
+            dimension_1=selected_model,
+        )
+
+        if tool_calls_made:
+            agent_telemetry.record_metric(
                 company_id=user_context.get("company_id", "unknown"),
-                metric_type="conversation_latency",
-                metric_value=latency_ms,
+                metric_type="tool_calls",
+                metric_value=len(tool_calls_made),
                 user_id=user_context.get("user_id"),
-                dimension_1=selected_model,
             )
 
-            if tool_calls_made:
-                await agent_repo.record_metric(
-                    company_id=user_context.get("company_id", "unknown"),
-                    metric_type="tool_calls",
-                    metric_value=len(tool_calls_made),
-                    user_id=user_context.get("user_id"),
-                )
-        except Exception as e:
-            logger.warning(f"Failed to record metrics: {e}")
-
         # 11. Done
         yield {
             "type": "done",
@@ -316,22 +370,104 @@ class AgentOrchestrator:
                 "message_id": assistant_message_id,
                 "latency_ms": latency_ms,
                 "tool_calls": len(tool_calls_made),
+                "prompt_tokens": prompt_tokens,
+                "model": selected_model,
+                "intent": intent,
+                "context": context_window.stats(),
             }
         }
 
-    def _summarize_result(self, result: Dict[str, Any], max_length: int = 8000) -> str:
+    def _fast_path_events(
+        self,
+        answer: FastPathAnswer,
+        message: str,
+        conversation_id: str,
+        user_context: Dict[str, Any],
+        start_time: float,
+    ) -> List[Dict[str, Any]]:
+        """Queue the audit rows for a fast-path answer and build its events."""
+        user_message_id = agent_telemetry.record_message(
+            conversation_id=conversation_id,
+            role="user",
+            content=message,
+        )
+        tool_call_id = agent_telemetry.record_tool_call(
+            message_id=user_message_id,
+            conversation_id=conversation_id,
+            user_id=user_context.get("user_id", ""),
+            tool_name=answer.tool_name,
+            tool_input=answer.params,
+            safety_level="read_only",
+            project_id=answer.params.get("project_id"),
+            execution_status="success",
+        )
+        agent_telemetry.update_tool_call(
+            tool_call_id=tool_call_id,
+            conversation_id=conversation_id,
+            tool_output=answer.result,
+            execution_time_ms=answer.execution_time_ms,
+        )
+
+        latency_ms = int((time.time() - start_time) * 1000)
+        assistant_message_id = agent_telemetry.record_message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=answer.content,
+            tool_calls=[{"name": answer.tool_name, "input": answer.params, "result": answer.result}],
+            model_used="fast_path",
+            latency_ms=latency_ms,
+        )
+        agent_telemetry.record_metric(
+            company_id=user_context.get("company_id", "unknown"),
+            metric_type="fast_path",
+            metric_value=latency_ms,
+            user_id=user_context.get("user_id"),
+            dimension_1=answer.template,
+            dimension_2="hit",
+        )
+
+        return [
+            {"type": "tool_start", "data": {"tool": answer.tool_name, "input": answer.params}},
+            {
+                "type": "tool_result",
+                "data": {"tool": answer.tool_name, "success": True, "result": answer.result},
+            },
+            {"type": "content", "data": {"content": answer.content}},
+            {
+                "type": "done",
+                "data": {
+                    "conversation_id": conversation_id,
+                    "message_id": assistant_message_id,
+                    "latency_ms": latency_ms,
+                    "tool_calls": 1,
+                    "prompt_tokens": 0,
+                    "model": "fast_path",
+                    "fast_path": answer.template,
+                },
+            },
+        ]
+
+    def _estimate_cost(self, model: str, tokens: int) -> float:
+        """Estimated USD cost of a turn from the configured per-1K rates."""
+        if model == model_router.complex_model and model != model_router.standard_model:
+            rate = settings.agent_cost_per_1k_tokens_complex
+        else:
+            rate = settings.agent_cost_per_1k_tokens_standard
+        return round(tokens / 1000 * rate, 6)
+
+    def _summarize_result(
+        self,
+        result: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None,
+        max_length: int = 8000,
+    ) -> str:
         """Summarize a tool result for inclusion in context.
 
-        Increased from 2000 to 8000 to handle complex nested structures
-        like materials-by-stage which can exceed 2000 chars easily.
+        Uses the compact tabular encoding (see result_encoder) so more rows
+        fit in the budget; rows matching the tool input are kept first.
         """
-        import json
-
         try:
-            result_str = json.dumps(result, indent=2, default=str)
-            if len(result_str) > max_length:
-                return result_str[:max_length] + "\n... (truncated - data continues)"
-            return result_str
+            return encode_tool_result(result, params=params, max_chars=max_length)
         except Exception:
             return str(result)[:max_length]
 
@@ -225,6 +225,81 @@ class ResponseFormatter:
 
         return "\n".join(lines)
 
+    @staticmethod
+    def format_query_response(result: Dict[str, Any], heading: str) -> str:
+        """Format a query_database result as a short list under a heading."""
+        rows = result.get("results", [])
+        # The summary total counts every match, not just the returned rows
+        count = (result.get("summary") or {}).get("total") or result.get("count", len(rows))
+
+        if not rows:
+            return f"No {heading[0].lower() + heading[1:]} found."
+
+        lines = [f"## {heading} ({count})"]
+        lines.append("")
+
+        for row in rows[:15]:  # Limit display
+            name = row.get("title") or row.get("name") or row.get("invoice_no") or "Untitled"
+            details = []
+            if row.get("status"):
+                details.append(str(row["status"]))
+            if row.get("priority") in ["high", "critical"]:
+                details.append(row["priority"])
+            if row.get("amount") is not None:
+                details.append(f"${float(row['amount']):,.2f}")
+            if row.get("due_date"):
+                details.append(f"due {str(row['due_date'])[:10]}")
+
+            line = f"- **{name}**"
+            if details:
+                line += f" - {', '.join(details)}"
+            lines.append(line)
+
+        if count > 15:
+            lines.append(f"\n... and {count - 15} more")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_stage_answer(
+        stages: List[Dict[str, Any]],
+        which: str,
+        project_name: Optional[str] = None,
+    ) -> str:
+        """Answer "current stage" / "next stage" from an ordered stage list."""
+        scope = f" for {project_name}" if project_name else ""
+        if not stages:
+            return f"No stages found{scope}."
+
+        active_index = next(
+            (i for i, s in enumerate(stages) if s.get("status") == "ACTIVE"), None
+        )
+        if which == "current":
+            stage = stages[active_index] if active_index is not None else None
+            if not stage:
+                return f"No stage is currently active{scope}."
+            label = "Current stage"
+        else:
+            start = active_index + 1 if active_index is not None else 0
+            stage = next(
+                (s for s in stages[start:] if s.get("status") == "NOT_STARTED"), None
+            )
+            if not stage:
+                return f"All remaining stages{scope} are complete or in progress."
+            label = "Next stage"
+
+        lines = [f"**{label}{scope}:** {stage.get('name', 'Unknown')}"]
+        if stage.get("plannedStartDate"):
+            lines.append(
+                f"Planned: {stage['plannedStartDate']} to {stage.get('plannedEndDate') or 'TBD'}"
+            )
+        if stage.get("completionPercentage") is not None and which == "current":
+            lines.append(f"Progress: {stage['completionPercentage']}%")
+
+        done = sum(1 for s in stages if s.get("status") == "COMPLETE")
+        lines.append(f"{done} of {len(stages)} stages complete.")
+        return "\n".join(lines)
+
     @staticmethod
     def format_generic_response(result: Dict[str, Any]) -> str:
         """Format a generic tool result."""
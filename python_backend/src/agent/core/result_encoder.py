@@ -0,0 +1,281 @@
+"""
+Compact encoding of tool results for the LLM context.
+
+Tool results used to be pretty-printed JSON truncated at a character limit,
+which spends most of the budget on indentation and repeated keys and cuts
+records off mid-way. This encoder emits:
+
+- scalars as "key: value" lines
+- small objects (summary, filters) as one "key: a=1, b=2" line
+- homogeneous lists of objects (tasks, issues, materials, query results) as
+  a table: a header row with the columns, then one "|"-separated row per
+  record
+
+Null values, empty strings and internal bookkeeping columns are dropped, and
+groupings that only repeat another table's rows (materialsByArea) are reduced
+to per-group counts.
+Rows are only ever dropped whole: when a table does not fit its share of the
+budget, rows that match the tool's input parameters are kept first and the
+number of elided rows is reported.
+
+Everything else counts against the same budget: long strings and lists are
+shortened, fields that don't fit are counted as not shown, and as a last
+resort the output is cut at max_chars with a "[truncated]" marker.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns that carry no information for the model
+INTERNAL_FIELDS = frozenset({
+    "company_id", "companyId",
+    "created_by", "createdBy",
+    "updated_at", "updatedAt",
+    "deleted_at", "deletedAt",
+    "search_vector", "searchVector",
+    "metadata",
+})
+
+CELL_SEPARATOR = "|"
+
+# Longest value kept in a table cell; longer text is cut with "..."
+MAX_CELL_CHARS = 200
+
+# Longest rendering of a non-table field (text, list, object); longer values are shortened
+MAX_VALUE_CHARS = 1000
+
+# Shortest parameter value used to match rows (avoids matching on "a", "1")
+MIN_MATCH_CHARS = 3
+
+TRUNCATED_MARKER = "\n... [truncated]"
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _scalar(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    if isinstance(value, (dict, list)):
+        return json.dumps(_strip(value), separators=(",", ":"), default=str)
+    return str(value)
+
+
+def _shorten(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:max(0, limit - 3)].rstrip() + "..."
+
+
+def _value(value: Any, limit: int = MAX_VALUE_CHARS) -> str:
+    """Render a non-table field within about limit characters.
+
+    Lists of scalars keep their leading items and report how many were cut.
+    """
+    if isinstance(value, list) and not any(isinstance(v, (dict, list)) for v in value):
+        kept = []
+        # Brackets plus room for the " (+N more)" note
+        used = 20
+        for item in value:
+            used += len(json.dumps(item, default=str)) + 1
+            if kept and used > limit:
+                break
+            kept.append(item)
+        text = _scalar(kept)
+        if len(kept) < len(value):
+            text += f" (+{len(value) - len(kept)} more)"
+        return _shorten(text, limit)
+    return _shorten(_scalar(value), limit)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - len(TRUNCATED_MARKER))] + TRUNCATED_MARKER
+
+
+def _cell(value: Any) -> str:
+    if _is_empty(value):
+        return ""
+    text = _scalar(value).replace("\r", " ").replace("\n", " ").replace(CELL_SEPARATOR, "/")
+    if len(text) > MAX_CELL_CHARS:
+        text = text[:MAX_CELL_CHARS].rstrip() + "..."
+    return text
+
+
+def _strip(value: Any) -> Any:
+    """Drop nulls and internal fields from nested structures."""
+    if isinstance(value, dict):
+        return {
+            k: _strip(v) for k, v in value.items()
+            if k not in INTERNAL_FIELDS and not _is_empty(v)
+        }
+    if isinstance(value, list):
+        return [_strip(v) for v in value if not _is_empty(v)]
+    return value
+
+
+def _is_table(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
+
+
+def _columns(rows: List[Dict[str, Any]]) -> List[str]:
+    """Union of keys in first-seen order, skipping internal and all-null columns."""
+    seen: Dict[str, bool] = {}
+    for row in rows:
+        for key, value in row.items():
+            if key in INTERNAL_FIELDS:
+                continue
+            seen[key] = seen.get(key, False) or not _is_empty(value)
+    return [key for key, has_value in seen.items() if has_value]
+
+
+def _match_terms(params: Optional[Dict[str, Any]]) -> List[str]:
+    """Lower-cased string parameter values used to rank rows."""
+    terms = []
+    for value in (params or {}).values():
+        if isinstance(value, str) and len(value) >= MIN_MATCH_CHARS and value.lower() != "all":
+            terms.append(value.lower())
+    return terms
+
+
+def prioritize_rows(rows: List[Dict[str, Any]], params: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Move rows that mention a requested value to the front (stable)."""
+    terms = _match_terms(params)
+    if not terms:
+        return rows
+
+    def matches(row: Dict[str, Any]) -> bool:
+        for value in row.values():
+            if isinstance(value, (str, int)) and not isinstance(value, bool):
+                text = str(value).lower()
+                if any(term in text for term in terms):
+                    return True
+        return False
+
+    matched = [row for row in rows if matches(row)]
+    if not matched or len(matched) == len(rows):
+        return rows
+    matched_ids = {id(row) for row in matched}
+    return matched + [row for row in rows if id(row) not in matched_ids]
+
+
+def _row_ids(rows: Any) -> Optional[set]:
+    if not _is_table(rows) or not all("id" in row for row in rows):
+        return None
+    return {str(row["id"]) for row in rows}
+
+
+def _regroups_existing_rows(groups: Dict[str, Any], result: Dict[str, Any]) -> bool:
+    """True when every grouped row already appears in a top-level table."""
+    grouped: set = set()
+    for rows in groups.values():
+        ids = _row_ids(rows)
+        if ids is None:
+            return False
+        grouped |= ids
+    for value in result.values():
+        ids = _row_ids(value)
+        if ids is not None and grouped <= ids:
+            return True
+    return False
+
+
+def encode_table(
+    name: str,
+    rows: List[Dict[str, Any]],
+    max_chars: int,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, int]:
+    """Encode a list of records as a table within max_chars.
+
+    Returns the text and the number of rows elided for lack of space.
+    """
+    columns = _columns(rows)
+    ordered = prioritize_rows(rows, params)
+    header = f"{name} ({len(rows)} rows): {CELL_SEPARATOR.join(columns)}"
+    lines = [header]
+    used = len(header)
+    shown = 0
+    for row in ordered:
+        line = CELL_SEPARATOR.join(_cell(row.get(column)) for column in columns)
+        # Keep room for the elision note
+        if shown and used + len(line) + 1 > max_chars - 40:
+            break
+        lines.append(line)
+        used += len(line) + 1
+        shown += 1
+    elided = len(rows) - shown
+    if elided:
+        lines.append(f"... {elided} more {name} rows not shown")
+    return "\n".join(lines), elided
+
+
+def _encode_object_line(key: str, value: Dict[str, Any]) -> str:
+    parts = [f"{k}={_value(v)}" for k, v in _strip(value).items()]
+    return _shorten(f"{key}: {', '.join(parts)}", MAX_VALUE_CHARS)
+
+
+def encode_tool_result(
+    result: Any,
+    params: Optional[Dict[str, Any]] = None,
+    max_chars: int = 8000,
+) -> str:
+    """Encode a tool result compactly for the LLM context."""
+    if _is_table(result):
+        return encode_table("rows", result, max_chars, params)[0]
+    if not isinstance(result, dict):
+        return _truncate(_value(_strip(result), max_chars), max_chars)
+
+    lines: List[str] = []
+    tables: List[Tuple[str, List[Dict[str, Any]]]] = []
+    for key, value in result.items():
+        if key in INTERNAL_FIELDS or _is_empty(value):
+            continue
+        if _is_table(value):
+            tables.append((key, value))
+        elif isinstance(value, dict) and any(_is_table(v) for v in value.values()):
+            if _regroups_existing_rows(value, result):
+                # e.g. materialsByArea repeats the materials rows: counts only
+                counts = {group: len(rows) for group, rows in value.items() if isinstance(rows, list)}
+                lines.append(_encode_object_line(f"{key} (row counts)", counts))
+                continue
+            # Grouped lists become one table per group
+            for group, rows in value.items():
+                if _is_table(rows):
+                    tables.append((f"{key}.{group}", rows))
+                elif not _is_empty(rows):
+                    lines.append(f"{key}.{group}: {_value(rows)}")
+        elif isinstance(value, dict):
+            line = _encode_object_line(key, value)
+            if not line.endswith(": "):
+                lines.append(line)
+        else:
+            lines.append(f"{key}: {_value(value)}")
+
+    # Fields are kept in order while they fit; the note reserves its own room
+    used = 0
+    for index, line in enumerate(lines):
+        if used + len(line) + 1 > max_chars - 40:
+            lines = lines[:index] + [f"... {len(lines) - index} more fields not shown"]
+            break
+        used += len(line) + 1
+
+    text = "\n".join(lines)
+    remaining = max_chars - len(text)
+    # Split what's left between the tables; unused space rolls over
+    for index, (name, rows) in enumerate(tables):
+        share = remaining // (len(tables) - index)
+        table_text, _ = encode_table(name, rows, share, params)
+        text = f"{text}\n{table_text}" if text else table_text
+        remaining -= len(table_text) + 1
+    return _truncate(text, max_chars)
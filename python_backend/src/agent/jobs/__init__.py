@@ -1,6 +1,17 @@
 """
-Background job scheduling for proactive behaviors (Phase 4).
+Background jobs: a lease-based runner for agent.scheduled_jobs.
 """
 
-# Jobs will be implemented in Phase 4
-__all__ = []
+from .builtin import register_builtin_jobs
+from .cron import CronSchedule, parse_cron
+from .runner import Job, JobRunner, PostgresJobStore, job_runner
+
+__all__ = [
+    "CronSchedule",
+    "Job",
+    "JobRunner",
+    "PostgresJobStore",
+    "job_runner",
+    "parse_cron",
+    "register_builtin_jobs",
+]
@@ -0,0 +1,47 @@
+"""
+Jobs every deployment runs, registered on the global runner at startup.
+"""
+
+from .runner import Job, JobRunner
+
+HEARTBEAT_CLEANUP = "analytics_heartbeat_cleanup"
+ANALYTICS_ROLLUP = "analytics_rollup"
+CASCADE_PURGE = "cascade_purge"
+
+
+async def _heartbeat_cleanup(job: Job) -> None:
+    from src.core.config import settings
+    from src.database.connection import get_db_pool
+    from src.services.heartbeat_partitions import maintain_heartbeat_partitions
+
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        await maintain_heartbeat_partitions(conn, settings.analytics_heartbeat_retention_days)
+
+
+async def _cascade_purge(job: Job) -> None:
+    from src.core.config import settings
+    from src.database.cascade_delete import get_delete_graph, run_deletion
+    from src.database.connection import get_db_pool
+
+    graph = await get_delete_graph()
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        await run_deletion(conn, graph, job.config["deletion_id"], settings.cascade_delete_batch_size)
+
+
+async def _analytics_rollup(job: Job) -> None:
+    from src.database.connection import get_db_pool
+    from src.services.analytics_rollups import refresh_rollups
+
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        await refresh_rollups(conn)
+
+
+def register_builtin_jobs(runner: JobRunner) -> None:
+    # Hourly: keeps daily heartbeat partitions ahead of time and drops expired ones
+    runner.register(HEARTBEAT_CLEANUP, _heartbeat_cleanup, cron="5 * * * *")
+    runner.register(ANALYTICS_ROLLUP, _analytics_rollup, cron="* * * * *")
+    # One-off: purges a company/user deleted with ?background=true (see database/cascade_delete.py)
+    runner.register(CASCADE_PURGE, _cascade_purge, concurrency=2)
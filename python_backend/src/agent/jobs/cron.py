@@ -0,0 +1,130 @@
+"""
+Five-field cron expressions for agent.scheduled_jobs.schedule_cron.
+
+Fields are minute, hour, day of month, month and day of week (0 or 7 is
+Sunday). Each accepts "*", numbers, ranges ("1-5"), steps ("*/15", "8-18/2"),
+lists ("0,30") and, for months and weekdays, three-letter names. The @hourly,
+@daily, @weekly, @monthly and @yearly shortcuts are supported too.
+
+As in Vixie cron, when both day of month and day of week are restricted a
+time matches if either one does.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
+
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+_MONTHS = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+)}
+_WEEKDAYS = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# (low, high, names) per field
+_FIELDS: Tuple[Tuple[int, int, Dict[str, int]], ...] = (
+    (0, 59, {}),
+    (0, 23, {}),
+    (1, 31, {}),
+    (1, 12, _MONTHS),
+    (0, 7, _WEEKDAYS),
+)
+
+# Give up on expressions that never match (e.g. "0 0 30 2 *")
+_SEARCH_YEARS = 5
+
+
+def _value(token: str, low: int, high: int, names: Dict[str, int]) -> int:
+    value = names.get(token.lower()) if names else None
+    if value is None:
+        if not token.isdigit():
+            raise ValueError(f"Invalid cron value '{token}'")
+        value = int(token)
+    if not low <= value <= high:
+        raise ValueError(f"Cron value {value} outside {low}-{high}")
+    return value
+
+
+def _parse_field(field: str, low: int, high: int, names: Dict[str, int]) -> FrozenSet[int]:
+    values = set()
+    for part in field.split(","):
+        base, _, step_text = part.partition("/")
+        step = 1
+        if step_text:
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ValueError(f"Invalid cron step '{part}'")
+            step = int(step_text)
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            first, _, last = base.partition("-")
+            start, end = _value(first, low, high, names), _value(last, low, high, names)
+            if start > end:
+                raise ValueError(f"Invalid cron range '{base}'")
+        else:
+            start = _value(base, low, high, names)
+            end = high if step_text else start
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """A parsed cron expression that can compute its next fire time."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = _ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+        parsed = [_parse_field(f, low, high, names) for f, (low, high, names) in zip(fields, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months = parsed[:4]
+        self.weekdays = frozenset(d % 7 for d in parsed[4])
+        self._day_restricted = not fields[2].startswith("*")
+        self._weekday_restricted = not fields[4].startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def matches(self, moment: datetime) -> bool:
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment (keeps its tzinfo)."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment.year + _SEARCH_YEARS
+        while candidate.year <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+
+@lru_cache(maxsize=256)
+def parse_cron(expression: str) -> CronSchedule:
+    """Parse (and cache) a cron expression; raises ValueError if invalid."""
+    return CronSchedule(expression)
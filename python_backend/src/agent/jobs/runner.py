@@ -0,0 +1,436 @@
+"""
+Lease-based runner for agent.scheduled_jobs.
+
+Every API worker runs a JobRunner. Rows are claimed with
+FOR UPDATE SKIP LOCKED and stamped with a lease (locked_by, locked_until),
+so each due job runs on exactly one worker:
+
+- Claiming: one UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+  per job type, limited to that type's free concurrency slots. Workers never
+  wait on each other's row locks.
+- Leases: a running job's lease is renewed every lease/3 seconds. If a worker
+  dies its lease runs out and another worker picks the job up again; results
+  from a worker that lost its lease are ignored (updates are fenced on
+  locked_by).
+- Schedules: recurring rows carry a cron expression (see cron.py) and are
+  moved to their next occurrence after each run. One-off rows (no cron) are
+  deleted once they succeed.
+- Retries: a failed run is retried with exponential backoff; after
+  agent_jobs_max_attempts failures a recurring job skips to its next
+  occurrence and a one-off job is disabled with its last error kept.
+- Durations: each run's duration is written to last_duration_ms and kept
+  per job type in stats().
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Set
+
+from src.core.config import settings
+from src.database.connection import db_manager
+from .cron import parse_cron
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the retry delay
+MAX_BACKOFF_SECONDS = 3600
+
+
+@dataclass
+class Job:
+    """One claimed agent.scheduled_jobs row."""
+    id: str
+    job_type: str
+    company_id: Optional[str] = None
+    schedule_cron: Optional[str] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    next_run_at: Optional[datetime] = None
+
+
+JobHandler = Callable[[Job], Awaitable[Any]]
+
+
+class JobStore(Protocol):
+    async def claim(
+        self, worker_id: str, job_type: str, limit: int, now: datetime, lease_until: datetime
+    ) -> List[Job]:
+        ...
+
+    async def renew(self, job_id: str, worker_id: str, lease_until: datetime) -> bool:
+        ...
+
+    async def record_run(
+        self,
+        job_id: str,
+        worker_id: str,
+        ran_at: datetime,
+        next_run_at: Optional[datetime],
+        attempts: int,
+        error: Optional[str],
+        duration_ms: int,
+        status: str,
+    ) -> bool:
+        ...
+
+    async def delete(self, job_id: str, worker_id: str) -> bool:
+        ...
+
+    async def ensure_schedule(
+        self, job_type: str, cron: str, config: Dict[str, Any], next_run_at: datetime
+    ) -> None:
+        ...
+
+    async def enqueue(
+        self, job_type: str, company_id: Optional[str], config: Dict[str, Any], run_at: datetime
+    ) -> str:
+        ...
+
+
+# ==================== Postgres store ====================
+
+_CLAIM = """
+    UPDATE agent.scheduled_jobs j
+    SET locked_by = $1, locked_until = $4, updated_at = NOW()
+    WHERE j.id IN (
+        SELECT id FROM agent.scheduled_jobs
+        WHERE status = 'active'
+          AND next_run_at <= $3
+          AND job_type = $2
+          AND (locked_until IS NULL OR locked_until < $3)
+        ORDER BY next_run_at
+        LIMIT $5
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.id, j.job_type, j.company_id, j.schedule_cron, j.config, j.attempts, j.next_run_at
+"""
+
+_RENEW = """
+    UPDATE agent.scheduled_jobs SET locked_until = $3
+    WHERE id = $1 AND locked_by = $2
+"""
+
+_RECORD_RUN = """
+    UPDATE agent.scheduled_jobs
+    SET last_run_at = $3, next_run_at = $4, attempts = $5, last_error = $6,
+        last_duration_ms = $7, status = $8, locked_by = NULL, locked_until = NULL,
+        updated_at = NOW()
+    WHERE id = $1 AND locked_by = $2
+"""
+
+_DELETE = "DELETE FROM agent.scheduled_jobs WHERE id = $1 AND locked_by = $2"
+
+# System-wide schedules (company_id NULL) are unique per job type; a changed
+# cron expression moves next_run_at, an unchanged one keeps it
+_ENSURE_SCHEDULE = """
+    INSERT INTO agent.scheduled_jobs (company_id, job_type, schedule_cron, config, next_run_at)
+    VALUES (NULL, $1, $2, $3::jsonb, $4)
+    ON CONFLICT (job_type) WHERE company_id IS NULL AND schedule_cron IS NOT NULL
+    DO UPDATE SET
+        schedule_cron = EXCLUDED.schedule_cron,
+        next_run_at = CASE
+            WHEN agent.scheduled_jobs.schedule_cron IS DISTINCT FROM EXCLUDED.schedule_cron
+            THEN EXCLUDED.next_run_at ELSE agent.scheduled_jobs.next_run_at END,
+        updated_at = NOW()
+"""
+
+_ENQUEUE = """
+    INSERT INTO agent.scheduled_jobs (company_id, job_type, schedule_cron, config, next_run_at)
+    VALUES ($1, $2, NULL, $3::jsonb, $4)
+    RETURNING id
+"""
+
+
+def _affected(status: str) -> bool:
+    """True if an UPDATE/DELETE command tag reports at least one row."""
+    return not str(status).endswith(" 0")
+
+
+class PostgresJobStore:
+    """agent.scheduled_jobs access for the runner."""
+
+    async def claim(
+        self, worker_id: str, job_type: str, limit: int, now: datetime, lease_until: datetime
+    ) -> List[Job]:
+        rows = await db_manager.execute_query(_CLAIM, worker_id, job_type, now, lease_until, limit)
+        jobs = []
+        for r in rows:
+            config = r["config"]
+            if isinstance(config, str):
+                config = json.loads(config)
+            jobs.append(Job(
+                id=str(r["id"]),
+                job_type=r["job_type"],
+                company_id=r["company_id"],
+                schedule_cron=r["schedule_cron"],
+                config=config or {},
+                attempts=r["attempts"] or 0,
+                next_run_at=r["next_run_at"],
+            ))
+        return jobs
+
+    async def renew(self, job_id: str, worker_id: str, lease_until: datetime) -> bool:
+        return _affected(await db_manager.execute(_RENEW, job_id, worker_id, lease_until))
+
+    async def record_run(
+        self,
+        job_id: str,
+        worker_id: str,
+        ran_at: datetime,
+        next_run_at: Optional[datetime],
+        attempts: int,
+        error: Optional[str],
+        duration_ms: int,
+        status: str,
+    ) -> bool:
+        result = await db_manager.execute(
+            _RECORD_RUN, job_id, worker_id, ran_at, next_run_at, attempts, error, duration_ms, status,
+        )
+        return _affected(result)
+
+    async def delete(self, job_id: str, worker_id: str) -> bool:
+        return _affected(await db_manager.execute(_DELETE, job_id, worker_id))
+
+    async def ensure_schedule(
+        self, job_type: str, cron: str, config: Dict[str, Any], next_run_at: datetime
+    ) -> None:
+        await db_manager.execute(_ENSURE_SCHEDULE, job_type, cron, json.dumps(config, default=str), next_run_at)
+
+    async def enqueue(
+        self, job_type: str, company_id: Optional[str], config: Dict[str, Any], run_at: datetime
+    ) -> str:
+        row = await db_manager.execute_one(
+            _ENQUEUE, company_id, job_type, json.dumps(config, default=str), run_at,
+        )
+        return str(row["id"])
+
+
+# ==================== Runner ====================
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class _Registration:
+    handler: JobHandler
+    concurrency: int
+    cron: Optional[str] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+
+
+class JobRunner:
+    """Claims due jobs, runs their handlers and records the outcome."""
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        clock: Callable[[], datetime] = _utcnow,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        poll_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+    ):
+        self.store = store or PostgresJobStore()
+        self.clock = clock
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds or settings.agent_jobs_lease_seconds
+        self.poll_seconds = poll_seconds or settings.agent_jobs_poll_seconds
+        self.max_attempts = max_attempts or settings.agent_jobs_max_attempts
+        self.backoff_seconds = backoff_seconds or settings.agent_jobs_backoff_seconds
+        self._registrations: Dict[str, _Registration] = {}
+        self._running: Dict[str, Set[asyncio.Task]] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    # ---------- Registration ----------
+
+    def register(
+        self,
+        job_type: str,
+        handler: JobHandler,
+        concurrency: int = 1,
+        cron: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Register a handler; with cron, a system-wide schedule is kept on start()."""
+        if cron:
+            parse_cron(cron)  # fail at registration, not at the first run
+        self._registrations[job_type] = _Registration(handler, max(1, concurrency), cron, config or {})
+        self._running.setdefault(job_type, set())
+        self._stats.setdefault(job_type, {
+            "runs": 0, "failures": 0, "total_ms": 0, "max_ms": 0, "last_ms": None,
+        })
+
+    async def enqueue(
+        self,
+        job_type: str,
+        company_id: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        run_at: Optional[datetime] = None,
+    ) -> str:
+        """Queue a one-off job (runs on whichever worker claims it first)."""
+        job_id = await self.store.enqueue(job_type, company_id, config or {}, run_at or self.clock())
+        if self._wake:
+            self._wake.set()
+        return job_id
+
+    # ---------- Execution ----------
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before retry number `attempts` (1-based)."""
+        return timedelta(seconds=min(self.backoff_seconds * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+    async def run_once(self) -> int:
+        """Claim due jobs into free slots and start them. Returns the number claimed."""
+        now = self.clock()
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        claimed = 0
+        for job_type, registration in self._registrations.items():
+            running = self._running[job_type]
+            free = registration.concurrency - len(running)
+            if free <= 0:
+                continue
+            for job in await self.store.claim(self.worker_id, job_type, free, now, lease_until):
+                task = asyncio.create_task(self._execute(job, registration.handler))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                claimed += 1
+        return claimed
+
+    async def drain(self) -> None:
+        """Wait for every job started by this runner to finish."""
+        tasks = [task for running in self._running.values() for task in running]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, job: Job, handler: JobHandler) -> None:
+        ran_at = self.clock()
+        started = time.perf_counter()
+        renewer = asyncio.create_task(self._renew_lease(job))
+        error: Optional[BaseException] = None
+        try:
+            await handler(job)
+        except asyncio.CancelledError:
+            # Shutdown: leave the lease to expire so another worker retries
+            raise
+        except Exception as e:
+            error = e
+            logger.warning(f"Job {job.job_type} ({job.id}) failed on attempt {job.attempts + 1}: {e}")
+        finally:
+            renewer.cancel()
+            if self._wake:
+                self._wake.set()
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        stats = self._stats[job.job_type]
+        stats["runs"] += 1
+        stats["failures"] += int(error is not None)
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["last_ms"] = duration_ms
+        try:
+            if not await self._record(job, ran_at, duration_ms, error):
+                logger.warning(f"Job {job.job_type} ({job.id}) lost its lease; result discarded")
+        except Exception as e:
+            logger.error(f"Failed to record run of job {job.job_type} ({job.id}): {e}")
+
+    async def _renew_lease(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                lease_until = self.clock() + timedelta(seconds=self.lease_seconds)
+                if not await self.store.renew(job.id, self.worker_id, lease_until):
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to renew lease for job {job.id}: {e}")
+
+    async def _record(
+        self, job: Job, ran_at: datetime, duration_ms: int, error: Optional[BaseException]
+    ) -> bool:
+        now = self.clock()
+        if error is None and not job.schedule_cron:
+            return await self.store.delete(job.id, self.worker_id)
+
+        attempts, status, next_run_at = 0, "active", None
+        message = str(error)[:1000] if error is not None else None
+        if error is not None and job.attempts + 1 < self.max_attempts:
+            attempts = job.attempts + 1
+            next_run_at = now + self.backoff(attempts)
+        elif job.schedule_cron:
+            try:
+                next_run_at = parse_cron(job.schedule_cron).next_after(now)
+            except ValueError as e:
+                status, message = "disabled", str(e)
+        else:
+            # One-off job out of attempts
+            attempts, status = job.attempts + 1, "disabled"
+        return await self.store.record_run(
+            job.id, self.worker_id, ran_at, next_run_at, attempts, message, duration_ms, status,
+        )
+
+    # ---------- Lifecycle ----------
+
+    async def start(self) -> None:
+        """Keep registered cron schedules and start polling in the background."""
+        now = self.clock()
+        for job_type, registration in self._registrations.items():
+            if registration.cron:
+                await self.store.ensure_schedule(
+                    job_type, registration.cron, registration.config,
+                    parse_cron(registration.cron).next_after(now),
+                )
+        if self._loop_task is None or self._loop_task.done():
+            self._wake = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.warning(f"Job claim failed: {e}")
+                claimed = 0
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Stop claiming and give running jobs `timeout` seconds to finish."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        tasks = [task for running in self._running.values() for task in running]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "jobs": {
+                job_type: {**stats, "running": len(self._running[job_type])}
+                for job_type, stats in self._stats.items()
+            },
+        }
+
+
+# Global runner instance
+job_runner = JobRunner()
@@ -3,5 +3,6 @@ Agent database repositories.
 """
 
 from .agent_repository import AgentRepository, agent_repo
+from .telemetry import AgentTelemetryWriter, agent_telemetry
 
-__all__ = ["AgentRepository", "agent_repo"]
+__all__ = ["AgentRepository", "agent_repo", "AgentTelemetryWriter", "agent_telemetry"]
@@ -8,7 +8,7 @@ from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 
 from src.database.connection import db_manager
-from src.utils.data_conversion import to_camel_case
+from src.utils.data_conversion import to_camel_case, convert_rows
 
 
 class AgentRepository:
@@ -106,7 +106,7 @@ class AgentRepository:
         params.extend([limit, offset])
 
         rows = await db_manager.execute_query(query, *params)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        return convert_rows(rows)
 
     async def update_conversation(
         self,
@@ -215,28 +215,85 @@ class AgentRepository:
         """
 
         rows = await db_manager.execute_query(query, conversation_id, limit, offset)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        return convert_rows(rows)
 
     async def get_messages_for_llm(
         self,
         conversation_id: str,
         limit: int = 30,
     ) -> List[Dict[str, str]]:
-        """Get messages formatted for LLM context (role + content only)."""
-        messages = await self.get_conversation_messages(conversation_id, limit)
-
-        llm_messages = []
-        for msg in messages:
-            # Skip system messages in history (they're added fresh each time)
-            if msg["role"] == "system":
-                continue
-
-            llm_messages.append({
-                "role": msg["role"],
-                "content": msg["content"],
-            })
+        """Get the most recent messages formatted for LLM context (role + content only)."""
+        messages = await self.get_recent_messages(conversation_id, limit)
+        return [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+
+    async def get_recent_messages(
+        self,
+        conversation_id: str,
+        limit: int = 60,
+    ) -> List[Dict[str, Any]]:
+        """Get the newest non-system messages, oldest first.
+
+        Selects only role, content and created_at so the large tool_calls /
+        tool_results JSON never leaves the database, and walks the
+        (conversation_id, created_at) index backwards.
+        """
+        query = """
+            SELECT role, content, created_at FROM agent.messages
+            WHERE conversation_id = $1 AND role <> 'system'
+            ORDER BY created_at DESC
+            LIMIT $2
+        """
+
+        rows = await db_manager.execute_query(query, conversation_id, limit)
+        return [dict(row) for row in reversed(rows)]
+
+    async def get_messages_between(
+        self,
+        conversation_id: str,
+        after: Optional[datetime],
+        before: datetime,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get non-system messages in (after, before), oldest first.
+
+        With limit, only the newest `limit` messages of the range are returned.
+        """
+        conditions = ["conversation_id = $1", "role <> 'system'", "created_at < $2"]
+        params: List[Any] = [conversation_id, before]
+        if after is not None:
+            params.append(after)
+            conditions.append(f"created_at > ${len(params)}")
+        query = f"""
+            SELECT role, content, created_at FROM agent.messages
+            WHERE {' AND '.join(conditions)}
+            ORDER BY created_at DESC
+        """
+        if limit is not None:
+            params.append(limit)
+            query += f" LIMIT ${len(params)}"
+        rows = await db_manager.execute_query(query, *params)
+        return [dict(row) for row in reversed(rows)]
+
+    async def get_context_summary(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Get the rolling summary of older turns stored in conversation metadata."""
+        query = """
+            SELECT metadata->'contextSummary' AS summary
+            FROM agent.conversations WHERE id = $1
+        """
+        row = await db_manager.execute_one(query, conversation_id)
+        if not row or row["summary"] is None:
+            return None
+        summary = row["summary"]
+        return json.loads(summary) if isinstance(summary, str) else summary
 
-        return llm_messages
+    async def save_context_summary(self, conversation_id: str, summary: Dict[str, Any]) -> None:
+        """Store the rolling summary without touching other metadata keys."""
+        query = """
+            UPDATE agent.conversations
+            SET metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object('contextSummary', $2::jsonb)
+            WHERE id = $1
+        """
+        await db_manager.execute(query, conversation_id, json.dumps(summary))
 
     # ==================== Tool Calls ====================
 
@@ -251,6 +308,7 @@ class AgentRepository:
         project_id: Optional[str] = None,
         execution_status: str = "pending",
         confirmation_required: bool = False,
+        cache_hit: bool = False,
     ) -> Dict[str, Any]:
         """Save a tool call record."""
         tool_call_id = str(uuid.uuid4())
@@ -259,8 +317,9 @@ class AgentRepository:
         query = """
             INSERT INTO agent.tool_calls
             (id, message_id, conversation_id, user_id, project_id, tool_name,
-             tool_input, safety_level, execution_status, confirmation_required, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+             tool_input, safety_level, execution_status, confirmation_required,
+             cache_hit, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
             RETURNING *
         """
 
@@ -276,6 +335,7 @@ class AgentRepository:
             safety_level,
             execution_status,
             confirmation_required,
+            cache_hit,
             now,
         )
 
@@ -375,7 +435,7 @@ class AgentRepository:
         params.append(limit)
 
         rows = await db_manager.execute_query(query, *params)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        return convert_rows(rows)
 
     # ==================== Pending Confirmations ====================
 
@@ -470,7 +530,7 @@ class AgentRepository:
         """
 
         rows = await db_manager.execute_query(query, user_id)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        return convert_rows(rows)
 
     async def expire_old_confirmations(self) -> int:
         """Expire old pending confirmations. Returns count of expired."""
@@ -554,7 +614,7 @@ class AgentRepository:
         """
 
         rows = await db_manager.execute_query(query, *params)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        return convert_rows(rows)
 
     # ==================== Feedback ====================
 
@@ -621,7 +681,7 @@ class AgentRepository:
         params.append(limit)
 
         rows = await db_manager.execute_query(query, *params)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        return convert_rows(rows)
 
     async def get_feedback_stats(
         self,
@@ -652,6 +712,51 @@ class AgentRepository:
             "positiveRate": round(positive / total * 100, 1) if total > 0 else 0,
         }
 
+    async def get_intent_training_examples(self, limit: int = 2000) -> List[Dict[str, Any]]:
+        """Get (user text, tools used) pairs for training the intent classifier.
+
+        Combines rated feedback (is_positive set) with logged turns: each user
+        message paired with the tool calls of the assistant reply that
+        followed it. Logged turns have is_positive NULL.
+        """
+        query = """
+            (
+                SELECT user_query AS text, tool_calls_used AS tool_calls, is_positive
+                FROM agent.feedback
+                ORDER BY created_at DESC
+                LIMIT $1
+            )
+            UNION ALL
+            (
+                SELECT u.content AS text, a.tool_calls, NULL::boolean AS is_positive
+                FROM agent.messages u
+                JOIN LATERAL (
+                    SELECT m.tool_calls FROM agent.messages m
+                    WHERE m.conversation_id = u.conversation_id
+                      AND m.role = 'assistant'
+                      AND m.created_at > u.created_at
+                    ORDER BY m.created_at ASC
+                    LIMIT 1
+                ) a ON a.tool_calls IS NOT NULL
+                WHERE u.role = 'user'
+                ORDER BY u.created_at DESC
+                LIMIT $1
+            )
+        """
+
+        rows = await db_manager.execute_query(query, limit)
+        examples = []
+        for row in rows:
+            tool_calls = row["tool_calls"]
+            if isinstance(tool_calls, str):
+                tool_calls = json.loads(tool_calls)
+            examples.append({
+                "text": row["text"],
+                "tool_calls": tool_calls or [],
+                "is_positive": row["is_positive"],
+            })
+        return examples
+
 
 # Global singleton instance
 agent_repo = AgentRepository()
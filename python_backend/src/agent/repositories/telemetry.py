@@ -0,0 +1,408 @@
+"""
+Asynchronous, batched writer for agent audit and metrics records.
+
+Messages, tool-call audit rows and metrics are queued in memory and written
+by a background task in batches, so none of these inserts sit on the
+user-visible latency path. Guarantees:
+
+- Ordering: a single consumer drains one FIFO queue, so records for a
+  conversation reach the database in the order they were produced (a tool
+  call is never written before the message it references).
+- Read-your-writes: readers call wait_for_conversation() before loading a
+  conversation's messages; it flushes if that conversation has pending rows.
+- Delivery on shutdown: close() drains the queue before returning.
+
+IDs are generated when a record is queued, so callers can reference rows
+(e.g. tool_call -> message_id) before they are written.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Protocol
+
+from src.database.connection import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Record kinds
+MESSAGE = "message"
+TOOL_CALL = "tool_call"
+TOOL_CALL_UPDATE = "tool_call_update"
+METRIC = "metric"
+
+
+@dataclass
+class TelemetryRecord:
+    """One queued row (or row update) for the agent schema."""
+    kind: str
+    conversation_id: Optional[str]
+    values: Dict[str, Any] = field(default_factory=dict)
+
+
+class TelemetrySink(Protocol):
+    async def write(self, records: List[TelemetryRecord]) -> None:
+        ...
+
+
+# ==================== Postgres sink ====================
+
+_INSERT_MESSAGE = """
+    INSERT INTO agent.messages
+    (id, conversation_id, role, content, tool_calls, tool_results,
+     model_used, token_count, latency_ms, created_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+"""
+
+_TOUCH_CONVERSATIONS = """
+    UPDATE agent.conversations SET updated_at = NOW()
+    WHERE id = ANY($1::uuid[])
+"""
+
+_INSERT_TOOL_CALL = """
+    INSERT INTO agent.tool_calls
+    (id, message_id, conversation_id, user_id, project_id, tool_name,
+     tool_input, safety_level, execution_status, confirmation_required,
+     cache_hit, tool_output, error_message, execution_time_ms, created_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+"""
+
+_UPDATE_TOOL_CALL = """
+    UPDATE agent.tool_calls
+    SET tool_output = COALESCE($2, tool_output),
+        execution_status = COALESCE($3, execution_status),
+        error_message = COALESCE($4, error_message),
+        execution_time_ms = COALESCE($5, execution_time_ms)
+    WHERE id = $1
+"""
+
+_INSERT_METRIC = """
+    INSERT INTO agent.metrics
+    (company_id, user_id, metric_type, metric_value, metric_date,
+     dimension_1, dimension_2, created_at)
+    VALUES ($1, $2, $3, $4, CURRENT_DATE, $5, $6, $7)
+"""
+
+
+def _json_or_none(value: Any) -> Optional[str]:
+    return json.dumps(value, default=str) if value else None
+
+
+def _message_args(v: Dict[str, Any]) -> tuple:
+    return (
+        v["id"], v["conversation_id"], v["role"], v["content"],
+        _json_or_none(v.get("tool_calls")), _json_or_none(v.get("tool_results")),
+        v.get("model_used"), v.get("token_count"), v.get("latency_ms"), v["created_at"],
+    )
+
+
+def _tool_call_args(v: Dict[str, Any]) -> tuple:
+    return (
+        v["id"], v["message_id"], v["conversation_id"], v["user_id"], v.get("project_id"),
+        v["tool_name"], json.dumps(v.get("tool_input") or {}, default=str), v["safety_level"],
+        v["execution_status"], v.get("confirmation_required", False), v.get("cache_hit", False),
+        _json_or_none(v.get("tool_output")), v.get("error_message"), v.get("execution_time_ms"),
+        v["created_at"],
+    )
+
+
+def _tool_call_update_args(v: Dict[str, Any]) -> tuple:
+    return (
+        v["id"], _json_or_none(v.get("tool_output")), v.get("execution_status"),
+        v.get("error_message"), v.get("execution_time_ms"),
+    )
+
+
+def _metric_args(v: Dict[str, Any]) -> tuple:
+    return (
+        v["company_id"], v.get("user_id"), v["metric_type"], v["metric_value"],
+        v.get("dimension_1"), v.get("dimension_2"), v["created_at"],
+    )
+
+
+_STATEMENTS = {
+    MESSAGE: (_INSERT_MESSAGE, _message_args),
+    TOOL_CALL: (_INSERT_TOOL_CALL, _tool_call_args),
+    TOOL_CALL_UPDATE: (_UPDATE_TOOL_CALL, _tool_call_update_args),
+    METRIC: (_INSERT_METRIC, _metric_args),
+}
+
+
+class PostgresTelemetrySink:
+    """Writes record batches with one executemany per run of same-kind records."""
+
+    async def write(self, records: List[TelemetryRecord]) -> None:
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await self._write_runs(conn, records)
+            except Exception as e:
+                # Isolate the bad record(s) instead of losing the whole batch
+                logger.warning(f"Telemetry batch of {len(records)} failed ({e}); retrying row by row")
+                for record in records:
+                    try:
+                        await self._write_runs(conn, [record])
+                    except Exception as row_error:
+                        logger.error(f"Dropping agent {record.kind} record: {row_error}")
+
+    async def _write_runs(self, conn, records: List[TelemetryRecord]) -> None:
+        i = 0
+        while i < len(records):
+            kind = records[i].kind
+            j = i
+            while j < len(records) and records[j].kind == kind:
+                j += 1
+            query, to_args = _STATEMENTS[kind]
+            await conn.executemany(query, [to_args(r.values) for r in records[i:j]])
+            if kind == MESSAGE:
+                conversation_ids = list({r.conversation_id for r in records[i:j]})
+                await conn.execute(_TOUCH_CONVERSATIONS, conversation_ids)
+            i = j
+
+
+# ==================== Writer ====================
+
+def coalesce_records(records: List[TelemetryRecord]) -> List[TelemetryRecord]:
+    """Fold tool-call updates into their insert when both are in one batch."""
+    inserts: Dict[str, TelemetryRecord] = {}
+    result: List[TelemetryRecord] = []
+    for record in records:
+        if record.kind == TOOL_CALL:
+            record = TelemetryRecord(record.kind, record.conversation_id, dict(record.values))
+            inserts[record.values["id"]] = record
+        elif record.kind == TOOL_CALL_UPDATE and record.values["id"] in inserts:
+            target = inserts[record.values["id"]].values
+            for key, value in record.values.items():
+                if value is not None:
+                    target[key] = value
+            continue
+        result.append(record)
+    return result
+
+
+class AgentTelemetryWriter:
+    """Queues agent audit/metric rows and flushes them in the background."""
+
+    def __init__(
+        self,
+        sink: Optional[TelemetrySink] = None,
+        batch_size: int = 200,
+        flush_interval: float = 0.25,
+    ):
+        self.sink = sink or PostgresTelemetrySink()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Deque[TelemetryRecord] = deque()
+        self._pending_by_conversation: Dict[str, int] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self._written = 0
+        self._batches = 0
+        self._failed_batches = 0
+
+    # ---------- Producers (non-blocking) ----------
+
+    def record_message(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        tool_results: Optional[List[Dict[str, Any]]] = None,
+        model_used: Optional[str] = None,
+        token_count: Optional[int] = None,
+        latency_ms: Optional[int] = None,
+    ) -> str:
+        """Queue a message insert. Returns the new message ID."""
+        message_id = str(uuid.uuid4())
+        self._enqueue(TelemetryRecord(MESSAGE, conversation_id, {
+            "id": message_id,
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "tool_calls": tool_calls,
+            "tool_results": tool_results,
+            "model_used": model_used,
+            "token_count": token_count,
+            "latency_ms": latency_ms,
+            "created_at": datetime.now(timezone.utc),
+        }))
+        return message_id
+
+    def record_tool_call(
+        self,
+        message_id: str,
+        conversation_id: str,
+        user_id: str,
+        tool_name: str,
+        tool_input: Dict[str, Any],
+        safety_level: str,
+        project_id: Optional[str] = None,
+        execution_status: str = "pending",
+        confirmation_required: bool = False,
+        cache_hit: bool = False,
+    ) -> str:
+        """Queue a tool-call audit insert. Returns the new tool call ID."""
+        tool_call_id = str(uuid.uuid4())
+        self._enqueue(TelemetryRecord(TOOL_CALL, conversation_id, {
+            "id": tool_call_id,
+            "message_id": message_id,
+            "conversation_id": conversation_id,
+            "user_id": user_id,
+            "project_id": project_id,
+            "tool_name": tool_name,
+            "tool_input": tool_input,
+            "safety_level": safety_level,
+            "execution_status": execution_status,
+            "confirmation_required": confirmation_required,
+            "cache_hit": cache_hit,
+            "created_at": datetime.now(timezone.utc),
+        }))
+        return tool_call_id
+
+    def update_tool_call(
+        self,
+        tool_call_id: str,
+        conversation_id: Optional[str] = None,
+        tool_output: Optional[Dict[str, Any]] = None,
+        execution_status: Optional[str] = None,
+        error_message: Optional[str] = None,
+        execution_time_ms: Optional[int] = None,
+    ) -> None:
+        """Queue an update to a previously queued (or written) tool call."""
+        self._enqueue(TelemetryRecord(TOOL_CALL_UPDATE, conversation_id, {
+            "id": tool_call_id,
+            "tool_output": tool_output,
+            "execution_status": execution_status,
+            "error_message": error_message,
+            "execution_time_ms": execution_time_ms,
+        }))
+
+    def record_metric(
+        self,
+        company_id: str,
+        metric_type: str,
+        metric_value: float,
+        user_id: Optional[str] = None,
+        dimension_1: Optional[str] = None,
+        dimension_2: Optional[str] = None,
+    ) -> None:
+        """Queue a metric insert."""
+        self._enqueue(TelemetryRecord(METRIC, None, {
+            "company_id": company_id,
+            "user_id": user_id,
+            "metric_type": metric_type,
+            "metric_value": metric_value,
+            "dimension_1": dimension_1,
+            "dimension_2": dimension_2,
+            "created_at": datetime.now(timezone.utc),
+        }))
+
+    def _enqueue(self, record: TelemetryRecord) -> None:
+        self._queue.append(record)
+        if record.conversation_id:
+            key = str(record.conversation_id)
+            self._pending_by_conversation[key] = self._pending_by_conversation.get(key, 0) + 1
+        self._ensure_worker()
+        if self._wake and len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    # ---------- Consumer ----------
+
+    def _ensure_worker(self) -> None:
+        """Start the background flusher on the running loop (lazily)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop yet; records are written on the next flush()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while self._queue:
+                await self._drain_batch()
+            if self._closing:
+                return
+
+    async def _drain_batch(self) -> None:
+        async with self._lock:
+            if not self._queue:
+                return
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                await self.sink.write(coalesce_records(batch))
+                self._written += len(batch)
+            except Exception as e:
+                self._failed_batches += 1
+                logger.error(f"Failed to write {len(batch)} agent telemetry records: {e}")
+            finally:
+                self._batches += 1
+                for record in batch:
+                    if record.conversation_id:
+                        key = str(record.conversation_id)
+                        remaining = self._pending_by_conversation.get(key, 0) - 1
+                        if remaining > 0:
+                            self._pending_by_conversation[key] = remaining
+                        else:
+                            self._pending_by_conversation.pop(key, None)
+
+    async def flush(self) -> None:
+        """Write everything queued so far, including a batch already in flight."""
+        self._ensure_worker()
+        while True:
+            while self._queue:
+                await self._drain_batch()
+            # The worker may have popped a batch that is still being written;
+            # taking the lock waits for that write to finish
+            async with self._lock:
+                if not self._queue:
+                    return
+
+    async def wait_for_conversation(self, conversation_id: str) -> None:
+        """Wait until the conversation's records are written (read-your-writes)."""
+        key = str(conversation_id)
+        while self._pending_by_conversation.get(key):
+            await self.flush()
+
+    async def close(self) -> None:
+        """Drain the queue and stop the background task (call on shutdown)."""
+        self._closing = True
+        await self.flush()
+        if self._worker is not None and not self._worker.done():
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._worker, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._worker.cancel()
+        self._worker = None
+        self._closing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "written": self._written,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+        }
+
+
+# Global writer instance
+agent_telemetry = AgentTelemetryWriter()
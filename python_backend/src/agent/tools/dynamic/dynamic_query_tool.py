@@ -11,6 +11,7 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from ..base_tool import BaseTool
+from ..project_resolver import project_resolver
 from ...models.agent_models import SafetyLevel
 from src.database.connection import db_manager
 from .schema_registry import (
@@ -19,7 +20,7 @@ from .schema_registry import (
     resolve_table_name,
     get_table_config,
 )
-from .query_builder import QueryBuilder
+from .query_builder import AGGREGATE_FUNCTIONS, DATE_BUCKET_UNITS, QueryBuilder
 
 
 class DynamicQueryTool(BaseTool):
@@ -32,6 +33,7 @@ class DynamicQueryTool(BaseTool):
     - Supporting project name resolution (no need for IDs)
     - Supporting date range filters (this week, this month, overdue, etc.)
     - Supporting status and custom filters
+    - Pushing counts, sums and GROUP BY breakdowns down to PostgreSQL
     """
 
     @property
@@ -48,7 +50,9 @@ class DynamicQueryTool(BaseTool):
             "(2) Date filtering - today, this_week, this_month, overdue, next_7, next_30, "
             "(3) Cross-project queries - get data across all projects, "
             "(4) Status and priority filters, "
-            "(5) Any combination of filters. "
+            "(5) Any combination of filters, "
+            "(6) Aggregates - counts, sums, averages per status, project or month via "
+            "aggregates/group_by/date_bucket (e.g. overdue tasks per project). "
             "ALWAYS use this tool when the user asks about payments, installments, tasks, issues, etc. "
             "with ANY date range, time period, or project name reference."
         )
@@ -97,6 +101,37 @@ class DynamicQueryTool(BaseTool):
                     "type": "integer",
                     "description": "Maximum results to return (default 50, max 100)",
                 },
+                "aggregates": {
+                    "type": "array",
+                    "description": (
+                        "Return aggregates instead of rows, e.g. [{\"function\": \"count\"}] or "
+                        "[{\"function\": \"sum\", \"column\": \"amount\"}]"
+                    ),
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "function": {"type": "string", "enum": list(AGGREGATE_FUNCTIONS)},
+                            "column": {"type": "string"},
+                        },
+                        "required": ["function"],
+                    },
+                },
+                "group_by": {
+                    "type": "array",
+                    "description": (
+                        "Group aggregates by columns such as status, priority, category, "
+                        "or \"project\" for a per-project breakdown"
+                    ),
+                    "items": {"type": "string"},
+                },
+                "date_bucket": {
+                    "type": "object",
+                    "description": "Group aggregates into time buckets of a date column",
+                    "properties": {
+                        "column": {"type": "string", "description": "Date column (default: the main date)"},
+                        "unit": {"type": "string", "enum": list(DATE_BUCKET_UNITS)},
+                    },
+                },
             },
             "required": ["data_type"],
         }
@@ -182,6 +217,11 @@ class DynamicQueryTool(BaseTool):
 
         limit = min(params.get("limit", 50), 100)
 
+        if params.get("aggregates") or params.get("group_by") or params.get("date_bucket"):
+            return await self._execute_aggregate(
+                builder, params, filters, data_type, table, resolved_project_name or project_id,
+            )
+
         query, query_params = builder.build_select(filters, None, limit)
 
         # 5. Execute query
@@ -197,8 +237,11 @@ class DynamicQueryTool(BaseTool):
         # 6. Format results
         formatted = self._format_results(results)
 
-        # 7. Build summary
-        summary = self._build_summary(results, table)
+        # 7. Build summary (in the database when the rows were truncated)
+        if len(results) >= limit:
+            summary = await self._build_database_summary(builder, filters, table, results)
+        else:
+            summary = self._build_summary(results, table)
 
         return {
             "dataType": data_type,
@@ -212,50 +255,69 @@ class DynamicQueryTool(BaseTool):
             "summary": summary,
         }
 
+    async def _execute_aggregate(
+        self,
+        builder: QueryBuilder,
+        params: Dict[str, Any],
+        filters: Dict[str, Any],
+        data_type: str,
+        table: str,
+        project_filter: Optional[str],
+    ) -> Dict[str, Any]:
+        """Run an aggregate/GROUP BY query and return one row per group."""
+        group_by = params.get("group_by") or []
+        if isinstance(group_by, str):
+            group_by = [group_by]
+
+        try:
+            query, query_params = builder.build_aggregate(
+                aggregates=params.get("aggregates"),
+                group_by=group_by,
+                date_bucket=params.get("date_bucket"),
+                filters=filters,
+                limit=min(params.get("limit", 100), 500),
+            )
+        except ValueError as e:
+            return {
+                "error": "invalid_aggregation",
+                "message": str(e),
+                "results": [],
+            }
+
+        try:
+            rows = await db_manager.execute_query(query, *query_params)
+        except Exception as e:
+            return {
+                "error": f"Query failed: {str(e)}",
+                "results": [],
+            }
+
+        groups = self._format_results([dict(row) for row in rows])
+        return {
+            "dataType": data_type,
+            "table": table,
+            "projectFilter": project_filter,
+            "dateFilter": params.get("date_filter"),
+            "statusFilter": params.get("status"),
+            "priorityFilter": params.get("priority"),
+            "groupBy": group_by,
+            "dateBucket": params.get("date_bucket"),
+            "results": groups,
+            "count": len(groups),
+        }
+
     async def _resolve_project(self, name: str, company_id: str) -> Dict[str, Any]:
         """
         Resolve project name to ID.
 
         Args:
-            name: Project name (partial match supported)
+            name: Project name (partial and misspelled names supported)
             company_id: Company ID for filtering
 
         Returns:
             Dictionary with project_id and project_name, or error info
         """
-        query = """
-            SELECT id, name FROM projects
-            WHERE LOWER(name) LIKE LOWER($1) AND company_id = $2
-            LIMIT 5
-        """
-        try:
-            rows = await db_manager.execute_query(query, f"%{name}%", company_id)
-        except Exception as e:
-            return {
-                "error": "project_lookup_failed",
-                "message": f"Failed to look up project: {str(e)}",
-                "results": [],
-            }
-
-        if len(rows) == 1:
-            return {
-                "project_id": str(rows[0]["id"]),
-                "project_name": rows[0]["name"]
-            }
-        elif len(rows) > 1:
-            matches = [{"id": str(r["id"]), "name": r["name"]} for r in rows]
-            return {
-                "error": "multiple_projects_found",
-                "message": f"Multiple projects match '{name}'. Please specify which one:",
-                "matches": matches,
-                "results": [],
-            }
-        else:
-            return {
-                "error": "project_not_found",
-                "message": f"No project found matching '{name}'",
-                "results": [],
-            }
+        return await project_resolver.resolve(name, company_id)
 
     def _format_results(self, results: List[Dict]) -> List[Dict]:
         """
@@ -285,6 +347,59 @@ class DynamicQueryTool(BaseTool):
             formatted.append(item)
         return formatted
 
+    async def _build_database_summary(
+        self,
+        builder: QueryBuilder,
+        filters: Dict[str, Any],
+        table: str,
+        results: List[Dict],
+    ) -> Dict[str, Any]:
+        """
+        Build the same summary as _build_summary over every matching row.
+
+        Used when the row list was truncated by the limit: one GROUP BY
+        status/priority query replaces counting in Python.
+        """
+        group_by = [
+            c for c in ("status", "priority")
+            if c in builder.config.group_by_columns and c in builder.columns
+            and (c == "status" or table in ("tasks", "issues"))
+        ]
+        aggregates: List[Dict[str, Any]] = [{"function": "count"}]
+        amount_column = {"payment_installments": "amount", "invoices": "total"}.get(table)
+        if amount_column:
+            aggregates.append({"function": "sum", "column": amount_column})
+
+        query, query_params = builder.build_aggregate(aggregates, group_by, filters=filters, limit=500)
+        try:
+            rows = [dict(row) for row in await db_manager.execute_query(query, *query_params)]
+        except Exception:
+            return self._build_summary(results, table)
+
+        summary: Dict[str, Any] = {"total": sum(r.get("count", 0) for r in rows)}
+        for column, key in (("status", "byStatus"), ("priority", "byPriority")):
+            if column not in group_by:
+                continue
+            counts: Dict[str, int] = {}
+            for r in rows:
+                if r.get(column):
+                    counts[r[column]] = counts.get(r[column], 0) + r.get("count", 0)
+            if counts:
+                summary[key] = counts
+
+        if amount_column:
+            sum_key = f"sum_{amount_column}"
+            total_amount = sum(float(r.get(sum_key) or 0) for r in rows)
+            if table == "payment_installments":
+                paid_amount = sum(float(r.get(sum_key) or 0) for r in rows if r.get("status") == "paid")
+                summary["totalAmount"] = round(total_amount, 2)
+                summary["paidAmount"] = round(paid_amount, 2)
+                summary["unpaidAmount"] = round(total_amount - paid_amount, 2)
+            else:
+                summary["invoiceTotal"] = round(total_amount, 2)
+
+        return summary
+
     def _build_summary(self, results: List[Dict], table: str) -> Dict[str, Any]:
         """
         Build summary statistics for the results.
@@ -10,6 +10,16 @@ from datetime import date, datetime, timedelta
 
 from .schema_registry import TABLE_CONFIGS, get_accessible_columns, TableConfig
 
+# Aggregate functions the agent may request; sum/avg need a numeric column
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+NUMERIC_AGGREGATES = ("sum", "avg")
+
+# date_trunc() units for date bucketing
+DATE_BUCKET_UNITS = ("day", "week", "month", "quarter", "year")
+
+# Grouping by "project" groups by project_id and labels groups with the project name
+PROJECT_GROUP = "project"
+
 
 class QueryBuilder:
     """Builds safe parameterized SQL queries with automatic security filtering."""
@@ -54,45 +64,195 @@ class QueryBuilder:
         Returns:
             Tuple of (query_string, parameters_list)
         """
-        params: List[Any] = []
-        param_count = 1
-        where_clauses: List[str] = []
+        needs_project_join = self._needs_project_join()
+        col_prefix = "t." if needs_project_join else ""
+
+        # Build SELECT clause
+        column_list = ", ".join([f"{col_prefix}{c}" for c in self.columns])
+        from_clause, where_clauses, params = self._build_from_where(filters)
+        query = f"SELECT {column_list}{from_clause}"
+
+        # Build WHERE clause
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+
+        # ORDER BY (validate column exists)
+        effective_order = order_by or self.config.default_order
+        if effective_order:
+            # Extract first column name for validation
+            order_col = effective_order.split()[0].replace("t.", "")
+            if order_col in self.columns:
+                if needs_project_join and not effective_order.startswith("t."):
+                    # Prefix columns with table alias
+                    parts = effective_order.split(",")
+                    prefixed_parts = []
+                    for part in parts:
+                        part = part.strip()
+                        col = part.split()[0]
+                        if col in self.columns:
+                            prefixed_parts.append("t." + part)
+                    if prefixed_parts:
+                        query += f" ORDER BY {', '.join(prefixed_parts)}"
+                else:
+                    query += f" ORDER BY {effective_order}"
+
+        # LIMIT (cap at 500)
+        query += f" LIMIT {min(limit, 500)}"
 
-        # Determine if we need to join to projects for company filtering
-        needs_project_join = (
+        return query, params
+
+    def build_aggregate(
+        self,
+        aggregates: Optional[List[Dict[str, Any]]] = None,
+        group_by: Optional[List[str]] = None,
+        date_bucket: Optional[Dict[str, Any]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build an aggregate query (COUNT/SUM/AVG/MIN/MAX with optional GROUP BY).
+
+        Every column is validated against the schema registry, so only
+        identifiers from TableConfig reach the SQL; values stay parameters.
+
+        Args:
+            aggregates: List of {"function": "count|sum|avg|min|max", "column": name};
+                defaults to a row count
+            group_by: Columns from the table's group_by_columns, or "project"
+            date_bucket: {"column": date column, "unit": "day|week|month|quarter|year"}
+            filters: Same filters as build_select
+            limit: Maximum groups to return (capped at 500)
+
+        Returns:
+            Tuple of (query_string, parameters_list)
+
+        Raises:
+            ValueError: If a function, column or bucket unit is not allowed
+        """
+        needs_project_join = self._needs_project_join()
+        col_prefix = "t." if needs_project_join else ""
+
+        group_exprs: List[str] = []
+        select_exprs: List[str] = []
+
+        for column in group_by or []:
+            if column == PROJECT_GROUP and needs_project_join:
+                group_exprs += [f"{col_prefix}project_id", "p.name"]
+                select_exprs += [f"{col_prefix}project_id", "p.name AS project_name"]
+                continue
+            self._check_column(column, self.config.group_by_columns, "group by")
+            group_exprs.append(f"{col_prefix}{column}")
+            select_exprs.append(f"{col_prefix}{column}")
+
+        bucket_alias = None
+        if date_bucket:
+            column = date_bucket.get("column") or self.config.date_column
+            unit = date_bucket.get("unit", "month")
+            self._check_column(column, self.config.date_columns, "bucket by date")
+            if unit not in DATE_BUCKET_UNITS:
+                raise ValueError(
+                    f"Unknown date bucket '{unit}'. Use one of: {', '.join(DATE_BUCKET_UNITS)}"
+                )
+            bucket_alias = f"{column}_{unit}"
+            bucket_expr = f"date_trunc('{unit}', {col_prefix}{column})::date"
+            group_exprs.append(bucket_expr)
+            select_exprs.append(f"{bucket_expr} AS {bucket_alias}")
+
+        aggregate_aliases: List[str] = []
+        for spec in aggregates or [{"function": "count"}]:
+            function = (spec.get("function") or "").lower()
+            column = spec.get("column")
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ValueError(
+                    f"Unknown aggregate '{function}'. Use one of: {', '.join(AGGREGATE_FUNCTIONS)}"
+                )
+            if function == "count" and not column:
+                expr, alias = "COUNT(*)", "count"
+            else:
+                allowed = (
+                    self.config.numeric_columns if function in NUMERIC_AGGREGATES
+                    else self.config.numeric_columns + self.config.date_columns + self.config.group_by_columns
+                )
+                self._check_column(column, allowed, function)
+                expr, alias = f"{function.upper()}({col_prefix}{column})", f"{function}_{column}"
+            if alias not in aggregate_aliases:
+                aggregate_aliases.append(alias)
+                select_exprs.append(f"{expr} AS {alias}")
+
+        from_clause, where_clauses, params = self._build_from_where(filters)
+        query = f"SELECT {', '.join(select_exprs)}{from_clause}"
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+
+        if group_exprs:
+            query += f" GROUP BY {', '.join(group_exprs)}"
+            # Time series read chronologically, other breakdowns largest first
+            if bucket_alias:
+                query += f" ORDER BY {bucket_alias} ASC"
+            else:
+                query += f" ORDER BY {aggregate_aliases[0]} DESC"
+            query += f" LIMIT {min(limit, 500)}"
+
+        return query, params
+
+    def _check_column(self, column: Optional[str], allowed: List[str], action: str) -> None:
+        """Raise ValueError unless the column is whitelisted and visible to the role."""
+        if not column or column not in allowed or column not in self.columns:
+            usable = [c for c in allowed if c in self.columns]
+            raise ValueError(
+                f"Cannot {action} '{column}' on {self.table}. "
+                f"Allowed: {', '.join(usable) or 'none'}"
+            )
+
+    def _needs_project_join(self) -> bool:
+        """Tables without company_id are company-filtered through projects."""
+        return (
             self.config.requires_company_filter
             and "company_id" not in self.columns
             and "project_id" in self.columns
         )
 
-        # Build SELECT clause
+    def _build_from_where(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, List[str], List[Any]]:
+        """
+        Build the FROM clause and WHERE conditions shared by every query.
+
+        Returns:
+            Tuple of (from_clause, where_clauses, parameters_list)
+        """
+        params: List[Any] = []
+        param_count = 1
+        where_clauses: List[str] = []
+
+        needs_project_join = self._needs_project_join()
+
         if needs_project_join:
-            column_list = ", ".join([f"t.{c}" for c in self.columns])
-            query = f"SELECT {column_list} FROM {self.config.table_name} t"
-            query += " JOIN projects p ON t.project_id::text = p.id::text"
+            from_clause = f" FROM {self.config.table_name} t"
+            from_clause += " JOIN projects p ON t.project_id = p.id"
             # Company filter on joined projects table
             where_clauses.append(f"p.company_id = ${param_count}")
             params.append(self.company_id)
             param_count += 1
         else:
-            column_list = ", ".join(self.columns)
-            query = f"SELECT {column_list} FROM {self.config.table_name}"
+            from_clause = f" FROM {self.config.table_name}"
             # Direct company filter if column exists
             if self.config.requires_company_filter and "company_id" in self.columns:
                 where_clauses.append(f"company_id = ${param_count}")
                 params.append(self.company_id)
                 param_count += 1
 
+        col_prefix = "t." if needs_project_join else ""
+
         # Project filter (if specified)
         if self.project_id and "project_id" in self.columns:
-            col_prefix = "t." if needs_project_join else ""
-            where_clauses.append(f"{col_prefix}project_id::text = ${param_count}")
+            where_clauses.append(f"{col_prefix}project_id = ${param_count}")
             params.append(str(self.project_id))
             param_count += 1
 
         # User-specified filters
         if filters:
-            col_prefix = "t." if needs_project_join else ""
             for key, value in filters.items():
                 # Skip columns user can't access
                 if key not in self.columns:
@@ -114,34 +274,7 @@ class QueryBuilder:
                     params.append(value)
                     param_count += 1
 
-        # Build WHERE clause
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-
-        # ORDER BY (validate column exists)
-        effective_order = order_by or self.config.default_order
-        if effective_order:
-            # Extract first column name for validation
-            order_col = effective_order.split()[0].replace("t.", "")
-            if order_col in self.columns:
-                if needs_project_join and not effective_order.startswith("t."):
-                    # Prefix columns with table alias
-                    parts = effective_order.split(",")
-                    prefixed_parts = []
-                    for part in parts:
-                        part = part.strip()
-                        col = part.split()[0]
-                        if col in self.columns:
-                            prefixed_parts.append("t." + part)
-                    if prefixed_parts:
-                        query += f" ORDER BY {', '.join(prefixed_parts)}"
-                else:
-                    query += f" ORDER BY {effective_order}"
-
-        # LIMIT (cap at 500)
-        query += f" LIMIT {min(limit, 500)}"
-
-        return query, params
+        return from_clause, where_clauses, params
 
     def _get_sql_operator(self, op: str) -> str:
         """Convert operator string to SQL operator."""
@@ -213,54 +346,8 @@ class QueryBuilder:
         Returns:
             Tuple of (query_string, parameters_list)
         """
-        params: List[Any] = []
-        param_count = 1
-        where_clauses: List[str] = []
-
-        needs_project_join = (
-            self.config.requires_company_filter
-            and "company_id" not in self.columns
-            and "project_id" in self.columns
-        )
-
-        if needs_project_join:
-            query = f"SELECT COUNT(*) as count FROM {self.config.table_name} t"
-            query += " JOIN projects p ON t.project_id::text = p.id::text"
-            where_clauses.append(f"p.company_id = ${param_count}")
-            params.append(self.company_id)
-            param_count += 1
-        else:
-            query = f"SELECT COUNT(*) as count FROM {self.config.table_name}"
-            if self.config.requires_company_filter and "company_id" in self.columns:
-                where_clauses.append(f"company_id = ${param_count}")
-                params.append(self.company_id)
-                param_count += 1
-
-        if self.project_id and "project_id" in self.columns:
-            col_prefix = "t." if needs_project_join else ""
-            where_clauses.append(f"{col_prefix}project_id::text = ${param_count}")
-            params.append(str(self.project_id))
-            param_count += 1
-
-        if filters:
-            col_prefix = "t." if needs_project_join else ""
-            for key, value in filters.items():
-                if key not in self.columns:
-                    continue
-                if isinstance(value, dict):
-                    for op, val in value.items():
-                        sql_op = self._get_sql_operator(op)
-                        where_clauses.append(f"{col_prefix}{key} {sql_op} ${param_count}")
-                        params.append(val)
-                        param_count += 1
-                elif value is not None:
-                    # Use case-insensitive comparison for status and priority fields
-                    if key in ("status", "priority") and isinstance(value, str):
-                        where_clauses.append(f"UPPER({col_prefix}{key}) = UPPER(${param_count})")
-                    else:
-                        where_clauses.append(f"{col_prefix}{key} = ${param_count}")
-                    params.append(value)
-                    param_count += 1
+        from_clause, where_clauses, params = self._build_from_where(filters)
+        query = f"SELECT COUNT(*) as count{from_clause}"
 
         if where_clauses:
             query += " WHERE " + " AND ".join(where_clauses)
@@ -20,6 +20,9 @@ class TableConfig:
     requires_company_filter: bool = True         # All tables need company_id filtering
     date_column: Optional[str] = None            # Primary date column for date filtering
     default_order: str = "created_at DESC"       # Default ORDER BY clause
+    group_by_columns: List[str] = field(default_factory=list)  # Columns allowed in GROUP BY
+    numeric_columns: List[str] = field(default_factory=list)   # Columns allowed in sum/avg
+    date_columns: List[str] = field(default_factory=list)      # Columns allowed in date buckets
 
 
 # Full table configuration
@@ -36,6 +39,9 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         requires_project_filter=False,
         date_column="due_date",
         default_order="name ASC",
+        group_by_columns=["status", "client_name", "location"],
+        numeric_columns=["progress", "budget"],
+        date_columns=["due_date", "created_at"],
     ),
     "tasks": TableConfig(
         table_name="tasks",
@@ -48,6 +54,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column="due_date",
         default_order="due_date ASC NULLS LAST",
+        group_by_columns=["status", "priority", "project_id", "assignee_id", "category", "is_milestone"],
+        date_columns=["due_date", "created_at"],
     ),
     "payment_installments": TableConfig(
         table_name="client_portal.payment_installments",
@@ -60,6 +68,9 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column="due_date",
         default_order="due_date ASC, display_order ASC",
+        group_by_columns=["status", "project_id", "schedule_id", "currency"],
+        numeric_columns=["amount"],
+        date_columns=["due_date", "created_at"],
     ),
     "payment_schedules": TableConfig(
         table_name="client_portal.payment_schedules",
@@ -70,6 +81,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column=None,
         default_order="created_at DESC",
+        group_by_columns=["project_id"],
+        date_columns=["created_at"],
     ),
     "issues": TableConfig(
         table_name="client_portal.issues",
@@ -82,6 +95,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column="due_date",
         default_order="priority DESC, created_at DESC",
+        group_by_columns=["status", "priority", "project_id", "assigned_to", "created_by", "category", "visibility"],
+        date_columns=["due_date", "created_at"],
     ),
     "materials": TableConfig(
         table_name="client_portal.material_items",
@@ -93,6 +108,9 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column=None,
         default_order="name ASC",
+        group_by_columns=["status", "project_id", "area_id", "vendor"],
+        numeric_columns=["quantity", "unit_cost"],
+        date_columns=["created_at"],
     ),
     "material_areas": TableConfig(
         table_name="client_portal.material_areas",
@@ -103,6 +121,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column=None,
         default_order="sort_order ASC",
+        group_by_columns=["project_id"],
+        date_columns=["created_at"],
     ),
     "project_stages": TableConfig(
         table_name="client_portal.project_stages",
@@ -114,6 +134,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column="planned_end_date",
         default_order="order_index ASC",
+        group_by_columns=["status", "project_id", "client_visible"],
+        date_columns=["planned_start_date", "planned_end_date", "created_at"],
     ),
     "forum_threads": TableConfig(
         table_name="client_portal.forum_threads",
@@ -125,6 +147,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column="created_at",
         default_order="pinned DESC, created_at DESC",
+        group_by_columns=["project_id", "created_by", "pinned"],
+        date_columns=["created_at"],
     ),
     "forum_messages": TableConfig(
         table_name="client_portal.forum_messages",
@@ -136,6 +160,8 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         requires_project_filter=False,  # Filtered via thread
         date_column="created_at",
         default_order="created_at ASC",
+        group_by_columns=["thread_id", "created_by"],
+        date_columns=["created_at"],
     ),
     "invoices": TableConfig(
         table_name="client_portal.invoices",
@@ -148,6 +174,9 @@ TABLE_CONFIGS: Dict[str, TableConfig] = {
         restricted_columns={},
         date_column="issue_date",
         default_order="created_at DESC",
+        group_by_columns=["project_id", "installment_id", "currency"],
+        numeric_columns=["amount", "tax", "total"],
+        date_columns=["issue_date", "created_at"],
     ),
 }
 
@@ -2,14 +2,20 @@
 Tool execution engine for running agent tools.
 """
 
+import copy
+import json
 import time
 import logging
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from typing import Dict, Any, Hashable, Optional, Tuple
 
 from .registry import tool_registry
 from .base_tool import BaseTool
+from ..cache import TTLCache, on_company_changed, on_project_changed
 from ..models.agent_models import SafetyLevel
-from ..repositories.agent_repository import agent_repo
+from ..repositories.telemetry import agent_telemetry
+from src.core.config import settings
+from src.database.connection import replica_reads
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +39,64 @@ class PermissionDenied(Exception):
         super().__init__(f"Role '{role}' cannot use tool '{tool_name}'")
 
 
+class ToolResultCache:
+    """Short-lived cache of READ_ONLY tool results.
+
+    Keys are (tool, normalized params, company, role, project), so results
+    are only shared between users who would get the same answer. Entries are
+    dropped on project/company write hooks as well as on expiry.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 2000):
+        self.enabled = ttl_seconds > 0
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        on_project_changed(self.invalidate_project)
+        on_company_changed(self.invalidate_company)
+
+    @staticmethod
+    def make_key(tool_name: str, params: Dict[str, Any], context: Dict[str, Any]) -> Tuple[Hashable, ...]:
+        normalized = json.dumps(
+            {k: v for k, v in params.items() if v is not None},
+            sort_keys=True,
+            default=str,
+        )
+        project_id = params.get("project_id") or context.get("project_id")
+        return (
+            tool_name,
+            normalized,
+            context.get("company_id"),
+            context.get("role"),
+            str(project_id) if project_id else None,
+        )
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Dict[str, Any]]:
+        result = self._cache.get(key)
+        # Copy so callers can't mutate the cached value
+        return copy.deepcopy(result) if result is not None else None
+
+    def set(self, key: Tuple[Hashable, ...], result: Dict[str, Any]) -> None:
+        self._cache.set(key, copy.deepcopy(result))
+
+    def invalidate_project(self, project_id: str) -> None:
+        # Unscoped results (project lists, cross-project queries) may include it too
+        self._cache.invalidate(lambda key: key[4] is None or key[4] == project_id)
+
+    def invalidate_company(self, company_id: str) -> None:
+        self._cache.invalidate(lambda key: key[2] == company_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
 class ToolExecutor:
     """Executes tools with permission checking and audit logging."""
 
+    def __init__(self, result_cache: Optional[ToolResultCache] = None):
+        self.result_cache = result_cache or ToolResultCache(settings.agent_tool_cache_ttl_seconds)
+
     async def execute(
         self,
         tool_name: str,
@@ -74,10 +135,33 @@ class ToolExecutor:
         # Validate parameters
         tool.validate_params(params)
 
-        # Create tool call record if we have message context
-        tool_call_record = None
+        # Serve repeated read-only calls from the result cache
+        cache_key = None
+        if tool.safety_level == SafetyLevel.READ_ONLY and self.result_cache.enabled:
+            cache_key = self.result_cache.make_key(tool_name, params, context)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                if message_id and conversation_id:
+                    # One audit row, flagged as a cache hit
+                    agent_telemetry.record_tool_call(
+                        message_id=message_id,
+                        conversation_id=conversation_id,
+                        user_id=context.get("user_id", ""),
+                        tool_name=tool_name,
+                        tool_input=params,
+                        safety_level=tool.safety_level.value,
+                        project_id=context.get("project_id"),
+                        execution_status="success",
+                        cache_hit=True,
+                    )
+                logger.info(f"Tool '{tool_name}' served from cache")
+                return cached
+
+        # Queue tool call record if we have message context (written in the
+        # background by the telemetry writer, off the request path)
+        tool_call_id = None
         if message_id and conversation_id:
-            tool_call_record = await agent_repo.save_tool_call(
+            tool_call_id = agent_telemetry.record_tool_call(
                 message_id=message_id,
                 conversation_id=conversation_id,
                 user_id=context.get("user_id", ""),
@@ -92,15 +176,21 @@ class ToolExecutor:
             )
 
         try:
-            # Execute the tool
-            result = await tool.execute(params, context)
+            # Execute the tool; read-only tools may read from the replica
+            reads = replica_reads() if tool.safety_level == SafetyLevel.READ_ONLY else nullcontext()
+            with reads:
+                result = await tool.execute(params, context)
 
             execution_time_ms = int((time.time() - start_time) * 1000)
 
+            if cache_key is not None and not (isinstance(result, dict) and result.get("error")):
+                self.result_cache.set(cache_key, result)
+
             # Update tool call record with result
-            if tool_call_record:
-                await agent_repo.update_tool_call(
-                    tool_call_id=tool_call_record["id"],
+            if tool_call_id:
+                agent_telemetry.update_tool_call(
+                    tool_call_id=tool_call_id,
+                    conversation_id=conversation_id,
                     tool_output=result,
                     execution_status="success",
                     execution_time_ms=execution_time_ms,
@@ -116,9 +206,10 @@ class ToolExecutor:
             execution_time_ms = int((time.time() - start_time) * 1000)
 
             # Update tool call record with error
-            if tool_call_record:
-                await agent_repo.update_tool_call(
-                    tool_call_id=tool_call_record["id"],
+            if tool_call_id:
+                agent_telemetry.update_tool_call(
+                    tool_call_id=tool_call_id,
+                    conversation_id=conversation_id,
                     execution_status="failed",
                     error_message=str(e),
                     execution_time_ms=execution_time_ms,
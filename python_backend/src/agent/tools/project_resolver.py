@@ -0,0 +1,235 @@
+"""
+Fuzzy project name resolution shared by every tool that accepts project_name.
+
+Names are matched by trigram similarity, the same measure as PostgreSQL's
+pg_trgm: a name scores by how many of its three-letter chunks it shares with
+the query, so "via tesorro", "tesoro" and "Via Tesoro" all find the
+"Via Tesoro Residence" project.
+
+When pg_trgm is installed the ranking runs as one query against the
+idx_projects_name_trgm GIN index (see migrations/add_project_name_trgm_index.sql).
+Otherwise each company's project names are loaded once into an in-memory
+trigram index, which is dropped when the company's projects change.
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import asyncpg
+
+from src.database.connection import db_manager
+from ..cache import TTLCache, on_company_changed, on_project_changed
+
+logger = logging.getLogger(__name__)
+
+# Candidates below this score are not considered matches
+MIN_SCORE = 0.3
+# A fuzzy match (not exact, not a word prefix) must score at least this to be
+# picked without asking; weaker candidates come back as ambiguous
+CONFIDENT_SCORE = 0.7
+# The best match wins outright when it leads the runner-up by this much
+CLEAR_WINNER_MARGIN = 0.2
+
+_TRGM_QUERY = """
+    SELECT id, name,
+           GREATEST(similarity(LOWER(name), $1), word_similarity($1, LOWER(name))) AS score
+    FROM projects
+    WHERE company_id = $2
+      AND (LOWER(name) % $1 OR $1 <% LOWER(name) OR LOWER(name) LIKE $3)
+    ORDER BY score DESC, name
+    LIMIT $4
+"""
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm trigrams: lower-cased words padded with two spaces before, one after."""
+    result: Set[str] = set()
+    for word in _NON_WORD.split((text or "").lower()):
+        if word:
+            padded = f"  {word} "
+            result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(a: str, b: str) -> float:
+    """Shared trigrams over all trigrams of both strings (pg_trgm similarity)."""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def word_similarity(query: str, name: str) -> float:
+    """Share of the query's trigrams found in the name (partial-name matches)."""
+    tq = trigrams(query)
+    if not tq:
+        return 0.0
+    return len(tq & trigrams(name)) / len(tq)
+
+
+@dataclass
+class ProjectMatch:
+    id: str
+    name: str
+    score: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "score": round(self.score, 3)}
+
+
+class CompanyProjectIndex:
+    """In-memory trigram index over one company's project names."""
+
+    def __init__(self, projects: List[Tuple[str, str]]):
+        self.projects = projects
+        self._trigrams = [trigrams(name) for _, name in projects]
+        self._postings: Dict[str, Set[int]] = {}
+        for position, grams in enumerate(self._trigrams):
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(position)
+
+    def search(self, query: str, limit: int = 5, min_score: float = MIN_SCORE) -> List[ProjectMatch]:
+        query_lower = query.lower().strip()
+        query_grams = trigrams(query_lower)
+        candidates: Set[int] = set()
+        for gram in query_grams:
+            candidates.update(self._postings.get(gram, ()))
+
+        matches = []
+        for position in candidates:
+            project_id, name = self.projects[position]
+            grams = self._trigrams[position]
+            shared = len(query_grams & grams)
+            value = max(shared / len(query_grams | grams), shared / len(query_grams))
+            if value >= min_score or query_lower in name.lower():
+                matches.append(ProjectMatch(project_id, name, value))
+        matches.sort(key=lambda m: (-m.score, m.name))
+        return matches[:limit]
+
+
+class ProjectNameResolver:
+    """Ranks a company's projects against a name and picks one when it is clear."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        min_score: float = MIN_SCORE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_score = min_score
+        self._indexes = TTLCache(ttl_seconds=ttl_seconds, max_entries=500, clock=clock)
+        self._project_companies: Dict[str, str] = {}
+        # None until the first query shows whether pg_trgm is installed
+        self._trgm_available: Optional[bool] = None
+        on_project_changed(self.invalidate_project)
+        on_company_changed(self.invalidate_company)
+
+    async def search(self, name: str, company_id: str, limit: int = 5) -> List[ProjectMatch]:
+        """Return projects ranked by similarity to the name, best first."""
+        name = (name or "").strip()
+        if not name:
+            return []
+        if self._trgm_available is not False:
+            try:
+                matches = await self._search_trgm(name, company_id, limit)
+                self._trgm_available = True
+                return matches
+            except (asyncpg.exceptions.UndefinedFunctionError, asyncpg.exceptions.UndefinedObjectError) as e:
+                logger.warning(f"pg_trgm not available, using in-memory project index: {e}")
+                self._trgm_available = False
+        index = await self._company_index(company_id)
+        return index.search(name, limit, self.min_score)
+
+    async def resolve(self, name: str, company_id: str) -> Dict[str, Any]:
+        """Resolve a name to one project.
+
+        Returns project_id and project_name, or a multiple_projects_found /
+        project_not_found error with the ranked candidates. Only an exact name,
+        a unique run of whole words from the name or a clear fuzzy match scoring at least
+        CONFIDENT_SCORE resolves; anything weaker is returned as ambiguous.
+        """
+        try:
+            matches = await self.search(name, company_id)
+        except Exception as e:
+            return {
+                "error": "project_lookup_failed",
+                "message": f"Failed to look up project: {str(e)}",
+                "results": [],
+            }
+
+        best = self._pick(name, matches)
+        if best:
+            return {"project_id": best.id, "project_name": best.name, "score": round(best.score, 3)}
+        if matches:
+            message = (
+                f"Multiple projects match '{name}'. Please specify which one:"
+                if len(matches) > 1
+                else f"'{name}' only loosely matches a project. Please confirm which one:"
+            )
+            return {
+                "error": "multiple_projects_found",
+                "message": message,
+                "matches": [m.to_dict() for m in matches],
+                "results": [],
+            }
+        return {
+            "error": "project_not_found",
+            "message": f"No project found matching '{name}'",
+            "results": [],
+        }
+
+    @staticmethod
+    def _pick(name: str, matches: List[ProjectMatch]) -> Optional[ProjectMatch]:
+        if not matches:
+            return None
+        wanted = name.strip().lower()
+        exact = [m for m in matches if m.name.lower() == wanted]
+        if len(exact) == 1:
+            return exact[0]
+        # Whole words of the name: "tesoro" or "via tesoro" for "Via Tesoro Residence"
+        prefixed = [m for m in matches if f" {wanted} " in f" {m.name.lower()} "]
+        if len(prefixed) == 1:
+            return prefixed[0]
+        best = matches[0]
+        if best.score < CONFIDENT_SCORE:
+            return None
+        if len(matches) == 1 or best.score - matches[1].score >= CLEAR_WINNER_MARGIN:
+            return best
+        return None
+
+    async def _search_trgm(self, name: str, company_id: str, limit: int) -> List[ProjectMatch]:
+        lowered = name.lower()
+        pattern = "%" + lowered.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = await db_manager.execute_query(_TRGM_QUERY, lowered, company_id, pattern, limit)
+        return [ProjectMatch(str(r["id"]), r["name"], float(r["score"])) for r in rows]
+
+    async def _company_index(self, company_id: str) -> CompanyProjectIndex:
+        index = self._indexes.get(company_id)
+        if index is None:
+            rows = await db_manager.execute_query(
+                "SELECT id, name FROM projects WHERE company_id = $1", company_id
+            )
+            projects = [(str(r["id"]), r["name"] or "") for r in rows]
+            for project_id, _ in projects:
+                self._project_companies[project_id] = company_id
+            index = CompanyProjectIndex(projects)
+            self._indexes.set(company_id, index)
+        return index
+
+    def invalidate_project(self, project_id: str) -> None:
+        """Drop the index holding this project (new projects notify their company)."""
+        company_id = self._project_companies.pop(project_id, None)
+        if company_id:
+            self._indexes.invalidate(lambda key: key == company_id)
+
+    def invalidate_company(self, company_id: str) -> None:
+        self._indexes.invalidate(lambda key: key == company_id)
+
+
+# Global instance
+project_resolver = ProjectNameResolver()
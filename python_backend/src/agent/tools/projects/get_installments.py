@@ -92,8 +92,8 @@ class GetInstallmentsTool(BaseTool):
                 p.name as project_name
             FROM client_portal.payment_installments pi
             JOIN client_portal.payment_schedules ps ON pi.schedule_id = ps.id
-            LEFT JOIN projects p ON pi.project_id::text = p.id::text
-            WHERE pi.project_id::text = $1
+            LEFT JOIN projects p ON pi.project_id = p.id
+            WHERE pi.project_id = $1
             ORDER BY pi.due_date ASC, pi.display_order ASC
         """
         query_params = [str(project_id)]
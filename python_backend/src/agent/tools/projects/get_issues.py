@@ -77,8 +77,8 @@ class GetIssuesTool(BaseTool):
         query = """
             SELECT i.*, p.name as project_name, COALESCE(NULLIF(CONCAT(u.first_name, ' ', u.last_name), ' '), u.email) as assigned_user_name
             FROM client_portal.issues i
-            LEFT JOIN projects p ON i.project_id::text = p.id::text
-            LEFT JOIN users u ON i.assigned_to::text = u.id::text
+            LEFT JOIN projects p ON i.project_id = p.id
+            LEFT JOIN users u ON i.assigned_to = u.id
             WHERE 1=1
         """
         query_params = []
@@ -92,7 +92,7 @@ class GetIssuesTool(BaseTool):
 
         # Filter by project
         if project_id:
-            query += f" AND i.project_id::text = ${param_count}"
+            query += f" AND i.project_id = ${param_count}"
             query_params.append(str(project_id))
             param_count += 1
 
@@ -7,6 +7,7 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from ..base_tool import BaseTool
+from ..project_resolver import project_resolver
 from ...models.agent_models import SafetyLevel
 from src.database.repositories import ProjectRepository
 from src.database.connection import db_manager
@@ -68,17 +69,19 @@ class GetProjectDetailTool(BaseTool):
 
     async def _find_project_by_name(
         self, name: str, company_id: str
-    ) -> Optional[Dict[str, Any]]:
-        """Find a project by name within the company."""
-        project_repo = ProjectRepository()
-        projects = await project_repo.get_by_company(company_id)
-
-        name_lower = name.lower()
-        for p in projects:
-            if name_lower in (p.get("name") or "").lower():
-                return p
+    ) -> Dict[str, Any]:
+        """Find a project by (fuzzy) name within the company.
 
-        return None
+        Returns the project dict, or the resolver's error when the name is
+        ambiguous or matches nothing.
+        """
+        resolved = await project_resolver.resolve(name, company_id)
+        if resolved.get("error"):
+            return resolved
+        project_obj = await ProjectRepository().get_by_id(resolved["project_id"])
+        if not project_obj:
+            return {"error": "project_not_found", "message": f"No project found matching '{name}'"}
+        return self._to_dict(project_obj)
 
     async def _get_project_stages(self, project_id: str) -> List[Dict[str, Any]]:
         """Get stages for a project."""
@@ -510,6 +513,10 @@ class GetProjectDetailTool(BaseTool):
                     }
         elif project_name:
             project_data = await self._find_project_by_name(project_name, company_id)
+            if project_data.get("error") == "multiple_projects_found":
+                return project_data
+            if project_data.get("error"):
+                project_data = None
 
         if not project_data:
             return {
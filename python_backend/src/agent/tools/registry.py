@@ -25,6 +25,8 @@ class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, BaseTool] = {}
         self._initialized = False
+        # LLM schemas per role, rebuilt only when the tool set changes
+        self._definitions_by_role: Dict[str, List[Dict[str, Any]]] = {}
 
     def register(self, tool: BaseTool) -> None:
         """Register a tool in the registry.
@@ -39,6 +41,7 @@ class ToolRegistry:
             logger.warning(f"Tool '{tool.name}' already registered, overwriting")
 
         self._tools[tool.name] = tool
+        self._definitions_by_role.clear()
         logger.debug(f"Registered tool: {tool.name}")
 
     def unregister(self, name: str) -> bool:
@@ -52,6 +55,7 @@ class ToolRegistry:
         """
         if name in self._tools:
             del self._tools[name]
+            self._definitions_by_role.clear()
             return True
         return False
 
@@ -96,10 +100,15 @@ class ToolRegistry:
             role: Role name to filter tools.
 
         Returns:
-            List of tool schemas ready for LLM function calling.
+            List of tool schemas ready for LLM function calling. The list is
+            shared between calls and must not be mutated.
         """
-        tools = self.get_tools_for_role(role)
-        return [tool.to_llm_schema() for tool in tools]
+        definitions = self._definitions_by_role.get(role)
+        if definitions is None:
+            tools = self.get_tools_for_role(role)
+            definitions = [tool.to_llm_schema() for tool in tools]
+            self._definitions_by_role[role] = definitions
+        return definitions
 
     def get_tools_by_safety_level(
         self, safety_level: SafetyLevel
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 import asyncpg
 from ..database.connection import get_db_pool
 from .auth import get_current_user_dependency, is_root_admin
+from ..core.storage import get_signed_url_cache_stats
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -310,6 +311,17 @@ async def get_platform_stats(
             "total_photos": stats["total_photos"] or 0
         }
 
+@router.get("/storage-cache")
+async def get_storage_cache_stats(
+    current_user: dict = Depends(get_current_user_dependency)
+):
+    """
+    Get signed URL cache metrics (root admin only).
+    Returns: Entry count, hits, misses, coalesced misses, errors and hit rate.
+    """
+    await verify_root_admin(current_user)
+    return get_signed_url_cache_stats()
+
 @router.get("/waitlist")
 async def get_waitlist_entries(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
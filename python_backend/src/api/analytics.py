@@ -12,13 +12,73 @@ from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
 
-from ..database.connection import get_db_pool
+from ..core.config import settings
+from ..database.connection import get_db_pool, get_read_pool
+from ..services.analytics_rollups import load_dashboard_rollups, refresh_rollups, summarize_dashboard
 from .auth import get_current_user_dependency, is_root_admin
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Dashboard rollups older than this are refreshed before they are read
+ROLLUP_MAX_AGE = timedelta(minutes=2)
+
+# Bit index of the current minute in the 1440-bit active-minute bitmaps
+# (same clock as CURRENT_DATE, which picks the stats row)
+MINUTE_OF_DAY = "(EXTRACT(HOUR FROM LOCALTIME) * 60 + EXTRACT(MINUTE FROM LOCALTIME))::int"
+
+
+# Daily stats upsert for one heartbeat. PostgreSQL deduces one type per
+# parameter, so $3 (agent active) is used as a boolean everywhere.
+HEARTBEAT_STATS_UPSERT = f"""
+    INSERT INTO public.analytics_daily_stats
+        (user_id, company_id, stat_date, total_time_seconds,
+         agent_time_seconds, app_time_seconds,
+         last_heartbeat_at, last_agent_active, updated_at,
+         active_minutes, agent_minutes)
+    VALUES ($1, $2, CURRENT_DATE, 0, 0, 0, now(), $3::boolean, now(),
+            set_bit(decode(repeat('00', 180), 'hex'), {MINUTE_OF_DAY}, 1),
+            set_bit(decode(repeat('00', 180), 'hex'), {MINUTE_OF_DAY}, CASE WHEN $3 THEN 1 ELSE 0 END))
+    ON CONFLICT (user_id, stat_date) DO UPDATE SET
+        total_time_seconds = CASE
+            WHEN analytics_daily_stats.last_heartbeat_at IS NOT NULL
+                AND EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at)) BETWEEN 10 AND 120
+            THEN analytics_daily_stats.total_time_seconds
+                + EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at))::int
+            ELSE analytics_daily_stats.total_time_seconds
+        END,
+        agent_time_seconds = CASE
+            WHEN $3 = true
+                AND analytics_daily_stats.last_heartbeat_at IS NOT NULL
+                AND EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at)) BETWEEN 10 AND 120
+            THEN analytics_daily_stats.agent_time_seconds
+                + EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at))::int
+            ELSE analytics_daily_stats.agent_time_seconds
+        END,
+        app_time_seconds = CASE
+            WHEN $3 = false
+                AND analytics_daily_stats.last_heartbeat_at IS NOT NULL
+                AND EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at)) BETWEEN 10 AND 120
+            THEN analytics_daily_stats.app_time_seconds
+                + EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at))::int
+            ELSE analytics_daily_stats.app_time_seconds
+        END,
+        active_minutes = set_bit(
+            COALESCE(analytics_daily_stats.active_minutes, decode(repeat('00', 180), 'hex')),
+            {MINUTE_OF_DAY}, 1),
+        agent_minutes = CASE
+            WHEN $3 = true
+            THEN set_bit(
+                COALESCE(analytics_daily_stats.agent_minutes, decode(repeat('00', 180), 'hex')),
+                {MINUTE_OF_DAY}, 1)
+            ELSE analytics_daily_stats.agent_minutes
+        END,
+        last_heartbeat_at = now(),
+        last_agent_active = $3,
+        updated_at = now()
+"""
+
 
 # --- Request / Response Models ---
 
@@ -97,51 +157,19 @@ async def record_heartbeat(
     try:
         pool = await get_db_pool()
         async with pool.acquire() as conn:
-            # Insert raw heartbeat
-            await conn.execute(
-                """
-                INSERT INTO public.analytics_heartbeats (user_id, company_id, agent_active, created_at)
-                VALUES ($1, $2, $3, now())
-                """,
-                user_id, company_id, agent_active,
-            )
+            # Insert raw heartbeat (lands in today's partition)
+            if settings.analytics_store_raw_heartbeats:
+                await conn.execute(
+                    """
+                    INSERT INTO public.analytics_heartbeats (user_id, company_id, agent_active, created_at)
+                    VALUES ($1, $2, $3, now())
+                    """,
+                    user_id, company_id, agent_active,
+                )
 
             # Upsert daily stats with time delta
             await conn.execute(
-                """
-                INSERT INTO public.analytics_daily_stats
-                    (user_id, company_id, stat_date, total_time_seconds,
-                     agent_time_seconds, app_time_seconds,
-                     last_heartbeat_at, last_agent_active, updated_at)
-                VALUES ($1, $2, CURRENT_DATE, 0, 0, 0, now(), $3, now())
-                ON CONFLICT (user_id, stat_date) DO UPDATE SET
-                    total_time_seconds = CASE
-                        WHEN analytics_daily_stats.last_heartbeat_at IS NOT NULL
-                            AND EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at)) BETWEEN 10 AND 120
-                        THEN analytics_daily_stats.total_time_seconds
-                            + EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at))::int
-                        ELSE analytics_daily_stats.total_time_seconds
-                    END,
-                    agent_time_seconds = CASE
-                        WHEN $3 = true
-                            AND analytics_daily_stats.last_heartbeat_at IS NOT NULL
-                            AND EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at)) BETWEEN 10 AND 120
-                        THEN analytics_daily_stats.agent_time_seconds
-                            + EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at))::int
-                        ELSE analytics_daily_stats.agent_time_seconds
-                    END,
-                    app_time_seconds = CASE
-                        WHEN $3 = false
-                            AND analytics_daily_stats.last_heartbeat_at IS NOT NULL
-                            AND EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at)) BETWEEN 10 AND 120
-                        THEN analytics_daily_stats.app_time_seconds
-                            + EXTRACT(EPOCH FROM (now() - analytics_daily_stats.last_heartbeat_at))::int
-                        ELSE analytics_daily_stats.app_time_seconds
-                    END,
-                    last_heartbeat_at = now(),
-                    last_agent_active = $3,
-                    updated_at = now()
-                """,
+                HEARTBEAT_STATS_UPSERT,
                 user_id, company_id, agent_active,
             )
     except Exception as e:
@@ -168,7 +196,7 @@ async def get_usage(
     if not end_date:
         end_date = date.today()
 
-    pool = await get_db_pool()
+    pool = await get_read_pool()
     async with pool.acquire() as conn:
         params: list = [start_date, end_date]
         company_filter = ""
@@ -238,76 +266,26 @@ async def get_dashboard(
         end_date = date.today()
 
     today = date.today()
+    # The rollup job refreshes every minute; catch up here (on the primary) if it is behind
     pool = await get_db_pool()
     async with pool.acquire() as conn:
+        await refresh_rollups(conn, max_age=ROLLUP_MAX_AGE)
+
+    read_pool = await get_read_pool()
+    async with read_pool.acquire() as conn:
         params: list = [start_date, end_date]
         company_filter = ""
         if company_id:
             company_filter = " AND ds.company_id = $3"
             params.append(company_id)
 
-        # --- Overview: today ---
-        today_params: list = [today, today]
-        today_company_filter = ""
-        if company_id:
-            today_company_filter = " AND ds.company_id = $3"
-            today_params.append(company_id)
-
-        today_row = await conn.fetchrow(
-            f"""
-            SELECT
-                COUNT(DISTINCT ds.user_id) as active_users,
-                COALESCE(AVG(ds.total_time_seconds), 0)::int as avg_time,
-                COALESCE(SUM(ds.action_count), 0)::int as total_actions,
-                COALESCE(SUM(ds.login_count), 0)::int as total_logins,
-                COALESCE(SUM(ds.agent_time_seconds), 0)::int as agent_time,
-                COALESCE(SUM(ds.app_time_seconds), 0)::int as app_time
-            FROM public.analytics_daily_stats ds
-            WHERE ds.stat_date BETWEEN $1 AND $2
-            {today_company_filter}
-            """,
-            *today_params,
-        )
-
-        # --- Overview: date range ---
-        range_row = await conn.fetchrow(
-            f"""
-            SELECT
-                COUNT(DISTINCT ds.user_id) as active_users_in_range,
-                COALESCE(AVG(daily_active.cnt), 0) as avg_daily_active
-            FROM public.analytics_daily_stats ds,
-            LATERAL (
-                SELECT COUNT(DISTINCT user_id) as cnt
-                FROM public.analytics_daily_stats
-                WHERE stat_date BETWEEN $1 AND $2
-                {company_filter.replace('ds.', '')}
-                GROUP BY stat_date
-            ) daily_active
-            WHERE ds.stat_date BETWEEN $1 AND $2
-            {company_filter}
-            """,
-            *params,
-        )
-
-        # --- Daily trends ---
-        trend_rows = await conn.fetch(
-            f"""
-            SELECT
-                ds.stat_date::text as date,
-                COUNT(DISTINCT ds.user_id) as active_users,
-                COALESCE(AVG(ds.total_time_seconds), 0)::int as avg_time_seconds,
-                COALESCE(SUM(ds.action_count), 0)::int as total_actions,
-                COALESCE(SUM(ds.login_count), 0)::int as total_logins,
-                COALESCE(SUM(ds.agent_time_seconds), 0)::int as agent_time_seconds,
-                COALESCE(SUM(ds.app_time_seconds), 0)::int as app_time_seconds
-            FROM public.analytics_daily_stats ds
-            WHERE ds.stat_date BETWEEN $1 AND $2
-            {company_filter}
-            GROUP BY ds.stat_date
-            ORDER BY ds.stat_date
-            """,
-            *params,
-        )
+        # --- Overview and daily trends: from per-company rollups ---
+        daily, weekly = await load_dashboard_rollups(conn, start_date, end_date, today, company_id)
+        # Sketch merges are CPU work: keep them off the event loop
+        summary = await asyncio.to_thread(summarize_dashboard, daily, weekly, start_date, end_date, today)
+        today_row = summary["today"]
+        range_row = summary["range"]
+        trend_rows = summary["trends"]
 
         # --- Top users (in range) ---
         top_idx = len(params) + 1
@@ -384,22 +362,3 @@ async def get_dashboard(
             dailyTrends=daily_trends,
             topUsers=top_users,
         )
-
-
-# --- Background cleanup ---
-
-async def start_heartbeat_cleanup_task():
-    """Periodically prune old heartbeat records (older than 30 days)."""
-    while True:
-        try:
-            await asyncio.sleep(86400)  # Run once per day
-            pool = await get_db_pool()
-            async with pool.acquire() as conn:
-                result = await conn.execute(
-                    "DELETE FROM public.analytics_heartbeats WHERE created_at < now() - interval '30 days'"
-                )
-                logger.info(f"Analytics cleanup: pruned old heartbeat records ({result})")
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.warning(f"Heartbeat cleanup error: {e}")
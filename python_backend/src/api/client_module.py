@@ -9,10 +9,11 @@ from asyncpg.exceptions import UniqueViolationError, ForeignKeyViolationError
 import json
 import re
 
-from src.database.connection import get_db_pool
+from src.database.connection import UnitOfWork, get_unit_of_work
 from src.api.auth import get_current_user_dependency, is_root_admin
 from src.services.notification_service import NotificationService
-from src.core.storage import generate_signed_url, get_storage_config
+from src.core.storage import generate_signed_urls, get_storage_config
+from src.agent.cache import notify_project_changed
 
 router = APIRouter()
 
@@ -398,7 +399,7 @@ async def get_user_accessible_projects(current_user: Dict[str, Any], pool: async
 async def get_issues(
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get all issues, optionally filtered by project."""
     accessible_projects = await get_user_accessible_projects(current_user, pool)
@@ -458,7 +459,7 @@ async def get_issues(
 async def create_issue(
     issue: IssueCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a new issue."""
     await verify_project_access(issue.project_id, current_user, pool)
@@ -511,6 +512,7 @@ async def create_issue(
             body=issue.description[:200] if issue.description else None
         )
 
+    notify_project_changed(issue.project_id)
     return issue_data
 
 @router.patch("/client-issues/{issue_id}")
@@ -518,7 +520,7 @@ async def update_issue(
     issue_id: str,
     status_update: str = Query(..., alias="status"),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update issue status."""
     async with pool.acquire() as conn:
@@ -600,6 +602,7 @@ async def update_issue(
             body=f"Marked as resolved by {resolver_name}"
         )
 
+    notify_project_changed(issue['project_id'])
     return issue_data
 
 
@@ -608,7 +611,7 @@ async def edit_issue(
     issue_id: str,
     update: IssueUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Edit an issue's details."""
     async with pool.acquire() as conn:
@@ -690,6 +693,7 @@ async def edit_issue(
             body=f"Fields changed: {', '.join(changed_fields)}" if changed_fields else None
         )
 
+    notify_project_changed(issue['project_id'])
     return issue_data
 
 
@@ -697,7 +701,7 @@ async def edit_issue(
 async def delete_issue(
     issue_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete an issue."""
     async with pool.acquire() as conn:
@@ -737,6 +741,7 @@ async def delete_issue(
             issue_id
         )
 
+        notify_project_changed(issue['project_id'])
         return {"success": True, "message": "Issue deleted successfully"}
 
 
@@ -744,7 +749,7 @@ async def delete_issue(
 async def get_issue_photos(
     issue_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get fresh signed URLs for issue photos."""
     async with pool.acquire() as conn:
@@ -764,28 +769,27 @@ async def get_issue_photos(
             issue_id
         )
 
-        # Generate fresh signed URLs for each attachment
+        # Generate fresh signed URLs for all attachments concurrently
         storage_config = get_storage_config()
         bucket_id = storage_config['bucket_id']
+        signed_urls = await generate_signed_urls(
+            bucket_id,
+            [attachment['url'] for attachment in attachments],
+            method="GET",
+            expires_minutes=60
+        )
 
         photos = []
         for attachment in attachments:
-            object_path = attachment['url']
-            try:
-                signed_url = await generate_signed_url(
-                    bucket_id,
-                    object_path,
-                    method="GET",
-                    expires_minutes=60
-                )
-                photos.append({
-                    "id": str(attachment['id']),
-                    "url": signed_url,
-                    "created_at": attachment['created_at'].isoformat() if attachment['created_at'] else None
-                })
-            except Exception:
+            signed_url = signed_urls.get(attachment['url'])
+            if not signed_url:
                 # If signing fails, skip this photo
                 continue
+            photos.append({
+                "id": str(attachment['id']),
+                "url": signed_url,
+                "created_at": attachment['created_at'].isoformat() if attachment['created_at'] else None
+            })
 
         return {"photos": photos}
 
@@ -795,7 +799,7 @@ async def delete_issue_photo(
     issue_id: str,
     photo_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a photo from an issue."""
     async with pool.acquire() as conn:
@@ -831,7 +835,7 @@ async def delete_issue_photo(
 async def get_issue_history(
     issue_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get audit history for an issue. Only admins and project managers can view."""
     # Check if user is admin or project manager
@@ -874,7 +878,7 @@ async def get_issue_history(
 async def get_issue_comments(
     issue_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get comments for an issue."""
     async with pool.acquire() as conn:
@@ -899,7 +903,7 @@ async def create_issue_comment(
     issue_id: str,
     comment: IssueCommentCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Add a comment to an issue."""
     async with pool.acquire() as conn:
@@ -927,7 +931,7 @@ async def create_issue_comment(
 async def get_forum_messages(
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get forum messages for a project (simplified - returns messages directly)."""
     accessible_projects = await get_user_accessible_projects(current_user, pool)
@@ -965,7 +969,7 @@ async def get_forum_messages(
 async def create_forum_message(
     message: ForumMessageCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a new forum message (simplified - no threads)."""
     await verify_project_access(message.project_id, current_user, pool)
@@ -1007,7 +1011,7 @@ async def create_forum_message(
 async def get_materials(
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get materials, optionally filtered by project."""
     accessible_projects = await get_user_accessible_projects(current_user, pool)
@@ -1042,7 +1046,7 @@ async def get_materials(
 async def create_material(
     material: MaterialCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a new material."""
     await verify_project_access(material.project_id, current_user, pool)
@@ -1069,7 +1073,7 @@ async def update_material(
     material_id: str,
     update: MaterialUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update a material."""
     async with pool.acquire() as conn:
@@ -1118,7 +1122,7 @@ async def update_material(
 async def delete_material(
     material_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a material."""
     async with pool.acquire() as conn:
@@ -1136,7 +1140,7 @@ async def delete_material(
 async def get_installments(
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get payment installments, optionally filtered by project."""
     accessible_projects = await get_user_accessible_projects(current_user, pool)
@@ -1171,7 +1175,7 @@ async def get_installments(
 async def create_installment(
     installment: InstallmentCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a new installment."""
     await verify_project_access(installment.project_id, current_user, pool)
@@ -1193,7 +1197,7 @@ async def update_installment(
     installment_id: str,
     update: InstallmentUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update installment status."""
     async with pool.acquire() as conn:
@@ -1216,9 +1220,9 @@ async def update_installment(
 async def get_installment_files(
     installment_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
-    """Get files for an installment."""
+    """Get files for an installment, each with a fresh signed download_url."""
     async with pool.acquire() as conn:
         # Get the installment to verify project access
         installment = await conn.fetchrow("SELECT project_id FROM client_portal.installments WHERE id = $1", installment_id)
@@ -1230,7 +1234,19 @@ async def get_installment_files(
             "SELECT * FROM client_portal.installment_files WHERE installment_id = $1 ORDER BY created_at DESC",
             installment_id
         )
-        return [dict(row) for row in rows]
+
+    files = [dict(row) for row in rows]
+    # Signed concurrently through the signed URL cache, like issue photos
+    try:
+        config = get_storage_config()
+        download_urls = await generate_signed_urls(
+            config["bucket_id"], [f["url"] for f in files], method="GET", expires_minutes=60
+        )
+    except ValueError:
+        download_urls = {}  # storage not configured: list files without URLs
+    for f in files:
+        f["download_url"] = download_urls.get(f["url"])
+    return files
 
 # ============================================================================
 # NOTIFICATIONS ENDPOINTS
@@ -1240,7 +1256,7 @@ async def get_installment_files(
 async def get_notification_settings(
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get notification settings."""
     accessible_projects = await get_user_accessible_projects(current_user, pool)
@@ -1269,7 +1285,7 @@ async def get_notification_settings(
 async def create_notification_setting(
     setting: NotificationSettingCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a notification setting."""
     await verify_project_access(setting.project_id, current_user, pool)
@@ -1293,7 +1309,7 @@ async def create_notification_setting(
 async def delete_notification_setting(
     setting_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a notification setting."""
     async with pool.acquire() as conn:
@@ -1311,7 +1327,7 @@ async def delete_notification_setting(
 async def get_material_areas(
     project_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get all material areas for a project with item counts and totals."""
     await verify_project_access(project_id, current_user, pool)
@@ -1335,7 +1351,7 @@ async def get_material_areas(
 async def create_material_area(
     area: MaterialAreaCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a new material area."""
     await verify_project_access(area.project_id, current_user, pool)
@@ -1359,7 +1375,7 @@ async def update_material_area(
     area_id: str,
     update: MaterialAreaUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update a material area."""
     if is_client_role(current_user):
@@ -1407,7 +1423,7 @@ async def update_material_area(
 async def delete_material_area(
     area_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a material area (cascade deletes items)."""
     async with pool.acquire() as conn:
@@ -1422,7 +1438,7 @@ async def duplicate_material_area(
     area_id: str,
     data: MaterialAreaDuplicate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Duplicate a material area with all its materials.
 
@@ -1529,7 +1545,7 @@ async def get_material_items(
     area_id: Optional[str] = Query(None),
     stage_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get material items, optionally filtered by project, area, or stage.
 
@@ -1602,7 +1618,7 @@ async def check_material_duplicate(
     area_id: str = Query(..., description="The area ID to check within"),
     name: str = Query(..., description="The material name to check"),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Check if a material with the same name exists in the given area."""
     async with pool.acquire() as conn:
@@ -1618,7 +1634,7 @@ async def check_material_duplicate(
 async def create_material_item(
     item: MaterialItemCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a new material item."""
     await verify_project_access(item.project_id, current_user, pool)
@@ -1668,6 +1684,7 @@ async def create_material_item(
             body=f"Spec: {item.spec[:100]}" if item.spec else None
         )
 
+    notify_project_changed(item.project_id)
     return dict(row)
 
 @router.patch("/material-items/{item_id}")
@@ -1675,7 +1692,7 @@ async def update_material_item(
     item_id: str,
     update: MaterialItemUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update a material item.
 
@@ -1776,13 +1793,14 @@ async def update_material_item(
         row = await conn.fetchrow(query, *values)
         if not row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+        notify_project_changed(row['project_id'])
         return dict(row)
 
 @router.delete("/material-items/{item_id}")
 async def delete_material_item(
     item_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a material item.
 
@@ -1795,10 +1813,11 @@ async def delete_material_item(
         )
 
     async with pool.acquire() as conn:
-        await conn.execute(
-            "DELETE FROM client_portal.material_items WHERE id = $1",
+        project_id = await conn.fetchval(
+            "DELETE FROM client_portal.material_items WHERE id = $1 RETURNING project_id",
             item_id
         )
+        notify_project_changed(project_id)
         return {"success": True}
 
 # ============================================================================
@@ -1817,7 +1836,7 @@ class MaterialDocumentCreate(BaseModel):
 async def get_material_documents(
     item_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get all documents attached to a material item. Returns fresh signed GET URLs."""
     async with pool.acquire() as conn:
@@ -1833,18 +1852,18 @@ async def get_material_documents(
         )
 
         config = get_storage_config()
+        # Generate fresh signed GET URLs for downloading, signed concurrently
+        download_urls = await generate_signed_urls(
+            config["bucket_id"],
+            [row["document_path"] for row in rows],
+            method="GET",
+            expires_minutes=60
+        )
         documents = []
         for row in rows:
             doc = dict(row)
             doc["created_at"] = doc["created_at"].isoformat() if doc["created_at"] else None
-            # Generate fresh signed GET URL for downloading
-            download_url = await generate_signed_url(
-                config["bucket_id"],
-                doc["document_path"],
-                method="GET",
-                expires_minutes=60
-            )
-            doc["download_url"] = download_url
+            doc["download_url"] = download_urls.get(doc["document_path"])
             documents.append(doc)
 
         return documents
@@ -1854,7 +1873,7 @@ async def get_material_documents(
 async def create_material_document(
     data: MaterialDocumentCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Attach a document to a material item. Both clients and PMs can upload. Max 5 per item."""
     async with pool.acquire() as conn:
@@ -1894,7 +1913,7 @@ async def create_material_document(
 async def delete_material_document(
     doc_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a material document. PMs/admins can delete any, clients can only delete their own."""
     async with pool.acquire() as conn:
@@ -1923,7 +1942,7 @@ async def delete_material_document(
 async def get_material_document_counts(
     project_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get document counts per material item for a project (for badge display)."""
     async with pool.acquire() as conn:
@@ -1945,7 +1964,7 @@ async def get_material_document_counts(
 async def get_client_portal_stats(
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get client portal statistics."""
     accessible_projects = await get_user_accessible_projects(current_user, pool)
@@ -1991,7 +2010,7 @@ async def get_client_portal_stats(
 async def create_payment_schedule(
     data: PaymentScheduleCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a payment schedule for a project."""
     await verify_project_access(data.project_id, current_user, pool)
@@ -2031,7 +2050,7 @@ async def create_payment_schedule(
 async def get_payment_schedules(
     project_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get payment schedules for a project."""
     await verify_project_access(project_id, current_user, pool)
@@ -2048,7 +2067,7 @@ async def update_payment_schedule(
     schedule_id: str,
     update: PaymentScheduleUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update a payment schedule."""
     async with pool.acquire() as conn:
@@ -2113,7 +2132,7 @@ async def update_payment_schedule(
 async def create_payment_installment(
     data: PaymentInstallmentCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Create a payment installment."""
     await verify_project_access(data.project_id, current_user, pool)
@@ -2162,6 +2181,7 @@ async def create_payment_installment(
                 data.project_id, current_user['id'], row['id']
             )
 
+            notify_project_changed(data.project_id)
             return dict(row)
 
 @router.get("/payment-installments")
@@ -2170,7 +2190,7 @@ async def get_payment_installments(
     schedule_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get payment installments for a project."""
     await verify_project_access(project_id, current_user, pool)
@@ -2208,7 +2228,7 @@ async def update_payment_installment(
     installment_id: str,
     update: PaymentInstallmentUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Update a payment installment."""
     async with pool.acquire() as conn:
@@ -2311,6 +2331,7 @@ async def update_payment_installment(
                     installment['project_id'], current_user['id'], installment_id, json.dumps(diff)
                 )
 
+            notify_project_changed(installment['project_id'])
             return dict(row)
 
 # ============================================================================
@@ -2321,7 +2342,7 @@ async def update_payment_installment(
 async def create_payment_document(
     data: PaymentDocumentCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Upload a payment document."""
     await verify_project_access(data.project_id, current_user, pool)
@@ -2348,7 +2369,7 @@ async def create_payment_document(
 async def get_payment_documents(
     project_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get payment documents for a project."""
     await verify_project_access(project_id, current_user, pool)
@@ -2364,7 +2385,7 @@ async def get_payment_documents(
 async def delete_payment_document(
     document_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Delete a payment document."""
     async with pool.acquire() as conn:
@@ -2382,7 +2403,7 @@ async def delete_payment_document(
 async def create_payment_receipt(
     data: PaymentReceiptCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Upload a payment receipt."""
     await verify_project_access(data.project_id, current_user, pool)
@@ -2424,7 +2445,7 @@ async def get_payment_receipts(
     installment_id: Optional[str] = Query(None),
     project_id: Optional[str] = Query(None),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get payment receipts."""
     if project_id:
@@ -2454,7 +2475,7 @@ async def get_payment_receipts(
 async def get_invoices(
     project_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get invoices for a project."""
     await verify_project_access(project_id, current_user, pool)
@@ -2475,7 +2496,7 @@ async def mark_installment_paid(
     installment_id: str,
     request: MarkPaidRequest,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Mark an installment as paid and notify office managers to upload invoice."""
     async with pool.acquire() as conn:
@@ -2547,6 +2568,7 @@ async def mark_installment_paid(
         # Notification failure should not fail the request
         pass
 
+    notify_project_changed(installment['project_id'])
     return {
         "success": True,
         "installment_id": installment_id,
@@ -2561,7 +2583,7 @@ async def mark_installment_paid(
 async def get_payment_totals(
     project_id: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get payment totals and summary for a project."""
     await verify_project_access(project_id, current_user, pool)
@@ -2608,7 +2630,7 @@ async def get_payment_totals(
 async def get_project_payments(
     project_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """Get comprehensive payment data for a project."""
     await verify_project_access(project_id, current_user, pool)
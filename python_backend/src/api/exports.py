@@ -0,0 +1,336 @@
+"""
+Streaming export endpoints (NDJSON / CSV).
+
+Rows are read through an asyncpg server-side cursor inside a read-only
+transaction and flushed to the client in fixed-size chunks, so memory use
+stays constant regardless of how many rows a company has. Scoping mirrors
+the corresponding list endpoints:
+
+- /exports/tasks      -> GET /tasks (effective company, same filters)
+- /exports/issues     -> GET /client-issues (accessible projects)
+- /exports/materials  -> GET /material-items (accessible projects)
+- /exports/payments   -> GET /payment-installments (accessible projects)
+- /exports/analytics  -> GET /analytics/usage (root admin only)
+"""
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from uuid import UUID
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from src.api.auth import get_current_user_dependency, get_effective_company_id, is_root_admin
+from src.api.client_module import get_user_accessible_projects, is_client_role, verify_project_access
+from src.core.json_response import dumps
+from src.database.connection import get_read_pool
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Rows fetched from the server per cursor round trip
+CURSOR_PREFETCH = 1000
+
+# Rows encoded into a single response chunk
+CHUNK_ROWS = 500
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a column value into something csv.writer can emit."""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str, separators=(",", ":"))
+    return value
+
+
+def encode_ndjson(rows: Sequence[asyncpg.Record]) -> bytes:
+    """Encode a batch of rows as newline-delimited JSON."""
+    return b"".join(dumps(dict(row)) + b"\n" for row in rows)
+
+
+class CsvEncoder:
+    """Incremental CSV encoder that writes the header before the first batch."""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._header_written = False
+
+    def encode(self, rows: Sequence[asyncpg.Record]) -> bytes:
+        if not rows:
+            return b""
+        if not self._header_written:
+            self._writer.writerow(list(rows[0].keys()))
+            self._header_written = True
+        for row in rows:
+            self._writer.writerow([_csv_value(value) for value in row.values()])
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+        return data.encode("utf-8")
+
+
+async def stream_query(
+    pool: asyncpg.Pool,
+    query: str,
+    params: Sequence[Any],
+    fmt: str,
+    chunk_rows: int = CHUNK_ROWS,
+    prefetch: int = CURSOR_PREFETCH,
+) -> AsyncIterator[bytes]:
+    """Stream query results as encoded chunks using a server-side cursor.
+
+    The connection is held for the lifetime of the stream; if the client
+    disconnects, the generator is closed and the transaction rolled back.
+    """
+    csv_encoder = CsvEncoder() if fmt == "csv" else None
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            batch: List[asyncpg.Record] = []
+            async for row in conn.cursor(query, *params, prefetch=prefetch):
+                batch.append(row)
+                if len(batch) >= chunk_rows:
+                    yield csv_encoder.encode(batch) if csv_encoder else encode_ndjson(batch)
+                    batch = []
+            if batch:
+                yield csv_encoder.encode(batch) if csv_encoder else encode_ndjson(batch)
+
+
+def _export_response(pool: asyncpg.Pool, name: str, query: str, params: Sequence[Any], fmt: str) -> StreamingResponse:
+    """Wrap a query stream in a download response."""
+    filename = f"{name}-{date.today().isoformat()}.{'csv' if fmt == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        stream_query(pool, query, params, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _validate_format(fmt: str) -> str:
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    return fmt
+
+
+def _reject_clients(current_user: Dict[str, Any]) -> None:
+    if is_client_role(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Exports are not available for client users"
+        )
+
+
+async def _scoped_projects(
+    project_id: Optional[str],
+    current_user: Dict[str, Any],
+    pool: asyncpg.Pool,
+) -> List[str]:
+    """Resolve the project IDs an export may read, mirroring the list endpoints."""
+    if project_id:
+        await verify_project_access(project_id, current_user, pool)
+        return [project_id]
+    return await get_user_accessible_projects(current_user, pool)
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@router.get("/tasks")
+async def export_tasks(
+    format: str = Query("ndjson"),
+    project_id: Optional[str] = Query(None, alias="projectId"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    category: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None, alias="assignedTo"),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    pool: asyncpg.Pool = Depends(get_read_pool),
+):
+    """Export tasks with the same company scoping and filters as GET /tasks."""
+    fmt = _validate_format(format)
+    _reject_clients(current_user)
+
+    query = "SELECT * FROM tasks WHERE 1=1"
+    params: List[Any] = []
+
+    effective_company_id = get_effective_company_id(current_user)
+    if effective_company_id:
+        params.append(effective_company_id)
+        query += f" AND company_id = ${len(params)}"
+    elif not is_root_admin(current_user):
+        # Non-root user without a company sees nothing
+        query += " AND FALSE"
+
+    for column, value in (
+        ("project_id", project_id),
+        ("status", status_filter),
+        ("category", category),
+        ("assignee_id", assigned_to),
+    ):
+        if value:
+            params.append(value)
+            query += f" AND {column} = ${len(params)}"
+
+    query += " ORDER BY created_at DESC"
+    return _export_response(pool, "tasks", query, params, fmt)
+
+
+@router.get("/issues")
+async def export_issues(
+    format: str = Query("ndjson"),
+    project_id: Optional[str] = Query(None),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    pool: asyncpg.Pool = Depends(get_read_pool),
+):
+    """Export client issues for the projects visible in GET /client-issues."""
+    fmt = _validate_format(format)
+    _reject_clients(current_user)
+    project_ids = await _scoped_projects(project_id, current_user, pool)
+
+    query = """
+        SELECT i.*,
+               COALESCE(NULLIF(CONCAT(u.first_name, ' ', u.last_name), ' '), u.email) as created_by_name,
+               COALESCE(NULLIF(CONCAT(r.first_name, ' ', r.last_name), ' '), r.email) as resolved_by_name
+        FROM client_portal.issues i
+        LEFT JOIN public.users u ON i.created_by = u.id
+        LEFT JOIN public.users r ON i.resolved_by = r.id
+        WHERE i.project_id = ANY($1::varchar[])
+        ORDER BY i.created_at DESC
+    """
+    return _export_response(pool, "issues", query, [project_ids], fmt)
+
+
+@router.get("/materials")
+async def export_materials(
+    format: str = Query("ndjson"),
+    project_id: Optional[str] = Query(None),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    pool: asyncpg.Pool = Depends(get_read_pool),
+):
+    """Export material items for the projects visible in GET /material-items."""
+    fmt = _validate_format(format)
+    _reject_clients(current_user)
+    project_ids = await _scoped_projects(project_id, current_user, pool)
+
+    query = """
+        SELECT mi.*,
+               COALESCE(NULLIF(CONCAT(u.first_name, ' ', u.last_name), ' '), u.email) as added_by_name,
+               ma.name as area_name,
+               ps.name as stage_name
+        FROM client_portal.material_items mi
+        LEFT JOIN public.users u ON mi.added_by = u.id
+        LEFT JOIN client_portal.material_areas ma ON mi.area_id = ma.id
+        LEFT JOIN client_portal.project_stages ps ON mi.stage_id = ps.id
+        WHERE mi.project_id = ANY($1::varchar[])
+        ORDER BY mi.project_id, ma.sort_order, mi.name ASC, mi.id
+    """
+    return _export_response(pool, "materials", query, [project_ids], fmt)
+
+
+@router.get("/payments")
+async def export_payments(
+    format: str = Query("ndjson"),
+    project_id: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    pool: asyncpg.Pool = Depends(get_read_pool),
+):
+    """Export payment installments for the projects visible to the user."""
+    fmt = _validate_format(format)
+    _reject_clients(current_user)
+    project_ids = await _scoped_projects(project_id, current_user, pool)
+
+    query = """
+        SELECT pi.*, ps.title as schedule_title
+        FROM client_portal.payment_installments pi
+        LEFT JOIN client_portal.payment_schedules ps ON pi.schedule_id = ps.id
+        WHERE pi.project_id = ANY($1::varchar[])
+    """
+    params: List[Any] = [project_ids]
+    if status_filter:
+        params.append(status_filter)
+        query += f" AND pi.status = ${len(params)}"
+    query += " ORDER BY pi.project_id, pi.display_order, pi.due_date NULLS LAST, pi.created_at"
+    return _export_response(pool, "payments", query, params, fmt)
+
+
+@router.get("/analytics")
+async def export_analytics(
+    format: str = Query("ndjson"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    company_id: Optional[str] = Query(None),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    pool: asyncpg.Pool = Depends(get_read_pool),
+):
+    """Export per-user daily usage rows (root admin only, like /analytics/usage)."""
+    fmt = _validate_format(format)
+    if not is_root_admin(current_user):
+        raise HTTPException(status_code=403, detail="Root admin access required.")
+
+    if not start_date:
+        start_date = date.today() - timedelta(days=7)
+    if not end_date:
+        end_date = date.today()
+
+    params: List[Any] = [start_date, end_date]
+    company_filter = ""
+    if company_id:
+        params.append(company_id)
+        company_filter = " AND ds.company_id = $3"
+
+    query = f"""
+        SELECT
+            ds.stat_date,
+            ds.user_id,
+            u.email,
+            COALESCE(u.first_name || ' ' || u.last_name, u.email) as name,
+            ds.company_id,
+            c.name as company_name,
+            ds.total_time_seconds,
+            ds.agent_time_seconds,
+            ds.app_time_seconds,
+            ds.action_count,
+            ds.login_count
+        FROM public.analytics_daily_stats ds
+        JOIN public.users u ON ds.user_id = u.id
+        LEFT JOIN public.companies c ON ds.company_id = c.id
+        WHERE ds.stat_date BETWEEN $1 AND $2
+        {company_filter}
+        ORDER BY ds.stat_date, ds.user_id
+    """
+    return _export_response(pool, "analytics", query, params, fmt)
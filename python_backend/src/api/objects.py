@@ -6,7 +6,7 @@ Supports multi-environment operation:
 - Production (Replit): Uses sidecar → prod bucket
 """
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
@@ -15,11 +15,14 @@ from ..core.config import settings
 from ..core.storage import (
     get_storage_config as _get_storage_config,
     generate_signed_url,
+    generate_signed_urls,
     get_object_path,
 )
-from .auth import get_current_user_dependency
+from ..database.repositories import PhotoRepository
+from .auth import get_current_user_dependency, is_root_admin
 
 router = APIRouter(prefix="/objects", tags=["objects"])
+photo_repo = PhotoRepository()
 
 
 def get_storage_config():
@@ -76,6 +79,14 @@ class DownloadRequest(BaseModel):
     filePath: str
 
 
+class SignedUrlBatchRequest(BaseModel):
+    objectIds: List[str]
+
+
+# Maximum number of objects accepted by the batch signed URL endpoint
+MAX_SIGNED_URL_BATCH = 200
+
+
 @router.post("/upload")
 async def get_upload_url(
     current_user: Dict[str, Any] = Depends(get_current_user_dependency)
@@ -100,7 +111,8 @@ async def get_upload_url(
         object_path = get_object_path(object_id, clean_private_dir)
 
         # Generate signed URL for PUT (upload) - 15 min expiry
-        upload_url = await generate_signed_url(bucket_id, object_path, method="PUT", expires_minutes=15)
+        # (fresh object ID, so there is nothing to reuse from the cache)
+        upload_url = await generate_signed_url(bucket_id, object_path, method="PUT", expires_minutes=15, use_cache=False)
 
         # Generate signed URL for GET (preview) - 60 min expiry
         preview_url = await generate_signed_url(bucket_id, object_path, method="GET", expires_minutes=60)
@@ -170,4 +182,62 @@ async def get_download_url(request: DownloadRequest):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get download URL"
-        )
\ No newline at end of file
+        )
+
+@router.post("/signed-urls")
+async def get_signed_urls(
+    request: SignedUrlBatchRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+):
+    """Get signed GET URLs for many object IDs in one round trip.
+
+    Signing runs concurrently and reuses cached URLs, so a gallery of N
+    images costs one request instead of N redirects through /image/{id}.
+    Only objects referenced by a photo or log image in one of the caller's
+    company projects are signed; the rest are listed in 'denied'.
+    Installment and material files are not signed here: they are stored as
+    full object paths and come with their own download URLs from the
+    endpoints that list them, after those endpoints' project access checks.
+    """
+    object_ids = list(dict.fromkeys(request.objectIds))
+    if len(object_ids) > MAX_SIGNED_URL_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_SIGNED_URL_BATCH} object IDs per request"
+        )
+
+    try:
+        config = get_storage_config()
+        bucket_id = config["bucket_id"]
+        clean_private_dir = config["clean_private_dir"]
+
+        if not bucket_id:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Object storage not configured"
+            )
+
+        company_id = None
+        if not is_root_admin(current_user):
+            company_id = str(current_user.get('companyId') or current_user.get('company_id') or '')
+        readable = set(await photo_repo.get_readable_object_ids(object_ids, company_id))
+
+        object_paths = {
+            object_id: get_object_path(object_id, clean_private_dir)
+            for object_id in object_ids if object_id in readable
+        }
+        signed = await generate_signed_urls(bucket_id, object_paths.values(), method="GET", expires_minutes=60)
+
+        return {
+            "urls": {object_id: signed.get(path) for object_id, path in object_paths.items()},
+            "denied": [object_id for object_id in object_ids if object_id not in readable],
+            "expiresInSeconds": 3600
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get signed URLs"
+        )
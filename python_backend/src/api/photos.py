@@ -10,41 +10,82 @@ import uuid
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Query, Request, Depends
 from fastapi.responses import FileResponse, RedirectResponse
-from src.models import Photo, PhotoCreate
+from src.models import Photo, PhotoCreate, PhotoWithUrl, PhotoSignedUrlRequest
 from pydantic import ValidationError
 from src.database.repositories import PhotoRepository, ProjectRepository
 from src.core.config import settings
-from src.core.storage import get_storage_config, generate_signed_url, get_object_path
+from src.core.storage import get_storage_config, generate_signed_url, generate_signed_urls, get_object_path
 from src.api.auth import get_current_user_dependency, is_root_admin
 
 router = APIRouter(prefix="/photos", tags=["photos"])
 photo_repo = PhotoRepository()
 project_repo = ProjectRepository()
 
+# Maximum number of photo IDs accepted by the batch signed URL endpoint
+MAX_SIGNED_URL_BATCH = 200
 
-@router.get("", response_model=List[Photo])
+
+def is_uuid_filename(filename: str) -> bool:
+    """Check if a photo filename is an object storage UUID (vs a legacy local file)."""
+    return (
+        (len(filename) == 36 and filename.count('-') == 4) or
+        (len(filename) > 36 and filename.count('-') >= 4 and '.' not in filename[:36])
+    )
+
+
+async def resolve_photo_urls(photos: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Resolve file URLs for many photos with concurrent signing.
+
+    Each photo dict needs 'id' and 'filename'. Object storage photos get a
+    signed GCS URL; legacy local files (or failed signings) fall back to
+    the /photos/{id}/file endpoint.
+    """
+    fallback = {str(p['id']): f"/api/v1/photos/{p['id']}/file" for p in photos}
+    object_paths: Dict[str, str] = {}
+    try:
+        config = get_storage_config()
+        for photo in photos:
+            filename = photo.get('filename') or ''
+            if filename and is_uuid_filename(filename):
+                clean_uuid = filename.split('?')[0]
+                object_paths[str(photo['id'])] = get_object_path(clean_uuid, config["clean_private_dir"])
+        signed = await generate_signed_urls(config["bucket_id"], object_paths.values(), method="GET", expires_minutes=60)
+    except Exception as e:
+        print(f"⚠️ [GCS] Batch URL signing failed: {e}")
+        return fallback
+
+    return {
+        photo_id: signed.get(object_paths.get(photo_id, '')) or url
+        for photo_id, url in fallback.items()
+    }
+
+
+@router.get("", response_model=List[PhotoWithUrl])
 async def get_photos(
     project_id: Optional[str] = Query(None, alias="projectId"),
     user_id: Optional[str] = Query(None, alias="userId"),
+    include_urls: bool = Query(True, alias="includeUrls"),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency)
 ):
-    """Get photos with optional filters and company scoping."""
+    """Get photos with optional filters and company scoping.
+
+    Each photo carries a signedUrl (signed in one concurrent batch), so
+    galleries don't need one /photos/{id}/file redirect per thumbnail; pass
+    includeUrls=false to skip signing, in which case signedUrl is null.
+    """
     try:
-        photos = await photo_repo.get_all(project_id=project_id, user_id=user_id)
-        
-        # Apply company filtering unless root admin
+        # Apply company filtering in the query unless root admin
+        company_id = None
         if not is_root_admin(current_user):
-            user_company_id = str(current_user.get('companyId') or current_user.get('company_id'))
-            # Filter photos by validating associated project company
-            filtered_photos = []
+            company_id = str(current_user.get('companyId') or current_user.get('company_id'))
+        photos = await photo_repo.get_all(project_id=project_id, user_id=user_id, company_id=company_id)
+
+        photos = [PhotoWithUrl(**photo.model_dump(by_alias=True)) for photo in photos]
+        if include_urls and photos:
+            urls = await resolve_photo_urls([{"id": p.id, "filename": p.filename} for p in photos])
             for photo in photos:
-                photo_project_id = photo.project_id
-                if photo_project_id:
-                    project = await project_repo.get_by_id(photo_project_id)
-                    if project and str(getattr(project, 'company_id', '')) == user_company_id:
-                        filtered_photos.append(photo)
-            photos = filtered_photos
-        
+                photo.signed_url = urls.get(photo.id)
+
         return photos
     except Exception as e:
         print(f"Error fetching photos: {e}")
@@ -253,6 +294,47 @@ async def upload_photo(
         )
 
 
+@router.post("/signed-urls")
+async def get_photo_signed_urls(
+    request: PhotoSignedUrlRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+):
+    """Resolve file URLs for up to MAX_SIGNED_URL_BATCH photos in one call.
+
+    Access is checked with a single query joining photos to their projects.
+    Photos that don't exist or belong to another company are listed in
+    'denied' rather than failing the whole batch.
+    """
+    photo_ids = list(dict.fromkeys(request.photo_ids))
+    if len(photo_ids) > MAX_SIGNED_URL_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_SIGNED_URL_BATCH} photo IDs per request"
+        )
+
+    try:
+        rows = await photo_repo.get_access_info(photo_ids)
+
+        if not is_root_admin(current_user):
+            user_company_id = str(current_user.get('companyId') or current_user.get('company_id') or '')
+            rows = [row for row in rows if str(row.get('company_id') or '') == user_company_id]
+
+        urls = await resolve_photo_urls(rows)
+        return {
+            "urls": urls,
+            "denied": [photo_id for photo_id in photo_ids if photo_id not in urls],
+            "expiresInSeconds": 3600,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error resolving photo URLs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to resolve photo URLs"
+        )
+
+
 @router.get("/{photo_id}")
 async def get_photo(
     photo_id: str,
@@ -320,11 +402,7 @@ async def get_photo_file(
         # Priority 1: For UUID filenames, generate signed URL from object storage
         if photo.filename:
             # Check if filename is a UUID (36 chars with dashes, or UUID pattern)
-            is_uuid_filename = (
-                (len(photo.filename) == 36 and photo.filename.count('-') == 4) or
-                (len(photo.filename) > 36 and photo.filename.count('-') >= 4 and '.' not in photo.filename[:36])
-            )
-            if is_uuid_filename:
+            if is_uuid_filename(photo.filename):
                 try:
                     # Get storage config (environment-aware)
                     config = get_storage_config()
@@ -165,6 +165,79 @@ def _row_to_dict(row) -> dict:
     return result
 
 
+# ============================================================================
+# CHECKLIST TREES
+# ============================================================================
+
+async def _load_checklists(
+    conn,
+    task_ids: Optional[List[str]] = None,
+    checklist_ids: Optional[List[str]] = None,
+) -> List[dict]:
+    """Load checklists with nested items and documents in three queries.
+
+    Each level (checklists, items, documents) is fetched for all parents at
+    once with ANY($1) and attached through a dict index, so the number of
+    round trips no longer grows with the number of tasks or items.
+    """
+    if checklist_ids is not None:
+        checklists = await conn.fetch(
+            "SELECT * FROM sub_checklists WHERE id = ANY($1::varchar[]) ORDER BY sort_order",
+            checklist_ids,
+        )
+    else:
+        checklists = await conn.fetch(
+            "SELECT * FROM sub_checklists WHERE task_id = ANY($1::varchar[]) ORDER BY sort_order",
+            task_ids or [],
+        )
+    if not checklists:
+        return []
+
+    items = await conn.fetch(
+        "SELECT * FROM sub_checklist_items WHERE checklist_id = ANY($1::varchar[]) ORDER BY sort_order",
+        [cl["id"] for cl in checklists],
+    )
+    docs = []
+    if items:
+        docs = await conn.fetch(
+            """SELECT * FROM sub_task_documents
+               WHERE checklist_item_id = ANY($1::varchar[]) ORDER BY created_at""",
+            [item["id"] for item in items],
+        )
+
+    docs_by_item: Dict[str, list] = defaultdict(list)
+    for doc in docs:
+        docs_by_item[doc["checklist_item_id"]].append(_row_to_dict(doc))
+
+    items_by_checklist: Dict[str, list] = defaultdict(list)
+    for item in items:
+        item_dict = _row_to_dict(item)
+        item_dict["documents"] = docs_by_item.get(item["id"], [])
+        items_by_checklist[item["checklist_id"]].append(item_dict)
+
+    result = []
+    for cl in checklists:
+        cl_dict = _row_to_dict(cl)
+        cl_dict["items"] = items_by_checklist.get(cl["id"], [])
+        result.append(cl_dict)
+    return result
+
+
+async def _attach_checklists(conn, rows) -> List[dict]:
+    """Convert task rows to dicts with their checklist trees attached."""
+    checklists = await _load_checklists(conn, task_ids=[row["id"] for row in rows])
+    by_task: Dict[str, list] = defaultdict(list)
+    for cl in checklists:
+        by_task[cl["taskId"]].append(cl)
+
+    result = []
+    for row in rows:
+        task_dict = _row_to_dict(row)
+        task_dict["checklists"] = by_task.get(row["id"], [])
+        result.append(task_dict)
+    return result
+
+
 # ============================================================================
 # SUBCONTRACTOR COMPANIES
 # ============================================================================
@@ -828,32 +901,8 @@ async def get_sub_task(
     task = await _verify_sub_task_access(task_id, current_user, pool)
 
     async with pool.acquire() as conn:
-        # Get checklists
-        checklists = await conn.fetch(
-            """SELECT * FROM sub_checklists WHERE task_id = $1 ORDER BY sort_order""",
-            task_id,
-        )
-
-        result_checklists = []
-        for cl in checklists:
-            cl_dict = _row_to_dict(cl)
-            # Get items for this checklist
-            items = await conn.fetch(
-                """SELECT * FROM sub_checklist_items WHERE checklist_id = $1 ORDER BY sort_order""",
-                cl["id"],
-            )
-            item_list = []
-            for item in items:
-                item_dict = _row_to_dict(item)
-                # Get documents for this item
-                docs = await conn.fetch(
-                    """SELECT * FROM sub_task_documents WHERE checklist_item_id = $1 ORDER BY created_at""",
-                    item["id"],
-                )
-                item_dict["documents"] = [_row_to_dict(d) for d in docs]
-                item_list.append(item_dict)
-            cl_dict["items"] = item_list
-            result_checklists.append(cl_dict)
+        # Get checklists with items and documents
+        result_checklists = await _load_checklists(conn, task_ids=[task_id])
 
         # Get reviews
         reviews = await conn.fetch(
@@ -1126,28 +1175,7 @@ async def get_task_checklists(
     await _verify_sub_task_access(task_id, current_user, pool)
 
     async with pool.acquire() as conn:
-        checklists = await conn.fetch(
-            "SELECT * FROM sub_checklists WHERE task_id = $1 ORDER BY sort_order", task_id
-        )
-        result = []
-        for cl in checklists:
-            cl_dict = _row_to_dict(cl)
-            items = await conn.fetch(
-                "SELECT * FROM sub_checklist_items WHERE checklist_id = $1 ORDER BY sort_order",
-                cl["id"],
-            )
-            item_list = []
-            for item in items:
-                item_dict = _row_to_dict(item)
-                docs = await conn.fetch(
-                    "SELECT * FROM sub_task_documents WHERE checklist_item_id = $1",
-                    item["id"],
-                )
-                item_dict["documents"] = [_row_to_dict(d) for d in docs]
-                item_list.append(item_dict)
-            cl_dict["items"] = item_list
-            result.append(cl_dict)
-    return result
+        return await _load_checklists(conn, task_ids=[task_id])
 
 
 @router.post("/tasks/{task_id}/checklists", status_code=201)
@@ -1175,25 +1203,24 @@ async def create_checklist(
 
         # Create items if provided
         items = body.get("items", [])
-        for i, item in enumerate(items):
-            await conn.execute(
+        if items:
+            await conn.executemany(
                 """INSERT INTO sub_checklist_items (id, checklist_id, description, item_type, sort_order)
                    VALUES ($1, $2, $3, $4, $5)""",
-                str(uuid.uuid4()), checklist_id,
-                item.get("description", ""),
-                item.get("itemType", "standard"),
-                item.get("sortOrder", i),
+                [
+                    (
+                        str(uuid.uuid4()), checklist_id,
+                        item.get("description", ""),
+                        item.get("itemType", "standard"),
+                        item.get("sortOrder", i),
+                    )
+                    for i, item in enumerate(items)
+                ],
             )
 
         # Return full checklist with items
-        cl_row = await conn.fetchrow("SELECT * FROM sub_checklists WHERE id = $1", checklist_id)
-        cl_dict = _row_to_dict(cl_row)
-        items_rows = await conn.fetch(
-            "SELECT * FROM sub_checklist_items WHERE checklist_id = $1 ORDER BY sort_order",
-            checklist_id,
-        )
-        cl_dict["items"] = [_row_to_dict(r) for r in items_rows]
-    return cl_dict
+        checklists = await _load_checklists(conn, checklist_ids=[checklist_id])
+    return checklists[0]
 
 
 @router.delete("/checklists/{checklist_id}")
@@ -1501,34 +1528,8 @@ async def get_review_queue(
             *params,
         )
 
-        result = []
-        for row in rows:
-            task_dict = _row_to_dict(row)
-            # Nest checklists with items and documents
-            checklists = await conn.fetch(
-                "SELECT * FROM sub_checklists WHERE task_id = $1 ORDER BY sort_order",
-                row["id"],
-            )
-            cl_list = []
-            for cl in checklists:
-                cl_dict = _row_to_dict(cl)
-                items = await conn.fetch(
-                    "SELECT * FROM sub_checklist_items WHERE checklist_id = $1 ORDER BY sort_order",
-                    cl["id"],
-                )
-                item_list = []
-                for item in items:
-                    item_dict = _row_to_dict(item)
-                    docs = await conn.fetch(
-                        "SELECT * FROM sub_task_documents WHERE checklist_item_id = $1 ORDER BY created_at",
-                        item["id"],
-                    )
-                    item_dict["documents"] = [_row_to_dict(d) for d in docs]
-                    item_list.append(item_dict)
-                cl_dict["items"] = item_list
-                cl_list.append(cl_dict)
-            task_dict["checklists"] = cl_list
-            result.append(task_dict)
+        # Nest checklists with items and documents
+        result = await _attach_checklists(conn, rows)
 
     return result
 
@@ -1588,34 +1589,8 @@ async def get_review_history(
             *params,
         )
 
-        result = []
-        for row in rows:
-            task_dict = _row_to_dict(row)
-            # Nest checklists with items and documents
-            checklists = await conn.fetch(
-                "SELECT * FROM sub_checklists WHERE task_id = $1 ORDER BY sort_order",
-                row["id"],
-            )
-            cl_list = []
-            for cl in checklists:
-                cl_dict = _row_to_dict(cl)
-                items = await conn.fetch(
-                    "SELECT * FROM sub_checklist_items WHERE checklist_id = $1 ORDER BY sort_order",
-                    cl["id"],
-                )
-                item_list = []
-                for item in items:
-                    item_dict = _row_to_dict(item)
-                    docs = await conn.fetch(
-                        "SELECT * FROM sub_task_documents WHERE checklist_item_id = $1 ORDER BY created_at",
-                        item["id"],
-                    )
-                    item_dict["documents"] = [_row_to_dict(d) for d in docs]
-                    item_list.append(item_dict)
-                cl_dict["items"] = item_list
-                cl_list.append(cl_dict)
-            task_dict["checklists"] = cl_list
-            result.append(task_dict)
+        # Nest checklists with items and documents
+        result = await _attach_checklists(conn, rows)
 
     return result
 
@@ -1848,25 +1823,24 @@ async def apply_template_to_task(
 
         # Create items from template
         items = template["items"] if isinstance(template["items"], list) else json.loads(template["items"] or "[]")
-        for i, item in enumerate(items):
-            await conn.execute(
+        if items:
+            await conn.executemany(
                 """INSERT INTO sub_checklist_items (id, checklist_id, description, item_type, sort_order)
                    VALUES ($1, $2, $3, $4, $5)""",
-                str(uuid.uuid4()), checklist_id,
-                item.get("description", ""),
-                item.get("itemType", item.get("item_type", "standard")),
-                item.get("sortOrder", item.get("sort_order", i)),
+                [
+                    (
+                        str(uuid.uuid4()), checklist_id,
+                        item.get("description", ""),
+                        item.get("itemType", item.get("item_type", "standard")),
+                        item.get("sortOrder", item.get("sort_order", i)),
+                    )
+                    for i, item in enumerate(items)
+                ],
             )
 
         # Return the created checklist
-        cl_row = await conn.fetchrow("SELECT * FROM sub_checklists WHERE id = $1", checklist_id)
-        cl_dict = _row_to_dict(cl_row)
-        item_rows = await conn.fetch(
-            "SELECT * FROM sub_checklist_items WHERE checklist_id = $1 ORDER BY sort_order",
-            checklist_id,
-        )
-        cl_dict["items"] = [_row_to_dict(r) for r in item_rows]
-    return cl_dict
+        checklists = await _load_checklists(conn, checklist_ids=[checklist_id])
+    return checklists[0]
 
 
 # ============================================================================
@@ -1993,19 +1967,8 @@ async def create_milestone(
         )
 
         # Check if milestone should be immediately payable (all linked tasks already approved)
-        if linked_task_ids:
-            all_approved = True
-            for tid in linked_task_ids:
-                t = await conn.fetchrow("SELECT status FROM sub_tasks WHERE id = $1", tid)
-                if not t or t["status"] != "approved":
-                    all_approved = False
-                    break
-            if all_approved:
-                await conn.execute(
-                    "UPDATE sub_payment_milestones SET status = 'payable', updated_at = NOW() WHERE id = $1",
-                    milestone_id,
-                )
-                row = await conn.fetchrow("SELECT * FROM sub_payment_milestones WHERE id = $1", milestone_id)
+        if linked_task_ids and await _update_milestone_payability(conn, milestone_ids=[milestone_id]):
+            row = await conn.fetchrow("SELECT * FROM sub_payment_milestones WHERE id = $1", milestone_id)
 
     return _row_to_dict(row)
 
@@ -2066,6 +2029,10 @@ async def update_milestone(
             f"UPDATE sub_payment_milestones SET {', '.join(updates)} WHERE id = ${idx} RETURNING *",
             *values,
         )
+
+        # Re-linking tasks can make the milestone payable right away
+        if "linkedTaskIds" in body and await _update_milestone_payability(conn, milestone_ids=[milestone_id]):
+            row = await conn.fetchrow("SELECT * FROM sub_payment_milestones WHERE id = $1", milestone_id)
     return _row_to_dict(row)
 
 
@@ -2530,32 +2497,60 @@ async def get_my_projects(
 # HELPER FUNCTIONS
 # ============================================================================
 
+async def _update_milestone_payability(
+    conn,
+    task_id: Optional[str] = None,
+    milestone_ids: Optional[List[str]] = None,
+    assignment_id: Optional[str] = None,
+) -> List[str]:
+    """Mark pending milestones payable once all their linked tasks are approved.
+
+    One statement unnests linked_task_ids, joins sub_tasks and keeps the
+    milestones where bool_and(status = 'approved'), then bulk-updates them.
+    Scope it with task_id (only milestones linking that task, found through
+    the GIN index on linked_task_ids), milestone_ids or assignment_id; with
+    no scope every pending milestone is re-evaluated. Milestones without
+    linked tasks are never touched (they are marked payable manually).
+    Returns the IDs that became payable.
+    """
+    conditions = ["m.status = 'pending'"]
+    params: list = []
+    if task_id is not None:
+        params.append(task_id)
+        conditions.append(f"m.linked_task_ids @> jsonb_build_array(${len(params)}::text)")
+    if milestone_ids is not None:
+        params.append(milestone_ids)
+        conditions.append(f"m.id = ANY(${len(params)}::varchar[])")
+    if assignment_id is not None:
+        params.append(assignment_id)
+        conditions.append(f"m.assignment_id = ${len(params)}")
+
+    rows = await conn.fetch(
+        f"""WITH ready AS (
+                SELECT m.id
+                FROM sub_payment_milestones m
+                CROSS JOIN LATERAL jsonb_array_elements_text(m.linked_task_ids) AS linked(task_id)
+                LEFT JOIN sub_tasks st ON st.id = linked.task_id
+                WHERE {" AND ".join(conditions)}
+                GROUP BY m.id
+                HAVING bool_and(COALESCE(st.status = 'approved', false))
+            )
+            UPDATE sub_payment_milestones m
+            SET status = 'payable', updated_at = NOW()
+            FROM ready
+            WHERE m.id = ready.id
+            RETURNING m.id""",
+        *params,
+    )
+    payable = [r["id"] for r in rows]
+    for milestone_id in payable:
+        logger.info(f"Milestone {milestone_id} is now payable (all linked tasks approved)")
+    return payable
+
+
 async def _check_milestone_payability(task_id: str, conn):
     """Check if any milestones linked to this task should become payable."""
-    milestones = await conn.fetch(
-        "SELECT * FROM sub_payment_milestones WHERE status = 'pending'",
-    )
-    for m in milestones:
-        linked_ids = m["linked_task_ids"] if isinstance(m["linked_task_ids"], list) else json.loads(m["linked_task_ids"] or "[]")
-        if not linked_ids:
-            continue  # Milestones without linked tasks must be manually marked
-        if task_id not in linked_ids:
-            continue
-        # Check if ALL linked tasks are approved
-        all_approved = True
-        for tid in linked_ids:
-            t = await conn.fetchrow(
-                "SELECT status FROM sub_tasks WHERE id = $1", tid
-            )
-            if not t or t["status"] != "approved":
-                all_approved = False
-                break
-        if all_approved:
-            await conn.execute(
-                "UPDATE sub_payment_milestones SET status = 'payable', updated_at = NOW() WHERE id = $1",
-                m["id"],
-            )
-            logger.info(f"Milestone {m['id']} is now payable (all linked tasks approved)")
+    return await _update_milestone_payability(conn, task_id=task_id)
 
 
 async def _send_task_assignment_email(task_id: str, pool):
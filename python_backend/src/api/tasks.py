@@ -7,6 +7,7 @@ from src.models import Task, TaskCreate, TaskUpdate, Project
 from src.database.repositories import TaskRepository, ProjectRepository
 from src.database.auth_repositories import auth_repo
 from src.api.auth import get_current_user_dependency, is_root_admin, get_effective_company_id
+from src.agent.cache import notify_company_changed
 
 router = APIRouter()
 task_repo = TaskRepository()
@@ -142,7 +143,9 @@ async def create_task(
             task_data['assignee_id'] = None
         
         print(f"Creating task for user {current_user.get('email')}: {task}")
-        return await task_repo.create(TaskCreate(**task_data))
+        created = await task_repo.create(TaskCreate(**task_data))
+        notify_company_changed(user_company_id)
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -174,6 +177,7 @@ async def update_task(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
+        notify_company_changed(current_user.get('companyId') or current_user.get('company_id'))
         return task
     except HTTPException:
         raise
@@ -213,6 +217,7 @@ async def assign_task(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
+        notify_company_changed(current_user.get('companyId') or current_user.get('company_id'))
         return task
     except HTTPException:
         raise
@@ -242,6 +247,7 @@ async def delete_task(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
+        notify_company_changed(current_user.get('companyId') or current_user.get('company_id'))
     except HTTPException:
         raise
     except Exception as e:
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, EmailStr, field_validator, ConfigDict
 from ..database.auth_repositories import auth_repo, company_repo, role_repo
+from ..database.cascade_delete import CascadeBlockedError
 from .auth import get_current_user_dependency, is_user_admin, is_root_admin
 from ..validators import (
     validate_name,
@@ -365,16 +366,30 @@ async def update_company(
 @router.delete("/rbac/companies/{company_id}")
 async def delete_company(
     company_id: str,
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    background: bool = False,
 ):
-    """Delete a company (root admin only)."""
+    """Delete a company (root admin only).
+
+    Pass ?background=true to deactivate the company now and purge its data
+    in the background; poll /rbac/deletions/{deletionId} for progress.
+    """
     try:
         if not is_root_admin(current_user):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Root admin privileges required"
             )
-        
+
+        if background:
+            deletion_id = await company_repo.schedule_company_deletion(company_id, current_user.get('id'))
+            if not deletion_id:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Company not found"
+                )
+            return {"message": "Company deletion scheduled", "deletionId": deletion_id}
+
         success = await company_repo.delete_company(company_id)
         if not success:
             raise HTTPException(
@@ -385,6 +400,8 @@ async def delete_company(
         
     except HTTPException:
         raise
+    except CascadeBlockedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error deleting company: {e}", exc_info=True)
         raise HTTPException(
@@ -710,12 +727,14 @@ async def update_user(
 async def delete_user(
     user_id: str,
     force: bool = False,
+    background: bool = False,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency)
 ):
     """Delete a user with authorization checks.
 
     Pass ?force=true to force-delete a user who has associated records.
-    Force-delete is restricted to root administrators only.
+    Force-delete is restricted to root administrators only; with
+    &background=true the user is deactivated now and purged in the background.
     """
     try:
         if not is_user_admin(current_user):
@@ -756,6 +775,15 @@ async def delete_user(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Only root administrators can force-delete users"
                 )
+            if background:
+                deletion_id = await auth_repo.schedule_user_deletion(user_id, current_user.get('id'))
+                if not deletion_id:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="User not found"
+                    )
+                logger.info(f"User deletion scheduled by {current_user.get('email')} (root admin)")
+                return {"message": "User deletion scheduled", "deletionId": deletion_id}
             success = await auth_repo.force_delete_user(user_id)
         else:
             try:
@@ -776,6 +804,8 @@ async def delete_user(
 
     except HTTPException:
         raise
+    except CascadeBlockedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error deleting user: {e}", exc_info=True)
         raise HTTPException(
@@ -783,6 +813,45 @@ async def delete_user(
             detail="Failed to delete user"
         )
 
+@router.get("/rbac/deletions/{deletion_id}")
+async def get_deletion_status(
+    deletion_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+):
+    """Status and progress of a background company/user deletion (root admin only)."""
+    if not is_root_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Root admin privileges required"
+        )
+    from ..database.cascade_delete import get_deletion
+
+    try:
+        deletion = await get_deletion(deletion_id)
+    except Exception as e:
+        logger.error(f"Error fetching deletion {deletion_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch deletion status"
+        )
+    if not deletion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deletion not found"
+        )
+    return {
+        "id": deletion["id"],
+        "rootTable": deletion["root_table"],
+        "rootId": deletion["root_id"],
+        "status": deletion["status"],
+        "progress": deletion["progress"],
+        "error": deletion["error"],
+        "requestedBy": deletion["requested_by"],
+        "createdAt": deletion["created_at"],
+        "updatedAt": deletion["updated_at"],
+        "finishedAt": deletion["finished_at"],
+    }
+
 # Role Management Endpoints
 
 @router.get("/rbac/roles")
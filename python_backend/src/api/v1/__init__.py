@@ -85,6 +85,12 @@ try:
 except ImportError:
     analytics_router = None
 
+# Import exports router (streaming NDJSON/CSV exports)
+try:
+    from ...api.exports import router as exports_router
+except ImportError:
+    exports_router = None
+
 def create_v1_router() -> APIRouter:
     """Create and configure the v1 API router."""
     v1_router = APIRouter(prefix="/v1", tags=["v1"])
@@ -164,5 +170,9 @@ def create_v1_router() -> APIRouter:
     if analytics_router:
         v1_router.include_router(analytics_router, tags=["analytics"])
 
+    # Include exports router for streaming data exports
+    if exports_router:
+        v1_router.include_router(exports_router, tags=["exports"])
+
     return v1_router
 
@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException, status, Depends, Query
 from pydantic import BaseModel, Field
 import asyncpg
 
-from src.database.connection import get_db_pool, db_manager
+from src.database.connection import UnitOfWork, get_unit_of_work, db_manager
 from src.api.auth import get_current_user_dependency, is_root_admin
 
 router = APIRouter(prefix="/materials", tags=["materials"])
@@ -74,7 +74,7 @@ def is_client_role(current_user: Dict[str, Any]) -> bool:
 async def get_suggested_materials(
     project_id: str = Query(..., alias="projectId", description="Project ID"),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Get materials pending PM approval.
@@ -152,7 +152,7 @@ async def get_suggested_materials(
 async def approve_materials_bulk(
     request: BulkApprovalRequest,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Bulk approve or reject suggested materials.
@@ -219,7 +219,7 @@ async def approve_materials_bulk(
 async def get_materials_by_stage(
     stage_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Get all materials linked to a specific stage.
@@ -302,7 +302,7 @@ async def get_materials_by_stage(
 async def get_pending_materials_count(
     project_id: str = Query(..., alias="projectId", description="Project ID"),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Get count of materials pending approval for a project.
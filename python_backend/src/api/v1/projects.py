@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from ...models import Project, ProjectCreate, ProjectUpdate
 from ...database.repositories import ProjectRepository
 from ...api.auth import get_current_user_dependency, is_root_admin, get_effective_company_id
+from ...agent.cache import notify_company_changed, notify_project_changed
 import logging
 
 logger = logging.getLogger(__name__)
@@ -126,6 +127,7 @@ async def create_project(
         logger.info(f"Creating project for user {current_user.get('email')} (company {user_company_id})")
         # Pass company_id as a separate parameter to ensure it's set
         created_project = await project_repo.create(project, company_id=str(user_company_id))
+        notify_company_changed(str(user_company_id))
         return created_project
     except HTTPException:
         raise
@@ -163,7 +165,9 @@ async def update_project(
                     detail="Access denied: Project belongs to different company"
                 )
         
-        return await project_repo.update(project_id, project_update)
+        updated_project = await project_repo.update(project_id, project_update)
+        notify_project_changed(project_id)
+        return updated_project
     except HTTPException:
         raise
     except Exception as e:
@@ -209,6 +213,7 @@ async def delete_project(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
+        notify_project_changed(project_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -8,9 +8,10 @@ from pydantic import BaseModel, Field
 from datetime import date
 import asyncpg
 
-from src.database.connection import get_db_pool
+from src.database.connection import UnitOfWork, get_transactional_unit_of_work, get_unit_of_work
 from src.database.stage_repository import stage_template_repo, project_stage_repo
 from src.api.auth import get_current_user_dependency, is_root_admin
+from src.agent.cache import notify_project_changed
 from src.models.stage import (
     ProjectStageCreate,
     ProjectStageUpdate,
@@ -99,7 +100,7 @@ async def get_project_stages(
     project_id: str = Query(..., alias="projectId", description="Project ID to get stages for"),
     include_hidden: bool = Query(True, alias="includeHidden", description="Include stages hidden from clients"),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Get all stages for a project.
@@ -118,7 +119,7 @@ async def get_project_stages(
 async def get_stage(
     stage_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Get a specific stage by ID.
@@ -146,7 +147,7 @@ async def get_stage(
 async def create_stage(
     stage: ProjectStageCreate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Create a new project stage.
@@ -163,7 +164,9 @@ async def create_stage(
     # Convert Pydantic model to dict
     stage_data = stage.model_dump(by_alias=False)
 
-    return await project_stage_repo.create(stage_data, current_user['id'])
+    created = await project_stage_repo.create(stage_data, current_user['id'])
+    notify_project_changed(stage.project_id)
+    return created
 
 
 @router.patch("/{stage_id}", response_model=Dict[str, Any])
@@ -171,7 +174,7 @@ async def update_stage(
     stage_id: str,
     update: ProjectStageUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Update a project stage.
@@ -199,14 +202,16 @@ async def update_stage(
     if 'status' in update_data and update_data['status']:
         update_data['status'] = update_data['status'].value if hasattr(update_data['status'], 'value') else update_data['status']
 
-    return await project_stage_repo.update(stage_id, update_data, user_id=current_user['id'])
+    updated = await project_stage_repo.update(stage_id, update_data, user_id=current_user['id'])
+    notify_project_changed(stage['projectId'])
+    return updated
 
 
 @router.delete("/{stage_id}", status_code=status.HTTP_200_OK)
 async def delete_stage(
     stage_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Delete a project stage.
@@ -229,6 +234,7 @@ async def delete_stage(
         )
 
     success = await project_stage_repo.delete(stage_id)
+    notify_project_changed(stage['projectId'])
     return {"success": success, "message": "Stage deleted successfully"}
 
 
@@ -237,7 +243,7 @@ async def reorder_stages(
     project_id: str = Query(..., alias="projectId"),
     request: ReorderStagesRequest = Body(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Reorder stages within a project.
@@ -251,7 +257,9 @@ async def reorder_stages(
             detail="Clients cannot reorder stages"
         )
 
-    return await project_stage_repo.reorder(project_id, request.stage_ids)
+    stages = await project_stage_repo.reorder(project_id, request.stage_ids)
+    notify_project_changed(project_id)
+    return stages
 
 
 @router.post("/shift-dates", response_model=List[Dict[str, Any]])
@@ -259,7 +267,7 @@ async def shift_stage_dates(
     project_id: str = Query(..., alias="projectId"),
     request: ShiftDatesRequest = Body(...),
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Shift dates of all stages after a given position by a number of days.
@@ -274,21 +282,25 @@ async def shift_stage_dates(
             detail="Clients cannot modify stages"
         )
 
-    return await project_stage_repo.shift_dates(
+    stages = await project_stage_repo.shift_dates(
         project_id, request.after_order_index, request.delta_days
     )
+    notify_project_changed(project_id)
+    return stages
 
 
 @router.post("/apply-template", response_model=List[Dict[str, Any]])
 async def apply_template(
     request: ApplyTemplateRequest,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_transactional_unit_of_work)
 ):
     """
     Apply a template to create stages for a project.
     Only PMs/admins can apply templates.
     Overwrites existing stages if any.
+    The stage count check, the stage inserts and the suggested materials run
+    in one transaction, so a failure part way leaves the project unchanged.
     """
     await verify_project_access(request.project_id, current_user, pool)
 
@@ -314,19 +326,21 @@ async def apply_template(
             detail=f"Project already has {existing_count} stages. Delete existing stages first or add stages manually."
         )
 
-    return await project_stage_repo.apply_template(
+    stages = await project_stage_repo.apply_template(
         request.project_id,
         request.template_id,
         current_user['id'],
         request.start_date
     )
+    notify_project_changed(request.project_id)
+    return stages
 
 
 @router.get("/count/{project_id}", response_model=Dict[str, int])
 async def get_stages_count(
     project_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user_dependency),
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pool: UnitOfWork = Depends(get_unit_of_work)
 ):
     """
     Get count of stages for a project.
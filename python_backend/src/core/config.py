@@ -66,7 +66,50 @@ class Settings(BaseSettings):
     agent_confirmation_timeout_minutes: int = int(
         os.getenv("AGENT_CONFIRMATION_TIMEOUT_MINUTES", "30")
     )
+    # Conversation history sent to the LLM: token budget for recent turns,
+    # budget for the rolling summary of older turns, and rows scanned per turn
+    agent_context_token_budget: int = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "6000"))
+    agent_context_summary_tokens: int = int(os.getenv("AGENT_CONTEXT_SUMMARY_TOKENS", "800"))
+    agent_context_max_messages: int = int(os.getenv("AGENT_CONTEXT_MAX_MESSAGES", "60"))
+    # Seconds an assembled agent system prompt is reused before re-querying
+    agent_prompt_cache_ttl_seconds: int = int(os.getenv("AGENT_PROMPT_CACHE_TTL_SECONDS", "300"))
+    # Seconds a read-only tool result is reused for identical calls (0 disables)
+    agent_tool_cache_ttl_seconds: int = int(os.getenv("AGENT_TOOL_CACHE_TTL_SECONDS", "60"))
+    # Local intent classifier used for model routing: minimum confidence to
+    # trust a prediction, and how often it retrains from logged conversations
+    agent_intent_min_confidence: float = float(os.getenv("AGENT_INTENT_MIN_CONFIDENCE", "0.55"))
+    agent_intent_retrain_seconds: int = int(os.getenv("AGENT_INTENT_RETRAIN_SECONDS", "3600"))
+    # Estimated USD per 1K tokens, used for the cost metric of each routed turn
+    agent_cost_per_1k_tokens_standard: float = float(os.getenv("AGENT_COST_PER_1K_TOKENS_STANDARD", "0.0005"))
+    agent_cost_per_1k_tokens_complex: float = float(os.getenv("AGENT_COST_PER_1K_TOKENS_COMPLEX", "0.006"))
+    # Answer high-confidence lookup templates directly, without the LLM loop
+    agent_fast_path_enabled: bool = os.getenv("AGENT_FAST_PATH_ENABLED", "true").lower() == "true"
+    # Agent SSE streams: token chunks are coalesced for up to coalesce_ms or
+    # coalesce_chars, idle streams get a keep-alive comment every heartbeat
+    # seconds, and each stream keeps replay_events events so a dropped client
+    # can resume with Last-Event-ID within resume_grace seconds
+    agent_sse_coalesce_ms: int = int(os.getenv("AGENT_SSE_COALESCE_MS", "50"))
+    agent_sse_coalesce_chars: int = int(os.getenv("AGENT_SSE_COALESCE_CHARS", "256"))
+    agent_sse_heartbeat_seconds: int = int(os.getenv("AGENT_SSE_HEARTBEAT_SECONDS", "15"))
+    agent_sse_replay_events: int = int(os.getenv("AGENT_SSE_REPLAY_EVENTS", "500"))
+    agent_sse_resume_grace_seconds: int = int(os.getenv("AGENT_SSE_RESUME_GRACE_SECONDS", "30"))
+    # Background job runner (agent.scheduled_jobs): poll interval, lease length,
+    # failures before a job gives up, and the first retry delay (doubles each time)
+    agent_jobs_enabled: bool = os.getenv("AGENT_JOBS_ENABLED", "true").lower() == "true"
+    agent_jobs_poll_seconds: int = int(os.getenv("AGENT_JOBS_POLL_SECONDS", "5"))
+    agent_jobs_lease_seconds: int = int(os.getenv("AGENT_JOBS_LEASE_SECONDS", "300"))
+    agent_jobs_max_attempts: int = int(os.getenv("AGENT_JOBS_MAX_ATTEMPTS", "5"))
+    agent_jobs_backoff_seconds: int = int(os.getenv("AGENT_JOBS_BACKOFF_SECONDS", "30"))
     
+    # Analytics heartbeats: days of raw heartbeat partitions to keep, and
+    # whether to store raw rows at all (active-minute bitmaps on
+    # analytics_daily_stats are always kept)
+    analytics_heartbeat_retention_days: int = int(os.getenv("ANALYTICS_HEARTBEAT_RETENTION_DAYS", "30"))
+    analytics_store_raw_heartbeats: bool = os.getenv("ANALYTICS_STORE_RAW_HEARTBEATS", "true").lower() == "true"
+
+    # Cascading deletes (projects, companies, users): rows per DELETE/UPDATE batch
+    cascade_delete_batch_size: int = int(os.getenv("CASCADE_DELETE_BATCH_SIZE", "500"))
+
     # Email (Resend) - for client onboarding emails
     resend_api_key: str = os.getenv("RESEND_API_KEY", "")
     resend_sender_domain: str = os.getenv("RESEND_SENDER_DOMAIN", "mail.proesphere.com")
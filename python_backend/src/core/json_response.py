@@ -0,0 +1,106 @@
+"""
+Fast JSON encoding for API responses and SSE streams.
+
+Uses orjson when installed and falls back to the stdlib json module
+otherwise. Output matches Starlette's JSONResponse byte for byte for the
+payloads handlers produce (compact separators, UTF-8, no ASCII escaping),
+so existing clients see no difference.
+
+Types handled natively: UUID, datetime/date/time, Decimal and asyncpg
+Record, plus anything orjson supports out of the box.
+"""
+import json
+import logging
+from decimal import Decimal
+from typing import Any, Callable
+from uuid import UUID
+
+import asyncpg
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _encode_decimal(value: Decimal) -> Any:
+    """Encode Decimal the same way FastAPI's jsonable_encoder does."""
+    if value.as_tuple().exponent >= 0:
+        return int(value)
+    return float(value)
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for types the serializer doesn't know about."""
+    if isinstance(obj, Decimal):
+        return _encode_decimal(obj)
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _default_str(obj: Any) -> Any:
+    """Stringify unknown types, mirroring json.dumps(default=str)."""
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+    return str(obj)
+
+
+if orjson is not None:
+    def _dumps(content: Any, default: Callable[[Any], Any], option: int = 0) -> bytes:
+        try:
+            return orjson.dumps(content, default=default, option=orjson.OPT_NON_STR_KEYS | option)
+        except TypeError:
+            # Integers outside 64-bit range and similar edge cases
+            return _stdlib_dumps(content, default)
+
+    # Route datetimes through default=str so SSE payloads keep the
+    # "YYYY-MM-DD HH:MM:SS" form clients already receive
+    _LENIENT_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+else:
+    def _dumps(content: Any, default: Callable[[Any], Any], option: int = 0) -> bytes:
+        return _stdlib_dumps(content, default)
+
+    _LENIENT_OPTIONS = 0
+
+
+def _stdlib_dumps(content: Any, default: Callable[[Any], Any]) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=default,
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes."""
+    return _dumps(content, _default)
+
+
+def dumps_lenient(content: Any) -> str:
+    """Serialize content to a compact JSON string, stringifying unknown types.
+
+    Parses to the same value as json.dumps(content, default=str); only the
+    whitespace differs. Used where a best-effort payload beats an error
+    (SSE events).
+    """
+    return _dumps(content, _default_str, _LENIENT_OPTIONS).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
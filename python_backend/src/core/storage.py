@@ -4,11 +4,19 @@ Multi-environment storage utility for GCP bucket operations.
 Environment routing:
 - Development: Uses GCP SDK directly with service account → dev bucket (photos_bucket_proespheredev)
 - Production (Replit): Uses Replit sidecar proxy → prod bucket (replit-objstore-...)
+
+Signed URLs are cached per (bucket, object, method) and reused until shortly
+before they expire, so galleries that render hundreds of thumbnails don't
+trigger one signing round trip per image.
 """
 import os
+import asyncio
 import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
 import httpx
 
 from .config import settings
@@ -21,6 +29,128 @@ REPLIT_SIDECAR_ENDPOINT = "http://127.0.0.1:1106"
 # Cache for GCP client
 _gcp_storage_client = None
 
+# Shared HTTP client for sidecar calls (created lazily, reused across requests)
+_sidecar_client: Optional[httpx.AsyncClient] = None
+
+# Maximum concurrent signing calls issued by generate_signed_urls
+BATCH_SIGNING_CONCURRENCY = 16
+
+# GCP SDK signing is synchronous (and the first call builds the client), so it
+# runs on a small dedicated pool instead of blocking the event loop
+_signing_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gcs-sign")
+
+SignedUrlKey = Tuple[str, str, str]
+# A cache entry: (bucket, object, method) plus the requested expiry in minutes
+_EntryKey = Tuple[SignedUrlKey, int]
+
+
+class SignedUrlCache:
+    """In-memory cache of signed URLs keyed by (bucket, object, method) and expiry.
+
+    URLs signed for different expiries are cached separately, so a caller
+    never gets a URL that outlives the expiry it asked for. A cached URL is
+    reused while its remaining lifetime is at least
+    ``reuse_fraction`` of the requested lifetime and never less than
+    ``safety_margin_seconds``. Concurrent misses for the same key share one
+    signing call (single-flight). Failed signings (None) are not cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        safety_margin_seconds: float = 300,
+        reuse_fraction: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.safety_margin_seconds = safety_margin_seconds
+        self.reuse_fraction = reuse_fraction
+        self._clock = clock
+        self._entries: "OrderedDict[_EntryKey, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[_EntryKey, "asyncio.Task[Optional[str]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def _lookup(self, key: _EntryKey, lifetime_seconds: float) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        url, expires_at = entry
+        min_remaining = max(self.safety_margin_seconds, lifetime_seconds * self.reuse_fraction)
+        if expires_at - self._clock() < min_remaining:
+            return None
+        self._entries.move_to_end(key)
+        return url
+
+    def _store(self, key: _EntryKey, url: str, expires_at: float) -> None:
+        existing = self._entries.get(key)
+        if existing is not None and existing[1] >= expires_at:
+            return
+        self._entries[key] = (url, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_sign(
+        self,
+        key: SignedUrlKey,
+        expires_minutes: int,
+        sign: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """Return a cached URL for key, or sign a new one exactly once."""
+        lifetime_seconds = expires_minutes * 60
+        entry_key = (key, expires_minutes)
+        url = self._lookup(entry_key, lifetime_seconds)
+        if url is not None:
+            self.hits += 1
+            return url
+
+        task = self._inflight.get(entry_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            issued_at = self._clock()
+
+            async def _sign_and_store() -> Optional[str]:
+                try:
+                    signed = await sign()
+                except Exception:
+                    self.errors += 1
+                    raise
+                finally:
+                    self._inflight.pop(entry_key, None)
+                if signed:
+                    self._store(entry_key, signed, issued_at + lifetime_seconds)
+                return signed
+
+            task = asyncio.ensure_future(_sign_and_store())
+            self._inflight[entry_key] = task
+
+        # Shield so a cancelled caller doesn't abort signing for the others
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit-rate metrics for monitoring."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Global signed URL cache instance
+signed_url_cache = SignedUrlCache()
+
 
 def is_replit_environment() -> bool:
     """Check if running in Replit environment (has sidecar available)."""
@@ -84,6 +214,22 @@ def get_clean_private_dir(bucket_id: str, private_dir: str) -> str:
     return clean_dir.lstrip('/')
 
 
+def _get_sidecar_client() -> httpx.AsyncClient:
+    """Get or create the shared sidecar HTTP client (keeps connections alive)."""
+    global _sidecar_client
+    if _sidecar_client is None or _sidecar_client.is_closed:
+        _sidecar_client = httpx.AsyncClient(timeout=30.0)
+    return _sidecar_client
+
+
+async def close_storage_clients():
+    """Close the shared sidecar client (called on shutdown)."""
+    global _sidecar_client
+    if _sidecar_client is not None:
+        await _sidecar_client.aclose()
+        _sidecar_client = None
+
+
 async def _generate_signed_url_sidecar(
     bucket_name: str,
     object_name: str,
@@ -100,19 +246,18 @@ async def _generate_signed_url_sidecar(
             "expires_at": expires_at
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{REPLIT_SIDECAR_ENDPOINT}/object-storage/signed-object-url",
-                headers={"Content-Type": "application/json"},
-                json=request_data
-            )
+        response = await _get_sidecar_client().post(
+            f"{REPLIT_SIDECAR_ENDPOINT}/object-storage/signed-object-url",
+            headers={"Content-Type": "application/json"},
+            json=request_data
+        )
 
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("signed_url")
-            else:
-                logger.error(f"Sidecar error: {response.status_code} - {response.text}")
-                return None
+        if response.status_code == 200:
+            result = response.json()
+            return result.get("signed_url")
+        else:
+            logger.error(f"Sidecar error: {response.status_code} - {response.text}")
+            return None
 
     except Exception as e:
         logger.error(f"Error calling sidecar: {e}")
@@ -144,27 +289,85 @@ def _generate_signed_url_gcp(
         return None
 
 
+async def _sign_url(
+    bucket_name: str,
+    object_name: str,
+    method: str,
+    expires_minutes: int
+) -> Optional[str]:
+    """Sign a URL without consulting the cache."""
+    if use_gcp_direct():
+        logger.debug(f"[DEV] Using GCP SDK directly -> {bucket_name}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _signing_executor,
+            _generate_signed_url_gcp,
+            bucket_name, object_name, method, expires_minutes,
+        )
+    else:
+        logger.debug(f"[PROD] Using Replit sidecar -> {bucket_name}")
+        return await _generate_signed_url_sidecar(bucket_name, object_name, method, expires_minutes)
+
+
 async def generate_signed_url(
     bucket_name: str,
     object_name: str,
     method: str = "GET",
-    expires_minutes: int = 60
+    expires_minutes: int = 60,
+    use_cache: bool = True
 ) -> Optional[str]:
     """
     Generate a signed URL for GCS object access.
 
     Routing:
-    - Development (local): GCP SDK → dev bucket
+    - Development (local): GCP SDK (in a worker thread) → dev bucket
     - Production (Replit): Sidecar → prod bucket
+
+    URLs are served from signed_url_cache when a still-fresh one exists.
     """
     logger.debug(f"Generating signed URL: bucket={bucket_name}, object={object_name}, method={method}")
 
-    if use_gcp_direct():
-        logger.debug(f"[DEV] Using GCP SDK directly -> {bucket_name}")
-        return _generate_signed_url_gcp(bucket_name, object_name, method, expires_minutes)
-    else:
-        logger.debug(f"[PROD] Using Replit sidecar -> {bucket_name}")
-        return await _generate_signed_url_sidecar(bucket_name, object_name, method, expires_minutes)
+    if not use_cache:
+        return await _sign_url(bucket_name, object_name, method, expires_minutes)
+
+    return await signed_url_cache.get_or_sign(
+        (bucket_name, object_name, method.upper()),
+        expires_minutes,
+        lambda: _sign_url(bucket_name, object_name, method, expires_minutes),
+    )
+
+
+async def generate_signed_urls(
+    bucket_name: str,
+    object_names: Iterable[str],
+    method: str = "GET",
+    expires_minutes: int = 60
+) -> Dict[str, Optional[str]]:
+    """
+    Generate signed URLs for many objects concurrently.
+
+    Returns a mapping of object name to URL (None where signing failed).
+    Cached URLs are returned immediately; misses are signed with at most
+    BATCH_SIGNING_CONCURRENCY calls in flight.
+    """
+    unique_names = list(dict.fromkeys(name for name in object_names if name))
+    semaphore = asyncio.Semaphore(BATCH_SIGNING_CONCURRENCY)
+
+    async def _sign_one(object_name: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await generate_signed_url(bucket_name, object_name, method, expires_minutes)
+            except Exception as e:
+                logger.warning(f"Failed to sign URL for {object_name}: {e}")
+                return None
+
+    urls = await asyncio.gather(*[_sign_one(name) for name in unique_names])
+    return dict(zip(unique_names, urls))
+
+
+def get_signed_url_cache_stats() -> dict:
+    """Get signed URL cache hit-rate metrics."""
+    return signed_url_cache.stats()
 
 
 def get_storage_config() -> dict:
@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any, Tuple
 from .connection import db_manager, get_db_pool
 from ..models.user import User
-from ..utils.data_conversion import to_camel_case, to_snake_case
+from ..utils.data_conversion import to_camel_case, to_snake_case, convert_rows
 
 # Module-level caches for information_schema introspection results.
 # The database schema is stable at runtime, so these are populated once
@@ -238,7 +238,7 @@ class AuthRepository:
                 ORDER BY u.first_name, u.last_name
             """
         
-        rows = await db_manager.execute_query(query)
+        rows = await db_manager.read_query(query)
 
         users = []
         for i, row in enumerate(rows):
@@ -344,7 +344,7 @@ class AuthRepository:
                 ORDER BY u.first_name, u.last_name
             """
         
-        rows = await db_manager.execute_query(query, company_id)
+        rows = await db_manager.read_query(query, company_id)
 
         users = []
         for i, row in enumerate(rows):
@@ -653,125 +653,32 @@ class AuthRepository:
             return False
     
     async def force_delete_user(self, user_id: str) -> bool:
-        """Force-delete a user by cleaning up all FK references first.
+        """Force-delete a user by cleaning up all references to it first.
 
-        Root admin only. Uses safe_delete to skip tables that may not exist.
-        Error codes caught: 42P01 = undefined_table, 42703 = undefined_column.
+        Root admin only. Deletes/nullifies in FK graph order (see
+        cascade_delete.py), then deactivates the user's subcontractor
+        company if no other user references it.
         """
+        from src.core.config import settings
+        from .cascade_delete import get_delete_graph, purge
+
+        graph = await get_delete_graph()
         pool = await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
-                async def safe_delete(query: str, *args):
-                    try:
-                        await conn.execute(query, *args)
-                    except Exception as e:
-                        code = getattr(e, 'sqlstate', None) or getattr(e, 'code', None)
-                        if code in ('42P01', '42703', '42P07'):
-                            pass  # table or column doesn't exist — skip
-                        else:
-                            raise
-
-                # --- public schema ---
-                await safe_delete("UPDATE tasks SET assignee_id = NULL WHERE assignee_id = $1", user_id)
-                await safe_delete("DELETE FROM beta_invitations WHERE invited_by = $1", user_id)
-                await safe_delete("DELETE FROM change_orders WHERE approved_by = $1", user_id)
-                await safe_delete("DELETE FROM change_orders WHERE requested_by = $1", user_id)
-                await safe_delete("DELETE FROM communications WHERE from_user_id = $1 OR to_user_id = $1", user_id)
-                await safe_delete("DELETE FROM company_users WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM photos WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM project_logs WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM notifications WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM schedule_changes WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM time_entries WHERE user_id = $1", user_id)
-                await safe_delete("UPDATE time_entries SET approved_by = NULL WHERE approved_by = $1", user_id)
-                await safe_delete("DELETE FROM user_activities WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM user_effective_permissions WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM project_assignments WHERE user_id = $1", user_id)
-                await safe_delete("UPDATE project_assignments SET granted_by_user_id = NULL WHERE granted_by_user_id = $1", user_id)
-                await safe_delete("DELETE FROM risk_assessments WHERE assigned_to = $1 OR identified_by = $1", user_id)
-
-                # --- sub module tables ---
-                await safe_delete("DELETE FROM sub_task_documents WHERE uploaded_by = $1", user_id)
-                await safe_delete("UPDATE sub_checklist_items SET completed_by = NULL WHERE completed_by = $1", user_id)
-                await safe_delete("DELETE FROM sub_task_reviews WHERE reviewer_id = $1", user_id)
-                await safe_delete("UPDATE sub_tasks SET assigned_user_id = NULL WHERE assigned_user_id = $1", user_id)
-                await safe_delete("DELETE FROM sub_tasks WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM sub_checklist_templates WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM subcontractor_assignments WHERE assigned_by = $1 OR subcontractor_id = $1", user_id)
-
-                # --- client_portal schema ---
-                await safe_delete("DELETE FROM client_portal.issue_audit_log WHERE actor_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.issue_attachments WHERE uploaded_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.issue_comments WHERE author_id = $1", user_id)
-                await safe_delete("UPDATE client_portal.issues SET assigned_to = NULL WHERE assigned_to = $1", user_id)
-                await safe_delete("UPDATE client_portal.issues SET resolved_by = NULL WHERE resolved_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.issues WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.forum_attachments WHERE uploaded_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.forum_messages WHERE author_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.forum_threads WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.material_documents WHERE uploaded_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.material_items WHERE added_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.material_areas WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.materials WHERE added_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.installment_files WHERE uploaded_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.notification_settings WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.notifications WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.pm_notification_prefs WHERE recipient_user_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.pm_notifications WHERE recipient_user_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.payment_documents WHERE uploaded_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.payment_events WHERE actor_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.payment_receipts WHERE uploaded_by = $1", user_id)
-                await safe_delete("UPDATE client_portal.payment_installments SET created_by = NULL WHERE created_by = $1", user_id)
-                await safe_delete("UPDATE client_portal.payment_installments SET updated_by = NULL WHERE updated_by = $1", user_id)
-                await safe_delete("UPDATE client_portal.payment_schedules SET created_by = NULL WHERE created_by = $1", user_id)
-                await safe_delete("UPDATE client_portal.payment_schedules SET updated_by = NULL WHERE updated_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.invoices WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.project_stages WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.client_invitations WHERE invited_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.client_invitations WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.sub_invitations WHERE invited_by = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.sub_invitations WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM client_portal.magic_link_tokens WHERE user_id = $1", user_id)
-
-                # --- agent schema ---
-                await safe_delete("DELETE FROM agent.pending_confirmations WHERE user_id = $1", user_id)
-                await safe_delete("UPDATE agent.tool_calls SET confirmed_by = NULL WHERE confirmed_by = $1", user_id)
-                await safe_delete("DELETE FROM agent.tool_calls WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM agent.feedback WHERE user_id = $1", user_id)
-                await safe_delete("UPDATE agent.metrics SET user_id = NULL WHERE user_id = $1", user_id)
-                await safe_delete("DELETE FROM agent.conversations WHERE user_id = $1", user_id)
-
-                # --- legacy public tables ---
-                await safe_delete("DELETE FROM client_forum_messages WHERE author_id = $1", user_id)
-                await safe_delete("DELETE FROM client_issues WHERE created_by = $1", user_id)
-                await safe_delete("DELETE FROM client_materials WHERE added_by = $1", user_id)
-
-                # --- sessions (sid/sess/expire format — no direct FK) ---
-                await safe_delete("DELETE FROM sessions WHERE sess::jsonb->>'userId' = $1", str(user_id))
-                await safe_delete("DELETE FROM sessions WHERE sess::jsonb->>'id' = $1", str(user_id))
-
-                # Capture subcontractor_id before deletion
-                sub_row = await conn.fetchrow(
-                    "SELECT subcontractor_id FROM users WHERE id = $1", user_id
+                return await purge(
+                    conn, graph, "public.users", user_id,
+                    batch_size=settings.cascade_delete_batch_size,
                 )
-                sub_company_id = sub_row["subcontractor_id"] if sub_row and sub_row["subcontractor_id"] else None
 
-                # Finally delete the user
-                result = await conn.execute("DELETE FROM users WHERE id = $1", user_id)
-                deleted = "DELETE 1" in result
+    async def schedule_user_deletion(self, user_id: str, requested_by: Optional[str] = None) -> Optional[str]:
+        """Deactivate the user now and purge it in the background.
 
-                # Deactivate orphaned subcontractor company if no other users reference it
-                if deleted and sub_company_id:
-                    remaining = await conn.fetchval(
-                        "SELECT COUNT(*) FROM users WHERE subcontractor_id = $1", sub_company_id
-                    )
-                    if remaining == 0:
-                        await conn.execute(
-                            "UPDATE subcontractors SET status = 'inactive', updated_at = NOW() WHERE id = $1",
-                            sub_company_id,
-                        )
+        Returns the cascade deletion id, or None if the user does not exist.
+        """
+        from .cascade_delete import request_deletion
 
-                return deleted
+        return await request_deletion("public.users", user_id, requested_by)
 
     async def assign_task(self, task_id: str, assignee_id: Optional[str]) -> Optional[Dict[str, Any]]:
         """Assign a task to a user."""
@@ -801,8 +708,8 @@ class CompanyRepository:
     async def get_companies(self) -> List[Dict[str, Any]]:
         """Get all companies."""
         query = f"SELECT * FROM {self.table_name} ORDER BY name"
-        rows = await db_manager.execute_query(query)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        rows = await db_manager.read_query(query)
+        return convert_rows(rows)
     
     async def get_company(self, company_id: str) -> Optional[Dict[str, Any]]:
         """Get company by ID."""
@@ -868,164 +775,31 @@ class CompanyRepository:
         return None
     
     async def delete_company(self, company_id: str) -> bool:
-        """Delete a company and all related records in proper FK dependency order.
+        """Delete a company and all related records in one transaction.
 
-        Uses safe_delete for every table since migrations may not have run and
-        tables/columns may not exist.  Error codes caught:
-          42P01 = undefined_table, 42703 = undefined_column, 42P07 = duplicate_table
+        Projects, users and everything referencing them are deleted (or
+        their references cleared) in FK graph order, see cascade_delete.py.
         """
+        from src.core.config import settings
+        from .cascade_delete import get_delete_graph, purge
+
+        graph = await get_delete_graph()
         pool = await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
-                async def safe_delete(query: str, *args):
-                    try:
-                        await conn.execute(query, *args)
-                    except Exception as e:
-                        code = getattr(e, 'sqlstate', None) or getattr(e, 'code', None)
-                        if code in ('42P01', '42703', '42P07'):
-                            pass  # table or column doesn't exist — skip
-                        else:
-                            raise
-
-                # Collect IDs for subquery-based deletes
-                project_ids = [r['id'] for r in await conn.fetch(
-                    "SELECT id FROM projects WHERE company_id = $1", company_id
-                )]
-                user_ids = [r['id'] for r in await conn.fetch(
-                    "SELECT id FROM users WHERE company_id = $1", company_id
-                )]
-
-                if project_ids:
-                    # --- client_portal: deepest leaf tables first ---
-                    # Issues (comments/attachments CASCADE from issues)
-                    await safe_delete(
-                        "DELETE FROM client_portal.issue_comments WHERE issue_id IN "
-                        "(SELECT id FROM client_portal.issues WHERE project_id = ANY($1))", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.issue_attachments WHERE issue_id IN "
-                        "(SELECT id FROM client_portal.issues WHERE project_id = ANY($1))", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.issue_audit_log WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.issues WHERE project_id = ANY($1)", project_ids)
-
-                    # Forum (messages/attachments CASCADE from threads)
-                    await safe_delete(
-                        "DELETE FROM client_portal.forum_attachments WHERE message_id IN "
-                        "(SELECT id FROM client_portal.forum_messages WHERE thread_id IN "
-                        "(SELECT id FROM client_portal.forum_threads WHERE project_id = ANY($1)))", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.forum_messages WHERE thread_id IN "
-                        "(SELECT id FROM client_portal.forum_threads WHERE project_id = ANY($1))", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.forum_threads WHERE project_id = ANY($1)", project_ids)
-
-                    # Materials (items CASCADE from areas)
-                    await safe_delete(
-                        "DELETE FROM client_portal.material_items WHERE area_id IN "
-                        "(SELECT id FROM client_portal.material_areas WHERE project_id = ANY($1))", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.material_areas WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.materials WHERE project_id = ANY($1)", project_ids)
-
-                    # Payments — RESTRICT FKs require correct leaf-first order
-                    await safe_delete(
-                        "DELETE FROM client_portal.payment_events WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.payment_receipts WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.invoices WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.payment_documents WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.payment_installments WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.payment_schedules WHERE project_id = ANY($1)", project_ids)
-
-                    # Legacy installments (files CASCADE from installments)
-                    await safe_delete(
-                        "DELETE FROM client_portal.installment_files WHERE installment_id IN "
-                        "(SELECT id FROM client_portal.installments WHERE project_id = ANY($1))", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.installments WHERE project_id = ANY($1)", project_ids)
-
-                    # Stages
-                    await safe_delete(
-                        "DELETE FROM client_portal.project_stages WHERE project_id = ANY($1)", project_ids)
-
-                    # Notifications (project-scoped)
-                    await safe_delete(
-                        "DELETE FROM client_portal.notification_settings WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.notifications WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.pm_notifications WHERE project_id = ANY($1)", project_ids)
-
-                    # Client invitations (project-scoped)
-                    await safe_delete(
-                        "DELETE FROM client_portal.client_invitations WHERE project_id = ANY($1)", project_ids)
-
-                    # --- Public schema: project-scoped tables with NO ACTION FKs ---
-                    await safe_delete("DELETE FROM schedule_changes WHERE task_id IN (SELECT id FROM tasks WHERE project_id = ANY($1))", project_ids)
-                    await safe_delete("DELETE FROM time_entries WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM change_orders WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM communications WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM subcontractor_assignments WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM invoices WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM photos WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM project_logs WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM project_health_metrics WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM risk_assessments WHERE project_id = ANY($1)", project_ids)
-                    # Legacy client_* tables
-                    await safe_delete("DELETE FROM client_notification_settings WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM client_issues WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM client_materials WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM client_forum_messages WHERE project_id = ANY($1)", project_ids)
-                    await safe_delete("DELETE FROM client_installments WHERE project_id = ANY($1)", project_ids)
-
-                if user_ids:
-                    # User-scoped client_portal tables
-                    await safe_delete(
-                        "DELETE FROM client_portal.magic_link_tokens WHERE user_id = ANY($1)", user_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.client_invitations WHERE user_id = ANY($1)", user_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.pm_notifications WHERE recipient_user_id = ANY($1)", user_ids)
-                    await safe_delete(
-                        "DELETE FROM client_portal.pm_notification_prefs WHERE recipient_user_id = ANY($1)", user_ids)
-                    # Public user-scoped tables with NO ACTION FKs
-                    await safe_delete("DELETE FROM notifications WHERE user_id = ANY($1)", user_ids)
-
-                # --- Agent schema (CASCADE from conversations handles messages/tool_calls/etc.) ---
-                await safe_delete("DELETE FROM agent.feedback WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM agent.metrics WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM agent.scheduled_jobs WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM agent.conversations WHERE company_id = $1", company_id)
-
-                # --- RBAC tables (most have CASCADE from companies) ---
-                await safe_delete("DELETE FROM project_assignments WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM user_effective_permissions WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM company_users WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM role_permissions WHERE company_id = $1", company_id)
-
-                # --- Public schema: company-scoped ---
-                await safe_delete("DELETE FROM audit_logs WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM user_activities WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM tasks WHERE company_id = $1", company_id)
-                await safe_delete("DELETE FROM projects WHERE company_id = $1", company_id)
-
-                # Sessions (no user_id column — sid/sess/expire only) then users
-                if user_ids:
-                    # Sessions store user data in JSONB 'sess'; delete by matching userId
-                    for uid in user_ids:
-                        await safe_delete("DELETE FROM sessions WHERE sess::jsonb->>'userId' = $1", str(uid))
-                        await safe_delete("DELETE FROM sessions WHERE sess::jsonb->>'id' = $1", str(uid))
-                await safe_delete("DELETE FROM users WHERE company_id = $1", company_id)
-
-                # Finally delete the company
-                result = await conn.execute(f"DELETE FROM {self.table_name} WHERE id = $1", company_id)
-                return "DELETE 1" in result
+                return await purge(
+                    conn, graph, "public.companies", company_id,
+                    batch_size=settings.cascade_delete_batch_size,
+                )
+
+    async def schedule_company_deletion(self, company_id: str, requested_by: Optional[str] = None) -> Optional[str]:
+        """Deactivate the company (and its users) now and purge it in the background.
+
+        Returns the cascade deletion id, or None if the company does not exist.
+        """
+        from .cascade_delete import request_deletion
+
+        return await request_deletion("public.companies", company_id, requested_by)
 
 
 class RoleRepository:
@@ -1586,7 +1360,7 @@ class RoleRepository:
                 FROM permissions
                 ORDER BY category, resource, action
             """
-            rows = await db_manager.execute_query(query)
+            rows = await db_manager.read_query(query)
             return [self._convert_to_camel_case(dict(row)) for row in rows]
         except Exception as e:
             print(f"Error getting permissions: {e}")
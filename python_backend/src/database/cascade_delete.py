@@ -0,0 +1,823 @@
+"""
+Set-based cascading deletes for projects, companies and users.
+
+The delete graph is built once per process from the database's foreign keys
+(pg_constraint) plus the references declared below, which cover columns
+that hold ids without a real constraint (legacy tables, tables created
+outside these init scripts). From a root table the planner derives:
+
+- nullify steps: references that keep the row and clear the column
+  (ON DELETE SET NULL, the NULLIFY overrides, nullable NO ACTION/RESTRICT
+  keys found only in pg_constraint, and nullable keys that close a cycle);
+- delete steps: every other reference, ordered leaf-first so no row is
+  deleted while something still points at it. ON DELETE CASCADE tables are
+  deleted explicitly too, which keeps every statement bounded by the batch;
+- blockers: NOT NULL NO ACTION/RESTRICT keys found only in pg_constraint
+  (audit_logs.user_id, for one). The schema declares those rows must not go
+  away with their parent, so the planner never deletes them: if any exist
+  the delete stops with CascadeBlockedError before touching anything. A
+  declared reference below is the explicit override for such a table.
+
+A step selects the rows it touches by joining back to the root along its
+reference path (no nested IN subqueries), and runs in keyed batches:
+DELETE/UPDATE ... WHERE pk = ANY(ARRAY(SELECT ... LIMIT n)) until a batch
+comes back short. Tables missing from the database are simply absent from
+the graph, so no statement has to tolerate undefined_table errors.
+
+Deletes can run synchronously in the caller's transaction, or be scheduled:
+the root is tombstoned (deactivated) right away, a cascade_deletions row
+tracks progress, and the cascade_purge background job purges in batches
+that each commit on their own.
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DELETE = "delete"
+NULLIFY = "nullify"
+BLOCK = "block"
+
+SCHEMAS = ("public", "client_portal", "agent")
+
+# Reference paths longer than this are not followed
+MAX_DEPTH = 6
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class CascadeBlockedError(ValueError):
+    """Rows behind a RESTRICT/NO ACTION foreign key still reference the root."""
+
+    def __init__(self, root: str, root_id: str, blockers: List[str]):
+        self.root = root
+        self.root_id = root_id
+        self.blockers = blockers
+        super().__init__(
+            f"Cannot delete {root} {root_id}: still referenced by {', '.join(blockers)}"
+        )
+
+
+@dataclass(frozen=True)
+class Reference:
+    """table.column holds ref_table.ref_column values."""
+    table: str
+    column: str
+    ref_table: str
+    ref_column: str = "id"
+    action: str = DELETE
+
+
+def _refs(ref_table: str, pairs: Iterable[Tuple[str, str]], action: str = DELETE) -> List[Reference]:
+    return [Reference(table, column, ref_table, "id", action) for table, column in pairs]
+
+
+# ==================== Declared references ====================
+#
+# Everything the hand-written cascades used to touch, so a database whose
+# tables were created without constraints is still cleaned up the same way.
+# A declared reference overrides the action derived from its foreign key.
+
+_PROJECT_REFERENCES = _refs("public.projects", [
+    ("client_portal.payment_events", "project_id"),
+    ("client_portal.payment_receipts", "project_id"),
+    ("client_portal.invoices", "project_id"),
+    ("client_portal.payment_documents", "project_id"),
+    ("client_portal.payment_installments", "project_id"),
+    ("client_portal.payment_schedules", "project_id"),
+    ("client_portal.issue_audit_log", "project_id"),
+    ("client_portal.issues", "project_id"),
+    ("client_portal.forum_threads", "project_id"),
+    ("client_portal.material_items", "project_id"),
+    ("client_portal.material_areas", "project_id"),
+    ("client_portal.materials", "project_id"),
+    ("client_portal.project_stages", "project_id"),
+    ("client_portal.installments", "project_id"),
+    ("client_portal.notification_settings", "project_id"),
+    ("client_portal.notifications", "project_id"),
+    ("client_portal.pm_notifications", "project_id"),
+    ("client_portal.client_invitations", "project_id"),
+    ("public.time_entries", "project_id"),
+    ("public.change_orders", "project_id"),
+    ("public.communications", "project_id"),
+    ("public.subcontractor_assignments", "project_id"),
+    ("public.project_assignments", "project_id"),
+    ("public.invoices", "project_id"),
+    ("public.tasks", "project_id"),
+    ("public.photos", "project_id"),
+    ("public.project_logs", "project_id"),
+    ("public.project_health_metrics", "project_id"),
+    ("public.risk_assessments", "project_id"),
+    ("public.client_notification_settings", "project_id"),
+    ("public.client_issues", "project_id"),
+    ("public.client_materials", "project_id"),
+    ("public.client_forum_messages", "project_id"),
+    ("public.client_installments", "project_id"),
+])
+
+_CHILD_REFERENCES = [
+    Reference("public.schedule_changes", "task_id", "public.tasks"),
+    Reference("client_portal.issue_comments", "issue_id", "client_portal.issues"),
+    Reference("client_portal.issue_attachments", "issue_id", "client_portal.issues"),
+    Reference("client_portal.forum_messages", "thread_id", "client_portal.forum_threads"),
+    Reference("client_portal.forum_attachments", "message_id", "client_portal.forum_messages"),
+    Reference("client_portal.material_items", "area_id", "client_portal.material_areas"),
+    Reference("client_portal.installment_files", "installment_id", "client_portal.installments"),
+]
+
+_COMPANY_REFERENCES = _refs("public.companies", [
+    ("public.users", "company_id"),
+    ("public.projects", "company_id"),
+    ("public.tasks", "company_id"),
+    ("public.audit_logs", "company_id"),
+    ("public.user_activities", "company_id"),
+    ("public.project_assignments", "company_id"),
+    ("public.user_effective_permissions", "company_id"),
+    ("public.company_users", "company_id"),
+    ("public.role_permissions", "company_id"),
+    ("agent.feedback", "company_id"),
+    ("agent.metrics", "company_id"),
+    ("agent.scheduled_jobs", "company_id"),
+    ("agent.conversations", "company_id"),
+])
+
+_USER_REFERENCES = _refs("public.users", [
+    ("public.beta_invitations", "invited_by"),
+    ("public.change_orders", "approved_by"),
+    ("public.change_orders", "requested_by"),
+    ("public.communications", "from_user_id"),
+    ("public.communications", "to_user_id"),
+    ("public.company_users", "user_id"),
+    ("public.photos", "user_id"),
+    ("public.project_logs", "user_id"),
+    ("public.notifications", "user_id"),
+    ("public.schedule_changes", "user_id"),
+    ("public.time_entries", "user_id"),
+    ("public.user_activities", "user_id"),
+    ("public.user_effective_permissions", "user_id"),
+    ("public.project_assignments", "user_id"),
+    ("public.risk_assessments", "assigned_to"),
+    ("public.risk_assessments", "identified_by"),
+    ("public.sub_task_documents", "uploaded_by"),
+    ("public.sub_task_reviews", "reviewer_id"),
+    ("public.sub_tasks", "created_by"),
+    ("public.sub_checklist_templates", "created_by"),
+    ("public.subcontractor_assignments", "assigned_by"),
+    ("public.subcontractor_assignments", "subcontractor_id"),
+    ("client_portal.issue_audit_log", "actor_id"),
+    ("client_portal.issue_attachments", "uploaded_by"),
+    ("client_portal.issue_comments", "author_id"),
+    ("client_portal.issues", "created_by"),
+    ("client_portal.forum_attachments", "uploaded_by"),
+    ("client_portal.forum_messages", "author_id"),
+    ("client_portal.forum_threads", "created_by"),
+    ("client_portal.material_documents", "uploaded_by"),
+    ("client_portal.material_items", "added_by"),
+    ("client_portal.material_areas", "created_by"),
+    ("client_portal.materials", "added_by"),
+    ("client_portal.installment_files", "uploaded_by"),
+    ("client_portal.notification_settings", "user_id"),
+    ("client_portal.notifications", "user_id"),
+    ("client_portal.pm_notification_prefs", "recipient_user_id"),
+    ("client_portal.pm_notifications", "recipient_user_id"),
+    ("client_portal.payment_documents", "uploaded_by"),
+    ("client_portal.payment_events", "actor_id"),
+    ("client_portal.payment_receipts", "uploaded_by"),
+    ("client_portal.invoices", "created_by"),
+    ("client_portal.project_stages", "created_by"),
+    ("client_portal.client_invitations", "invited_by"),
+    ("client_portal.client_invitations", "user_id"),
+    ("client_portal.sub_invitations", "invited_by"),
+    ("client_portal.sub_invitations", "user_id"),
+    ("client_portal.magic_link_tokens", "user_id"),
+    ("agent.pending_confirmations", "user_id"),
+    ("agent.tool_calls", "user_id"),
+    ("agent.feedback", "user_id"),
+    ("agent.conversations", "user_id"),
+    ("public.client_forum_messages", "author_id"),
+    ("public.client_issues", "created_by"),
+    ("public.client_materials", "added_by"),
+]) + _refs("public.users", [
+    ("public.tasks", "assignee_id"),
+    ("public.time_entries", "approved_by"),
+    ("public.project_assignments", "granted_by_user_id"),
+    ("public.sub_checklist_items", "completed_by"),
+    ("public.sub_tasks", "assigned_user_id"),
+    ("client_portal.issues", "assigned_to"),
+    ("client_portal.issues", "resolved_by"),
+    ("client_portal.payment_installments", "created_by"),
+    ("client_portal.payment_installments", "updated_by"),
+    ("client_portal.payment_schedules", "created_by"),
+    ("client_portal.payment_schedules", "updated_by"),
+    ("agent.tool_calls", "confirmed_by"),
+    ("agent.metrics", "user_id"),
+], action=NULLIFY)
+
+DECLARED_REFERENCES: List[Reference] = (
+    _PROJECT_REFERENCES + _CHILD_REFERENCES + _COMPANY_REFERENCES + _USER_REFERENCES
+)
+
+
+@dataclass(frozen=True)
+class KeyCleanup:
+    """Statement run with the keys of each deleted batch of `table` ($1 = text[]).
+
+    For data that refers to those rows without a column to join on.
+    """
+    table: str
+    requires: str
+    sql: str
+
+
+CLEANUPS = [
+    # connect-pg-simple sessions keep the user id inside the sess JSON
+    KeyCleanup(
+        "public.users", "public.sessions",
+        "DELETE FROM public.sessions "
+        "WHERE sess::jsonb->>'userId' = ANY($1::text[]) OR sess::jsonb->>'id' = ANY($1::text[])",
+    ),
+]
+
+
+@dataclass(frozen=True)
+class RootSpec:
+    """How a root table is tombstoned and what runs around its purge.
+
+    context_query ($1 = root id) captures values the after statements need
+    once the root row is gone; after is (sql, context key) pairs run with
+    that value as $1 when it is not null. tombstone is (required table, sql)
+    pairs run with the root id when a background deletion is scheduled.
+    """
+    table: str
+    key: str = "id"
+    tombstone: Tuple[Tuple[str, str], ...] = ()
+    context_query: Optional[str] = None
+    after: Tuple[Tuple[str, str], ...] = ()
+
+
+_SESSIONS_OF_COMPANY = (
+    "DELETE FROM public.sessions WHERE sess::jsonb->>'userId' IN "
+    "(SELECT id::text FROM public.users WHERE company_id = $1)"
+)
+
+ROOTS: Dict[str, RootSpec] = {
+    "public.projects": RootSpec("public.projects"),
+    "public.companies": RootSpec(
+        "public.companies",
+        tombstone=(
+            ("public.companies", "UPDATE public.companies SET is_active = false WHERE id = $1"),
+            ("public.users", "UPDATE public.users SET is_active = false WHERE company_id = $1"),
+            ("public.sessions", _SESSIONS_OF_COMPANY),
+        ),
+    ),
+    "public.users": RootSpec(
+        "public.users",
+        tombstone=(
+            ("public.users", "UPDATE public.users SET is_active = false WHERE id = $1"),
+            ("public.sessions",
+             "DELETE FROM public.sessions WHERE sess::jsonb->>'userId' = $1 OR sess::jsonb->>'id' = $1"),
+        ),
+        context_query="SELECT subcontractor_id FROM public.users WHERE id = $1",
+        # Deactivate the user's subcontractor company once no user references it
+        after=((
+            "UPDATE public.subcontractors SET status = 'inactive', updated_at = NOW() "
+            "WHERE id = $1 AND NOT EXISTS (SELECT 1 FROM public.users WHERE subcontractor_id = $1)",
+            "subcontractor_id",
+        ),),
+    ),
+}
+
+
+# ==================== Planning ====================
+
+@dataclass
+class TableInfo:
+    """Columns (name -> nullable) and the key batches select rows by."""
+    columns: Dict[str, bool]
+    key: Optional[str] = None  # single-column primary key, "ctid", or None (unbatched)
+
+
+@dataclass
+class Step:
+    table: str
+    action: str
+    path: Tuple[Reference, ...]  # root-first; the last reference points at `table`'s parent
+    sql: str
+    batched: bool
+    returning: bool = False
+
+
+class DeleteGraph:
+    """References between the tables that exist, and the plans derived from them."""
+
+    def __init__(self, tables: Dict[str, TableInfo], references: Iterable[Reference]):
+        self.tables = tables
+        merged: Dict[Tuple[str, str, str], Reference] = {}
+        for ref in references:
+            if self._exists(ref):
+                merged[(ref.table, ref.column, ref.ref_table)] = ref
+        self.references = sorted(merged.values(), key=lambda r: (r.ref_table, r.table, r.column))
+        self._plans: Dict[str, List[Step]] = {}
+        self._blockers: Dict[str, List[Step]] = {}
+
+    def _exists(self, ref: Reference) -> bool:
+        child, parent = self.tables.get(ref.table), self.tables.get(ref.ref_table)
+        return (
+            child is not None and parent is not None
+            and ref.column in child.columns and ref.ref_column in parent.columns
+        )
+
+    def _nullable(self, ref: Reference) -> bool:
+        return self.tables[ref.table].columns.get(ref.column, False)
+
+    def referencing(self, table: str) -> List[Reference]:
+        return [r for r in self.references if r.ref_table == table]
+
+    def plan(self, root: str) -> List[Step]:
+        """Nullify steps, then delete steps leaf-first, ending with the root row."""
+        if root not in self._plans:
+            self._plans[root] = self._build_plan(root)
+        return self._plans[root]
+
+    def blockers(self, root: str) -> List[Step]:
+        """Checks ($1 = root id) for rows that a RESTRICT key keeps from being deleted."""
+        self.plan(root)
+        return self._blockers[root]
+
+    def _build_plan(self, root: str) -> List[Step]:
+        if root not in self.tables:
+            raise ValueError(f"Unknown table {root}")
+
+        # Depth-first over delete edges: post-order gives leaf-first tables;
+        # an edge back to a table on the stack closes a cycle and is nullified
+        order: List[str] = []
+        state: Dict[str, str] = {}
+        cycle_edges = set()
+
+        def visit(table: str) -> None:
+            state[table] = "open"
+            for ref in self.referencing(table):
+                if ref.action != DELETE:
+                    continue
+                if state.get(ref.table) == "open":
+                    cycle_edges.add(ref)
+                elif ref.table not in state:
+                    visit(ref.table)
+            state[table] = "done"
+            order.append(table)
+
+        visit(root)
+
+        nullify: List[Step] = []
+        blockers: List[Step] = []
+        deletes: Dict[str, List[Step]] = {table: [] for table in order}
+
+        def walk(path: Tuple[Reference, ...], on_path: Tuple[str, ...]) -> None:
+            if len(path) >= MAX_DEPTH:
+                return
+            for ref in self.referencing(on_path[-1]):
+                if ref.action == BLOCK:
+                    # Rows this plan deletes anyway (via another reference) do not block
+                    if ref.table not in deletes:
+                        blockers.append(self._blocker_step(root, path + (ref,)))
+                    continue
+                if ref in cycle_edges or ref.action == NULLIFY:
+                    if ref in cycle_edges and not self._nullable(ref):
+                        logger.warning(
+                            f"Cascade delete: {ref.table}.{ref.column} closes a cycle and is NOT NULL; "
+                            "leaving it to the database"
+                        )
+                        continue
+                    nullify.append(self._step(root, ref.table, NULLIFY, path + (ref,)))
+                elif ref.table not in on_path:
+                    deletes[ref.table].append(self._step(root, ref.table, DELETE, path + (ref,)))
+                    walk(path + (ref,), on_path + (ref.table,))
+
+        walk((), (root,))
+        steps = nullify + [step for table in order if table != root for step in deletes[table]]
+        steps.append(self._root_step(root))
+        self._blockers[root] = blockers
+        return steps
+
+    # ---------- SQL ----------
+
+    def _cleanups(self, table: str) -> List[KeyCleanup]:
+        return [c for c in CLEANUPS if c.table == table and c.requires in self.tables]
+
+    def _root_step(self, root: str) -> Step:
+        spec = ROOTS.get(root, RootSpec(root))
+        returning = bool(self._cleanups(root))
+        sql = f"DELETE FROM {root} WHERE {spec.key} = $1"
+        if returning:
+            sql += f" RETURNING {spec.key}::text AS key"
+        return Step(root, DELETE, (), sql, batched=False, returning=returning)
+
+    def _join(self, root: str, path: Tuple[Reference, ...]) -> Tuple[List[str], str]:
+        """FROM items (target first) and WHERE clause joining path back to the root."""
+        spec = ROOTS.get(root, RootSpec(root))
+        # Aliases t1..tn follow the path from the root; tn is the target table
+        sources = [f"{ref.table} t{i}" for i, ref in enumerate(path, 1)]
+        conditions = [
+            f"t{i}.{ref.column} = t{i - 1}.{ref.ref_column}" for i, ref in enumerate(path, 1) if i > 1
+        ]
+        first = path[0]
+        if first.ref_column == spec.key:
+            conditions.insert(0, f"t1.{first.column} = $1")
+        else:
+            sources.insert(0, f"{root} t0")
+            conditions[:0] = [f"t1.{first.column} = t0.{first.ref_column}", f"t0.{spec.key} = $1"]
+        sources.reverse()  # target first
+        return sources, " AND ".join(conditions)
+
+    def _blocker_step(self, root: str, path: Tuple[Reference, ...]) -> Step:
+        sources, where = self._join(root, path)
+        sql = f"SELECT EXISTS (SELECT 1 FROM {', '.join(sources)} WHERE {where})"
+        return Step(path[-1].table, BLOCK, path, sql, batched=False)
+
+    def _step(self, root: str, table: str, action: str, path: Tuple[Reference, ...]) -> Step:
+        sources, where = self._join(root, path)
+        target_alias = f"t{len(path)}"
+        key = self.tables[table].key
+        returning = action == DELETE and bool(self._cleanups(table)) and key not in (None, "ctid")
+
+        if key is None:
+            others = [s for s in sources if not s.endswith(f" {target_alias}")]
+            using = (" USING " if action == DELETE else " FROM ") + ", ".join(others) if others else ""
+            if action == DELETE:
+                sql = f"DELETE FROM {table} {target_alias}{using} WHERE {where}"
+            else:
+                column = path[-1].column
+                sql = f"UPDATE {table} {target_alias} SET {column} = NULL{using} WHERE {where}"
+            return Step(table, action, path, sql, batched=False)
+
+        select = f"SELECT {target_alias}.{key} FROM {', '.join(sources)} WHERE {where} LIMIT $2"
+        if action == DELETE:
+            sql = f"DELETE FROM {table} WHERE {key} = ANY(ARRAY({select}))"
+            if returning:
+                sql += f" RETURNING {key}::text AS key"
+        else:
+            sql = f"UPDATE {table} SET {path[-1].column} = NULL WHERE {key} = ANY(ARRAY({select}))"
+        return Step(table, action, path, sql, batched=True, returning=returning)
+
+
+# ==================== Loading ====================
+
+_COLUMNS = """
+    SELECT c.table_schema || '.' || c.table_name AS table_name, c.column_name,
+           c.is_nullable = 'YES' AS nullable
+    FROM information_schema.columns c
+    JOIN pg_class cl ON cl.relname = c.table_name
+    JOIN pg_namespace n ON n.oid = cl.relnamespace AND n.nspname = c.table_schema
+    WHERE c.table_schema = ANY($1::text[]) AND cl.relkind IN ('r', 'p') AND NOT cl.relispartition
+"""
+
+_KEYS = """
+    SELECT n.nspname || '.' || cl.relname AS table_name, cl.relkind,
+           (SELECT a.attname FROM pg_constraint pk
+            JOIN pg_attribute a ON a.attrelid = pk.conrelid AND a.attnum = pk.conkey[1]
+            WHERE pk.conrelid = cl.oid AND pk.contype = 'p' AND array_length(pk.conkey, 1) = 1) AS pk
+    FROM pg_class cl
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    WHERE n.nspname = ANY($1::text[]) AND cl.relkind IN ('r', 'p') AND NOT cl.relispartition
+"""
+
+_FOREIGN_KEYS = """
+    SELECT cn.nspname || '.' || c.relname AS table_name, a.attname AS column_name,
+           rn.nspname || '.' || r.relname AS ref_table, ra.attname AS ref_column,
+           con.confdeltype AS on_delete
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace cn ON cn.oid = c.relnamespace
+    JOIN pg_class r ON r.oid = con.confrelid
+    JOIN pg_namespace rn ON rn.oid = r.relnamespace
+    JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = con.conkey[1]
+    JOIN pg_attribute ra ON ra.attrelid = con.confrelid AND ra.attnum = con.confkey[1]
+    WHERE con.contype = 'f' AND array_length(con.conkey, 1) = 1
+      AND cn.nspname = ANY($1::text[]) AND rn.nspname = ANY($1::text[])
+      AND NOT c.relispartition
+"""
+
+
+def foreign_key_action(on_delete: str, nullable: bool) -> Optional[str]:
+    """Planner action for a foreign key found in pg_constraint (confdeltype).
+
+    SET DEFAULT is left to the database. NO ACTION/RESTRICT keys that are
+    nullable are cleared rather than deleting rows that merely point at
+    the root (a project created by a deleted user stays, without creator);
+    NOT NULL ones block the delete, as the schema declares.
+    """
+    if on_delete == "c":
+        return DELETE
+    if on_delete == "n":
+        return NULLIFY
+    if on_delete == "d":
+        return None
+    return NULLIFY if nullable else BLOCK
+
+
+def build_graph(
+    columns: Iterable[Dict[str, Any]],
+    keys: Iterable[Dict[str, Any]],
+    foreign_keys: Iterable[Dict[str, Any]],
+    declared: Sequence[Reference] = DECLARED_REFERENCES,
+) -> DeleteGraph:
+    tables: Dict[str, TableInfo] = {}
+    for row in columns:
+        tables.setdefault(row["table_name"], TableInfo({})).columns[row["column_name"]] = row["nullable"]
+    for row in keys:
+        info = tables.get(row["table_name"])
+        if info is not None:
+            info.key = row["pk"] or ("ctid" if row["relkind"] == "r" else None)
+
+    references: List[Reference] = []
+    for row in foreign_keys:
+        info = tables.get(row["table_name"])
+        nullable = bool(info and info.columns.get(row["column_name"], False))
+        action = foreign_key_action(row["on_delete"], nullable)
+        if action:
+            references.append(Reference(
+                row["table_name"], row["column_name"], row["ref_table"], row["ref_column"], action,
+            ))
+    # Declared references come last so they override the derived action
+    return DeleteGraph(tables, references + list(declared))
+
+
+async def load_delete_graph(conn) -> DeleteGraph:
+    schemas = list(SCHEMAS)
+    return build_graph(
+        await conn.fetch(_COLUMNS, schemas),
+        await conn.fetch(_KEYS, schemas),
+        await conn.fetch(_FOREIGN_KEYS, schemas),
+    )
+
+
+_graph: Optional[DeleteGraph] = None
+
+
+async def get_delete_graph(refresh: bool = False) -> DeleteGraph:
+    """The process-wide delete graph, loaded on first use (or at startup)."""
+    global _graph
+    if _graph is None or refresh:
+        from .connection import get_db_pool
+
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            _graph = await load_delete_graph(conn)
+        for root in ROOTS:
+            if root in _graph.tables:
+                _graph.plan(root)
+    return _graph
+
+
+# ==================== Execution ====================
+
+@dataclass
+class DeleteProgress:
+    root_table: str
+    root_id: str
+    steps_total: int
+    steps_done: int = 0
+    rows: Dict[str, int] = field(default_factory=dict)  # "delete public.tasks" -> rows
+
+    def add(self, step: Step, count: int) -> None:
+        if count:
+            label = f"{step.action} {step.table}"
+            self.rows[label] = self.rows.get(label, 0) + count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stepsTotal": self.steps_total, "stepsDone": self.steps_done, "rows": self.rows}
+
+
+ProgressCallback = Callable[[DeleteProgress], Awaitable[None]]
+
+
+def _count(status: str) -> int:
+    try:
+        return int(status.split()[-1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+async def _run_cleanups(conn, graph: DeleteGraph, table: str, keys: List[str]) -> None:
+    if keys:
+        for cleanup in graph._cleanups(table):
+            await conn.execute(cleanup.sql, keys)
+
+
+async def check_blockers(conn, graph: DeleteGraph, root: str, root_id: str) -> None:
+    """Raise CascadeBlockedError if RESTRICT-protected rows reference root_id."""
+    blocked = []
+    for step in graph.blockers(root):
+        if await conn.fetchval(step.sql, root_id):
+            ref = step.path[-1]
+            blocked.append(f"{ref.table}.{ref.column}")
+    if blocked:
+        raise CascadeBlockedError(root, str(root_id), blocked)
+
+
+async def _capture_context(conn, spec: RootSpec, root_id: str) -> Dict[str, Any]:
+    if not spec.context_query:
+        return {}
+    row = await conn.fetchrow(spec.context_query, root_id)
+    return dict(row) if row else {}
+
+
+async def purge(
+    conn,
+    graph: DeleteGraph,
+    root: str,
+    root_id: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Optional[ProgressCallback] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Delete root_id from root and everything that depends on it.
+
+    Runs on conn as given: inside a transaction the whole purge is atomic,
+    without one every batch commits on its own. Returns whether the root
+    row was deleted. Raises CascadeBlockedError, before deleting anything,
+    when rows behind a RESTRICT key still reference the root.
+    """
+    spec = ROOTS.get(root, RootSpec(root))
+    await check_blockers(conn, graph, root, root_id)
+    if context is None:
+        context = await _capture_context(conn, spec, root_id)
+    steps = graph.plan(root)
+    progress = DeleteProgress(root, str(root_id), len(steps))
+    deleted = False
+
+    for step in steps:
+        while True:
+            args = (root_id, batch_size) if step.batched else (root_id,)
+            if step.returning:
+                keys = [r["key"] for r in await conn.fetch(step.sql, *args)]
+                count = len(keys)
+                await _run_cleanups(conn, graph, step.table, keys)
+            else:
+                count = _count(await conn.execute(step.sql, *args))
+            progress.add(step, count)
+            if not step.path:
+                deleted = count > 0
+            if on_progress and count:
+                await on_progress(progress)
+            if not step.batched or count < batch_size:
+                break
+        progress.steps_done += 1
+
+    for sql, name in spec.after:
+        if context.get(name) is not None:
+            await conn.execute(sql, context[name])
+    if on_progress:
+        await on_progress(progress)
+    logger.info(f"Purged {root} {root_id}: {progress.rows}")
+    return deleted
+
+
+# ==================== Background deletions ====================
+
+CASCADE_DELETION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS public.cascade_deletions(
+        id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+        root_table varchar(100) NOT NULL,
+        root_id varchar NOT NULL,
+        status varchar(20) NOT NULL DEFAULT 'pending',
+        context jsonb NOT NULL DEFAULT '{}'::jsonb,
+        progress jsonb NOT NULL DEFAULT '{}'::jsonb,
+        error text,
+        requested_by varchar,
+        created_at timestamptz NOT NULL DEFAULT now(),
+        updated_at timestamptz NOT NULL DEFAULT now(),
+        finished_at timestamptz
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_cascade_deletions_open
+        ON public.cascade_deletions(root_table, root_id) WHERE status <> 'done';
+"""
+
+# Job type of the purge job (registered in agent/jobs/builtin.py)
+CASCADE_PURGE = "cascade_purge"
+
+
+async def init_cascade_delete_schema() -> None:
+    from .connection import get_db_pool
+
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(CASCADE_DELETION_SCHEMA)
+
+
+async def schedule_deletion(
+    conn,
+    graph: DeleteGraph,
+    root: str,
+    root_id: str,
+    requested_by: Optional[str] = None,
+) -> Optional[str]:
+    """Tombstone the root now and record a deletion for the purge job.
+
+    Returns the deletion id (an already open one for the same root is
+    reused), or None if the root row does not exist. Raises
+    CascadeBlockedError (nothing is tombstoned) when the purge could not
+    complete. The caller enqueues the purge job after its transaction commits.
+    """
+    spec = ROOTS[root]
+    async with conn.transaction():
+        exists = await conn.fetchval(f"SELECT 1 FROM {root} WHERE {spec.key} = $1 FOR UPDATE", root_id)
+        if not exists:
+            return None
+        await check_blockers(conn, graph, root, root_id)
+        for required, sql in spec.tombstone:
+            if required in graph.tables:
+                await conn.execute(sql, root_id)
+        context = await _capture_context(conn, spec, root_id)
+        deletion_id = await conn.fetchval(
+            """
+            INSERT INTO public.cascade_deletions (root_table, root_id, context, requested_by)
+            VALUES ($1, $2, $3::jsonb, $4)
+            ON CONFLICT (root_table, root_id) WHERE status <> 'done'
+            DO UPDATE SET status = 'pending', error = NULL, updated_at = now()
+            RETURNING id
+            """,
+            root, str(root_id), json.dumps(context, default=str), requested_by,
+        )
+    return str(deletion_id)
+
+
+async def request_deletion(root: str, root_id: str, requested_by: Optional[str] = None) -> Optional[str]:
+    """schedule_deletion on a pooled connection, then enqueue the purge job."""
+    from src.agent.jobs import job_runner
+    from .connection import get_db_pool
+
+    graph = await get_delete_graph()
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        deletion_id = await schedule_deletion(conn, graph, root, root_id, requested_by)
+    if deletion_id:
+        await job_runner.enqueue(CASCADE_PURGE, config={"deletion_id": deletion_id})
+    return deletion_id
+
+
+async def run_deletion(conn, graph: DeleteGraph, deletion_id: str, batch_size: int = DEFAULT_BATCH_SIZE) -> bool:
+    """Purge a scheduled deletion, committing batch by batch and recording progress."""
+    row = await conn.fetchrow(
+        "SELECT root_table, root_id, status, context FROM public.cascade_deletions WHERE id = $1::uuid",
+        deletion_id,
+    )
+    if not row or row["status"] == "done":
+        return False
+    context = row["context"]
+    if isinstance(context, str):
+        context = json.loads(context)
+
+    async def record(progress: DeleteProgress) -> None:
+        await conn.execute(
+            "UPDATE public.cascade_deletions SET progress = $2::jsonb, updated_at = now() WHERE id = $1::uuid",
+            deletion_id, json.dumps(progress.to_dict()),
+        )
+
+    await conn.execute(
+        "UPDATE public.cascade_deletions SET status = 'running', updated_at = now() WHERE id = $1::uuid",
+        deletion_id,
+    )
+    try:
+        await purge(
+            conn, graph, row["root_table"], row["root_id"],
+            batch_size=batch_size, on_progress=record, context=context or {},
+        )
+    except Exception as e:
+        await conn.execute(
+            "UPDATE public.cascade_deletions SET status = 'failed', error = $2, updated_at = now() "
+            "WHERE id = $1::uuid",
+            deletion_id, str(e),
+        )
+        raise
+    await conn.execute(
+        "UPDATE public.cascade_deletions SET status = 'done', error = NULL, "
+        "finished_at = now(), updated_at = now() WHERE id = $1::uuid",
+        deletion_id,
+    )
+    return True
+
+
+async def get_deletion(deletion_id: str) -> Optional[Dict[str, Any]]:
+    """The cascade_deletions row as a dict; None if unknown or not a UUID."""
+    from .connection import db_manager
+
+    try:
+        uuid.UUID(deletion_id)
+    except ValueError:
+        return None
+    row = await db_manager.execute_one(
+        "SELECT id::text, root_table, root_id, status, progress, error, requested_by, "
+        "created_at, updated_at, finished_at FROM public.cascade_deletions WHERE id = $1::uuid",
+        deletion_id,
+    )
+    if not row:
+        return None
+    deletion = dict(row)
+    if isinstance(deletion["progress"], str):
+        deletion["progress"] = json.loads(deletion["progress"])
+    return deletion
@@ -3,9 +3,14 @@ Database connection utilities for async operations
 """
 
 import os
+import re
 import ssl
+import time
+import asyncio
 import asyncpg
-from typing import AsyncGenerator, Optional
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, AsyncIterator, Dict, Iterator, Optional
 from pathlib import Path
 
 # Select database URL based on environment
@@ -35,12 +40,22 @@ DB_SSL_CERT = os.getenv("DB_SSL_CERT")  # client-cert.pem
 DB_SSL_KEY = os.getenv("DB_SSL_KEY")  # client-key.pem
 DB_SSL_DIR = os.getenv("DB_SSL_DIR")  # Directory containing certificates
 
-# Global connection pool
+# Optional streaming read replica. Unset means every query goes to DATABASE_URL.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or None
+# After a session writes, its reads stay on the primary for this many seconds
+# so replication lag never hides the session's own changes
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# How long to wait before retrying a replica that failed to connect
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+# Global connection pools
 _pool = None
+_replica_pool = None
+_replica_retry_at = 0.0
 
-def _create_ssl_context() -> Optional[ssl.SSLContext]:
+def _create_ssl_context(database_url: Optional[str] = None) -> Optional[ssl.SSLContext]:
     """Create SSL context based on database type: Neon (dev/prod) or Cloud SQL"""
-    db_url_lower = DATABASE_URL.lower()
+    db_url_lower = (database_url or DATABASE_URL).lower()
     
     # Detect database type - Cloud SQL has highest priority (SSL certs present)
     is_cloud_sql = (
@@ -146,20 +161,7 @@ async def get_db_pool() -> asyncpg.Pool:
             # Create SSL context for Cloud SQL
             ssl_context = _create_ssl_context()
             
-            _pool = await asyncpg.create_pool(
-                DATABASE_URL,
-                ssl=ssl_context,
-                command_timeout=30,
-                max_size=20,  # Limit pool size
-                min_size=1,   # Keep at least one connection
-                statement_cache_size=0,  # Disable statement caching to prevent InvalidCachedStatementError after schema changes
-                server_settings={
-                    'jit': 'off'  # Disable JIT for better connection stability
-                }
-            )
-            # Test the connection
-            async with _pool.acquire() as conn:
-                await conn.fetchval("SELECT 1")
+            _pool = await _create_pool(DATABASE_URL, ssl_context)
             print("✅ Database connection pool created and tested successfully")
         except Exception as e:
             print(f"❌ Failed to create database pool: {e}")
@@ -167,9 +169,53 @@ async def get_db_pool() -> asyncpg.Pool:
             raise
     return _pool
 
+async def _create_pool(database_url: str, ssl_context) -> asyncpg.Pool:
+    """Create a pool with the shared settings and test one connection"""
+    pool = await asyncpg.create_pool(
+        database_url,
+        ssl=ssl_context,
+        command_timeout=30,
+        max_size=20,  # Limit pool size
+        min_size=1,   # Keep at least one connection
+        statement_cache_size=0,  # Disable statement caching to prevent InvalidCachedStatementError after schema changes
+        server_settings={
+            'jit': 'off'  # Disable JIT for better connection stability
+        }
+    )
+    # Test the connection
+    async with pool.acquire() as conn:
+        await conn.fetchval("SELECT 1")
+    return pool
+
+async def get_replica_pool() -> Optional[asyncpg.Pool]:
+    """Get the read-replica pool, or None when no replica is configured or reachable.
+
+    A replica that fails to connect is retried after DB_REPLICA_RETRY_SECONDS;
+    until then reads fall back to the primary instead of failing.
+    """
+    global _replica_pool, _replica_retry_at
+    if not DATABASE_REPLICA_URL:
+        return None
+    if _replica_pool is None:
+        if time.monotonic() < _replica_retry_at:
+            return None
+        try:
+            _replica_pool = await _create_pool(
+                DATABASE_REPLICA_URL, _create_ssl_context(DATABASE_REPLICA_URL)
+            )
+            print("✅ Read-replica connection pool created and tested successfully")
+        except Exception as e:
+            print(f"⚠️  Read replica unavailable, reading from primary: {e}")
+            _replica_pool = None
+            _replica_retry_at = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+    return _replica_pool
+
 async def close_db_pool():
-    """Close the database connection pool"""
-    global _pool
+    """Close the database connection pools"""
+    global _pool, _replica_pool
+    if _replica_pool:
+        await _replica_pool.close()
+        _replica_pool = None
     if _pool:
         await _pool.close()
         _pool = None
@@ -181,14 +227,348 @@ async def get_db_connection() -> AsyncGenerator[asyncpg.Connection, None]:
         yield connection
 
 
+# ---------------------------------------------------------------------------
+# Read routing
+# ---------------------------------------------------------------------------
+
+# Session making the current request (set by ReadRoutingMiddleware)
+_session_key: ContextVar[Optional[str]] = ContextVar("db_session_key", default=None)
+# True while the current request/task must read from the primary
+_pin_primary: ContextVar[bool] = ContextVar("db_pin_primary", default=False)
+# True while plain execute_query/execute_one reads may use the replica
+# (read-only agent tools, which call db_manager directly)
+_prefer_replica: ContextVar[bool] = ContextVar("db_prefer_replica", default=False)
+
+_WRITE_WORDS = re.compile(
+    r"\b(insert|update|delete|merge|truncate|nextval|setval|pg_advisory\w*|lock|into)\b"
+    r"|\bfor\s+(no\s+key\s+)?(update|share)\b|\bfor\s+key\s+share\b",
+    re.IGNORECASE,
+)
+_LEADING_COMMENTS = re.compile(r"^(\s|--[^\n]*\n|/\*.*?\*/)+", re.DOTALL)
+
+
+def is_read_only(query: str) -> bool:
+    """True if a statement only reads: a SELECT/WITH without writes, row locks or sequence calls.
+
+    Conservative by design - anything that merely mentions a write keyword
+    (even inside a string literal) is treated as a write and stays on the primary.
+    """
+    body = _LEADING_COMMENTS.sub("", query)
+    verb = body.split(None, 1)[0].lower() if body.strip() else ""
+    if verb not in ("select", "with"):
+        return False
+    return not _WRITE_WORDS.search(body)
+
+
+class RecentWrites:
+    """Per-session "recent write" window for read-your-writes.
+
+    Sessions that wrote within the window read from the primary. Entries
+    expire on their own; the map is pruned as it grows.
+
+    The windows live in this process's memory only: another worker, or this
+    one after a restart, does not see them. ReadRoutingMiddleware carries the
+    window to other workers in a cookie (see middleware/read_routing.py).
+    """
+
+    def __init__(self, window_seconds: float = DB_READ_YOUR_WRITES_SECONDS, max_sessions: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_sessions = max_sessions
+        self._until: Dict[str, float] = {}
+
+    def mark(self, session_key: str) -> None:
+        now = time.monotonic()
+        if len(self._until) >= self.max_sessions:
+            self._until = {k: t for k, t in self._until.items() if t > now}
+            if len(self._until) >= self.max_sessions:
+                # Still full of live windows: drop the ones closest to expiring
+                for key in sorted(self._until, key=self._until.get)[: self.max_sessions // 10 or 1]:
+                    del self._until[key]
+        self._until[session_key] = now + self.window_seconds
+
+    def active(self, session_key: str) -> bool:
+        until = self._until.get(session_key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._until.pop(session_key, None)
+            return False
+        return True
+
+
+# Global recent-writes tracker
+recent_writes = RecentWrites()
+
+
+def set_session_key(session_key: Optional[str]):
+    """Bind the current request to a session; returns a token for reset_session_key()"""
+    return _session_key.set(session_key)
+
+
+def reset_session_key(token) -> None:
+    _session_key.reset(token)
+
+
+def note_write() -> None:
+    """Record that the current session wrote: its reads stay on the primary for the window.
+
+    Also pins the rest of the current request/task to the primary, which
+    covers background work that has no session.
+    """
+    _pin_primary.set(True)
+    session_key = _session_key.get()
+    if session_key:
+        recent_writes.mark(session_key)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Send every read inside the block to the primary"""
+    token = _pin_primary.set(True)
+    try:
+        yield
+    finally:
+        _pin_primary.reset(token)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Let execute_query/execute_one route read-only statements to the replica inside the block"""
+    token = _prefer_replica.set(True)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
+
+
+def reads_may_use_replica() -> bool:
+    """Replica configured, current request not pinned, and no recent write by its session"""
+    if not DATABASE_REPLICA_URL or _pin_primary.get():
+        return False
+    session_key = _session_key.get()
+    return not (session_key and recent_writes.active(session_key))
+
+
+def should_use_replica(query: str) -> bool:
+    """Routing rule for one statement: reads may use the replica and the SQL is read-only"""
+    return reads_may_use_replica() and is_read_only(query)
+
+
+async def get_read_pool() -> asyncpg.Pool:
+    """Pool for a block of read-only statements (exports, dashboards).
+
+    The replica when the routing rules allow, otherwise the primary. Usable
+    as a FastAPI dependency in place of get_db_pool.
+    """
+    if reads_may_use_replica():
+        replica = await get_replica_pool()
+        if replica is not None:
+            return replica
+    return await get_db_pool()
+
+
+# Errors that mean the replica itself is unusable (not a bad query)
+_REPLICA_UNAVAILABLE = (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError)
+
+
+# ---------------------------------------------------------------------------
+# Unit of work
+# ---------------------------------------------------------------------------
+
+class UnitOfWork:
+    """One pooled connection shared by every statement in a request.
+
+    The connection is checked out lazily on first use and released by
+    close(). ``acquire()`` mirrors ``asyncpg.Pool.acquire()``, so a unit of
+    work can be passed wherever handlers and services expect a pool; while
+    it is bound (see get_unit_of_work) db_manager and the repositories use
+    it too. With ``transactional=True`` everything runs in one transaction,
+    committed by close() or rolled back on error.
+
+    Statements from concurrent tasks (asyncio.gather) cannot share one
+    connection: outside a transaction they get their own checkout, inside
+    one they wait their turn. close() waits for the statement in progress
+    on the shared connection; tasks still waiting when it closes fall back
+    to their own checkout. ``checkouts`` counts pool checkouts.
+    """
+
+    def __init__(self, pool: Optional[asyncpg.Pool] = None, transactional: bool = False):
+        self.transactional = transactional
+        self.checkouts = 0
+        self._pool = pool
+        self._conn = None
+        self._tx = None
+        self._owner = None
+        self._closed = False
+        self._lock = asyncio.Lock()
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            self._pool = await get_db_pool()
+        return self._pool
+
+    async def connection(self) -> asyncpg.Connection:
+        """The shared connection, checked out (and its transaction begun) on first use"""
+        if self._conn is None:
+            pool = await self._get_pool()
+            self._conn = await pool.acquire()
+            self.checkouts += 1
+            if self.transactional:
+                self._tx = self._conn.transaction()
+                await self._tx.start()
+        return self._conn
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        task = asyncio.current_task()
+        if self._owner is task:
+            # Re-entrant: a repository call inside the handler's own block
+            yield self._conn
+            return
+        if self._closed or (self._lock.locked() and not self.transactional):
+            pool = await self._get_pool()
+            self.checkouts += 1
+            async with pool.acquire() as conn:
+                yield conn
+            return
+        async with self._lock:
+            if not self._closed:
+                conn = await self.connection()
+                self._owner = task
+                try:
+                    yield conn
+                finally:
+                    self._owner = None
+                return
+        # Closed while this task waited for the shared connection
+        pool = await self._get_pool()
+        self.checkouts += 1
+        async with pool.acquire() as conn:
+            yield conn
+
+    async def close(self, commit: bool = True) -> None:
+        """Finish the transaction (if any) and return the connection to the pool
+
+        Waits for a task that is mid-statement on the shared connection, so the
+        connection is never committed or released underneath it.
+        """
+        self._closed = True
+        if self._owner is asyncio.current_task():
+            # Closing from inside this task's own acquire() block
+            await self._release(commit)
+            return
+        async with self._lock:
+            await self._release(commit)
+
+    async def _release(self, commit: bool) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            if self._tx is not None:
+                if commit:
+                    await self._tx.commit()
+                else:
+                    await self._tx.rollback()
+        finally:
+            self._tx = None
+            await self._pool.release(conn)
+
+
+# Unit of work bound to the current request (see get_unit_of_work)
+_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar("db_unit_of_work", default=None)
+
+
+@asynccontextmanager
+async def unit_of_work(transactional: bool = False, pool: Optional[asyncpg.Pool] = None) -> AsyncIterator[UnitOfWork]:
+    """Bind a unit of work for the block; commits on success, rolls back on error"""
+    uow = UnitOfWork(pool, transactional=transactional)
+    token = _unit_of_work.set(uow)
+    if transactional:
+        pin = _pin_primary.set(True)
+    try:
+        yield uow
+    except BaseException:
+        await uow.close(commit=False)
+        raise
+    else:
+        await uow.close(commit=True)
+    finally:
+        if transactional:
+            _pin_primary.reset(pin)
+        _unit_of_work.reset(token)
+
+
+async def get_unit_of_work() -> AsyncGenerator[UnitOfWork, None]:
+    """FastAPI dependency: one shared connection for the whole request"""
+    async with unit_of_work() as uow:
+        yield uow
+
+
+async def get_transactional_unit_of_work() -> AsyncGenerator[UnitOfWork, None]:
+    """FastAPI dependency: one shared connection and one transaction for the whole request"""
+    async with unit_of_work(transactional=True) as uow:
+        yield uow
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _unit_of_work.get()
+
+
+@asynccontextmanager
+async def _primary_connection() -> AsyncIterator[asyncpg.Connection]:
+    """The request's shared connection when a unit of work is bound, else a pool checkout"""
+    uow = _unit_of_work.get()
+    if uow is not None:
+        async with uow.acquire() as connection:
+            yield connection
+    else:
+        pool = await get_db_pool()
+        async with pool.acquire() as connection:
+            yield connection
+
+
 class DatabaseManager:
     """Database manager for executing queries with proper connection handling"""
-    
+
+    async def _read(self, method: str, query: str, args: tuple):
+        """Run a read on the replica when the routing rules allow, else on the primary"""
+        uow = _unit_of_work.get()
+        if should_use_replica(query) and not (uow and uow.transactional):
+            replica = await get_replica_pool()
+            if replica is not None:
+                try:
+                    async with replica.acquire() as connection:
+                        return await getattr(connection, method)(query, *args)
+                except _REPLICA_UNAVAILABLE as e:
+                    print(f"Read replica error, retrying on primary: {e}")
+        async with _primary_connection() as connection:
+            return await getattr(connection, method)(query, *args)
+
+    async def read_query(self, query: str, *args) -> list:
+        """Execute a read-only query, on the replica when possible, and return all results"""
+        try:
+            return await self._read("fetch", query, args)
+        except Exception as e:
+            print(f"Database read_query error: {e}")
+            raise
+
+    async def read_one(self, query: str, *args):
+        """Execute a read-only query, on the replica when possible, and return one result"""
+        try:
+            return await self._read("fetchrow", query, args)
+        except Exception as e:
+            print(f"Database read_one error: {e}")
+            raise
+
     async def execute_query(self, query: str, *args) -> list:
         """Execute a SELECT query and return all results"""
+        if _prefer_replica.get() and is_read_only(query):
+            return await self.read_query(query, *args)
         try:
-            pool = await get_db_pool()
-            async with pool.acquire() as connection:
+            if not is_read_only(query):
+                note_write()
+            async with _primary_connection() as connection:
                 rows = await connection.fetch(query, *args)
                 return rows
         except Exception as e:
@@ -197,9 +577,12 @@ class DatabaseManager:
     
     async def execute_one(self, query: str, *args):
         """Execute a query and return one result"""
+        if _prefer_replica.get() and is_read_only(query):
+            return await self.read_one(query, *args)
         try:
-            pool = await get_db_pool()
-            async with pool.acquire() as connection:
+            if not is_read_only(query):
+                note_write()
+            async with _primary_connection() as connection:
                 row = await connection.fetchrow(query, *args)
                 return row
         except Exception as e:
@@ -209,8 +592,9 @@ class DatabaseManager:
     async def execute(self, query: str, *args) -> str:
         """Execute a query without returning results"""
         try:
-            pool = await get_db_pool()
-            async with pool.acquire() as connection:
+            if not is_read_only(query):
+                note_write()
+            async with _primary_connection() as connection:
                 result = await connection.execute(query, *args)
                 return result
         except Exception as e:
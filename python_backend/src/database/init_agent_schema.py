@@ -7,6 +7,13 @@ import asyncpg
 from .connection import get_db_pool
 
 
+PROJECT_NAME_TRGM_SQL = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS idx_projects_name_trgm
+        ON public.projects USING gin (LOWER(name) gin_trgm_ops);
+"""
+
+
 async def init_agent_schema():
     """Initialize agent schema with all required tables."""
     pool = await get_db_pool()
@@ -81,6 +88,7 @@ async def init_agent_schema():
         confirmed_at timestamptz,
         error_message text,
         execution_time_ms integer,
+        cache_hit boolean NOT NULL DEFAULT false,
         created_at timestamptz NOT NULL DEFAULT now(),
         CONSTRAINT chk_tool_safety_level CHECK (safety_level IN (
             'read_only', 'audit_logged', 'requires_review',
@@ -102,6 +110,9 @@ async def init_agent_schema():
             REFERENCES public.users(id) ON DELETE SET NULL
     );
 
+    -- Tool calls served from the executor's result cache (added after initial release)
+    ALTER TABLE agent.tool_calls ADD COLUMN IF NOT EXISTS cache_hit boolean NOT NULL DEFAULT false;
+
     -- PENDING CONFIRMATIONS TABLE
     -- Operations awaiting user confirmation before execution
     CREATE TABLE IF NOT EXISTS agent.pending_confirmations(
@@ -186,6 +197,16 @@ async def init_agent_schema():
             REFERENCES public.companies(id) ON DELETE RESTRICT
     );
 
+    -- Job runner bookkeeping (src/agent/jobs): leases, retries and durations.
+    -- System-wide jobs have no company; one-off jobs have no cron expression.
+    ALTER TABLE agent.scheduled_jobs ALTER COLUMN company_id DROP NOT NULL;
+    ALTER TABLE agent.scheduled_jobs ALTER COLUMN schedule_cron DROP NOT NULL;
+    ALTER TABLE agent.scheduled_jobs ADD COLUMN IF NOT EXISTS locked_by text;
+    ALTER TABLE agent.scheduled_jobs ADD COLUMN IF NOT EXISTS locked_until timestamptz;
+    ALTER TABLE agent.scheduled_jobs ADD COLUMN IF NOT EXISTS attempts integer NOT NULL DEFAULT 0;
+    ALTER TABLE agent.scheduled_jobs ADD COLUMN IF NOT EXISTS last_error text;
+    ALTER TABLE agent.scheduled_jobs ADD COLUMN IF NOT EXISTS last_duration_ms integer;
+
     -- Create indexes for better performance
     CREATE INDEX IF NOT EXISTS idx_conversations_user ON agent.conversations(user_id);
     CREATE INDEX IF NOT EXISTS idx_conversations_company ON agent.conversations(company_id);
@@ -204,6 +225,8 @@ async def init_agent_schema():
     CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_company ON agent.scheduled_jobs(company_id);
     CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON agent.scheduled_jobs(next_run_at)
         WHERE status = 'active';
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_scheduled_jobs_system ON agent.scheduled_jobs(job_type)
+        WHERE company_id IS NULL AND schedule_cron IS NOT NULL;
     CREATE INDEX IF NOT EXISTS idx_feedback_company ON agent.feedback(company_id);
     CREATE INDEX IF NOT EXISTS idx_feedback_message ON agent.feedback(message_id);
     CREATE INDEX IF NOT EXISTS idx_feedback_positive ON agent.feedback(company_id, is_positive);
@@ -217,11 +240,20 @@ async def init_agent_schema():
         async with pool.acquire() as conn:
             await conn.execute(init_sql)
             print("✅ Agent schema initialized successfully")
-            return True
     except Exception as e:
         print(f"❌ Error initializing agent schema: {e}")
         raise
 
+    # Fuzzy project name lookup; optional because CREATE EXTENSION may need
+    # privileges the app role lacks (the resolver falls back to memory)
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(PROJECT_NAME_TRGM_SQL)
+            print("✅ Project name trigram index verified")
+    except Exception as e:
+        print(f"⚠️  Project name trigram index unavailable: {e}")
+    return True
+
 
 async def drop_agent_schema():
     """Drop agent schema and all tables (use with caution!)."""
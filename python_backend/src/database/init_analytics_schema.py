@@ -4,6 +4,8 @@ Safe, additive migration that creates tables for tracking
 user engagement: heartbeats, daily usage stats, and agent vs app time.
 """
 
+from ..core.config import settings
+from ..services.heartbeat_partitions import maintain_heartbeat_partitions
 from .connection import get_db_pool
 
 
@@ -15,20 +17,62 @@ async def init_analytics_schema():
     BEGIN;
 
     -- =============================================
-    -- RAW HEARTBEAT PINGS (write-heavy, pruned after 30 days)
+    -- RAW HEARTBEAT PINGS (write-heavy), range-partitioned by day.
+    -- Daily partitions are created ahead and dropped after the retention
+    -- period by the app (src/services/heartbeat_partitions.py). A table
+    -- from before partitioning becomes one partition covering everything
+    -- up to the end of the day it was converted.
     -- =============================================
-    CREATE TABLE IF NOT EXISTS public.analytics_heartbeats(
-        id bigserial PRIMARY KEY,
-        user_id varchar NOT NULL,
-        company_id varchar,
-        agent_active boolean NOT NULL DEFAULT false,
-        created_at timestamptz NOT NULL DEFAULT now()
-    );
+    CREATE SEQUENCE IF NOT EXISTS public.analytics_heartbeats_id_seq;
+
+    DO $$
+    DECLARE
+        legacy_upper timestamptz := date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+            + interval '1 day';
+        converting boolean;
+    BEGIN
+        SELECT EXISTS (
+            SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relname = 'analytics_heartbeats' AND c.relkind = 'r'
+        ) INTO converting;
+
+        IF converting THEN
+            ALTER TABLE public.analytics_heartbeats RENAME TO analytics_heartbeats_legacy;
+            -- A validated bound lets ATTACH PARTITION skip its own scan. Adding
+            -- it NOT VALID and validating separately keeps the full-table scan
+            -- out of ADD CONSTRAINT.
+            EXECUTE format(
+                'ALTER TABLE public.analytics_heartbeats_legacy
+                 ADD CONSTRAINT analytics_heartbeats_legacy_bound CHECK (created_at < %L) NOT VALID',
+                legacy_upper);
+            ALTER TABLE public.analytics_heartbeats_legacy
+                VALIDATE CONSTRAINT analytics_heartbeats_legacy_bound;
+        END IF;
 
-    CREATE INDEX IF NOT EXISTS idx_heartbeat_user_created
-        ON public.analytics_heartbeats(user_id, created_at DESC);
-    CREATE INDEX IF NOT EXISTS idx_heartbeat_created
-        ON public.analytics_heartbeats(created_at);
+        CREATE TABLE IF NOT EXISTS public.analytics_heartbeats(
+            id bigint NOT NULL DEFAULT nextval('public.analytics_heartbeats_id_seq'),
+            user_id varchar NOT NULL,
+            company_id varchar,
+            agent_active boolean NOT NULL DEFAULT false,
+            created_at timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (created_at);
+
+        CREATE INDEX IF NOT EXISTS idx_heartbeats_user_time
+            ON public.analytics_heartbeats(user_id, created_at DESC);
+
+        IF converting THEN
+            EXECUTE format(
+                'ALTER TABLE public.analytics_heartbeats ATTACH PARTITION public.analytics_heartbeats_legacy
+                 FOR VALUES FROM (MINVALUE) TO (%L)',
+                legacy_upper);
+        END IF;
+
+        -- The sequence must outlive the legacy partition that created it
+        ALTER SEQUENCE public.analytics_heartbeats_id_seq OWNED BY public.analytics_heartbeats.id;
+
+        CREATE TABLE IF NOT EXISTS public.analytics_heartbeats_default
+            PARTITION OF public.analytics_heartbeats DEFAULT;
+    END $$;
 
     -- =============================================
     -- PRE-AGGREGATED DAILY STATS (one row per user per day)
@@ -50,12 +94,64 @@ async def init_analytics_schema():
         CONSTRAINT uq_daily_stats_user_date UNIQUE(user_id, stat_date)
     );
 
+    -- Active minutes of the day as 1440-bit bitmaps (bit n = minute n of the
+    -- day, set by each heartbeat), a compact alternative to raw heartbeats
+    ALTER TABLE public.analytics_daily_stats ADD COLUMN IF NOT EXISTS active_minutes bytea;
+    ALTER TABLE public.analytics_daily_stats ADD COLUMN IF NOT EXISTS agent_minutes bytea;
+
     CREATE INDEX IF NOT EXISTS idx_daily_stats_date
         ON public.analytics_daily_stats(stat_date);
     CREATE INDEX IF NOT EXISTS idx_daily_stats_user_date
         ON public.analytics_daily_stats(user_id, stat_date DESC);
     CREATE INDEX IF NOT EXISTS idx_daily_stats_company_date
         ON public.analytics_daily_stats(company_id, stat_date);
+    CREATE INDEX IF NOT EXISTS idx_daily_stats_updated
+        ON public.analytics_daily_stats(updated_at);
+
+    -- =============================================
+    -- PER-COMPANY ROLLUPS (maintained by the analytics_rollup job,
+    -- see src/services/analytics_rollups.py); user_sketch is a
+    -- HyperLogLog sketch of the period's distinct users
+    -- =============================================
+    CREATE TABLE IF NOT EXISTS public.analytics_rollup_daily(
+        company_id varchar NOT NULL,
+        stat_date date NOT NULL,
+        active_users integer NOT NULL DEFAULT 0,
+        total_time_seconds bigint NOT NULL DEFAULT 0,
+        agent_time_seconds bigint NOT NULL DEFAULT 0,
+        app_time_seconds bigint NOT NULL DEFAULT 0,
+        action_count bigint NOT NULL DEFAULT 0,
+        login_count bigint NOT NULL DEFAULT 0,
+        user_sketch bytea NOT NULL,
+        updated_at timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (company_id, stat_date)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_rollup_daily_date
+        ON public.analytics_rollup_daily(stat_date);
+
+    CREATE TABLE IF NOT EXISTS public.analytics_rollup_weekly(
+        company_id varchar NOT NULL,
+        week_start date NOT NULL,
+        active_users integer NOT NULL DEFAULT 0,
+        total_time_seconds bigint NOT NULL DEFAULT 0,
+        agent_time_seconds bigint NOT NULL DEFAULT 0,
+        app_time_seconds bigint NOT NULL DEFAULT 0,
+        action_count bigint NOT NULL DEFAULT 0,
+        login_count bigint NOT NULL DEFAULT 0,
+        user_sketch bytea NOT NULL,
+        updated_at timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (company_id, week_start)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_rollup_weekly_week
+        ON public.analytics_rollup_weekly(week_start);
+
+    -- Refresh watermark: stats rows updated after it are not rolled up yet
+    CREATE TABLE IF NOT EXISTS public.analytics_rollup_state(
+        name text PRIMARY KEY,
+        watermark timestamptz
+    );
 
     COMMIT;
     """
@@ -63,6 +159,8 @@ async def init_analytics_schema():
     try:
         async with pool.acquire() as conn:
             await conn.execute(init_sql)
+            # Make sure today's heartbeat partitions exist before the first insert
+            await maintain_heartbeat_partitions(conn, settings.analytics_heartbeat_retention_days)
             print("Analytics schema initialized successfully")
             return True
     except Exception as e:
@@ -285,6 +285,9 @@ async def init_subcontractor_schema():
 
     CREATE INDEX IF NOT EXISTS idx_sub_milestones_assignment ON public.sub_payment_milestones(assignment_id);
     CREATE INDEX IF NOT EXISTS idx_sub_milestones_status ON public.sub_payment_milestones(status);
+    -- Finds the milestones that link a task when it is approved
+    CREATE INDEX IF NOT EXISTS idx_sub_milestones_linked_tasks
+        ON public.sub_payment_milestones USING gin (linked_task_ids jsonb_path_ops);
 
     -- =============================================
     -- SUB INVITATIONS (in client_portal schema)
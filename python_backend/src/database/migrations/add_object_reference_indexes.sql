@@ -0,0 +1,25 @@
+-- Migration: Indexes for looking up which rows reference a storage object
+-- Date: 2026-10-19
+-- Type: Additive only
+
+-- PhotoRepository.get_readable_object_ids (POST /objects/signed-urls) checks
+-- the requested object IDs against photo filenames and log image URLs. Both
+-- are stored with decorations (a "?..." query string, a URL prefix), so the
+-- lookups go through these expressions and need matching indexes.
+
+-- photos.filename is the object ID, optionally followed by "?..."
+CREATE INDEX IF NOT EXISTS idx_photos_object_id
+    ON public.photos ((split_part(filename, '?', 1)));
+
+-- project_logs.images holds URLs ending in the object ID
+-- (/api/objects/image/<id>); the GIN index serves "&& ids"
+CREATE OR REPLACE FUNCTION public.project_log_image_ids(images text[])
+RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT array_agg(regexp_replace(split_part(img, '?', 1), '^.*/', ''))
+    FROM unnest(images) AS img
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_project_logs_image_ids
+    ON public.project_logs USING gin (public.project_log_image_ids(images));
@@ -0,0 +1,11 @@
+-- Migration: Trigram index on project names for agent fuzzy project lookup
+-- Date: 2026-10-18
+-- Type: Additive only
+
+-- pg_trgm provides similarity(), word_similarity() and the % / <% operators
+-- used by src/agent/tools/project_resolver.py. The GIN index serves those
+-- operators and LIKE '%name%' on LOWER(name).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_projects_name_trgm
+    ON public.projects USING gin (LOWER(name) gin_trgm_ops);
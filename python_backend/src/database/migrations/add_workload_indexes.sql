@@ -0,0 +1,65 @@
+-- Migration: Composite/covering indexes for the repository and agent query workload
+-- Date: 2026-10-18
+-- Type: Additive only
+
+-- Each index matches a filter + ORDER BY the app runs on every page load, so
+-- the rows come back in index order without a separate sort. The existing
+-- single-column indexes on the leading column stay (drizzle and the init
+-- scripts create them); the planner prefers these where the ORDER BY matches.
+-- Measure with scripts/bench_query_indexes.py.
+
+-- TaskRepository.get_all: WHERE company_id / project_id ... ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_tasks_project_created
+    ON public.tasks(project_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_company_created
+    ON public.tasks(company_id, created_at DESC);
+
+-- ProjectRepository.get_by_company: WHERE company_id ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_projects_company_created
+    ON public.projects(company_id, created_at DESC);
+
+-- PhotoRepository.get_all / ScheduleChangeRepository.get_all
+CREATE INDEX IF NOT EXISTS idx_photos_project_created
+    ON public.photos(project_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_schedule_changes_task_created
+    ON public.schedule_changes(task_id, created_at DESC);
+
+-- SubcontractorAssignmentRepository.get_by_project / get_by_subcontractor
+CREATE INDEX IF NOT EXISTS idx_sub_assignments_project_created
+    ON public.subcontractor_assignments(project_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sub_assignments_subcontractor_created
+    ON public.subcontractor_assignments(subcontractor_id, created_at DESC);
+
+-- Sub portal: WHERE assigned_to = $1 AND project_id = $2
+CREATE INDEX IF NOT EXISTS idx_subtasks_assigned_project
+    ON public.sub_tasks(assigned_to, project_id);
+
+-- Checklist trees: WHERE task_id / checklist_id = ANY($1) ORDER BY sort_order
+CREATE INDEX IF NOT EXISTS idx_sub_checklists_task_sort
+    ON public.sub_checklists(task_id, sort_order);
+CREATE INDEX IF NOT EXISTS idx_sub_checklist_items_checklist_sort
+    ON public.sub_checklist_items(checklist_id, sort_order);
+
+-- PM notifications: list without an is_read filter (ORDER BY created_at DESC);
+-- the is_read variant is served by idx_pm_notifications_recipient_read_created
+CREATE INDEX IF NOT EXISTS idx_pm_notifications_recipient_created
+    ON client_portal.pm_notifications(recipient_user_id, created_at DESC);
+
+-- Client issues list: WHERE project_id ORDER BY created_at DESC, with
+-- per-issue attachment counts/URLs answered from the index alone
+CREATE INDEX IF NOT EXISTS idx_issues_project_created
+    ON client_portal.issues(project_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_issue_attachments_issue
+    ON client_portal.issue_attachments(issue_id) INCLUDE (url);
+
+-- Forum thread view: WHERE thread_id ORDER BY created_at
+CREATE INDEX IF NOT EXISTS idx_forum_messages_thread_created
+    ON client_portal.forum_messages(thread_id, created_at);
+
+-- Agent get_installments: WHERE project_id ORDER BY due_date, display_order
+CREATE INDEX IF NOT EXISTS idx_payment_installments_project_due
+    ON client_portal.payment_installments(project_id, due_date, display_order);
+
+-- Agent project detail: material areas WHERE project_id ORDER BY sort_order
+CREATE INDEX IF NOT EXISTS idx_material_areas_project_sort
+    ON client_portal.material_areas(project_id, sort_order);
@@ -49,6 +49,13 @@ MIGRATIONS = [
     # Notification types
     "add_task_submitted_notification.sql",
 
+    # Agent lookups
+    "add_project_name_trgm_index.sql",
+
+    # Query workload indexes (see scripts/bench_query_indexes.py)
+    "add_workload_indexes.sql",
+    "add_object_reference_indexes.sql",
+
     # Seed data
     "seed_production_templates.sql",
 ]
@@ -13,7 +13,7 @@ from src.models import (
     ScheduleChange, ScheduleChangeCreate, ScheduleChangeUpdate,
     ProjectLog, Notification
 )
-from src.utils.data_conversion import to_camel_case, to_snake_case
+from src.utils.data_conversion import to_camel_case, to_snake_case, convert_rows
 
 class BaseRepository:
     """Base repository with common database operations."""
@@ -48,19 +48,19 @@ class ProjectRepository(BaseRepository):
     async def get_all(self) -> List[Dict[str, Any]]:
         """Get all projects."""
         query = f"SELECT * FROM {self.table_name} ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query)
-        return [self._normalize_status(self._convert_to_camel_case(dict(row))) for row in rows]
+        rows = await db_manager.read_query(query)
+        return [self._normalize_status(row) for row in convert_rows(rows)]
 
     async def get_by_company(self, company_id: str) -> List[Dict[str, Any]]:
         """Get projects filtered by company ID."""
         query = f"SELECT * FROM {self.table_name} WHERE company_id = $1 ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query, company_id)
-        return [self._normalize_status(self._convert_to_camel_case(dict(row))) for row in rows]
+        rows = await db_manager.read_query(query, company_id)
+        return [self._normalize_status(row) for row in convert_rows(rows)]
     
     async def get_by_id(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project by ID."""
         query = f"SELECT * FROM {self.table_name} WHERE id = $1"
-        row = await db_manager.execute_one(query, project_id)
+        row = await db_manager.read_one(query, project_id)
         if row:
             return Project(**self._normalize_status(self._convert_to_camel_case(dict(row))))
         return None
@@ -157,85 +157,23 @@ class ProjectRepository(BaseRepository):
         return None
     
     async def delete(self, project_id: str) -> bool:
-        """Delete a project with cascade deletion of all related data.
+        """Delete a project and everything that depends on it, in one transaction.
 
-        Deletes in reverse FK dependency order.  Error codes caught:
-          42P01 = undefined_table, 42703 = undefined_column
+        The delete order comes from the FK graph (see cascade_delete.py).
         """
+        from src.core.config import settings
+        from src.database.cascade_delete import get_delete_graph, purge
         from src.database.connection import get_db_pool
 
+        graph = await get_delete_graph()
         pool = await get_db_pool()
         try:
             async with pool.acquire() as connection:
                 async with connection.transaction():
-                    async def safe_delete(query: str):
-                        try:
-                            await connection.execute(query, project_id)
-                        except Exception as e:
-                            code = getattr(e, 'sqlstate', None) or getattr(e, 'code', None)
-                            if code not in ('42P01', '42703'):
-                                raise
-
-                    # === CLIENT PORTAL: leaf tables first ===
-                    # Payments — RESTRICT FKs require leaf-first order
-                    await safe_delete("DELETE FROM client_portal.payment_events WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.payment_receipts WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.invoices WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.payment_documents WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.payment_installments WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.payment_schedules WHERE project_id = $1")
-
-                    # Issues (comments/attachments CASCADE from issues)
-                    await safe_delete("DELETE FROM client_portal.issue_audit_log WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.issues WHERE project_id = $1")
-
-                    # Forum (messages/attachments CASCADE from threads)
-                    await safe_delete("DELETE FROM client_portal.forum_threads WHERE project_id = $1")
-
-                    # Materials (items CASCADE from areas)
-                    await safe_delete("DELETE FROM client_portal.material_items WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.material_areas WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.materials WHERE project_id = $1")
-
-                    # Stages (material_area_id SET NULL, stage_id SET NULL)
-                    await safe_delete("DELETE FROM client_portal.project_stages WHERE project_id = $1")
-
-                    # Legacy installments (files CASCADE from installments)
-                    await safe_delete("DELETE FROM client_portal.installment_files WHERE installment_id IN (SELECT id FROM client_portal.installments WHERE project_id = $1)")
-                    await safe_delete("DELETE FROM client_portal.installments WHERE project_id = $1")
-
-                    # Notifications & invitations
-                    await safe_delete("DELETE FROM client_portal.notification_settings WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.notifications WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.pm_notifications WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_portal.client_invitations WHERE project_id = $1")
-
-                    # === PUBLIC SCHEMA: NO ACTION FKs must be deleted before project ===
-                    await safe_delete("DELETE FROM schedule_changes WHERE task_id IN (SELECT id FROM tasks WHERE project_id = $1)")
-                    await safe_delete("DELETE FROM time_entries WHERE project_id = $1")
-                    await safe_delete("DELETE FROM change_orders WHERE project_id = $1")
-                    await safe_delete("DELETE FROM communications WHERE project_id = $1")
-                    await safe_delete("DELETE FROM subcontractor_assignments WHERE project_id = $1")
-                    await safe_delete("DELETE FROM project_assignments WHERE project_id = $1")
-                    await safe_delete("DELETE FROM invoices WHERE project_id = $1")
-                    await safe_delete("DELETE FROM tasks WHERE project_id = $1")
-                    await safe_delete("DELETE FROM photos WHERE project_id = $1")
-                    await safe_delete("DELETE FROM project_logs WHERE project_id = $1")
-                    await safe_delete("DELETE FROM project_health_metrics WHERE project_id = $1")
-                    await safe_delete("DELETE FROM risk_assessments WHERE project_id = $1")
-                    # Legacy client_* tables
-                    await safe_delete("DELETE FROM client_notification_settings WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_issues WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_materials WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_forum_messages WHERE project_id = $1")
-                    await safe_delete("DELETE FROM client_installments WHERE project_id = $1")
-
-                    # Finally delete the project
-                    result = await connection.execute(
-                        f"DELETE FROM {self.table_name} WHERE id = $1",
-                        project_id
+                    return await purge(
+                        connection, graph, "public.projects", project_id,
+                        batch_size=settings.cascade_delete_batch_size,
                     )
-                    return "DELETE 1" in result
         except Exception as e:
             import traceback
             print(f"Error deleting project {project_id}: {e}")
@@ -297,7 +235,7 @@ class TaskRepository(BaseRepository):
             param_count += 1
         
         query += " ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query, *params)
+        rows = await db_manager.read_query(query, *params)
         tasks = []
         for row in rows:
             try:
@@ -322,7 +260,7 @@ class TaskRepository(BaseRepository):
     async def get_by_id(self, task_id: str) -> Optional[Task]:
         """Get task by ID."""
         query = f"SELECT * FROM {self.table_name} WHERE id = $1"
-        row = await db_manager.execute_one(query, task_id)
+        row = await db_manager.read_one(query, task_id)
         if row:
             row_dict = dict(row)
             # Normalize status value (e.g., 'done' -> 'completed')
@@ -448,30 +386,86 @@ class PhotoRepository(BaseRepository):
     def __init__(self):
         super().__init__("photos")
     
-    async def get_all(self, project_id: Optional[str] = None, user_id: Optional[str] = None) -> List[Photo]:
-        """Get photos with optional filters."""
-        query = f"SELECT * FROM {self.table_name} WHERE 1=1"
-        params = []
-        param_count = 1
+    async def get_all(self, project_id: Optional[str] = None, user_id: Optional[str] = None,
+                      company_id: Optional[str] = None) -> List[Photo]:
+        """Get photos with optional filters.
+
+        When company_id is given, only photos whose project belongs to that
+        company are returned (resolved with a join, not per-photo lookups).
+        """
+        if company_id:
+            query = (
+                f"SELECT ph.* FROM {self.table_name} ph "
+                "JOIN projects p ON p.id = ph.project_id "
+                "WHERE p.company_id = $1"
+            )
+            params = [company_id]
+            param_count = 2
+            column_prefix = "ph."
+        else:
+            query = f"SELECT * FROM {self.table_name} WHERE 1=1"
+            params = []
+            param_count = 1
+            column_prefix = ""
         
         if project_id:
-            query += f" AND project_id = ${param_count}"
+            query += f" AND {column_prefix}project_id = ${param_count}"
             params.append(project_id)
             param_count += 1
         
         if user_id:
-            query += f" AND user_id = ${param_count}"
+            query += f" AND {column_prefix}user_id = ${param_count}"
             params.append(user_id)
             param_count += 1
         
-        query += " ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query, *params)
+        query += f" ORDER BY {column_prefix}created_at DESC"
+        rows = await db_manager.read_query(query, *params)
         return [Photo(**self._convert_to_camel_case(dict(row))) for row in rows]
     
+    async def get_access_info(self, photo_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get filename, project and owning company for many photos in one query."""
+        query = f"""
+            SELECT ph.id, ph.filename, ph.project_id, p.company_id
+            FROM {self.table_name} ph
+            LEFT JOIN projects p ON p.id = ph.project_id
+            WHERE ph.id = ANY($1)
+        """
+        rows = await db_manager.read_query(query, photo_ids)
+        return [dict(row) for row in rows]
+    
+    async def get_readable_object_ids(self, object_ids: List[str],
+                                      company_id: Optional[str] = None) -> List[str]:
+        """Object storage IDs among object_ids that a photo or log image references.
+
+        Only projects of company_id count when it is given (None = any
+        company, for root admins). Log images are stored as URLs ending in
+        the object ID (/api/objects/image/<id>). Each branch looks up the
+        requested IDs through an indexed expression (see
+        migrations/add_object_reference_indexes.sql).
+        """
+        query = f"""
+            SELECT DISTINCT refs.object_id
+            FROM (
+                SELECT split_part(ph.filename, '?', 1) AS object_id, ph.project_id
+                FROM {self.table_name} ph
+                WHERE split_part(ph.filename, '?', 1) = ANY($1::text[])
+                UNION ALL
+                SELECT img_id, pl.project_id
+                FROM project_logs pl
+                CROSS JOIN LATERAL unnest(project_log_image_ids(pl.images)) AS img_id
+                WHERE project_log_image_ids(pl.images) && $1::text[]
+            ) refs
+            JOIN projects p ON p.id = refs.project_id
+            WHERE refs.object_id = ANY($1::text[])
+              AND ($2::text IS NULL OR p.company_id = $2)
+        """
+        rows = await db_manager.read_query(query, object_ids, company_id)
+        return [row["object_id"] for row in rows]
+
     async def get_by_id(self, photo_id: str) -> Optional[Photo]:
         """Get photo by ID."""
         query = f"SELECT * FROM {self.table_name} WHERE id = $1"
-        row = await db_manager.execute_one(query, photo_id)
+        row = await db_manager.read_one(query, photo_id)
         if row:
             return Photo(**self._convert_to_camel_case(dict(row)))
         return None
@@ -532,7 +526,7 @@ class DashboardRepository(BaseRepository):
                     COALESCE(AVG(progress), 0) as average_progress
                 FROM projects{company_filter}
             """
-            return await db_manager.execute_one(q, *company_params)
+            return await db_manager.read_one(q, *company_params)
 
         async def _task_stats():
             q = f"""
@@ -543,7 +537,7 @@ class DashboardRepository(BaseRepository):
                     COUNT(*) FILTER (WHERE due_date < NOW() AND status != 'completed') as overdue_tasks
                 FROM tasks{company_filter}
             """
-            return await db_manager.execute_one(q, *company_params)
+            return await db_manager.read_one(q, *company_params)
 
         async def _photo_stats():
             if company_id:
@@ -555,7 +549,7 @@ class DashboardRepository(BaseRepository):
                     JOIN projects pr ON p.project_id = pr.id
                     WHERE pr.company_id = $1
                 """
-                return await db_manager.execute_one(q, company_id)
+                return await db_manager.read_one(q, company_id)
             else:
                 q = """
                     SELECT
@@ -563,7 +557,7 @@ class DashboardRepository(BaseRepository):
                         COUNT(*) FILTER (WHERE p.created_at >= NOW() - INTERVAL '7 days') as photos_this_week
                     FROM photos p
                 """
-                return await db_manager.execute_one(q)
+                return await db_manager.read_one(q)
 
         async def _user_stats():
             if company_id:
@@ -577,7 +571,7 @@ class DashboardRepository(BaseRepository):
                     LEFT JOIN roles r ON u.role_id = r.id
                     WHERE u.company_id = $1
                 """
-                return await db_manager.execute_one(q, company_id)
+                return await db_manager.read_one(q, company_id)
             else:
                 q = """
                     SELECT
@@ -588,7 +582,7 @@ class DashboardRepository(BaseRepository):
                     FROM users u
                     LEFT JOIN roles r ON u.role_id = r.id
                 """
-                return await db_manager.execute_one(q)
+                return await db_manager.read_one(q)
 
         project_row, task_row, photo_row, user_row = await asyncio.gather(
             _project_stats(), _task_stats(), _photo_stats(), _user_stats()
@@ -620,13 +614,13 @@ class ScheduleChangeRepository(BaseRepository):
             param_count += 1
         
         query += " ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query, *params)
+        rows = await db_manager.read_query(query, *params)
         return [ScheduleChange(**self._convert_to_camel_case(dict(row))) for row in rows]
     
     async def get_by_id(self, change_id: str) -> Optional[ScheduleChange]:
         """Get schedule change by ID."""
         query = f"SELECT * FROM {self.table_name} WHERE id = $1"
-        row = await db_manager.execute_one(query, change_id)
+        row = await db_manager.read_one(query, change_id)
         if row:
             return ScheduleChange(**self._convert_to_camel_case(dict(row)))
         return None
@@ -732,7 +726,7 @@ class UserRepository(BaseRepository):
             LEFT JOIN roles r ON u.role_id = r.id
             ORDER BY u.first_name, u.last_name
         """
-        rows = await db_manager.execute_query(query)
+        rows = await db_manager.read_query(query)
         return [User(**dict(row)) for row in rows]
     
     async def get_by_role(self, role: str) -> List["User"]:
@@ -743,7 +737,7 @@ class UserRepository(BaseRepository):
         if role == 'manager':
             role_lookup = 'project_manager'
         
-        role_row = await db_manager.execute_one("""
+        role_row = await db_manager.read_one("""
             SELECT id FROM roles 
             WHERE LOWER(role_name) = LOWER($1) OR LOWER(role_name) LIKE LOWER($2)
             LIMIT 1
@@ -763,7 +757,7 @@ class UserRepository(BaseRepository):
             WHERE u.role_id = $1 OR u.role ILIKE $2
             ORDER BY u.first_name, u.last_name
         """
-        rows = await db_manager.execute_query(query, role_row['id'], f'%{role}%')
+        rows = await db_manager.read_query(query, role_row['id'], f'%{role}%')
         return [User(**dict(row)) for row in rows]
     
     async def get_by_id(self, user_id: str) -> Optional["User"]:
@@ -779,7 +773,7 @@ class UserRepository(BaseRepository):
             LEFT JOIN roles r ON u.role_id = r.id
             WHERE u.id = $1
         """
-        row = await db_manager.execute_one(query, user_id)
+        row = await db_manager.read_one(query, user_id)
         if row:
             return User(**dict(row))
         return None
@@ -795,14 +789,14 @@ class SubcontractorAssignmentRepository(BaseRepository):
         """Get all subcontractor assignments."""
         from ..models.subcontractor_assignment import SubcontractorAssignment
         query = f"SELECT * FROM {self.table_name} ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        rows = await db_manager.read_query(query)
+        return convert_rows(rows)
     
     async def get_by_id(self, assignment_id: str) -> Optional[Dict[str, Any]]:
         """Get subcontractor assignment by ID."""
         from ..models.subcontractor_assignment import SubcontractorAssignment
         query = f"SELECT * FROM {self.table_name} WHERE id = $1"
-        row = await db_manager.execute_one(query, assignment_id)
+        row = await db_manager.read_one(query, assignment_id)
         if row:
             return self._convert_to_camel_case(dict(row))
         return None
@@ -872,12 +866,12 @@ class SubcontractorAssignmentRepository(BaseRepository):
         """Get all assignments for a specific subcontractor."""
         from ..models.subcontractor_assignment import SubcontractorAssignment
         query = f"SELECT * FROM {self.table_name} WHERE subcontractor_id = $1 ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query, subcontractor_id)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        rows = await db_manager.read_query(query, subcontractor_id)
+        return convert_rows(rows)
     
     async def get_by_project(self, project_id: str) -> List["SubcontractorAssignment"]:
         """Get all assignments for a specific project."""
         from ..models.subcontractor_assignment import SubcontractorAssignment
         query = f"SELECT * FROM {self.table_name} WHERE project_id = $1 ORDER BY created_at DESC"
-        rows = await db_manager.execute_query(query, project_id)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
\ No newline at end of file
+        rows = await db_manager.read_query(query, project_id)
+        return convert_rows(rows)
\ No newline at end of file
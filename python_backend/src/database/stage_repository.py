@@ -5,8 +5,8 @@ import uuid
 import json
 from datetime import datetime, date, timedelta, timezone
 from typing import List, Optional, Dict, Any
-from src.database.connection import db_manager, get_db_pool
-from src.utils.data_conversion import to_camel_case, to_snake_case
+from src.database.connection import current_unit_of_work, db_manager, get_db_pool
+from src.utils.data_conversion import to_camel_case, to_snake_case, convert_rows
 
 
 class StageTemplateRepository:
@@ -36,7 +36,7 @@ class StageTemplateRepository:
             GROUP BY t.id, t.name, t.description, t.category, t.created_at
             ORDER BY t.category, t.name
         """
-        rows = await db_manager.execute_query(query)
+        rows = await db_manager.read_query(query)
         results = []
         for row in rows:
             data = dict(row)
@@ -65,7 +65,7 @@ class StageTemplateRepository:
             WHERE t.id = $1
             GROUP BY t.id, t.name, t.description, t.category, t.created_at
         """
-        row = await db_manager.execute_one(query, template_id)
+        row = await db_manager.read_one(query, template_id)
         if row:
             data = dict(row)
             if isinstance(data.get('items'), str):
@@ -114,8 +114,8 @@ class ProjectStageRepository:
                      ps.created_at, ps.updated_at, ma.name
             ORDER BY ps.order_index
         """
-        rows = await db_manager.execute_query(query, project_id)
-        return [self._convert_to_camel_case(dict(row)) for row in rows]
+        rows = await db_manager.read_query(query, project_id)
+        return convert_rows(rows)
 
     async def get_by_id(self, stage_id: str) -> Optional[Dict[str, Any]]:
         """Get a single stage by ID."""
@@ -137,7 +137,7 @@ class ProjectStageRepository:
                      ps.material_area_id, ps.client_visible, ps.created_by,
                      ps.created_at, ps.updated_at, ma.name
         """
-        row = await db_manager.execute_one(query, stage_id)
+        row = await db_manager.read_one(query, stage_id)
         return self._convert_to_camel_case(dict(row)) if row else None
 
     async def _create_materials_for_stage(
@@ -232,7 +232,7 @@ class ProjectStageRepository:
         project_id = data.get('project_id')
         stage_name = data.get('name', '')
 
-        pool = await get_db_pool()
+        pool = current_unit_of_work() or await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
                 # Get the next available order_index for this project
@@ -290,7 +290,7 @@ class ProjectStageRepository:
         if not data and not materials:
             return await self.get_by_id(stage_id)
 
-        pool = await get_db_pool()
+        pool = current_unit_of_work() or await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
                 row = None
@@ -368,7 +368,7 @@ class ProjectStageRepository:
         neg_indices = [-(i + 1) for i in range(len(stage_ids))]
         final_indices = list(range(len(stage_ids)))
 
-        pool = await get_db_pool()
+        pool = current_unit_of_work() or await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
                 # Phase 1: Set all to negative indices (avoids unique constraint conflicts)
@@ -492,7 +492,7 @@ class ProjectStageRepository:
         areas_needed = set(mt['area_name'] for mt in material_templates)
         area_name_to_id = {}
 
-        pool = await get_db_pool()
+        pool = current_unit_of_work() or await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
                 now = datetime.now(timezone.utc)
@@ -573,7 +573,7 @@ class ProjectStageRepository:
         Shifts planned_start_date, planned_end_date, and finish_materials_due_date
         for stages with order_index > after_order_index. Only non-NULL dates are shifted.
         """
-        pool = await get_db_pool()
+        pool = current_unit_of_work() or await get_db_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
                 await conn.execute(
@@ -594,7 +594,7 @@ class ProjectStageRepository:
             SELECT COUNT(*) as count FROM client_portal.project_stages
             WHERE project_id = $1
         """
-        row = await db_manager.execute_one(query, project_id)
+        row = await db_manager.read_one(query, project_id)
         return row['count'] if row else 0
 
 
@@ -0,0 +1,98 @@
+"""
+Read-replica routing middleware.
+
+Binds each request to its session so db_manager can honor read-your-writes,
+and keeps mutating requests on the primary for their whole lifetime.
+
+The recent-write window is kept in two places. recent_writes lives in this
+process only, so on its own it would not survive a restart or be seen by
+the other workers. Successful mutating requests therefore also get a short
+RECENT_WRITE_COOKIE holding the window's end, and a request carrying an
+unexpired one reads from the primary whichever worker serves it. Clients
+that don't keep cookies, and writes made after a streamed response has
+started (agent chat), only have the per-process window.
+"""
+import math
+import time
+from urllib.parse import unquote
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from ..database.connection import (
+    DATABASE_REPLICA_URL,
+    DB_READ_YOUR_WRITES_SECONDS,
+    _pin_primary,
+    recent_writes,
+    reset_session_key,
+    set_session_key,
+)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Mutating endpoints that mostly read. Their writes go through db_manager,
+# which opens the session's read-your-writes window itself, so the rest of
+# the request (e.g. READ_ONLY agent tools) may still use the replica.
+REPLICA_SAFE_PATHS = {
+    "/api/v1/agent/chat",
+}
+
+# Holds the end of the read-your-writes window (Unix time) across workers
+RECENT_WRITE_COOKIE = "recent_write"
+
+
+def _session_key(request: Request):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        auth_header = request.headers.get("authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            session_id = auth_header[7:]
+    return unquote(session_id) if session_id else None
+
+
+def _recent_write_cookie_active(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(RECENT_WRITE_COOKIE, "")) > time.time()
+    except ValueError:
+        return False
+
+
+def _set_recent_write_cookie(response) -> None:
+    from ..api.auth import get_cookie_secure
+
+    response.set_cookie(
+        key=RECENT_WRITE_COOKIE,
+        value=str(math.ceil(time.time() + DB_READ_YOUR_WRITES_SECONDS)),
+        max_age=math.ceil(DB_READ_YOUR_WRITES_SECONDS),
+        httponly=True,
+        secure=get_cookie_secure(),
+        samesite="lax",
+    )
+
+
+class ReadRoutingMiddleware(BaseHTTPMiddleware):
+    """Route reads per request: session binding, primary pinning, recent-write window."""
+
+    async def dispatch(self, request: Request, call_next):
+        if not DATABASE_REPLICA_URL:
+            return await call_next(request)
+
+        session_key = _session_key(request)
+        mutating = request.method not in SAFE_METHODS
+        token = set_session_key(session_key)
+        pin = _pin_primary.set(
+            (mutating and request.url.path not in REPLICA_SAFE_PATHS)
+            or _recent_write_cookie_active(request)
+        )
+        try:
+            response = await call_next(request)
+        finally:
+            _pin_primary.reset(pin)
+            reset_session_key(token)
+
+        # Writes that bypass db_manager (raw pool transactions) still open the window
+        if mutating and response.status_code < 400:
+            if session_key:
+                recent_writes.mark(session_key)
+            _set_recent_write_cookie(response)
+        return response
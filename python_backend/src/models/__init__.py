@@ -73,6 +73,8 @@ __all__ = [
     
     # Photo models
     "Photo",
+    "PhotoWithUrl",
+    "PhotoSignedUrlRequest",
     "PhotoCreate",
     "PhotoStats",
     
@@ -32,6 +32,18 @@ class Photo(BaseEntity, PhotoBase):
     pass
 
 
+class PhotoWithUrl(Photo):
+    """Photo model with an optional inline file URL."""
+    signed_url: Optional[str] = Field(default=None, alias="signedUrl")
+
+
+class PhotoSignedUrlRequest(BaseModel):
+    """Batch signed URL request for photos."""
+    photo_ids: List[str] = Field(alias="photoIds", min_length=1)
+
+    model_config = {"populate_by_name": True}
+
+
 class PhotoStats(BaseModel):
     """Photo statistics model."""
     total_photos: int = Field(alias="totalPhotos")
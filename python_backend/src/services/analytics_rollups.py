@@ -0,0 +1,327 @@
+"""
+Per-company daily and weekly rollups of analytics_daily_stats.
+
+The admin analytics dashboard reads these instead of aggregating user-day
+rows on every load:
+
+- analytics_rollup_daily: one row per company per day with the day's
+  counters, its active user count and a HyperLogLog sketch of its users.
+- analytics_rollup_weekly: the same per ISO week (Monday start); its sketch
+  is the union of the week's daily sketches.
+
+Distinct users over any date range are estimated by merging the weekly
+sketches of the full weeks inside the range with the daily sketches of the
+days at its edges.
+
+Rollups are maintained incrementally by the analytics_rollup background job:
+each run re-aggregates only the company-days whose stats rows changed since
+the last run's watermark (plus their weeks).
+
+Building, merging and (de)serializing sketches is CPU work; the async entry
+points run it in a worker thread so the event loop keeps serving requests.
+"""
+
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.hyperloglog import HyperLogLog
+
+_STATE_NAME = "daily_stats"
+
+# Stats rows are re-read this far behind the watermark: updated_at is the
+# writer's transaction start, so a slow transaction can commit rows that are
+# older than the watermark set by a refresh that ran meanwhile
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+_COUNTERS = ("total_time_seconds", "agent_time_seconds", "app_time_seconds", "action_count", "login_count")
+
+
+@dataclass
+class Rollup:
+    """Counters and distinct-user sketch for one company over one day or week."""
+    company_id: str
+    period_start: date
+    active_users: int = 0
+    total_time_seconds: int = 0
+    agent_time_seconds: int = 0
+    app_time_seconds: int = 0
+    action_count: int = 0
+    login_count: int = 0
+    sketch: HyperLogLog = field(default_factory=HyperLogLog)
+
+    def add_stat(self, row: Dict[str, Any]) -> None:
+        """Fold in one analytics_daily_stats row (one user-day)."""
+        self.active_users += 1
+        for name in _COUNTERS:
+            setattr(self, name, getattr(self, name) + (row[name] or 0))
+        self.sketch.add(str(row["user_id"]))
+
+    def add_rollup(self, other: "Rollup") -> None:
+        """Fold in another period's rollup; active_users is left to count_users()."""
+        for name in _COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.sketch.merge(other.sketch)
+
+    def count_users(self) -> None:
+        """Set active_users from the sketch (once all rollups are folded in)."""
+        self.active_users = self.sketch.count()
+
+    def to_args(self) -> tuple:
+        return (
+            self.company_id, self.period_start, self.active_users,
+            *(getattr(self, name) for name in _COUNTERS), self.sketch.to_bytes(),
+        )
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Rollup":
+        return cls(
+            company_id=row["company_id"],
+            period_start=row["period_start"],
+            active_users=row["active_users"],
+            **{name: row[name] for name in _COUNTERS},
+            sketch=HyperLogLog.from_bytes(bytes(row["user_sketch"])),
+        )
+
+
+def week_start(day: date) -> date:
+    """Monday of the day's week (same as date_trunc('week', day))."""
+    return day - timedelta(days=day.weekday())
+
+
+def build_daily_rollups(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, date], Rollup]:
+    """Aggregate analytics_daily_stats rows into per company-day rollups."""
+    rollups: Dict[Tuple[str, date], Rollup] = {}
+    for row in rows:
+        key = (row["company_id"] or "", row["stat_date"])
+        if key not in rollups:
+            rollups[key] = Rollup(*key)
+        rollups[key].add_stat(row)
+    return rollups
+
+
+def build_weekly_rollups(daily: Iterable[Rollup]) -> Dict[Tuple[str, date], Rollup]:
+    """Merge daily rollups into per company-week rollups."""
+    rollups: Dict[Tuple[str, date], Rollup] = {}
+    for day in daily:
+        key = (day.company_id, week_start(day.period_start))
+        if key not in rollups:
+            rollups[key] = Rollup(*key)
+        rollups[key].add_rollup(day)
+    for rollup in rollups.values():
+        rollup.count_users()
+    return rollups
+
+
+def _weekly_from_rows(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, date], Rollup]:
+    return build_weekly_rollups(Rollup.from_row(r) for r in rows)
+
+
+def _upsert_args(rollups: Iterable[Rollup]) -> List[tuple]:
+    return [r.to_args() for r in rollups]
+
+
+def _rollups_from_rows(rows: Iterable[Dict[str, Any]]) -> List[Rollup]:
+    return [Rollup.from_row(r) for r in rows]
+
+
+def _avg_int(total: int, count: int) -> int:
+    """AVG(...)::int: numeric average rounded half away from zero."""
+    if not count:
+        return 0
+    return int((Decimal(total) / Decimal(count)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _day_summary(rollups: List[Rollup]) -> Dict[str, int]:
+    active = sum(r.active_users for r in rollups)
+    total_time = sum(r.total_time_seconds for r in rollups)
+    return {
+        "active_users": active,
+        "avg_time_seconds": _avg_int(total_time, active),
+        "total_actions": sum(r.action_count for r in rollups),
+        "total_logins": sum(r.login_count for r in rollups),
+        "agent_time_seconds": sum(r.agent_time_seconds for r in rollups),
+        "app_time_seconds": sum(r.app_time_seconds for r in rollups),
+    }
+
+
+def summarize_dashboard(
+    daily: List[Rollup],
+    weekly: List[Rollup],
+    start_date: date,
+    end_date: date,
+    today: date,
+) -> Dict[str, Any]:
+    """Dashboard overview and trends from rollups.
+
+    daily holds the range's daily rollups plus today's; weekly holds the
+    weekly rollups of full weeks inside the range. Counts of users on a day
+    are exact (each user has one stats row per day); distinct users over the
+    range are a sketch estimate.
+    """
+    by_date: Dict[date, List[Rollup]] = defaultdict(list)
+    for rollup in daily:
+        by_date[rollup.period_start].append(rollup)
+
+    today_summary = _day_summary(by_date.get(today, []))
+    in_range = sorted(d for d in by_date if start_date <= d <= end_date)
+    trends = [{"date": d.isoformat(), **_day_summary(by_date[d])} for d in in_range]
+
+    covered = set()
+    union = HyperLogLog()
+    for rollup in weekly:
+        union.merge(rollup.sketch)
+        covered.add(rollup.period_start)
+    for d in in_range:
+        if week_start(d) not in covered:
+            for rollup in by_date[d]:
+                union.merge(rollup.sketch)
+
+    return {
+        "today": {
+            "active_users": today_summary["active_users"],
+            "avg_time": today_summary["avg_time_seconds"],
+            "total_actions": today_summary["total_actions"],
+            "total_logins": today_summary["total_logins"],
+            "agent_time": today_summary["agent_time_seconds"],
+            "app_time": today_summary["app_time_seconds"],
+        },
+        "range": {
+            "active_users_in_range": union.count(),
+            "avg_daily_active": (
+                sum(t["active_users"] for t in trends) / len(trends) if trends else 0.0
+            ),
+        },
+        "trends": trends,
+    }
+
+
+# ==================== Database ====================
+
+_ROLLUP_COLUMNS = (
+    "active_users, total_time_seconds, agent_time_seconds, app_time_seconds, "
+    "action_count, login_count, user_sketch"
+)
+
+_UPSERT = """
+    INSERT INTO public.{table}
+        (company_id, {period}, active_users, total_time_seconds, agent_time_seconds,
+         app_time_seconds, action_count, login_count, user_sketch, updated_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, now())
+    ON CONFLICT (company_id, {period}) DO UPDATE SET
+        active_users = EXCLUDED.active_users,
+        total_time_seconds = EXCLUDED.total_time_seconds,
+        agent_time_seconds = EXCLUDED.agent_time_seconds,
+        app_time_seconds = EXCLUDED.app_time_seconds,
+        action_count = EXCLUDED.action_count,
+        login_count = EXCLUDED.login_count,
+        user_sketch = EXCLUDED.user_sketch,
+        updated_at = now()
+"""
+_UPSERT_DAILY = _UPSERT.format(table="analytics_rollup_daily", period="stat_date")
+_UPSERT_WEEKLY = _UPSERT.format(table="analytics_rollup_weekly", period="week_start")
+
+_CHANGED_DAYS = """
+    SELECT DISTINCT COALESCE(company_id, '') AS company_id, stat_date
+    FROM public.analytics_daily_stats
+    WHERE updated_at > COALESCE($1::timestamptz, '-infinity')
+"""
+
+_STATS_FOR_DAYS = """
+    SELECT ds.user_id, COALESCE(ds.company_id, '') AS company_id, ds.stat_date,
+           ds.total_time_seconds, ds.agent_time_seconds, ds.app_time_seconds,
+           ds.action_count, ds.login_count
+    FROM public.analytics_daily_stats ds
+    JOIN unnest($1::varchar[], $2::date[]) AS d(company_id, stat_date)
+      ON COALESCE(ds.company_id, '') = d.company_id AND ds.stat_date = d.stat_date
+"""
+
+_DAILY_FOR_WEEKS = f"""
+    SELECT r.company_id, r.stat_date AS period_start, {_ROLLUP_COLUMNS}
+    FROM public.analytics_rollup_daily r
+    JOIN unnest($1::varchar[], $2::date[]) AS w(company_id, week_start)
+      ON r.company_id = w.company_id
+     AND r.stat_date >= w.week_start AND r.stat_date < w.week_start + 7
+"""
+
+
+async def refresh_rollups(conn, max_age: Optional[timedelta] = None) -> Dict[str, int]:
+    """Re-aggregate the company-days (and weeks) changed since the last refresh.
+
+    With max_age, does nothing if the last refresh is more recent than that.
+    Concurrent refreshes are serialized on the state row.
+    """
+    async with conn.transaction():
+        await conn.execute(
+            "INSERT INTO public.analytics_rollup_state (name) VALUES ($1) ON CONFLICT (name) DO NOTHING",
+            _STATE_NAME,
+        )
+        state = await conn.fetchrow(
+            "SELECT watermark, now() AS now FROM public.analytics_rollup_state WHERE name = $1 FOR UPDATE",
+            _STATE_NAME,
+        )
+        watermark: Optional[datetime] = state["watermark"]
+        if max_age is not None and watermark is not None and state["now"] - watermark < max_age:
+            return {"days": 0, "weeks": 0}
+
+        since = watermark - WATERMARK_OVERLAP if watermark is not None else None
+        changed = [(r["company_id"], r["stat_date"]) for r in await conn.fetch(_CHANGED_DAYS, since)]
+        weekly: Dict[Tuple[str, date], Rollup] = {}
+        if changed:
+            companies, days = [c for c, _ in changed], [d for _, d in changed]
+            stats = await conn.fetch(_STATS_FOR_DAYS, companies, days)
+            daily = await asyncio.to_thread(build_daily_rollups, stats)
+            await conn.executemany(_UPSERT_DAILY, await asyncio.to_thread(_upsert_args, daily.values()))
+
+            weeks = sorted({(c, week_start(d)) for c, d in changed})
+            rows = await conn.fetch(_DAILY_FOR_WEEKS, [c for c, _ in weeks], [w for _, w in weeks])
+            weekly = await asyncio.to_thread(_weekly_from_rows, rows)
+            await conn.executemany(_UPSERT_WEEKLY, await asyncio.to_thread(_upsert_args, weekly.values()))
+
+        await conn.execute(
+            "UPDATE public.analytics_rollup_state SET watermark = $2 WHERE name = $1",
+            _STATE_NAME, state["now"],
+        )
+    return {"days": len(changed), "weeks": len(weekly)}
+
+
+async def load_dashboard_rollups(
+    conn,
+    start_date: date,
+    end_date: date,
+    today: date,
+    company_id: Optional[str] = None,
+) -> Tuple[List[Rollup], List[Rollup]]:
+    """Daily rollups for the range and today, weekly rollups of full weeks in range."""
+    daily_params: list = [start_date, end_date, today]
+    weekly_params: list = [start_date, end_date]
+    daily_filter = weekly_filter = ""
+    if company_id:
+        daily_params.append(company_id)
+        weekly_params.append(company_id)
+        daily_filter, weekly_filter = " AND company_id = $4", " AND company_id = $3"
+    daily_rows = await conn.fetch(
+        f"""
+        SELECT company_id, stat_date AS period_start, {_ROLLUP_COLUMNS}
+        FROM public.analytics_rollup_daily
+        WHERE (stat_date BETWEEN $1 AND $2 OR stat_date = $3)
+        {daily_filter}
+        """,
+        *daily_params,
+    )
+    weekly_rows = await conn.fetch(
+        f"""
+        SELECT company_id, week_start AS period_start, {_ROLLUP_COLUMNS}
+        FROM public.analytics_rollup_weekly
+        WHERE week_start >= $1 AND week_start + 6 <= $2
+        {weekly_filter}
+        """,
+        *weekly_params,
+    )
+    return (
+        await asyncio.to_thread(_rollups_from_rows, daily_rows),
+        await asyncio.to_thread(_rollups_from_rows, weekly_rows),
+    )
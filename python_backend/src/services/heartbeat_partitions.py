@@ -0,0 +1,145 @@
+"""
+Daily partitions for public.analytics_heartbeats.
+
+The heartbeat table is range-partitioned on created_at with one partition
+per UTC day (analytics_heartbeats_pYYYYMMDD), plus a DEFAULT partition that
+catches rows if maintenance ever falls behind. The app owns the partitions:
+the hourly heartbeat maintenance job creates the next few days ahead and
+drops whole partitions once they are past the retention period, so
+retention never runs a bulk DELETE.
+
+A table created before partitioning is attached as one partition
+(analytics_heartbeats_legacy) covering everything up to the switch, and is
+dropped like any other partition once it ages out.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PARENT = "analytics_heartbeats"
+DEFAULT_PARTITION = "analytics_heartbeats_default"
+
+_LIST_PARTITIONS = """
+    SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    JOIN pg_namespace n ON n.oid = p.relnamespace
+    WHERE n.nspname = 'public' AND p.relname = 'analytics_heartbeats'
+"""
+
+_BOUND = re.compile(r"FROM \((MINVALUE|'[^']*')\) TO \((MAXVALUE|'[^']*')\)")
+_NAME = re.compile(r"^analytics_heartbeats_[a-z0-9_]+$")
+
+
+@dataclass
+class Partition:
+    name: str
+    lower: Optional[datetime]  # None for MINVALUE
+    upper: Optional[datetime]  # None for MAXVALUE
+    is_default: bool = False
+
+    def overlaps(self, lower: datetime, upper: datetime) -> bool:
+        if self.is_default:
+            return False
+        return (self.lower is None or self.lower < upper) and (self.upper is None or lower < self.upper)
+
+
+def _bound_value(text: str) -> Optional[datetime]:
+    if text in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(text.strip("'"))
+
+
+def parse_partition(name: str, bound: str) -> Optional[Partition]:
+    """Partition from its pg_get_expr(relpartbound) text; None if unrecognized."""
+    if bound.strip() == "DEFAULT":
+        return Partition(name, None, None, is_default=True)
+    match = _BOUND.search(bound)
+    if not match:
+        return None
+    return Partition(name, _bound_value(match.group(1)), _bound_value(match.group(2)))
+
+
+def day_bounds(day: date) -> tuple:
+    start = datetime.combine(day, time(0), tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT}_p{day:%Y%m%d}"
+
+
+def days_to_create(existing: List[Partition], today: date, days_ahead: int) -> List[date]:
+    """Days from today through today + days_ahead with no partition covering them."""
+    missing = []
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        lower, upper = day_bounds(day)
+        if not any(p.overlaps(lower, upper) for p in existing):
+            missing.append(day)
+    return missing
+
+
+def expired_partitions(existing: List[Partition], cutoff: datetime) -> List[str]:
+    """Partitions whose whole range is older than cutoff."""
+    return sorted(
+        p.name for p in existing
+        if not p.is_default and p.upper is not None and p.upper <= cutoff
+    )
+
+
+async def list_partitions(conn) -> List[Partition]:
+    partitions = []
+    for row in await conn.fetch(_LIST_PARTITIONS):
+        partition = parse_partition(row["name"], row["bound"])
+        if partition:
+            partitions.append(partition)
+        else:
+            logger.warning(f"Unrecognized heartbeat partition bound for {row['name']}: {row['bound']}")
+    return partitions
+
+
+async def maintain_heartbeat_partitions(
+    conn,
+    retention_days: int,
+    days_ahead: int = 3,
+    today: Optional[date] = None,
+) -> Dict[str, List[str]]:
+    """Create upcoming daily partitions and drop the ones past retention."""
+    today = today or datetime.now(timezone.utc).date()
+    existing = await list_partitions(conn)
+    created, dropped = [], []
+
+    for day in days_to_create(existing, today, days_ahead):
+        lower, upper = day_bounds(day)
+        name = partition_name(day)
+        try:
+            await conn.execute(
+                f'CREATE TABLE IF NOT EXISTS public."{name}" PARTITION OF public.{PARENT} '
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            created.append(name)
+        except Exception as e:
+            # e.g. the default partition already holds rows for that day
+            logger.warning(f"Could not create heartbeat partition {name}: {e}")
+
+    cutoff, _ = day_bounds(today - timedelta(days=retention_days))
+    for name in expired_partitions(existing, cutoff):
+        if not _NAME.match(name):
+            continue
+        await conn.execute(f'DROP TABLE IF EXISTS public."{name}"')
+        dropped.append(name)
+
+    if any(p.is_default for p in existing):
+        # Normally empty; only holds rows written while maintenance was behind
+        await conn.execute(f"DELETE FROM public.{DEFAULT_PARTITION} WHERE created_at < $1", cutoff)
+
+    if created or dropped:
+        logger.info(f"Heartbeat partitions: created {created}, dropped {dropped}")
+    return {"created": created, "dropped": dropped}
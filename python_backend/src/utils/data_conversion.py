@@ -1,34 +1,128 @@
 """
 Data conversion utilities for camelCase/snake_case transformation.
+
+Key translation is memoized: the key universe is the set of column names
+and request fields (a few hundred strings), so each key is converted once
+and then served from a bounded LRU table. Nested structures are walked
+iteratively with an explicit stack, so deep payloads never hit the
+recursion limit.
 """
 import re
+from functools import lru_cache
 from uuid import UUID
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, Callable, Iterable, List, Mapping, Union
+
+# Bound on each key translation table. Comfortably above the number of
+# distinct column names so steady-state traffic is all cache hits, while a
+# client sending arbitrary keys cannot grow memory without limit.
+KEY_CACHE_SIZE = 4096
+
+# Insert underscore before uppercase letters (except at start)
+_SNAKE_BOUNDARY_RE = re.compile('([a-z0-9])([A-Z])')
+
+# Value types returned untouched by every converter (checked by exact type)
+_PASSTHROUGH_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def camel_key(key: str) -> str:
+    """Convert a single snake_case key to camelCase (memoized)."""
+    components = key.split('_')
+    return components[0] + ''.join(word.capitalize() for word in components[1:])
+
 
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def snake_key(key: str) -> str:
+    """Convert a single camelCase key to snake_case (memoized)."""
+    return _SNAKE_BOUNDARY_RE.sub(r'\1_\2', key).lower()
 
-def _convert_value(value: Any) -> Any:
-    """Convert a value, handling UUIDs and nested structures."""
-    if isinstance(value, UUID):
-        return str(value)
-    elif isinstance(value, dict):
-        return to_camel_case(value)
-    elif isinstance(value, list):
-        return [_convert_value(item) for item in value]
-    return value
+
+def _convert_tree_to_camel(root: Union[Dict[str, Any], List[Any]]) -> Union[Dict[str, Any], List[Any]]:
+    """
+    Convert a nested dict/list structure to camelCase without recursion.
+
+    Keys of every dict are translated, UUIDs become strings, and lists are
+    walked at any depth (including lists of lists).
+    """
+    result: Any = {} if isinstance(root, dict) else []
+    stack = [(root, result)]
+    while stack:
+        source, target = stack.pop()
+        if isinstance(source, dict):
+            for key, value in source.items():
+                new_key = camel_key(key) if isinstance(key, str) else key
+                if type(value) in _PASSTHROUGH_TYPES:
+                    target[new_key] = value
+                elif isinstance(value, UUID):
+                    target[new_key] = str(value)
+                elif isinstance(value, dict):
+                    child: Any = {}
+                    target[new_key] = child
+                    stack.append((value, child))
+                elif isinstance(value, list):
+                    child = []
+                    target[new_key] = child
+                    stack.append((value, child))
+                else:
+                    target[new_key] = value
+        else:
+            for item in source:
+                if type(item) in _PASSTHROUGH_TYPES:
+                    target.append(item)
+                elif isinstance(item, UUID):
+                    target.append(str(item))
+                elif isinstance(item, dict):
+                    child = {}
+                    target.append(child)
+                    stack.append((item, child))
+                elif isinstance(item, list):
+                    child = []
+                    target.append(child)
+                    stack.append((item, child))
+                else:
+                    target.append(item)
+    return result
+
+
+def _convert_tree_to_snake(root: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a nested dict structure to snake_case without recursion.
+
+    Dicts nested in dicts and dicts directly inside lists are converted;
+    other list items (including nested lists) are kept as-is.
+    """
+    result: Dict[str, Any] = {}
+    stack = [(root, result)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in source.items():
+            new_key = snake_key(key) if isinstance(key, str) else key
+            if isinstance(value, dict):
+                child: Dict[str, Any] = {}
+                target[new_key] = child
+                stack.append((value, child))
+            elif isinstance(value, list):
+                items = []
+                for item in value:
+                    if isinstance(item, dict):
+                        child = {}
+                        items.append(child)
+                        stack.append((item, child))
+                    else:
+                        items.append(item)
+                target[new_key] = items
+            else:
+                target[new_key] = value
+    return result
 
 
 def to_camel_case(data: Union[Dict[str, Any], str]) -> Union[Dict[str, Any], str]:
     """Convert snake_case to camelCase and UUID objects to strings."""
     if isinstance(data, str):
-        components = data.split('_')
-        return components[0] + ''.join(word.capitalize() for word in components[1:])
+        return camel_key(data)
 
     if isinstance(data, dict):
-        converted = {}
-        for key, value in data.items():
-            camel_key = to_camel_case(key) if isinstance(key, str) else key
-            converted[camel_key] = _convert_value(value)
-        return converted
+        return _convert_tree_to_camel(data)
 
     return data
 
@@ -36,23 +130,65 @@ def to_camel_case(data: Union[Dict[str, Any], str]) -> Union[Dict[str, Any], str
 def to_snake_case(data: Union[Dict[str, Any], str]) -> Union[Dict[str, Any], str]:
     """Convert camelCase to snake_case."""
     if isinstance(data, str):
-        # Insert underscore before uppercase letters (except at start)
-        s1 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', data)
-        return s1.lower()
-    
+        return snake_key(data)
+
     if isinstance(data, dict):
-        converted = {}
-        for key, value in data.items():
-            snake_key = to_snake_case(key) if isinstance(key, str) else key
-            if isinstance(value, dict):
-                converted[snake_key] = to_snake_case(value)
+        return _convert_tree_to_snake(data)
+
+    return data
+
+
+def convert_rows(rows: Iterable[Mapping[str, Any]], case: str = "camel") -> List[Dict[str, Any]]:
+    """
+    Bulk-convert a list of homogeneous rows (dicts or asyncpg Records).
+
+    The key mapping is built once from the first row and reused for the
+    rest, so per-row work is a dict lookup per key instead of a string
+    transformation. Rows with extra keys still convert correctly.
+    Produces the same output as calling to_camel_case/to_snake_case on
+    each row.
+    """
+    if case == "camel":
+        key_fn: Callable[[str], str] = camel_key
+    elif case == "snake":
+        key_fn = snake_key
+    else:
+        raise ValueError(f"Unknown case '{case}', expected 'camel' or 'snake'")
+
+    key_map: Dict[Any, Any] = {}
+    converted: List[Dict[str, Any]] = []
+    for row in rows:
+        if not key_map:
+            key_map = {
+                key: key_fn(key) if isinstance(key, str) else key
+                for key in row.keys()
+            }
+        out: Dict[str, Any] = {}
+        for key, value in row.items():
+            new_key = key_map.get(key)
+            if new_key is None:
+                new_key = key_fn(key) if isinstance(key, str) else key
+                key_map[key] = new_key
+            if type(value) in _PASSTHROUGH_TYPES:
+                out[new_key] = value
+            elif case == "camel":
+                if isinstance(value, UUID):
+                    out[new_key] = str(value)
+                elif isinstance(value, (dict, list)):
+                    out[new_key] = _convert_tree_to_camel(value)
+                else:
+                    out[new_key] = value
+            elif isinstance(value, dict):
+                out[new_key] = _convert_tree_to_snake(value)
             elif isinstance(value, list):
-                converted[snake_key] = [to_snake_case(item) if isinstance(item, dict) else item for item in value]
+                out[new_key] = [
+                    _convert_tree_to_snake(item) if isinstance(item, dict) else item
+                    for item in value
+                ]
             else:
-                converted[snake_key] = value
-        return converted
-    
-    return data
+                out[new_key] = value
+        converted.append(out)
+    return converted
 
 
 def convert_response_to_camel_case(data: Any) -> Any:
@@ -70,4 +206,4 @@ def convert_request_to_snake_case(data: Any) -> Any:
         return to_snake_case(data)
     elif isinstance(data, list):
         return [to_snake_case(item) if isinstance(item, dict) else item for item in data]
-    return data
\ No newline at end of file
+    return data
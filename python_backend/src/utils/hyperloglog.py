@@ -0,0 +1,128 @@
+"""
+HyperLogLog distinct-count sketches.
+
+A sketch keeps 2**precision one-byte registers, each holding the largest
+"leading zeros + 1" seen among the hashes routed to it. Two sketches merge by
+taking the register-wise maximum, so the distinct users of any date range
+can be estimated by merging per-day sketches, without revisiting raw rows.
+With the default precision of 14 (16384 registers) the standard error is
+about 0.8%; small sets use linear counting, which is off only when two
+values land in the same register.
+
+Serialized sketches start with a format byte: sparse sketches (few
+registers set) store (index, value) pairs, dense ones every register.
+
+The registers are processed a whole array at a time rather than one byte per
+Python step: merge takes the byte-wise maximum with big-integer arithmetic,
+count works from a histogram of register values, and (de)serialization
+only visits the registers that are set.
+"""
+
+import hashlib
+import math
+import re
+import struct
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Optional
+
+DEFAULT_PRECISION = 14
+
+_SPARSE = 1
+_DENSE = 2
+
+
+_NONZERO = re.compile(b"[^\\x00]")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+@lru_cache(maxsize=None)
+def _high_bits(m: int) -> int:
+    """An m-byte integer with the top bit of every byte set."""
+    return int.from_bytes(b"\x80" * m, "big")
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytearray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    @classmethod
+    def of(cls, values: Iterable[str], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        sketch = cls(precision)
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def add(self, value: str) -> None:
+        h = _hash64(value)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch into this one (in place) and return self."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        if other.registers.count(0) == self.m:
+            return self
+        # Byte-wise max: registers stay below 0x80, so (a | 0x80) - b never
+        # borrows across bytes and keeps the top bit exactly where a >= b
+        a = int.from_bytes(self.registers, "big")
+        b = int.from_bytes(other.registers, "big")
+        high = _high_bits(self.m)
+        keep_a = ((((a | high) - b) & high) >> 7) * 0xFF
+        merged = (a & keep_a) | (b & ~keep_a)
+        self.registers = bytearray(merged.to_bytes(self.m, "big"))
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values added."""
+        m = self.m
+        zeros = self.registers.count(0)
+        if zeros == m:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / m)
+        # Histogram of register values, lowest first, until every register is counted
+        harmonic, remaining, rank = 0.0, m, 0
+        while remaining:
+            n = self.registers.count(rank)
+            harmonic += n * 2.0 ** -rank
+            remaining -= n
+            rank += 1
+        estimate = alpha * m * m / harmonic
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        registers = self.registers
+        if (self.m - registers.count(0)) * 3 < self.m:
+            indexes = [match.start() for match in _NONZERO.finditer(registers)]
+            body = struct.pack(f">{'HB' * len(indexes)}", *chain.from_iterable((i, registers[i]) for i in indexes))
+            return bytes([_SPARSE, self.precision]) + body
+        return bytes([_DENSE, self.precision]) + bytes(registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        kind, precision = data[0], data[1]
+        sketch = cls(precision)
+        if kind == _SPARSE:
+            registers = sketch.registers
+            for index, rank in struct.iter_unpack(">HB", memoryview(data)[2:]):
+                registers[index] = rank
+        elif kind == _DENSE:
+            sketch.registers = bytearray(data[2:2 + sketch.m])
+        else:
+            raise ValueError(f"Unknown sketch format {kind}")
+        return sketch
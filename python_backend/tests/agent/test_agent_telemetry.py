@@ -0,0 +1,225 @@
+"""
+Tests for repositories/telemetry.py
+
+Tests queueing, batching, ordering and shutdown delivery of agent audit
+records, and that a full agent turn no longer waits on those writes.
+"""
+
+import asyncio
+import time
+from typing import List
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.agent.core.context_window import ContextWindow
+from src.agent.repositories.telemetry import (
+    AgentTelemetryWriter,
+    MESSAGE,
+    METRIC,
+    TOOL_CALL,
+    TOOL_CALL_UPDATE,
+    TelemetryRecord,
+    coalesce_records,
+)
+
+SINK_DELAY = 0.2
+
+
+class RecordingSink:
+    """Collects written batches; each write takes `delay` seconds."""
+
+    def __init__(self, delay: float = 0.0, fail_first: int = 0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.batches: List[List[TelemetryRecord]] = []
+
+    async def write(self, records):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_first:
+            self.fail_first -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(records))
+
+    @property
+    def records(self) -> List[TelemetryRecord]:
+        return [r for batch in self.batches for r in batch]
+
+
+class TestAgentTelemetryWriter:
+
+    @pytest.mark.asyncio
+    async def test_producers_do_not_wait_for_sink(self):
+        sink = RecordingSink(delay=SINK_DELAY)
+        writer = AgentTelemetryWriter(sink=sink, flush_interval=0.01)
+
+        start = time.perf_counter()
+        message_id = writer.record_message("conv-1", "user", "hi")
+        writer.record_metric("company-123", "conversation_latency", 10)
+        elapsed = time.perf_counter() - start
+
+        assert message_id
+        assert elapsed < SINK_DELAY / 10
+        assert sink.records == []
+        await writer.close()
+        assert [r.kind for r in sink.records] == [MESSAGE, METRIC]
+
+    @pytest.mark.asyncio
+    async def test_preserves_order_within_conversation(self):
+        sink = RecordingSink()
+        writer = AgentTelemetryWriter(sink=sink, batch_size=2)
+
+        message_id = writer.record_message("conv-1", "user", "show tasks")
+        tool_call_id = writer.record_tool_call(
+            message_id, "conv-1", "user-1", "get_tasks", {}, "read_only",
+        )
+        writer.update_tool_call(tool_call_id, "conv-1", execution_status="success")
+        writer.record_message("conv-1", "assistant", "Here are your tasks")
+        await writer.flush()
+
+        kinds = [r.kind for r in sink.records]
+        assert kinds == [MESSAGE, TOOL_CALL, TOOL_CALL_UPDATE, MESSAGE]
+        assert sink.records[1].values["message_id"] == message_id
+        assert len(sink.batches) == 2
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_batches_up_to_batch_size(self):
+        sink = RecordingSink()
+        writer = AgentTelemetryWriter(sink=sink, batch_size=50)
+        for i in range(120):
+            writer.record_metric("company-123", "prompt_tokens", i)
+        await writer.flush()
+
+        assert [len(b) for b in sink.batches] == [50, 50, 20]
+        assert writer.stats()["written"] == 120
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_wait_for_conversation_flushes_pending_rows(self):
+        sink = RecordingSink()
+        writer = AgentTelemetryWriter(sink=sink, flush_interval=60)
+        writer.record_message("conv-1", "user", "hi")
+
+        await writer.wait_for_conversation("conv-2")
+        assert sink.records == []
+
+        await writer.wait_for_conversation("conv-1")
+        assert len(sink.records) == 1
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_wait_for_conversation_waits_for_in_flight_batch(self):
+        sink = RecordingSink(delay=SINK_DELAY)
+        writer = AgentTelemetryWriter(sink=sink, flush_interval=0.01)
+        writer.record_message("conv-1", "user", "hi")
+
+        # Let the background worker pop the batch and start its slow write
+        await asyncio.sleep(0.05)
+        assert writer.stats()["queued"] == 0 and sink.records == []
+
+        await writer.wait_for_conversation("conv-1")
+        assert len(sink.records) == 1
+
+        writer.record_message("conv-1", "assistant", "hello")
+        await asyncio.sleep(0.05)
+        await writer.flush()
+        assert len(sink.records) == 2
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_delivers_everything(self):
+        sink = RecordingSink(delay=0.01)
+        writer = AgentTelemetryWriter(sink=sink, batch_size=3, flush_interval=60)
+        for i in range(10):
+            writer.record_message("conv-1", "user", f"message {i}")
+        await writer.close()
+
+        assert [r.values["content"] for r in sink.records] == [f"message {i}" for i in range(10)]
+        assert writer.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_block_later_writes(self):
+        sink = RecordingSink(fail_first=1)
+        writer = AgentTelemetryWriter(sink=sink, batch_size=1)
+        writer.record_metric("company-123", "tool_calls", 1)
+        writer.record_metric("company-123", "tool_calls", 2)
+        await writer.flush()
+
+        assert [r.values["metric_value"] for r in sink.records] == [2]
+        assert writer.stats()["failed_batches"] == 1
+        await writer.close()
+
+
+class TestCoalesceRecords:
+
+    def test_update_folds_into_insert_in_same_batch(self):
+        records = [
+            TelemetryRecord(TOOL_CALL, "c1", {"id": "t1", "execution_status": "pending"}),
+            TelemetryRecord(TOOL_CALL_UPDATE, "c1", {
+                "id": "t1", "execution_status": "success", "tool_output": {"n": 1}, "error_message": None,
+            }),
+        ]
+        result = coalesce_records(records)
+
+        assert len(result) == 1
+        assert result[0].values["execution_status"] == "success"
+        assert result[0].values["tool_output"] == {"n": 1}
+        # The queued record itself is not mutated
+        assert records[0].values["execution_status"] == "pending"
+
+    def test_update_without_insert_is_kept(self):
+        records = [TelemetryRecord(TOOL_CALL_UPDATE, "c1", {"id": "t1", "execution_status": "failed"})]
+        assert coalesce_records(records) == records
+
+
+class StubLLM:
+    """LLM provider that streams a fixed reply immediately."""
+
+    async def chat_completion(self, **kwargs):
+        yield {"type": "content", "content": "All 3 tasks are on track."}
+        yield {"type": "stop"}
+
+
+class TestTurnLatency:
+    """End-to-end turn latency with a stub LLM and a slow database sink."""
+
+    @pytest.mark.asyncio
+    async def test_turn_does_not_wait_on_audit_writes(self, admin_context):
+        from src.agent.core import orchestrator as orchestrator_module
+
+        sink = RecordingSink(delay=SINK_DELAY)
+        writer = AgentTelemetryWriter(sink=sink, flush_interval=0.01)
+
+        with patch.object(orchestrator_module, "agent_telemetry", writer), \
+             patch.object(orchestrator_module, "get_cached_llm_provider", return_value=StubLLM()), \
+             patch.object(orchestrator_module.agent_repo, "create_conversation",
+                          AsyncMock(return_value={"id": "conv-1"})), \
+             patch.object(orchestrator_module.context_builder, "build_system_prompt",
+                          AsyncMock(return_value="system")), \
+             patch.object(orchestrator_module.context_window_manager, "build",
+                          AsyncMock(return_value=ContextWindow())), \
+             patch.object(orchestrator_module.intent_classifier, "schedule_refresh"):
+            start = time.perf_counter()
+            events = [
+                event async for event in orchestrator_module.agent_orchestrator.process_message(
+                    message="How are my tasks?",
+                    conversation_id=None,
+                    project_id=None,
+                    user_context=admin_context,
+                )
+            ]
+            turn_seconds = time.perf_counter() - start
+
+        done = events[-1]
+        assert done["type"] == "done"
+        # Messages and metrics queued; none written during the turn
+        assert turn_seconds < SINK_DELAY
+        assert sink.records == []
+
+        await writer.close()
+        kinds = [r.kind for r in sink.records]
+        assert kinds[:2] == [MESSAGE, MESSAGE]
+        assert set(kinds[2:]) == {METRIC}
+        assert sink.records[1].values["id"] == done["data"]["message_id"]
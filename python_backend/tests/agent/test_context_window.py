@@ -0,0 +1,164 @@
+"""
+Tests for context_window.py
+
+Tests token-budgeted history selection and the rolling summary.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from src.agent.core.context_window import (
+    ContextWindowManager,
+    estimate_message_tokens,
+    estimate_tokens,
+)
+
+
+class FakeAgentRepo:
+    """In-memory stand-in for the message/summary queries."""
+
+    def __init__(self, messages: List[Dict[str, Any]]):
+        self.messages = messages
+        self.summary: Optional[Dict[str, Any]] = None
+        self.between_calls = 0
+        self.largest_fetch = 0
+
+    async def get_recent_messages(self, conversation_id, limit=60):
+        return [dict(m) for m in self.messages[-limit:]]
+
+    async def get_messages_between(self, conversation_id, after, before, limit=None):
+        self.between_calls += 1
+        rows = [
+            dict(m) for m in self.messages
+            if (after is None or m["created_at"] > after) and m["created_at"] < before
+        ]
+        if limit:
+            rows = rows[-limit:]
+        self.largest_fetch = max(self.largest_fetch, len(rows))
+        return rows
+
+    async def get_context_summary(self, conversation_id):
+        return self.summary
+
+    async def save_context_summary(self, conversation_id, summary):
+        self.summary = summary
+
+
+def _conversation(turns: int, size: int = 400) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"message {i} " + "x" * size,
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(turns)
+    ]
+
+
+class TestTokenEstimates:
+    """Heuristic token counting."""
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+    def test_message_overhead(self):
+        assert estimate_message_tokens({"role": "user", "content": "abcd"}) == 5
+
+
+class TestContextWindow:
+    """Selection of recent turns and summary maintenance."""
+
+    @pytest.mark.asyncio
+    async def test_short_conversation_fits_entirely(self):
+        repo = FakeAgentRepo(_conversation(4, size=10))
+        window = await ContextWindowManager(repo, token_budget=1000).build("c1")
+
+        assert window.included_messages == 4
+        assert window.summary is None
+        assert repo.summary is None
+        assert window.messages[0]["content"].startswith("message 0")
+
+    @pytest.mark.asyncio
+    async def test_keeps_most_recent_turns_under_budget(self):
+        repo = FakeAgentRepo(_conversation(20))
+        manager = ContextWindowManager(repo, token_budget=500, summary_token_budget=2000)
+        window = await manager.build("c1")
+
+        assert window.history_tokens <= 500
+        assert window.messages[-1]["content"].startswith("message 19")
+        assert window.included_messages < 20
+        assert window.summarized_messages == 20 - window.included_messages
+        assert repo.summary["messageCount"] == window.summarized_messages
+        assert "message 0" in window.summary
+
+    @pytest.mark.asyncio
+    async def test_summary_is_incremental(self):
+        repo = FakeAgentRepo(_conversation(20))
+        manager = ContextWindowManager(repo, token_budget=500, summary_token_budget=5000)
+        first = await manager.build("c1")
+
+        repo.messages.extend(_conversation(22)[20:])
+        repo.messages[-2]["created_at"] = repo.messages[-3]["created_at"] + timedelta(minutes=1)
+        repo.messages[-1]["created_at"] = repo.messages[-2]["created_at"] + timedelta(minutes=1)
+        second = await manager.build("c1")
+
+        assert second.summarized_messages == first.summarized_messages + 2
+        assert second.summary.count("message 0 ") == 1
+
+    @pytest.mark.asyncio
+    async def test_summary_respects_budget(self):
+        repo = FakeAgentRepo(_conversation(40))
+        window = await ContextWindowManager(repo, token_budget=300, summary_token_budget=150).build("c1")
+
+        assert window.summary_tokens <= 150
+        # Oldest lines are dropped first
+        assert "message 0 " not in window.summary
+
+    @pytest.mark.asyncio
+    async def test_fetches_gap_beyond_scanned_rows(self):
+        repo = FakeAgentRepo(_conversation(30))
+        window = await ContextWindowManager(
+            repo, token_budget=300, summary_token_budget=10000, max_messages=10
+        ).build("c1")
+
+        # The 20-row gap is read in pages of max_messages, newest first
+        assert repo.between_calls == 3
+        assert repo.largest_fetch == 10
+        assert window.summarized_messages == 30 - window.included_messages
+        assert window.summary.index("message 0 ") < window.summary.index("message 19 ")
+
+    @pytest.mark.asyncio
+    async def test_gap_fetch_stops_at_summary_budget(self):
+        repo = FakeAgentRepo(_conversation(5000, size=100))
+        window = await ContextWindowManager(
+            repo, token_budget=300, summary_token_budget=200, max_messages=10
+        ).build("c1")
+
+        # Only enough pages to fill the summary are read, not the whole history
+        assert repo.between_calls <= 3
+        assert repo.largest_fetch == 10
+        assert window.summary_tokens <= 200
+        assert "message 4989 " in window.summary
+        assert "message 0 " not in window.summary
+
+    @pytest.mark.asyncio
+    async def test_oversized_message_is_truncated(self):
+        repo = FakeAgentRepo(_conversation(1, size=10000))
+        window = await ContextWindowManager(repo, token_budget=100).build("c1")
+
+        assert window.included_messages == 1
+        assert window.history_tokens <= 100
+
+    @pytest.mark.asyncio
+    async def test_summary_prepended_as_system_message(self):
+        repo = FakeAgentRepo(_conversation(20))
+        window = await ContextWindowManager(repo, token_budget=500).build("c1")
+        messages = window.to_llm_messages()
+
+        assert messages[0]["role"] == "system"
+        assert messages[0]["content"].startswith("Summary of earlier conversation")
+        assert len(messages) == window.included_messages + 1
@@ -117,12 +117,14 @@ class TestProjectNameResolution:
     @pytest.mark.asyncio
     async def test_query_with_project_name_resolution(self, query_tool, admin_context):
         """Test 9: Project name resolves to ID correctly."""
-        with patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
-            # First call resolves project name
-            # Second call gets the actual data
-            mock_db.execute_query = AsyncMock(side_effect=[
-                [{"id": "p1", "name": "Via Tesoro"}],  # Project lookup
-                [{"id": "t1", "title": "Task 1", "status": "pending", "project_id": "p1"}],  # Tasks query
+        with patch("src.agent.tools.project_resolver.db_manager") as mock_resolver_db, \
+             patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
+            # Project lookup goes through the shared resolver
+            mock_resolver_db.execute_query = AsyncMock(return_value=[
+                {"id": "p1", "name": "Via Tesoro", "score": 1.0},
+            ])
+            mock_db.execute_query = AsyncMock(return_value=[
+                {"id": "t1", "title": "Task 1", "status": "pending", "project_id": "p1"},
             ])
 
             result = await query_tool.execute(
@@ -136,10 +138,10 @@ class TestProjectNameResolution:
     @pytest.mark.asyncio
     async def test_query_with_ambiguous_project_name(self, query_tool, admin_context):
         """Test 10: Returns matches for disambiguation."""
-        with patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
+        with patch("src.agent.tools.project_resolver.db_manager") as mock_db:
             mock_db.execute_query = AsyncMock(return_value=[
-                {"id": "p1", "name": "Cole Dr"},
-                {"id": "p2", "name": "Cole Ave"},
+                {"id": "p1", "name": "Cole Dr", "score": 0.6},
+                {"id": "p2", "name": "Cole Ave", "score": 0.6},
             ])
 
             result = await query_tool.execute(
@@ -154,7 +156,7 @@ class TestProjectNameResolution:
     @pytest.mark.asyncio
     async def test_query_with_nonexistent_project(self, query_tool, admin_context):
         """Test 11: Returns not found error."""
-        with patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
+        with patch("src.agent.tools.project_resolver.db_manager") as mock_db:
             mock_db.execute_query = AsyncMock(return_value=[])
 
             result = await query_tool.execute(
@@ -294,6 +296,60 @@ class TestSummaryBuilding:
             assert result["summary"]["byPriority"]["high"] == 2
 
 
+class TestAggregation:
+    """Tests for aggregate queries pushed down to the database."""
+
+    @pytest.mark.asyncio
+    async def test_overdue_tasks_per_project(self, query_tool, admin_context):
+        with patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
+            mock_db.execute_query = AsyncMock(return_value=[
+                {"project_id": "p1", "project_name": "Via Tesoro", "count": 7},
+                {"project_id": "p2", "project_name": "Cole Dr", "count": 2},
+            ])
+
+            result = await query_tool.execute(
+                {"data_type": "tasks", "date_filter": "overdue", "group_by": ["project"]},
+                admin_context,
+            )
+
+            query = mock_db.execute_query.call_args.args[0]
+            assert "GROUP BY t.project_id, p.name" in query
+            assert mock_db.execute_query.await_count == 1
+            assert result["results"][0] == {"project_id": "p1", "project_name": "Via Tesoro", "count": 7}
+            assert result["groupBy"] == ["project"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_aggregation_returns_hint(self, query_tool, admin_context):
+        with patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
+            mock_db.execute_query = AsyncMock()
+
+            result = await query_tool.execute(
+                {"data_type": "tasks", "group_by": ["description"]},
+                admin_context,
+            )
+
+            assert result["error"] == "invalid_aggregation"
+            assert "Allowed:" in result["message"]
+            mock_db.execute_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_truncated_rows_summarized_in_database(self, query_tool, admin_context):
+        rows = [{"id": f"t{i}", "title": f"Task {i}", "status": "pending"} for i in range(5)]
+        groups = [
+            {"status": "pending", "priority": "high", "count": 40},
+            {"status": "completed", "priority": "low", "count": 80},
+        ]
+        with patch("src.agent.tools.dynamic.dynamic_query_tool.db_manager") as mock_db:
+            mock_db.execute_query = AsyncMock(side_effect=[rows, groups])
+
+            result = await query_tool.execute({"data_type": "tasks", "limit": 5}, admin_context)
+
+            assert result["count"] == 5
+            assert result["summary"]["total"] == 120
+            assert result["summary"]["byStatus"] == {"pending": 40, "completed": 80}
+            assert result["summary"]["byPriority"] == {"high": 40, "low": 80}
+
+
 class TestSecurityFiltering:
     """Tests for security enforcement."""
 
@@ -0,0 +1,185 @@
+"""
+Tests for fast_path.py
+
+Tests template matching, fallbacks, rendering, and that a matched turn is
+answered by the orchestrator without calling the LLM.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.agent.core.context_window import ContextWindow
+from src.agent.core.fast_path import FastPathRouter, normalize
+from src.agent.repositories.telemetry import AgentTelemetryWriter, MESSAGE, TOOL_CALL, TOOL_CALL_UPDATE
+
+
+class FakeExecutor:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    async def execute(self, tool_name, params, context, message_id=None, conversation_id=None):
+        self.calls.append((tool_name, params))
+        if self.error:
+            raise self.error
+        return self.result
+
+
+OVERDUE_RESULT = {
+    "dataType": "tasks",
+    "table": "tasks",
+    "projectFilter": "Via Tesoro",
+    "results": [
+        {"id": "t1", "title": "Order windows", "status": "pending", "priority": "high", "due_date": "2026-01-03"},
+        {"id": "t2", "title": "Inspect footings", "status": "in-progress", "due_date": "2026-01-05"},
+    ],
+    "count": 2,
+}
+
+STAGES_RESULT = {
+    "projectId": "proj-1",
+    "stages": [
+        {"name": "Demo", "status": "COMPLETE", "completionPercentage": 100},
+        {"name": "Framing", "status": "ACTIVE", "completionPercentage": 40},
+        {"name": "Drywall", "status": "NOT_STARTED", "plannedStartDate": "2026-04-01",
+         "plannedEndDate": "2026-04-20"},
+    ],
+}
+
+
+class TestMatching:
+
+    @pytest.mark.parametrize("message, template, params", [
+        ("What's overdue on Via Tesoro?", "overdue",
+         {"data_type": "tasks", "date_filter": "overdue", "project_name": "via tesoro"}),
+        ("which payments are overdue", "overdue",
+         {"data_type": "payments", "date_filter": "overdue"}),
+        ("show me overdue tasks for the Maple Street project", "overdue",
+         {"data_type": "tasks", "date_filter": "overdue", "project_name": "maple street"}),
+        ("open issues on project X", "open_issues",
+         {"data_type": "issues", "status": "open", "project_name": "project x"}),
+        ("any critical issues", "open_issues",
+         {"data_type": "issues", "priority": "critical"}),
+        ("tasks due this week", "due",
+         {"data_type": "tasks", "date_filter": "this_week"}),
+        ("next stage on Via Tesoro", "stage",
+         {"data_type": "stages", "project_name": "via tesoro"}),
+    ])
+    def test_templates(self, message, template, params):
+        matched = FastPathRouter(executor=FakeExecutor()).match(message)
+        assert matched is not None
+        assert matched[0].name == template
+        assert matched[2] == params
+
+    def test_conversation_project_scopes_query(self):
+        _, _, params = FastPathRouter(executor=FakeExecutor()).match("next stage", project_id="proj-1")
+        assert params == {"project_id": "proj-1"}
+
+    @pytest.mark.parametrize("message", [
+        "what's overdue and why is the framing late?",
+        "next stage",  # no project to look at
+        "write a report on overdue tasks",
+        "summarize open issues and suggest fixes",
+        "what is overdue on via tesoro and why is it late",
+        "which tasks are due this week for the kitchen remodel and who is assigned",
+        "open issues on maple or harbor view",
+    ])
+    def test_partial_matches_fall_through(self, message):
+        assert FastPathRouter(executor=FakeExecutor()).match(message) is None
+
+    def test_normalize(self):
+        assert normalize("  What’s   overdue?? ") == "what is overdue"
+
+
+class TestAnswer:
+
+    @pytest.mark.asyncio
+    async def test_renders_query_result(self, admin_context):
+        executor = FakeExecutor(result=OVERDUE_RESULT)
+        router = FastPathRouter(executor=executor)
+
+        answer = await router.answer("what's overdue on via tesoro", None, admin_context)
+
+        assert executor.calls[0][0] == "query_database"
+        assert answer.template == "overdue"
+        assert answer.content.startswith("## Overdue tasks on Via Tesoro (2)")
+        assert "- **Order windows** - pending, high, due 2026-01-03" in answer.content
+        assert router.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_renders_next_stage(self, admin_context):
+        router = FastPathRouter(executor=FakeExecutor(result=STAGES_RESULT))
+        answer = await router.answer("what is the next stage", "proj-1", admin_context)
+
+        assert answer.tool_name == "get_stages"
+        assert answer.content.splitlines()[0] == "**Next stage:** Drywall"
+        assert "Planned: 2026-04-01 to 2026-04-20" in answer.content
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_project_falls_back(self, admin_context):
+        result = {"error": "multiple_projects_found", "matches": [], "results": []}
+        router = FastPathRouter(executor=FakeExecutor(result=result))
+
+        assert await router.answer("open issues on maple", None, admin_context) is None
+        assert router.stats()["fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unresolved_project_falls_back(self, admin_context):
+        result = dict(OVERDUE_RESULT, projectFilter=None)
+        router = FastPathRouter(executor=FakeExecutor(result=result))
+
+        assert await router.answer("what's overdue on tesoro", None, admin_context) is None
+        assert router.stats()["fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_permission_error_falls_back(self, crew_context):
+        router = FastPathRouter(executor=FakeExecutor(error=PermissionError("denied")))
+        assert await router.answer("overdue payments", None, crew_context) is None
+
+    @pytest.mark.asyncio
+    async def test_hit_rate(self, admin_context):
+        router = FastPathRouter(executor=FakeExecutor(result=OVERDUE_RESULT))
+        await router.answer("overdue tasks", None, admin_context)
+        await router.answer("how should I sequence the trades next month?", None, admin_context)
+
+        stats = router.stats()
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
+class TestOrchestratorFastPath:
+
+    @pytest.mark.asyncio
+    async def test_matched_turn_skips_llm(self, admin_context):
+        from src.agent.core import orchestrator as orchestrator_module
+
+        writer = AgentTelemetryWriter(sink=MagicMock(write=AsyncMock()), flush_interval=60)
+        llm = MagicMock()
+        llm.chat_completion.side_effect = AssertionError("LLM should not be called")
+        router = FastPathRouter(executor=FakeExecutor(result=OVERDUE_RESULT))
+
+        with patch.object(orchestrator_module, "agent_telemetry", writer), \
+             patch.object(orchestrator_module, "fast_path_router", router), \
+             patch.object(orchestrator_module, "get_cached_llm_provider", return_value=llm), \
+             patch.object(orchestrator_module.agent_repo, "create_conversation",
+                          AsyncMock(return_value={"id": "conv-1"})), \
+             patch.object(orchestrator_module.context_window_manager, "build",
+                          AsyncMock(return_value=ContextWindow())) as build_window:
+            events = [
+                event async for event in orchestrator_module.agent_orchestrator.process_message(
+                    message="What's overdue on Via Tesoro?",
+                    conversation_id=None,
+                    project_id=None,
+                    user_context=admin_context,
+                )
+            ]
+
+        assert [e["type"] for e in events] == ["tool_start", "tool_result", "content", "done"]
+        assert events[-1]["data"]["fast_path"] == "overdue"
+        build_window.assert_not_called()
+        queued = list(writer._queue)
+        assert [r.kind for r in queued[:3]] == [MESSAGE, TOOL_CALL, TOOL_CALL_UPDATE]
+        assert queued[3].values["model_used"] == "fast_path"
+        await writer.close()
@@ -80,13 +80,18 @@ class TestGetProjectDetailExecution:
             "src.agent.tools.projects.get_project_detail.ProjectRepository"
         ) as MockRepo:
             mock_repo = MagicMock()
-            mock_repo.get_by_company = AsyncMock(return_value=sample_projects)
+            mock_repo.get_by_id = AsyncMock(return_value=sample_projects[0])
             MockRepo.return_value = mock_repo
 
             with patch(
                 "src.agent.tools.projects.get_project_detail.db_manager"
-            ) as mock_db:
+            ) as mock_db, patch(
+                "src.agent.tools.project_resolver.db_manager"
+            ) as mock_resolver_db:
                 mock_db.execute_query = AsyncMock(return_value=[])
+                mock_resolver_db.execute_query = AsyncMock(return_value=[
+                    {"id": "project-1", "name": "Via Tesoro", "score": 0.8},
+                ])
 
                 result = await get_project_detail_tool.execute(
                     {"project_name": "tesoro"},
@@ -0,0 +1,133 @@
+"""
+Tests for intent_classifier.py
+
+Tests seed predictions, labelling logged turns from tool calls, retraining
+from logs/feedback, and routing of predicted intents through ModelRouter.
+"""
+
+import asyncio
+
+import pytest
+
+from src.agent.core.intent_classifier import (
+    IntentClassifier,
+    label_from_tool_calls,
+    tokenize,
+)
+from src.agent.llm.model_router import ModelRouter
+
+
+class FakeAgentRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    async def get_intent_training_examples(self, limit=2000):
+        self.calls += 1
+        return self.rows
+
+
+@pytest.fixture
+def classifier():
+    return IntentClassifier(retrain_seconds=3600)
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(standard_model="fast-model", complex_model="big-model")
+
+
+class TestPrediction:
+
+    @pytest.mark.parametrize("text, intent", [
+        ("which tasks are overdue on this project?", "lookup_tasks"),
+        ("show me the open issues", "lookup_issues"),
+        ("what's the next stage", "lookup_stages"),
+        ("when is the next payment due", "lookup_payments"),
+        ("analyze why we are behind schedule", "analyze"),
+        ("write a progress report for the client", "generate_progress_report"),
+    ])
+    def test_seed_predictions(self, classifier, text, intent):
+        assert classifier.predict(text).intent == intent
+
+    def test_unknown_words_are_unclassified(self, classifier):
+        prediction = classifier.predict("zzz qqq")
+        assert prediction.intent is None
+        assert prediction.confidence == 0.0
+        assert prediction.routed_intent(0.5) is None
+
+    def test_tokenize_adds_bigrams_and_drops_stopwords(self):
+        assert tokenize("What is the next stage?") == ["next", "stage", "next_stage"]
+
+
+class TestRouting:
+
+    def test_lookups_use_standard_model(self, classifier, router):
+        intent = classifier.predict("list overdue tasks").routed_intent(0.3)
+        assert router.select_model(intent=intent) == "fast-model"
+
+    def test_analysis_uses_complex_model(self, classifier, router):
+        intent = classifier.predict("which projects are at risk across my portfolio").routed_intent(0.3)
+        assert intent == "portfolio_health"
+        assert router.select_model(intent=intent) == "big-model"
+
+
+class TestLabelling:
+
+    def test_named_tool(self):
+        assert label_from_tool_calls([{"name": "get_issues", "input": {}}]) == "lookup_issues"
+
+    def test_query_database_uses_data_type(self):
+        calls = [{"name": "query_database", "input": {"data_type": "punch list"}}]
+        assert label_from_tool_calls(calls) == "lookup_tasks"
+
+    def test_multi_tool_turn_is_analysis(self):
+        calls = [{"name": "get_tasks"}, {"name": "get_issues"}, {"name": "get_stages"}]
+        assert label_from_tool_calls(calls) == "analyze"
+
+    def test_no_tools(self):
+        assert label_from_tool_calls([]) is None
+        assert label_from_tool_calls(None) is None
+
+
+class TestTrainingFromLogs:
+
+    @pytest.mark.asyncio
+    async def test_learns_new_vocabulary(self, classifier):
+        rows = [
+            {"text": f"what's left on the walkthrough list for unit {i}",
+             "tool_calls": [{"name": "get_tasks", "input": {}}], "is_positive": None}
+            for i in range(5)
+        ]
+        assert classifier.predict("walkthrough").intent is None
+
+        count = await classifier.train_from_logs(FakeAgentRepo(rows))
+
+        assert count > 5
+        assert classifier.predict("walkthrough").intent == "lookup_tasks"
+
+    @pytest.mark.asyncio
+    async def test_negative_feedback_removes_examples(self, classifier):
+        text = "walkthrough list for unit 4"
+        rows = [
+            {"text": text, "tool_calls": [{"name": "get_tasks"}], "is_positive": None},
+            {"text": text, "tool_calls": [{"name": "get_tasks"}], "is_positive": False},
+        ]
+        await classifier.train_from_logs(FakeAgentRepo(rows))
+        assert classifier.predict("walkthrough").intent is None
+
+    @pytest.mark.asyncio
+    async def test_schedule_refresh_runs_once_per_interval(self, classifier):
+        repo = FakeAgentRepo([])
+
+        async def train():
+            await classifier.train_from_logs(repo)
+
+        classifier._refresh = train
+        classifier.schedule_refresh()
+        classifier.schedule_refresh()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        classifier.schedule_refresh()
+
+        assert repo.calls == 1
@@ -0,0 +1,329 @@
+"""
+Tests for jobs/cron.py and jobs/runner.py
+
+Tests cron parsing and next fire times, claiming due jobs, rescheduling,
+retry backoff, per-type concurrency, and lease safety across workers,
+driven by a fake clock.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from src.agent.jobs import CronSchedule, Job, JobRunner, PostgresJobStore
+
+START = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc)  # a Monday
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+class MemoryJobStore:
+    """agent.scheduled_jobs in memory, with the same claim and fencing rules."""
+
+    def __init__(self):
+        self.rows = {}
+        self._next_id = 0
+
+    def add(self, job_type, next_run_at, cron=None, config=None, company_id=None):
+        self._next_id += 1
+        job_id = f"job-{self._next_id}"
+        self.rows[job_id] = {
+            "id": job_id, "job_type": job_type, "company_id": company_id,
+            "schedule_cron": cron, "config": config or {}, "attempts": 0,
+            "next_run_at": next_run_at, "status": "active",
+            "locked_by": None, "locked_until": None,
+            "last_run_at": None, "last_error": None, "last_duration_ms": None,
+        }
+        return job_id
+
+    async def claim(self, worker_id, job_type, limit, now, lease_until):
+        due = sorted(
+            (r for r in self.rows.values()
+             if r["status"] == "active" and r["job_type"] == job_type and r["next_run_at"] <= now
+             and (r["locked_until"] is None or r["locked_until"] < now)),
+            key=lambda r: r["next_run_at"],
+        )[:limit]
+        for row in due:
+            row["locked_by"], row["locked_until"] = worker_id, lease_until
+        return [
+            Job(r["id"], r["job_type"], r["company_id"], r["schedule_cron"], r["config"],
+                r["attempts"], r["next_run_at"])
+            for r in due
+        ]
+
+    async def renew(self, job_id, worker_id, lease_until):
+        row = self.rows.get(job_id)
+        if row and row["locked_by"] == worker_id:
+            row["locked_until"] = lease_until
+            return True
+        return False
+
+    async def record_run(self, job_id, worker_id, ran_at, next_run_at, attempts, error, duration_ms, status):
+        row = self.rows.get(job_id)
+        if not row or row["locked_by"] != worker_id:
+            return False
+        row.update(last_run_at=ran_at, next_run_at=next_run_at, attempts=attempts, last_error=error,
+                   last_duration_ms=duration_ms, status=status, locked_by=None, locked_until=None)
+        return True
+
+    async def delete(self, job_id, worker_id):
+        row = self.rows.get(job_id)
+        if not row or row["locked_by"] != worker_id:
+            return False
+        del self.rows[job_id]
+        return True
+
+    async def ensure_schedule(self, job_type, cron, config, next_run_at):
+        if not any(r["job_type"] == job_type and r["company_id"] is None for r in self.rows.values()):
+            self.add(job_type, next_run_at, cron=cron, config=config)
+
+    async def enqueue(self, job_type, company_id, config, run_at):
+        return self.add(job_type, run_at, config=config, company_id=company_id)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store():
+    return MemoryJobStore()
+
+
+def make_runner(store, clock, worker_id="w1", **kwargs):
+    defaults = dict(lease_seconds=60, poll_seconds=1, max_attempts=3, backoff_seconds=30)
+    defaults.update(kwargs)
+    return JobRunner(store=store, clock=clock, worker_id=worker_id, **defaults)
+
+
+async def run_pending(runner):
+    claimed = await runner.run_once()
+    await runner.drain()
+    return claimed
+
+
+class TestCron:
+
+    @pytest.mark.parametrize("expression, after, expected", [
+        ("*/15 * * * *", START, START.replace(minute=15)),
+        ("15 3 * * *", START, datetime(2026, 3, 3, 3, 15, tzinfo=timezone.utc)),
+        ("0 9 * * mon-fri", datetime(2026, 3, 6, 10, 0, tzinfo=timezone.utc),
+         datetime(2026, 3, 9, 9, 0, tzinfo=timezone.utc)),
+        ("@monthly", START, datetime(2026, 4, 1, tzinfo=timezone.utc)),
+        ("0 0 29 2 *", START, datetime(2028, 2, 29, tzinfo=timezone.utc)),
+        ("30 8-18/4 * * *", START, START.replace(minute=30)),
+    ])
+    def test_next_after(self, expression, after, expected):
+        assert CronSchedule(expression).next_after(after) == expected
+
+    def test_day_of_month_or_weekday(self):
+        # The 15th or any Sunday
+        schedule = CronSchedule("0 0 15 * sun")
+        assert schedule.next_after(START) == datetime(2026, 3, 8, tzinfo=timezone.utc)
+        assert schedule.next_after(datetime(2026, 3, 14, 1, 0, tzinfo=timezone.utc)) == \
+            datetime(2026, 3, 15, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "0 0 31 2 *", "5-1 * * * *"])
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError):
+            CronSchedule(expression).next_after(START)
+
+
+class TestRunner:
+
+    @pytest.mark.asyncio
+    async def test_due_cron_job_runs_and_reschedules(self, store, clock):
+        seen = []
+
+        async def handler(job):
+            seen.append(job.config["retention_days"])
+
+        runner = make_runner(store, clock)
+        runner.register("cleanup", handler, cron="15 3 * * *", config={"retention_days": 30})
+        await runner.start()
+        await runner.stop()
+
+        assert await run_pending(runner) == 0
+        clock.advance(days=1)
+        assert await run_pending(runner) == 1
+
+        row = next(iter(store.rows.values()))
+        assert seen == [30]
+        assert row["last_run_at"] == clock.now
+        assert row["next_run_at"] == datetime(2026, 3, 4, 3, 15, tzinfo=timezone.utc)
+        assert row["locked_by"] is None
+        assert row["last_duration_ms"] is not None
+        assert runner.stats()["jobs"]["cleanup"]["runs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_one_off_job_is_deleted_after_success(self, store, clock):
+        calls = []
+
+        async def handler(job):
+            calls.append(job.company_id)
+
+        runner = make_runner(store, clock)
+        runner.register("send_email", handler)
+        await runner.enqueue("send_email", company_id="company-123")
+
+        assert await run_pending(runner) == 1
+        assert calls == ["company-123"]
+        assert store.rows == {}
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off_then_disable(self, store, clock):
+        async def handler(job):
+            raise RuntimeError("smtp down")
+
+        runner = make_runner(store, clock)
+        runner.register("send_email", handler)
+        job_id = store.add("send_email", clock.now)
+
+        await run_pending(runner)
+        row = store.rows[job_id]
+        assert (row["attempts"], row["next_run_at"]) == (1, clock.now + timedelta(seconds=30))
+        assert row["last_error"] == "smtp down"
+
+        clock.advance(seconds=29)
+        assert await run_pending(runner) == 0
+        clock.advance(seconds=1)
+        await run_pending(runner)
+        assert (row["attempts"], row["next_run_at"]) == (2, clock.now + timedelta(seconds=60))
+
+        clock.advance(seconds=60)
+        await run_pending(runner)
+        assert row["status"] == "disabled"
+        assert runner.stats()["jobs"]["send_email"]["failures"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failing_cron_job_skips_to_next_occurrence(self, store, clock):
+        async def handler(job):
+            raise RuntimeError("boom")
+
+        runner = make_runner(store, clock, max_attempts=1)
+        runner.register("rollup", handler)
+        job_id = store.add("rollup", clock.now, cron="0 * * * *")
+
+        await run_pending(runner)
+        row = store.rows[job_id]
+        assert row["status"] == "active"
+        assert row["attempts"] == 0
+        assert row["next_run_at"] == START + timedelta(hours=1)
+
+    @pytest.mark.asyncio
+    async def test_per_type_concurrency_limit(self, store, clock):
+        release = asyncio.Event()
+        active = []
+
+        async def slow(job):
+            active.append(job.id)
+            await release.wait()
+
+        runner = make_runner(store, clock)
+        runner.register("report", slow, concurrency=2)
+        for _ in range(5):
+            store.add("report", clock.now)
+
+        assert await runner.run_once() == 2
+        assert await runner.run_once() == 0
+        await asyncio.sleep(0)
+        assert len(active) == 2
+
+        release.set()
+        await runner.drain()
+        assert await run_pending(runner) == 2
+        assert len(store.rows) == 1
+
+    @pytest.mark.asyncio
+    async def test_unregistered_types_are_not_claimed(self, store, clock):
+        runner = make_runner(store, clock)
+        runner.register("known", lambda job: asyncio.sleep(0))
+        job_id = store.add("unknown", clock.now)
+
+        assert await run_pending(runner) == 0
+        assert store.rows[job_id]["locked_by"] is None
+
+
+class TestMultipleWorkers:
+
+    @pytest.mark.asyncio
+    async def test_each_job_runs_once(self, store, clock):
+        runs = []
+
+        async def handler(job):
+            runs.append(job.id)
+            await asyncio.sleep(0)
+
+        workers = [make_runner(store, clock, worker_id=f"w{i}") for i in range(3)]
+        for worker in workers:
+            worker.register("report", handler, concurrency=4)
+        for _ in range(10):
+            store.add("report", clock.now)
+
+        while store.rows:
+            await asyncio.gather(*(w.run_once() for w in workers))
+            await asyncio.gather(*(w.drain() for w in workers))
+
+        assert sorted(runs) == sorted(set(runs))
+        assert len(runs) == 10
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed_and_stale_result_ignored(self, store, clock):
+        release = asyncio.Event()
+        calls = []
+
+        async def handler(job):
+            calls.append(job.id)
+            if len(calls) == 1:
+                await release.wait()
+
+        stuck = make_runner(store, clock, worker_id="stuck")
+        other = make_runner(store, clock, worker_id="other")
+        for runner in (stuck, other):
+            runner.register("report", handler)
+        job_id = store.add("report", clock.now, cron="0 * * * *")
+
+        assert await stuck.run_once() == 1
+        await asyncio.sleep(0)
+        assert await other.run_once() == 0
+
+        clock.advance(seconds=61)
+        assert await run_pending(other) == 1
+        rescheduled = store.rows[job_id]["next_run_at"]
+
+        release.set()
+        await stuck.drain()
+        assert store.rows[job_id]["next_run_at"] == rescheduled
+        assert calls == [job_id, job_id]
+
+
+class TestPostgresStore:
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_locked_rows(self):
+        captured = {}
+
+        class FakeDB:
+            async def execute_query(self, query, *args):
+                captured["query"], captured["args"] = query, args
+                return [{"id": "j1", "job_type": "report", "company_id": None, "schedule_cron": None,
+                         "config": '{"a": 1}', "attempts": 0, "next_run_at": START}]
+
+        with patch("src.agent.jobs.runner.db_manager", FakeDB()):
+            jobs = await PostgresJobStore().claim("w1", "report", 3, START, START + timedelta(minutes=5))
+
+        assert "FOR UPDATE SKIP LOCKED" in captured["query"]
+        assert captured["args"] == ("w1", "report", START, START + timedelta(minutes=5), 3)
+        assert jobs[0].config == {"a": 1}
@@ -0,0 +1,189 @@
+"""
+Tests for project_resolver.py
+
+Tests pg_trgm-compatible similarity, ranking and disambiguation, the
+in-memory fallback when pg_trgm is missing, and index invalidation.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import asyncpg
+import pytest
+
+from src.agent.cache import notify_company_changed, notify_project_changed
+from src.agent.tools.project_resolver import (
+    CompanyProjectIndex,
+    ProjectNameResolver,
+    similarity,
+    trigrams,
+    word_similarity,
+)
+
+PROJECTS = [
+    {"id": "p1", "name": "Via Tesoro Residence"},
+    {"id": "p2", "name": "Maple Street Remodel"},
+    {"id": "p3", "name": "Maple Avenue Addition"},
+    {"id": "p4", "name": "Harbor View Condos"},
+]
+
+
+class FakeDB:
+    """execute_query stand-in: pg_trgm queries fail, project loads return PROJECTS."""
+
+    def __init__(self, trgm_rows=None):
+        self.trgm_rows = trgm_rows
+        self.loads = 0
+        self.trgm_queries = 0
+
+    async def execute_query(self, query, *args):
+        if "similarity(" in query:
+            self.trgm_queries += 1
+            if self.trgm_rows is None:
+                raise asyncpg.exceptions.UndefinedFunctionError("function similarity does not exist")
+            return self.trgm_rows
+        self.loads += 1
+        return PROJECTS
+
+
+@pytest.fixture
+def db():
+    fake = FakeDB()
+    with patch("src.agent.tools.project_resolver.db_manager", fake):
+        yield fake
+
+
+@pytest.fixture
+def resolver():
+    return ProjectNameResolver()
+
+
+class TestSimilarity:
+
+    def test_matches_pg_trgm(self):
+        # Values from the PostgreSQL pg_trgm documentation
+        assert round(similarity("word", "two words"), 4) == 0.3636
+        assert word_similarity("word", "two words") == 0.8
+
+    def test_trigrams_are_padded_per_word(self):
+        assert trigrams("Ab") == {"  a", " ab", "ab "}
+        assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+
+
+class TestIndex:
+
+    def test_typo_ranks_intended_project_first(self):
+        index = CompanyProjectIndex([(p["id"], p["name"]) for p in PROJECTS])
+        matches = index.search("via tesorro")
+        assert matches[0].id == "p1"
+        assert matches[0].score > 0.5
+
+    def test_unrelated_query_matches_nothing(self):
+        index = CompanyProjectIndex([(p["id"], p["name"]) for p in PROJECTS])
+        assert index.search("xyzzy") == []
+
+
+class TestResolve:
+
+    @pytest.mark.asyncio
+    async def test_resolves_partial_name(self, db, resolver):
+        result = await resolver.resolve("tesoro", "company-123")
+        assert result["project_id"] == "p1"
+        assert result["project_name"] == "Via Tesoro Residence"
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_name_lists_ranked_matches(self, db, resolver):
+        result = await resolver.resolve("maple", "company-123")
+        assert result["error"] == "multiple_projects_found"
+        assert {m["id"] for m in result["matches"]} == {"p2", "p3"}
+        assert all("score" in m for m in result["matches"])
+
+    @pytest.mark.asyncio
+    async def test_weak_lone_match_is_ambiguous(self, db, resolver):
+        # Over-captured names still share a few trigrams with one project
+        result = await resolver.resolve("via tesoro and why is it late", "company-123")
+        assert result["error"] == "multiple_projects_found"
+        assert [m["id"] for m in result["matches"]] == ["p1"]
+        assert result["matches"][0]["score"] < 0.7
+
+    @pytest.mark.asyncio
+    async def test_clear_typo_resolves(self, db, resolver):
+        result = await resolver.resolve("via tesorro", "company-123")
+        assert result["project_id"] == "p1"
+
+    @pytest.mark.asyncio
+    async def test_trgm_lone_match_needs_confident_score(self, resolver):
+        fake = FakeDB(trgm_rows=[{"id": "p4", "name": "Harbor View Condos", "score": 0.4}])
+        with patch("src.agent.tools.project_resolver.db_manager", fake):
+            result = await resolver.resolve("harbour viewing deck", "company-123")
+        assert result["error"] == "multiple_projects_found"
+
+    @pytest.mark.asyncio
+    async def test_not_found(self, db, resolver):
+        result = await resolver.resolve("warehouse", "company-123")
+        assert result["error"] == "project_not_found"
+
+    @pytest.mark.asyncio
+    async def test_uses_trgm_query_when_available(self, resolver):
+        fake = FakeDB(trgm_rows=[{"id": "p1", "name": "Via Tesoro Residence", "score": 0.9}])
+        with patch("src.agent.tools.project_resolver.db_manager", fake):
+            result = await resolver.resolve("via tesoro", "company-123")
+
+        assert result["project_id"] == "p1"
+        assert fake.trgm_queries == 1
+        assert fake.loads == 0
+
+    @pytest.mark.asyncio
+    async def test_falls_back_once_when_pg_trgm_missing(self, db, resolver):
+        await resolver.resolve("tesoro", "company-123")
+        await resolver.resolve("harbor", "company-123")
+
+        assert db.trgm_queries == 1
+        assert db.loads == 1
+
+
+class TestInvalidation:
+
+    @pytest.mark.asyncio
+    async def test_project_change_reloads_its_company(self, db, resolver):
+        await resolver.search("tesoro", "company-123")
+        notify_project_changed("p2")
+        await resolver.search("tesoro", "company-123")
+        assert db.loads == 2
+
+    @pytest.mark.asyncio
+    async def test_company_change_reloads(self, db, resolver):
+        await resolver.search("tesoro", "company-123")
+        notify_company_changed("company-999")
+        await resolver.search("tesoro", "company-123")
+        assert db.loads == 1
+
+        notify_company_changed("company-123")
+        await resolver.search("tesoro", "company-123")
+        assert db.loads == 2
+
+
+class TestTools:
+
+    @pytest.mark.asyncio
+    async def test_query_database_uses_resolver(self, admin_context):
+        from src.agent.tools.dynamic.dynamic_query_tool import DynamicQueryTool
+
+        resolve = AsyncMock(return_value={"error": "multiple_projects_found", "matches": [], "results": []})
+        with patch("src.agent.tools.dynamic.dynamic_query_tool.project_resolver.resolve", resolve):
+            result = await DynamicQueryTool().execute(
+                {"data_type": "tasks", "project_name": "maple"}, admin_context,
+            )
+
+        resolve.assert_awaited_once_with("maple", admin_context["company_id"])
+        assert result["error"] == "multiple_projects_found"
+
+    @pytest.mark.asyncio
+    async def test_project_detail_returns_ambiguity(self, admin_context):
+        from src.agent.tools.projects.get_project_detail import GetProjectDetailTool
+
+        ambiguous = {"error": "multiple_projects_found", "matches": [{"id": "p2"}, {"id": "p3"}], "results": []}
+        with patch("src.agent.tools.projects.get_project_detail.project_resolver.resolve",
+                   AsyncMock(return_value=ambiguous)):
+            result = await GetProjectDetailTool().execute({"project_name": "maple"}, admin_context)
+
+        assert result["error"] == "multiple_projects_found"
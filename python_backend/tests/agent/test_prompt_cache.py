@@ -0,0 +1,123 @@
+"""
+Tests for system prompt caching in context_builder.py and tool definition
+caching in registry.py.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from src.agent.cache import TTLCache, notify_project_changed
+from src.agent.core.context_builder import ContextBuilder
+from src.agent.tools.registry import ToolRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def builder():
+    """ContextBuilder with the database calls mocked out."""
+    builder = ContextBuilder()
+    project = SimpleNamespace(
+        name="Cole Dr", status="active", progress=40, location=None,
+        clientName=None, dueDate=None,
+    )
+    builder.project_repo.get_by_id = AsyncMock(return_value=project)
+    return builder
+
+
+def _db_mock():
+    async def execute_one(query, *args):
+        if "FROM companies" in query:
+            return {"name": "Acme Builders"}
+        if "project_stages" in query:
+            return {"name": "Framing", "status": "ACTIVE"}
+        return {"count": 2}
+    return AsyncMock(side_effect=execute_one)
+
+
+class TestTTLCache:
+    """Expiry and invalidation."""
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl_seconds=10, clock=clock)
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+        clock.now += 11
+        assert cache.get("k") is None
+
+    def test_invalidate_by_predicate(self):
+        cache = TTLCache(ttl_seconds=10)
+        cache.set(("c1", "p1"), 1)
+        cache.set(("c1", "p2"), 2)
+        assert cache.invalidate(lambda key: key[1] == "p1") == 1
+        assert cache.get(("c1", "p2")) == 2
+
+
+class TestSystemPromptCache:
+    """build_system_prompt reuses assembled prompts."""
+
+    @pytest.mark.asyncio
+    async def test_static_prefix_first(self, builder, admin_context):
+        with patch("src.agent.core.context_builder.db_manager.execute_one", _db_mock()):
+            prompt = await builder.build_system_prompt(admin_context, project_id="p1")
+
+        assert prompt.startswith(ContextBuilder.BASE_SYSTEM_PROMPT)
+        assert "Acme Builders" in prompt
+        assert "Framing" in prompt
+        assert '[{"title": "API Test Issue", "status": "open"}]' in prompt
+
+    @pytest.mark.asyncio
+    async def test_second_call_hits_cache(self, builder, admin_context):
+        db = _db_mock()
+        with patch("src.agent.core.context_builder.db_manager.execute_one", db):
+            first = await builder.build_system_prompt(admin_context, project_id="p1")
+            calls = db.await_count
+            second = await builder.build_system_prompt(admin_context, project_id="p1")
+
+        assert first == second
+        assert db.await_count == calls
+        assert builder.cache_stats()["prompts"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_roles_share_company_section(self, builder, admin_context, crew_context):
+        db = _db_mock()
+        with patch("src.agent.core.context_builder.db_manager.execute_one", db):
+            await builder.build_system_prompt(admin_context)
+            await builder.build_system_prompt(crew_context)
+
+        company_queries = [c for c in db.await_args_list if "FROM companies" in c.args[0]]
+        assert len(company_queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_project_change_invalidates(self, builder, admin_context):
+        db = _db_mock()
+        with patch("src.agent.core.context_builder.db_manager.execute_one", db):
+            await builder.build_system_prompt(admin_context, project_id="p1")
+            notify_project_changed("p1")
+            await builder.build_system_prompt(admin_context, project_id="p1")
+
+        assert builder.project_repo.get_by_id.await_count == 2
+
+
+class TestToolDefinitionCache:
+    """Tool schemas are built once per role."""
+
+    def test_definitions_reused_until_registry_changes(self):
+        registry = ToolRegistry()
+        tool = SimpleNamespace(name="t1", permissions=["admin"])
+        tool.to_llm_schema = lambda: {"name": "t1"}
+        registry.register(tool)
+
+        first = registry.get_tool_definitions("admin")
+        assert registry.get_tool_definitions("admin") is first
+
+        registry.unregister("t1")
+        assert registry.get_tool_definitions("admin") == []
@@ -217,3 +217,74 @@ class TestQueryBuilderProjectJoin:
         assert "p.company_id" in query
         assert "company-123" in params
 
+    def test_project_join_and_filter_compare_columns_directly(self):
+        """Both sides are varchar; a ::text cast would hide the indexes."""
+        builder = QueryBuilder(
+            table="payment_installments",
+            role="admin",
+            company_id="company-123",
+            project_id="project-456",
+        )
+        query, params = builder.build_select()
+
+        assert "t.project_id = p.id" in query
+        assert "t.project_id = $2" in query
+        assert "::text" not in query
+
+
+class TestQueryBuilderAggregates:
+    """Tests for aggregate and GROUP BY queries."""
+
+    def test_count_per_project_keeps_company_filter(self):
+        """Grouping by project joins project names and stays company-scoped."""
+        builder = QueryBuilder(table="tasks", role="admin", company_id="company-123")
+        filters = builder.build_date_filter("overdue")
+        query, params = builder.build_aggregate(group_by=["project"], filters=filters)
+
+        assert query.startswith("SELECT t.project_id, p.name AS project_name, COUNT(*) AS count")
+        assert "p.company_id = $1" in query
+        assert "t.due_date < $2" in query
+        assert "GROUP BY t.project_id, p.name ORDER BY count DESC" in query
+        assert params == ["company-123", date.today()]
+
+    def test_sum_grouped_by_status(self):
+        builder = QueryBuilder(
+            table="payment_installments", role="admin", company_id="company-123", project_id="project-456",
+        )
+        query, params = builder.build_aggregate(
+            aggregates=[{"function": "sum", "column": "amount"}, {"function": "count"}],
+            group_by=["status"],
+        )
+
+        assert "SELECT t.status, SUM(t.amount) AS sum_amount, COUNT(*) AS count" in query
+        assert "GROUP BY t.status" in query
+        assert params == ["company-123", "project-456"]
+
+    def test_date_bucket(self):
+        builder = QueryBuilder(table="tasks", role="admin", company_id="company-123")
+        query, _ = builder.build_aggregate(date_bucket={"column": "due_date", "unit": "month"})
+
+        assert "date_trunc('month', t.due_date)::date AS due_date_month" in query
+        assert "ORDER BY due_date_month ASC" in query
+
+    def test_ungrouped_aggregate_has_no_group_by(self):
+        builder = QueryBuilder(table="projects", role="admin", company_id="company-123")
+        query, params = builder.build_aggregate([{"function": "avg", "column": "progress"}])
+
+        assert query == "SELECT AVG(progress) AS avg_progress FROM projects WHERE company_id = $1"
+        assert params == ["company-123"]
+
+    @pytest.mark.parametrize("kwargs", [
+        {"aggregates": [{"function": "median", "column": "amount"}]},
+        {"aggregates": [{"function": "sum", "column": "status"}]},
+        {"aggregates": [{"function": "sum", "column": "amount; DROP TABLE tasks"}]},
+        {"group_by": ["description"]},
+        {"group_by": ["project"]},  # projects have no parent project
+        {"date_bucket": {"column": "due_date", "unit": "fortnight"}},
+        {"date_bucket": {"column": "name", "unit": "month"}},
+    ])
+    def test_rejects_unlisted_functions_and_columns(self, kwargs):
+        table = "payment_installments" if "aggregates" in kwargs else "projects"
+        builder = QueryBuilder(table=table, role="admin", company_id="company-123")
+        with pytest.raises(ValueError):
+            builder.build_aggregate(**kwargs)
@@ -0,0 +1,173 @@
+"""
+Tests for result_encoder.py
+
+Tests the compact tabular encoding of tool results, row prioritization and
+elision, and the token savings over pretty-printed JSON.
+"""
+
+import json
+from datetime import date
+
+from src.agent.core.context_window import estimate_tokens
+from src.agent.core.orchestrator import AgentOrchestrator
+from src.agent.core.result_encoder import (
+    encode_table,
+    encode_tool_result,
+    prioritize_rows,
+)
+
+
+def _tasks(n):
+    return [
+        {
+            "id": f"task-{i:04d}",
+            "title": f"Install drywall level {i}",
+            "description": None if i % 2 else f"Hang and tape drywall on level {i}",
+            "status": ["pending", "in-progress", "completed", "blocked"][i % 4],
+            "priority": "high" if i % 5 == 0 else "medium",
+            "assigneeId": None,
+            "dueDate": str(date(2026, 3, 1 + i % 28)),
+            "isMilestone": i % 10 == 0,
+            "category": "interior",
+        }
+        for i in range(n)
+    ]
+
+
+def _tasks_result(n):
+    return {
+        "projectId": "proj-1",
+        "tasks": _tasks(n),
+        "summary": {"totalTasks": n, "pending": n // 4, "blocked": 0},
+        "filters": {"status": None, "assignee": None, "priority": None},
+    }
+
+
+def _legacy(result, max_length=8000):
+    text = json.dumps(result, indent=2, default=str)
+    if len(text) > max_length:
+        return text[:max_length] + "\n... (truncated - data continues)"
+    return text
+
+
+class TestEncodeToolResult:
+
+    def test_tabular_layout(self):
+        text = encode_tool_result(_tasks_result(3))
+        lines = text.splitlines()
+
+        assert lines[0] == "projectId: proj-1"
+        assert lines[1] == "summary: totalTasks=3, pending=0, blocked=0"
+        # All-null filters and the all-null assigneeId column are dropped
+        assert not any(line.startswith("filters") for line in lines)
+        assert lines[2] == (
+            "tasks (3 rows): id|title|description|status|priority|dueDate|isMilestone|category"
+        )
+        assert lines[3] == (
+            "task-0000|Install drywall level 0|Hang and tape drywall on level 0"
+            "|pending|high|2026-03-01|true|interior"
+        )
+        assert lines[4].split("|")[2] == ""
+
+    def test_internal_fields_dropped(self):
+        rows = [{"id": "1", "company_id": "c", "name": "A", "updated_at": "x"}]
+        text = encode_tool_result({"results": rows})
+        assert "company_id" not in text
+        assert "updated_at" not in text
+        assert "results (1 rows): id|name" in text
+
+    def test_cells_are_escaped(self):
+        rows = [{"title": "Line one\nline two | with pipe"}]
+        text, _ = encode_table("issues", rows, 1000)
+        assert text.splitlines()[1] == "Line one line two / with pipe"
+
+    def test_grouped_lists_become_tables(self):
+        result = {"materialsByArea": {"Kitchen": [{"name": "Tile"}], "Bath": [{"name": "Grout"}]}}
+        text = encode_tool_result(result)
+        assert "materialsByArea.Kitchen (1 rows): name" in text
+        assert "materialsByArea.Bath (1 rows): name" in text
+
+    def test_regrouped_rows_reduced_to_counts(self):
+        materials = [{"id": f"m{i}", "name": f"Tile {i}", "area": "Kitchen" if i % 2 else "Bath"} for i in range(4)]
+        result = {
+            "materials": materials,
+            "materialsByArea": {
+                "Bath": [m for m in materials if m["area"] == "Bath"],
+                "Kitchen": [m for m in materials if m["area"] == "Kitchen"],
+            },
+        }
+        text = encode_tool_result(result)
+        assert "materialsByArea (row counts): Bath=2, Kitchen=2" in text
+        assert text.count("Tile 1") == 1
+
+    def test_whole_rows_elided_with_count(self):
+        text = encode_tool_result(_tasks_result(200), max_chars=2000)
+        assert len(text) <= 2000
+        last = text.splitlines()[-1]
+        assert last.startswith("... ") and last.endswith("more tasks rows not shown")
+        shown = len(text.splitlines()) - 4
+        assert last == f"... {200 - shown} more tasks rows not shown"
+        # No row is cut mid-way
+        for line in text.splitlines()[3:-1]:
+            assert line.startswith("task-")
+            assert line.endswith("interior")
+
+    def test_rows_matching_params_come_first(self):
+        rows = _tasks(100)
+        text = encode_tool_result({"tasks": rows}, params={"search": "level 97"}, max_chars=300)
+        assert text.splitlines()[1].startswith("task-0097")
+
+    def test_prioritize_rows_keeps_order_without_matches(self):
+        rows = _tasks(5)
+        assert prioritize_rows(rows, {"status_filter": "all"}) == rows
+        assert prioritize_rows(rows, None) == rows
+
+    def test_huge_string_field_is_shortened(self):
+        result = {"projectId": "proj-1", "notes": "x" * 50_000, "tasks": _tasks(3)}
+        text = encode_tool_result(result)
+        assert len(text) <= 8000
+        assert "notes: " + "x" * 100 in text and "x..." in text
+        # Tables still get the rest of the budget
+        assert "tasks (3 rows):" in text
+
+    def test_huge_id_list_is_shortened(self):
+        ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(20_000)]
+        text = encode_tool_result({"taskIds": ids, "count": len(ids)})
+        assert len(text) <= 8000
+        assert text.splitlines()[0].startswith('taskIds: ["00000000-0000-0000-0000-000000000000",')
+        assert "more)" in text.splitlines()[0]
+        assert "count: 20000" in text
+
+    def test_many_fields_fit_the_budget(self):
+        result = {f"field{i}": "y" * 900 for i in range(50)}
+        text = encode_tool_result(result, max_chars=4000)
+        assert len(text) <= 4000
+        assert text.splitlines()[-1].endswith("more fields not shown")
+
+    def test_non_dict_results_are_shortened(self):
+        text = encode_tool_result("z" * 20_000, max_chars=500)
+        assert len(text) <= 500 and text.endswith("z...")
+        text = encode_tool_result(list(range(20_000)), max_chars=500)
+        assert len(text) <= 500 and "more)" in text
+
+    def test_orchestrator_uses_encoder(self):
+        text = AgentOrchestrator._summarize_result(None, _tasks_result(2), {})
+        assert "tasks (2 rows):" in text
+
+
+class TestTokenBenchmark:
+    """Tokens per result on fixture data, compact encoding vs indented JSON."""
+
+    def test_fewer_tokens_for_same_rows(self):
+        result = _tasks_result(30)
+        legacy = estimate_tokens(json.dumps(result, indent=2, default=str))
+        compact = estimate_tokens(encode_tool_result(result, max_chars=100_000))
+        assert compact < legacy * 0.4
+
+    def test_more_rows_fit_in_budget(self):
+        result = _tasks_result(200)
+        legacy = _legacy(result)
+        compact = encode_tool_result(result)
+        legacy_rows = legacy.count('"id": "task-')
+        compact_rows = sum(1 for line in compact.splitlines() if line.startswith("task-"))
+        assert compact_rows >= legacy_rows * 2.5
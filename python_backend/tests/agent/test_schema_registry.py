@@ -48,6 +48,12 @@ class TestSchemaRegistryConfiguration:
                 assert col == col.lower(), f"{table_name}.{col} is not lowercase"
                 assert "-" not in col, f"{table_name}.{col} contains hyphen"
 
+    def test_aggregation_whitelists_are_table_columns(self):
+        """Group-by, numeric and date columns must be real columns of the table."""
+        for table_name, config in TABLE_CONFIGS.items():
+            for col in config.group_by_columns + config.numeric_columns + config.date_columns:
+                assert col in config.all_columns, f"{table_name}.{col} not in all_columns"
+
     def test_all_roles_defined_in_permissions(self):
         """Test 4: Verify all 6 roles are used across table permissions."""
         all_roles = {"admin", "project_manager", "office_manager", "crew", "subcontractor", "client"}
@@ -0,0 +1,292 @@
+"""
+Tests for api/sse.py
+
+Tests chunk coalescing, event IDs, replay after Last-Event-ID, heartbeats,
+cancelling abandoned turns, and the resume endpoint's access checks.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.agent.api import chat as chat_module
+from src.agent.api.sse import (
+    AgentStream,
+    AgentStreamRegistry,
+    merge_content,
+    parse_last_event_id,
+    sse_frames,
+    StreamEvent,
+)
+from src.api.auth import get_current_user_dependency
+
+
+async def token_source(tokens, delay=0.0, done=True):
+    for token in tokens:
+        if delay:
+            await asyncio.sleep(delay)
+        yield {"type": "content", "data": {"content": token}}
+    if done:
+        yield {"type": "done", "data": {"conversation_id": "conv-1"}}
+
+
+async def finish(stream: AgentStream):
+    await asyncio.wait_for(stream._task, 2)
+
+
+def make_stream(**kwargs) -> AgentStream:
+    defaults = dict(max_events=100, coalesce_seconds=0.05, coalesce_chars=1000, resume_grace_seconds=0.05)
+    defaults.update(kwargs)
+    return AgentStream(user_id="user-1", **defaults)
+
+
+async def collect(stream, after_seq=0, heartbeat_seconds=5):
+    return [frame async for frame in sse_frames(stream, after_seq, heartbeat_seconds=heartbeat_seconds)]
+
+
+class TestCoalescing:
+
+    @pytest.mark.asyncio
+    async def test_tokens_within_window_become_one_event(self):
+        stream = make_stream()
+        stream.start(token_source(["Hel", "lo", " there"]))
+        await finish(stream)
+
+        assert [(e.type, e.data) for e in stream.events] == [
+            ("content", {"content": "Hello there"}),
+            ("done", {"conversation_id": "conv-1"}),
+        ]
+        assert stream.conversation_id == "conv-1"
+
+    @pytest.mark.asyncio
+    async def test_size_limit_flushes_early(self):
+        stream = make_stream(coalesce_chars=4)
+        stream.start(token_source(["ab", "cd", "ef"]))
+        await finish(stream)
+
+        contents = [e.data["content"] for e in stream.events if e.type == "content"]
+        assert contents == ["abcd", "ef"]
+
+    @pytest.mark.asyncio
+    async def test_non_content_event_flushes_pending_text(self):
+        async def source():
+            yield {"type": "content", "data": {"content": "Checking"}}
+            yield {"type": "tool_start", "data": {"tool": "get_tasks"}}
+            yield {"type": "content", "data": {"content": "Done"}}
+
+        stream = make_stream()
+        stream.start(source())
+        await finish(stream)
+
+        assert [e.type for e in stream.events] == ["content", "tool_start", "content"]
+        assert [e.seq for e in stream.events] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_source_error_becomes_error_event(self):
+        async def source():
+            yield {"type": "content", "data": {"content": "partial"}}
+            raise RuntimeError("provider down")
+
+        stream = make_stream()
+        stream.start(source())
+        await finish(stream)
+
+        assert stream.events[-1].type == "error"
+        assert stream.events[-1].data == {"message": "provider down"}
+
+
+class TestFrames:
+
+    @pytest.mark.asyncio
+    async def test_frames_carry_stream_ids(self):
+        stream = make_stream()
+        stream.start(token_source(["hi"]))
+        frames = await collect(stream)
+
+        assert frames[0].startswith("retry:")
+        assert frames[1].startswith(f"id: {stream.id}:1\nevent: content\n")
+        assert frames[2].startswith(f"id: {stream.id}:2\nevent: done\n")
+
+    @pytest.mark.asyncio
+    async def test_replay_after_last_event_id(self):
+        async def source():
+            yield {"type": "tool_start", "data": {"tool": "get_tasks"}}
+            yield {"type": "tool_result", "data": {"tool": "get_tasks"}}
+            yield {"type": "done", "data": {}}
+
+        stream = make_stream()
+        stream.start(source())
+        await finish(stream)
+
+        frames = await collect(stream, after_seq=1)
+        assert [f.split("\n")[1] for f in frames[1:]] == ["event: tool_result", "event: done"]
+
+    @pytest.mark.asyncio
+    async def test_catch_up_merges_buffered_content(self):
+        stream = make_stream()
+        for token in ["a", "b", "c"]:
+            stream.publish("content", {"content": token})
+        stream.publish("done", {})
+        stream.finished = True
+
+        frames = await collect(stream)
+        assert frames[1].startswith(f"id: {stream.id}:3\nevent: content\n")
+        assert '"abc"' in frames[1].replace(" ", "")
+
+    @pytest.mark.asyncio
+    async def test_reports_replay_gap(self):
+        stream = make_stream(max_events=2)
+        for token in ["a", "b", "c", "d"]:
+            stream.publish("tool_start", {"tool": token})
+        stream.finished = True
+
+        frames = await collect(stream, after_seq=1)
+        assert frames[1].startswith("event: replay_gap")
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_while_idle(self):
+        stream = make_stream()
+        stream.start(token_source(["slow"], delay=0.15))
+        frames = await collect(stream, heartbeat_seconds=0.05)
+
+        assert ": keep-alive\n\n" in frames
+        assert frames[-1].startswith(f"id: {stream.id}:2\nevent: done")
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_gets_done_without_waiting_for_heartbeat(self):
+        async def source():
+            yield {"type": "tool_start", "data": {"tool": "get_tasks"}}
+            # Lands while the consumer is still sending tool_start
+            await asyncio.sleep(0.07)
+            yield {"type": "tool_result", "data": {"tool": "get_tasks"}}
+            yield {"type": "done", "data": {}}
+
+        async def slow_consumer():
+            frames = []
+            async for frame in sse_frames(stream, heartbeat_seconds=3):
+                frames.append(frame)
+                await asyncio.sleep(0.05)
+            return frames
+
+        stream = make_stream()
+        stream.start(source())
+        frames = await asyncio.wait_for(slow_consumer(), 1)
+
+        assert ": keep-alive\n\n" not in frames
+        assert [f.split("\n")[1] for f in frames[1:]] == [
+            "event: tool_start", "event: tool_result", "event: done",
+        ]
+
+
+class TestDisconnect:
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_is_cancelled(self):
+        cancelled = asyncio.Event()
+
+        async def source():
+            try:
+                yield {"type": "content", "data": {"content": "thinking"}}
+                await asyncio.sleep(10)
+                yield {"type": "done", "data": {}}
+            finally:
+                cancelled.set()
+
+        stream = make_stream()
+        stream.start(source())
+        frames = sse_frames(stream, heartbeat_seconds=5)
+        await frames.__anext__()  # retry
+        await frames.__anext__()  # first content
+        await frames.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert stream.cancelled
+        assert stream.finished
+
+    @pytest.mark.asyncio
+    async def test_reconnect_within_grace_keeps_running(self):
+        stream = make_stream(resume_grace_seconds=0.1)
+        stream.start(token_source(["a", "b"], delay=0.05))
+        frames = sse_frames(stream, heartbeat_seconds=5)
+        await frames.__anext__()
+        await frames.aclose()
+
+        # Reconnect before the grace period ends
+        await asyncio.sleep(0.02)
+        resumed = await collect(stream)
+        assert not stream.cancelled
+        assert resumed[-1].split("\n")[1] == "event: done"
+
+
+class TestRegistry:
+
+    @pytest.mark.asyncio
+    async def test_prunes_finished_streams(self):
+        registry = AgentStreamRegistry(retain_seconds=0)
+        stream = registry.create("user-1", token_source([]), coalesce_seconds=0)
+        await finish(stream)
+        await asyncio.sleep(0.01)
+
+        assert registry.get(stream.id) is None
+
+    @pytest.mark.asyncio
+    async def test_caps_stream_count(self):
+        registry = AgentStreamRegistry(max_streams=1)
+        first = registry.create("user-1", token_source(["x"], delay=1), coalesce_seconds=0)
+        second = registry.create("user-1", token_source([]), coalesce_seconds=0)
+        await asyncio.sleep(0.01)
+
+        assert registry.get(first.id) is None
+        assert registry.get(second.id) is second
+        assert first.cancelled
+
+
+class TestHelpers:
+
+    def test_parse_last_event_id(self):
+        assert parse_last_event_id("abc:12") == ("abc", 12)
+        assert parse_last_event_id("abc") is None
+        assert parse_last_event_id("abc:x") is None
+        assert parse_last_event_id(None) is None
+
+    def test_merge_content_keeps_other_events(self):
+        events = [
+            StreamEvent(1, "content", {"content": "a"}),
+            StreamEvent(2, "tool_start", {}),
+            StreamEvent(3, "content", {"content": "b"}),
+            StreamEvent(4, "content", {"content": "c"}),
+        ]
+        merged = merge_content(events)
+        assert [(e.seq, e.type) for e in merged] == [(1, "content"), (2, "tool_start"), (4, "content")]
+        assert merged[-1].data == {"content": "bc"}
+
+
+class TestResumeEndpoint:
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+        app.include_router(chat_module.router)
+        return app
+
+    def test_requires_authentication(self, app):
+        app.dependency_overrides[get_current_user_dependency] = lambda: None
+        response = TestClient(app).get("/agent/chat/streams/abc")
+        assert response.status_code == 401
+
+    def test_client_role_rejected(self, app):
+        app.dependency_overrides[get_current_user_dependency] = lambda: {"id": "u", "role": "client"}
+        response = TestClient(app).get("/agent/chat/streams/abc")
+        assert response.status_code == 403
+
+    def test_unknown_stream_is_404(self, app):
+        app.dependency_overrides[get_current_user_dependency] = lambda: {"id": "u", "role": "admin"}
+        response = TestClient(app).get("/agent/chat/streams/abc", headers={"Last-Event-ID": "abc:3"})
+        assert response.status_code == 404
+
+    def test_mismatched_cursor_is_400(self, app):
+        app.dependency_overrides[get_current_user_dependency] = lambda: {"id": "u", "role": "admin"}
+        response = TestClient(app).get("/agent/chat/streams/abc", params={"lastEventId": "other:3"})
+        assert response.status_code == 400
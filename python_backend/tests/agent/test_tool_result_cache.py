@@ -0,0 +1,176 @@
+"""
+Tests for the read-only tool result cache in executor.py
+
+Tests reuse of identical calls, scoping of cache keys, write-path
+invalidation and cache-hit audit records.
+"""
+
+import pytest
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+from src.agent.cache import notify_company_changed, notify_project_changed
+from src.agent.models.agent_models import SafetyLevel
+from src.agent.tools.base_tool import BaseTool
+from src.agent.tools.executor import ToolExecutor, ToolResultCache
+from src.agent.tools.registry import tool_registry
+
+
+class CountingTool(BaseTool):
+    """Tool that counts executions."""
+
+    def __init__(self, name: str, safety_level: SafetyLevel = SafetyLevel.READ_ONLY):
+        self._name = name
+        self._safety_level = safety_level
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "Counting tool for tests"
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {"properties": {"project_id": {"type": "string"}}, "required": []}
+
+    @property
+    def permissions(self) -> List[str]:
+        return ["admin", "crew"]
+
+    @property
+    def safety_level(self) -> SafetyLevel:
+        return self._safety_level
+
+    async def execute(self, params: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        return {"calls": self.calls, "items": [1, 2, 3]}
+
+
+@pytest.fixture
+def read_tool():
+    tool = CountingTool("test_cached_read")
+    tool_registry.register(tool)
+    yield tool
+    tool_registry.unregister(tool.name)
+
+
+@pytest.fixture
+def executor():
+    return ToolExecutor(result_cache=ToolResultCache(ttl_seconds=60))
+
+
+class TestToolResultCache:
+    """Executor-level caching of READ_ONLY tools."""
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_reuse_result(self, executor, read_tool, admin_context):
+        first = await executor.execute(read_tool.name, {"project_id": "p1"}, admin_context)
+        second = await executor.execute(read_tool.name, {"project_id": "p1"}, admin_context)
+
+        assert read_tool.calls == 1
+        assert first == second
+        assert executor.result_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_param_order_and_none_values_normalized(self, executor, read_tool, admin_context):
+        await executor.execute(read_tool.name, {"project_id": "p1", "status": None}, admin_context)
+        await executor.execute(read_tool.name, {"project_id": "p1"}, admin_context)
+        assert read_tool.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_scoped_by_company_and_role(self, executor, read_tool, admin_context, crew_context):
+        await executor.execute(read_tool.name, {}, admin_context)
+        await executor.execute(read_tool.name, {}, {**admin_context, "company_id": "other"})
+        await executor.execute(read_tool.name, {}, crew_context)
+        assert read_tool.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self, executor, read_tool, admin_context):
+        first = await executor.execute(read_tool.name, {}, admin_context)
+        first["items"].append(99)
+        second = await executor.execute(read_tool.name, {}, admin_context)
+        assert second["items"] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_project_write_invalidates(self, executor, read_tool, admin_context):
+        await executor.execute(read_tool.name, {"project_id": "p1"}, admin_context)
+        await executor.execute(read_tool.name, {"project_id": "p2"}, admin_context)
+        await executor.execute(read_tool.name, {}, admin_context)
+
+        notify_project_changed("p1")
+
+        await executor.execute(read_tool.name, {"project_id": "p1"}, admin_context)
+        await executor.execute(read_tool.name, {"project_id": "p2"}, admin_context)
+        await executor.execute(read_tool.name, {}, admin_context)
+        # p1 and the unscoped call re-run; p2 is still cached
+        assert read_tool.calls == 5
+
+    @pytest.mark.asyncio
+    async def test_company_write_invalidates(self, executor, read_tool, admin_context):
+        await executor.execute(read_tool.name, {}, admin_context)
+        notify_company_changed(admin_context["company_id"])
+        await executor.execute(read_tool.name, {}, admin_context)
+        assert read_tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_non_read_only_tools_not_cached(self, executor, admin_context):
+        tool = CountingTool("test_uncached_write", SafetyLevel.AUDIT_LOGGED)
+        tool_registry.register(tool)
+        try:
+            await executor.execute(tool.name, {}, admin_context)
+            await executor.execute(tool.name, {}, admin_context)
+        finally:
+            tool_registry.unregister(tool.name)
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_writes_single_flagged_audit_row(self, executor, read_tool, admin_context):
+        with patch("src.agent.tools.executor.agent_telemetry") as telemetry:
+            telemetry.record_tool_call = MagicMock(return_value="tc-1")
+            telemetry.update_tool_call = MagicMock()
+
+            await executor.execute(read_tool.name, {}, admin_context, message_id="m1", conversation_id="c1")
+            await executor.execute(read_tool.name, {}, admin_context, message_id="m2", conversation_id="c1")
+
+        assert telemetry.record_tool_call.call_count == 2
+        assert telemetry.update_tool_call.call_count == 1
+        assert telemetry.record_tool_call.call_args_list[1].kwargs["cache_hit"] is True
+        assert "cache_hit" not in telemetry.record_tool_call.call_args_list[0].kwargs
+
+    @pytest.mark.asyncio
+    async def test_disabled_with_zero_ttl(self, read_tool, admin_context):
+        executor = ToolExecutor(result_cache=ToolResultCache(ttl_seconds=0))
+        await executor.execute(read_tool.name, {}, admin_context)
+        await executor.execute(read_tool.name, {}, admin_context)
+        assert read_tool.calls == 2
+
+
+class TestStageWritesInvalidate:
+    """Stage mutations drop the project's cached context and tool results."""
+
+    USER = {"id": "u1", "role": "project_manager", "company_id": "c1"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("endpoint, repo_method, body", [
+        ("reorder_stages", "reorder", {"stageIds": ["s2", "s1"]}),
+        ("shift_stage_dates", "shift_dates", {"afterOrderIndex": 1, "deltaDays": 3}),
+    ])
+    async def test_reorder_and_shift_notify(self, endpoint, repo_method, body):
+        from unittest.mock import AsyncMock
+
+        from src.api.v1 import stages
+        from src.models.stage import ReorderStagesRequest, ShiftDatesRequest
+
+        request_model = ReorderStagesRequest if endpoint == "reorder_stages" else ShiftDatesRequest
+        with patch.object(stages, "verify_project_access", AsyncMock()), \
+             patch.object(stages.project_stage_repo, repo_method, AsyncMock(return_value=[{"id": "s1"}])), \
+             patch.object(stages, "notify_project_changed") as notify:
+            result = await getattr(stages, endpoint)(
+                project_id="p1", request=request_model(**body), current_user=self.USER, pool=None,
+            )
+
+        assert result == [{"id": "s1"}]
+        notify.assert_called_once_with("p1")
@@ -0,0 +1,74 @@
+"""
+Tests for api/analytics.py heartbeat recording
+
+Tests that the daily stats upsert uses its agent-active parameter with one
+type throughout, and (when TEST_DATABASE_URL is set) that it runs against a
+real analytics_daily_stats table and sets the minute bitmaps.
+"""
+
+import os
+import re
+import uuid
+
+import pytest
+
+from src.api.analytics import HEARTBEAT_STATS_UPSERT
+from src.database import connection
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class TestUpsertParameters:
+
+    def test_agent_active_is_only_used_as_boolean(self):
+        # PostgreSQL deduces a single type per parameter; mixing $3 and
+        # $3::int fails with "inconsistent types deduced for parameter $3"
+        casts = re.findall(r"\$3::(\w+)", HEARTBEAT_STATS_UPSERT)
+        assert casts and set(casts) == {"boolean"}
+        # Integer contexts (the set_bit value) convert explicitly
+        assert "CASE WHEN $3 THEN 1 ELSE 0 END" in HEARTBEAT_STATS_UPSERT
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="set TEST_DATABASE_URL to a PostgreSQL database")
+class TestUpsertAgainstDatabase:
+
+    @pytest.fixture
+    async def conn(self, monkeypatch):
+        from src.database.init_analytics_schema import init_analytics_schema
+
+        monkeypatch.setattr(connection, "DATABASE_URL", TEST_DATABASE_URL)
+        monkeypatch.setattr(connection, "DATABASE_REPLICA_URL", None)
+        monkeypatch.setattr(connection, "_pool", None)
+        await init_analytics_schema()
+        pool = await connection.get_db_pool()
+        async with pool.acquire() as conn:
+            yield conn
+        await connection.close_db_pool()
+
+    @pytest.mark.asyncio
+    async def test_parameter_types(self, conn):
+        statement = await conn.prepare(HEARTBEAT_STATS_UPSERT)
+        assert [t.name for t in statement.get_parameters()] == ["varchar", "varchar", "bool"]
+
+    @pytest.mark.asyncio
+    async def test_upsert_sets_minute_bitmaps(self, conn):
+        user_id = f"heartbeat-test-{uuid.uuid4().hex[:8]}"
+        try:
+            await conn.execute(HEARTBEAT_STATS_UPSERT, user_id, "c1", True)
+            await conn.execute(HEARTBEAT_STATS_UPSERT, user_id, "c1", False)
+            row = await conn.fetchrow(
+                """
+                SELECT last_agent_active,
+                       (SELECT count(*) FROM generate_series(0, 1439) n
+                        WHERE get_bit(active_minutes, n) = 1) AS active,
+                       (SELECT count(*) FROM generate_series(0, 1439) n
+                        WHERE get_bit(agent_minutes, n) = 1) AS agent
+                FROM public.analytics_daily_stats
+                WHERE user_id = $1 AND stat_date = CURRENT_DATE
+                """,
+                user_id,
+            )
+            assert row["last_agent_active"] is False
+            assert row["active"] >= 1 and row["agent"] >= 1
+        finally:
+            await conn.execute("DELETE FROM public.analytics_daily_stats WHERE user_id = $1", user_id)
@@ -0,0 +1,278 @@
+"""
+Tests for the analytics dashboard rollups (services/analytics_rollups.py)
+and the HyperLogLog sketch they use (utils/hyperloglog.py).
+
+The parity tests compute the dashboard the way the previous raw queries over
+analytics_daily_stats did and compare it with the rollup-based result.
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from src.services.analytics_rollups import (
+    WATERMARK_OVERLAP,
+    build_daily_rollups,
+    build_weekly_rollups,
+    refresh_rollups,
+    summarize_dashboard,
+    week_start,
+)
+from src.utils.hyperloglog import HyperLogLog
+
+TODAY = date(2026, 3, 18)  # a Wednesday
+
+
+def make_stats(seed=7, days=30, companies=3, users_per_company=40):
+    """analytics_daily_stats rows: one per active user per day."""
+    rng = random.Random(seed)
+    rows = []
+    for c in range(companies):
+        company_id = f"company-{c}" if c else None  # some rows have no company
+        for u in range(users_per_company):
+            for d in range(days):
+                if rng.random() < 0.35:
+                    rows.append({
+                        "user_id": f"user-{c}-{u}",
+                        "company_id": company_id,
+                        "stat_date": TODAY - timedelta(days=d),
+                        "total_time_seconds": rng.randint(0, 7200),
+                        "agent_time_seconds": rng.randint(0, 3600),
+                        "app_time_seconds": rng.randint(0, 3600),
+                        "action_count": rng.randint(0, 50),
+                        "login_count": rng.randint(0, 3),
+                    })
+    return rows
+
+
+def _avg_int(values):
+    if not values:
+        return 0
+    return int((Decimal(sum(values)) / Decimal(len(values))).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def raw_dashboard(rows, start, end, today, company_id=None):
+    """Python rendition of the previous raw analytics_daily_stats queries."""
+    rows = [r for r in rows if not company_id or r["company_id"] == company_id]
+
+    def day_row(day_rows):
+        return {
+            "active_users": len({r["user_id"] for r in day_rows}),
+            "avg_time_seconds": _avg_int([r["total_time_seconds"] for r in day_rows]),
+            "total_actions": sum(r["action_count"] for r in day_rows),
+            "total_logins": sum(r["login_count"] for r in day_rows),
+            "agent_time_seconds": sum(r["agent_time_seconds"] for r in day_rows),
+            "app_time_seconds": sum(r["app_time_seconds"] for r in day_rows),
+        }
+
+    in_range = [r for r in rows if start <= r["stat_date"] <= end]
+    dates = sorted({r["stat_date"] for r in in_range})
+    trends = [{"date": d.isoformat(), **day_row([r for r in in_range if r["stat_date"] == d])} for d in dates]
+    today_row = day_row([r for r in rows if r["stat_date"] == today])
+    return {
+        "today": {
+            "active_users": today_row["active_users"],
+            "avg_time": today_row["avg_time_seconds"],
+            "total_actions": today_row["total_actions"],
+            "total_logins": today_row["total_logins"],
+            "agent_time": today_row["agent_time_seconds"],
+            "app_time": today_row["app_time_seconds"],
+        },
+        "range": {
+            "active_users_in_range": len({r["user_id"] for r in in_range}),
+            # AVG over the LATERAL cross join == mean of the per-day counts
+            "avg_daily_active": (sum(t["active_users"] for t in trends) / len(trends)) if trends else 0.0,
+        },
+        "trends": trends,
+    }
+
+
+def rollup_dashboard(rows, start, end, today, company_id=None):
+    """What load_dashboard_rollups + summarize_dashboard return for the same data."""
+    daily = build_daily_rollups(rows)
+    weekly = build_weekly_rollups(daily.values())
+    daily_rows = [
+        r for (c, d), r in daily.items()
+        if (start <= d <= end or d == today) and (not company_id or c == company_id)
+    ]
+    weekly_rows = [
+        r for (c, w), r in weekly.items()
+        if w >= start and w + timedelta(days=6) <= end and (not company_id or c == company_id)
+    ]
+    return summarize_dashboard(daily_rows, weekly_rows, start, end, today)
+
+
+class TestHyperLogLog:
+
+    def test_small_sets_are_near_exact(self):
+        assert abs(HyperLogLog.of(f"user-{i}" for i in range(50)).count() - 50) <= 1
+        assert HyperLogLog().count() == 0
+
+    def test_large_set_within_error_bound(self):
+        estimate = HyperLogLog.of(f"user-{i}" for i in range(20000)).count()
+        assert abs(estimate - 20000) / 20000 < 0.05
+
+    def test_merge_is_union(self):
+        a = HyperLogLog.of(f"user-{i}" for i in range(0, 300))
+        b = HyperLogLog.of(f"user-{i}" for i in range(200, 500))
+        merged = HyperLogLog.from_bytes(a.to_bytes()).merge(b)
+        assert merged.registers == HyperLogLog.of(f"user-{i}" for i in range(500)).registers
+        assert abs(merged.count() - 500) <= 10
+
+    @pytest.mark.parametrize("size", [3, 5000])
+    def test_serialization_round_trip(self, size):
+        sketch = HyperLogLog.of(f"u{i}" for i in range(size))
+        data = sketch.to_bytes()
+        assert HyperLogLog.from_bytes(data).registers == sketch.registers
+        if size == 3:
+            assert len(data) == 2 + 3 * 3  # sparse
+
+    def test_merge_is_register_wise_max(self):
+        rng = random.Random(3)
+        for _ in range(5):
+            a = HyperLogLog(10, bytearray(rng.randint(0, 55) for _ in range(1024)))
+            b = HyperLogLog(10, bytearray(rng.choice([0, rng.randint(0, 55)]) for _ in range(1024)))
+            expected = bytearray(map(max, a.registers, b.registers))
+            assert HyperLogLog(10, bytearray(a.registers)).merge(b).registers == expected
+
+    def test_count_matches_reference_estimate(self):
+        sketch = HyperLogLog.of(f"user-{i}" for i in range(60000))
+        m = sketch.m
+        reference = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in sketch.registers)
+        assert sketch.count() == int(round(reference))
+
+
+class TestDashboardParity:
+
+    @pytest.mark.parametrize("start, end, company_id", [
+        (TODAY - timedelta(days=7), TODAY, None),
+        (TODAY - timedelta(days=29), TODAY, None),
+        (TODAY - timedelta(days=20), TODAY - timedelta(days=3), "company-1"),
+        (TODAY - timedelta(days=5), TODAY - timedelta(days=1), "company-2"),
+    ])
+    def test_matches_raw_queries(self, start, end, company_id):
+        rows = make_stats()
+        raw = raw_dashboard(rows, start, end, TODAY, company_id)
+        rolled = rollup_dashboard(rows, start, end, TODAY, company_id)
+
+        assert rolled["today"] == raw["today"]
+        assert rolled["trends"] == raw["trends"]
+        assert rolled["range"]["avg_daily_active"] == pytest.approx(raw["range"]["avg_daily_active"])
+        expected = raw["range"]["active_users_in_range"]
+        # Sketch estimate: off only by register collisions at these sizes
+        assert abs(rolled["range"]["active_users_in_range"] - expected) <= max(2, expected * 0.02)
+
+    def test_empty_range(self):
+        rolled = rollup_dashboard([], TODAY - timedelta(days=7), TODAY, TODAY)
+        assert rolled == raw_dashboard([], TODAY - timedelta(days=7), TODAY, TODAY)
+
+    def test_weekly_rollup_unions_days(self):
+        rows = make_stats(companies=1)
+        weekly = build_weekly_rollups(build_daily_rollups(rows).values())
+        monday = week_start(TODAY - timedelta(days=7))
+        week = weekly[("", monday)]
+        users = {r["user_id"] for r in rows if monday <= r["stat_date"] < monday + timedelta(days=7)}
+        assert abs(week.active_users - len(users)) <= 2
+        assert week.action_count == sum(
+            r["action_count"] for r in rows if monday <= r["stat_date"] < monday + timedelta(days=7)
+        )
+
+    def test_weekly_rollup_counts_each_week_once(self, monkeypatch):
+        daily = build_daily_rollups(make_stats(companies=1))
+        weekly_keys = {(c, week_start(d)) for c, d in daily}
+        calls = []
+        original = HyperLogLog.count
+        monkeypatch.setattr(HyperLogLog, "count", lambda self: calls.append(1) or original(self))
+
+        build_weekly_rollups(daily.values())
+        assert len(calls) == len(weekly_keys) < len(daily)
+
+
+class FakeRollupConn:
+    """Serves the refresh queries from in-memory stats rows."""
+
+    def __init__(self, stats, watermark=None, now=None):
+        self.stats = stats
+        self.watermark = watermark
+        self.now = now or datetime(2026, 3, 18, 12, 0, tzinfo=timezone.utc)
+        self.daily = {}
+        self.weekly = {}
+        self.changed_since = "unset"
+
+    def transaction(self):
+        class _Tx:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Tx()
+
+    async def execute(self, query, *args):
+        if "SET watermark" in query:
+            self.watermark = args[1]
+        return "OK"
+
+    async def fetchrow(self, query, *args):
+        return {"watermark": self.watermark, "now": self.now}
+
+    async def fetch(self, query, *args):
+        if "SELECT DISTINCT" in query:
+            self.changed_since = args[0]
+            return [
+                {"company_id": r["company_id"] or "", "stat_date": r["stat_date"]}
+                for r in self.stats if args[0] is None or r["updated_at"] > args[0]
+            ]
+        if "FROM public.analytics_daily_stats ds" in query:
+            wanted = set(zip(args[0], args[1]))
+            return [
+                {**r, "company_id": r["company_id"] or ""}
+                for r in self.stats if ((r["company_id"] or ""), r["stat_date"]) in wanted
+            ]
+        if "FROM public.analytics_rollup_daily r" in query:
+            weeks = set(zip(args[0], args[1]))
+            return [
+                {"company_id": c, "period_start": d, "active_users": row[2],
+                 "total_time_seconds": row[3], "agent_time_seconds": row[4], "app_time_seconds": row[5],
+                 "action_count": row[6], "login_count": row[7], "user_sketch": row[8]}
+                for (c, d), row in self.daily.items() if (c, week_start(d)) in weeks
+            ]
+        raise AssertionError(f"Unexpected query: {query}")
+
+    async def executemany(self, query, args_list):
+        target = self.daily if "analytics_rollup_daily" in query else self.weekly
+        for args in args_list:
+            target[(args[0], args[1])] = args
+
+
+class TestRefresh:
+
+    @pytest.mark.asyncio
+    async def test_only_changed_days_are_reaggregated(self):
+        old = datetime(2026, 3, 18, 11, 0, tzinfo=timezone.utc)
+        new = datetime(2026, 3, 18, 11, 59, tzinfo=timezone.utc)
+        stats = [
+            {"user_id": "u1", "company_id": "c1", "stat_date": TODAY, "updated_at": new,
+             "total_time_seconds": 60, "agent_time_seconds": 0, "app_time_seconds": 60,
+             "action_count": 2, "login_count": 1},
+            {"user_id": "u2", "company_id": "c1", "stat_date": TODAY - timedelta(days=10), "updated_at": old,
+             "total_time_seconds": 30, "agent_time_seconds": 30, "app_time_seconds": 0,
+             "action_count": 1, "login_count": 0},
+        ]
+        watermark = datetime(2026, 3, 18, 11, 50, tzinfo=timezone.utc)
+        conn = FakeRollupConn(stats, watermark=watermark)
+
+        assert await refresh_rollups(conn) == {"days": 1, "weeks": 1}
+        assert conn.changed_since == watermark - WATERMARK_OVERLAP
+        assert list(conn.daily) == [("c1", TODAY)]
+        assert list(conn.weekly) == [("c1", week_start(TODAY))]
+        assert conn.watermark == conn.now
+
+    @pytest.mark.asyncio
+    async def test_fresh_rollups_are_not_refreshed(self):
+        conn = FakeRollupConn([], watermark=datetime(2026, 3, 18, 11, 59, tzinfo=timezone.utc))
+        assert await refresh_rollups(conn, max_age=timedelta(minutes=2)) == {"days": 0, "weeks": 0}
+        assert conn.changed_since == "unset"
@@ -0,0 +1,309 @@
+"""
+Tests for database/cascade_delete.py
+
+Tests the delete plan derived from FK metadata plus declared references
+(leaf-first order, nullified references, cycles, missing tables), the
+keyed batch loop with progress reporting, and scheduling a background
+deletion, that RESTRICT keys block the delete instead of being purged, and
+that a malformed deletion id is reported as not found.
+"""
+
+import pytest
+
+from src.database.cascade_delete import (
+    BLOCK,
+    DELETE,
+    NULLIFY,
+    CascadeBlockedError,
+    Reference,
+    build_graph,
+    get_deletion,
+    purge,
+    schedule_deletion,
+)
+
+
+def columns(spec):
+    """{table: {column: nullable}} -> information_schema-style rows."""
+    return [
+        {"table_name": table, "column_name": column, "nullable": nullable}
+        for table, cols in spec.items() for column, nullable in cols.items()
+    ]
+
+
+def keys(spec, overrides=None):
+    overrides = overrides or {}
+    return [
+        {"table_name": table, "relkind": overrides.get(table, ("r", "id"))[0],
+         "pk": overrides.get(table, ("r", "id"))[1]}
+        for table in spec
+    ]
+
+
+def fk(table, column, ref_table, on_delete="a", ref_column="id"):
+    return {"table_name": table, "column_name": column, "ref_table": ref_table,
+            "ref_column": ref_column, "on_delete": on_delete}
+
+
+TABLES = {
+    "public.companies": {"id": False},
+    "public.users": {"id": False, "company_id": False, "manager_id": True},
+    "public.projects": {"id": False, "company_id": False, "created_by": True},
+    "public.tasks": {"id": False, "project_id": False, "assignee_id": True, "parent_id": True},
+    "public.schedule_changes": {"id": False, "task_id": False},
+    "public.sessions": {"sid": False, "sess": False},
+    "public.audit_logs": {"id": False, "company_id": False, "user_id": False},
+}
+
+FOREIGN_KEYS = [
+    fk("public.users", "company_id", "public.companies", on_delete="c"),
+    fk("public.users", "manager_id", "public.users", on_delete="n"),
+    fk("public.projects", "company_id", "public.companies", on_delete="c"),
+    fk("public.projects", "created_by", "public.users"),
+    fk("public.tasks", "project_id", "public.projects", on_delete="c"),
+    fk("public.tasks", "parent_id", "public.tasks"),
+    fk("public.schedule_changes", "task_id", "public.tasks", on_delete="c"),
+    fk("public.audit_logs", "company_id", "public.companies", on_delete="c"),
+    fk("public.audit_logs", "user_id", "public.users", on_delete="r"),
+]
+
+
+def graph(tables=TABLES, foreign_keys=FOREIGN_KEYS, declared=(), key_overrides=None):
+    return build_graph(columns(tables), keys(tables, key_overrides), foreign_keys, declared)
+
+
+def summary(steps):
+    return [(s.action, s.table, tuple(r.column for r in s.path)) for s in steps]
+
+
+class TestPlan:
+
+    def test_leaf_first_with_root_last(self):
+        steps = graph().plan("public.companies")
+        deletes = [s for s in steps if s.action == DELETE]
+        order = [s.table for s in deletes]
+        assert order.index("public.schedule_changes") < order.index("public.tasks")
+        assert order.index("public.tasks") < order.index("public.projects")
+        assert order[-1] == "public.companies"
+        assert deletes[-1].sql == "DELETE FROM public.companies WHERE id = $1"
+
+    def test_nullify_steps_come_first(self):
+        plan = summary(graph().plan("public.companies"))
+        first_delete = next(i for i, (action, _, _) in enumerate(plan) if action == DELETE)
+        nullified = {(table, path[-1]) for action, table, path in plan[:first_delete]}
+        # SET NULL, a nullable NO ACTION key, and the self-reference closing a cycle
+        assert nullified == {
+            ("public.users", "manager_id"),
+            ("public.projects", "created_by"),
+            ("public.tasks", "parent_id"),
+        }
+        assert all(action == DELETE for action, _, _ in plan[first_delete:])
+
+    def test_step_joins_back_to_the_root(self):
+        steps = graph().plan("public.companies")
+        step = next(s for s in steps if s.table == "public.schedule_changes")
+        assert step.sql == (
+            "DELETE FROM public.schedule_changes WHERE id = ANY(ARRAY("
+            "SELECT t3.id FROM public.schedule_changes t3, public.tasks t2, public.projects t1 "
+            "WHERE t1.company_id = $1 AND t2.project_id = t1.id AND t3.task_id = t2.id LIMIT $2))"
+        )
+        assert " IN (SELECT" not in step.sql
+
+    def test_declared_reference_overrides_foreign_key(self):
+        declared = [Reference("public.tasks", "assignee_id", "public.users", action=NULLIFY),
+                    Reference("public.projects", "created_by", "public.users", action=DELETE)]
+        plan = summary(graph(declared=declared).plan("public.users"))
+        assert (NULLIFY, "public.tasks", ("assignee_id",)) in plan
+        assert (DELETE, "public.projects", ("created_by",)) in plan
+        assert (DELETE, "public.tasks", ("created_by", "project_id")) in plan
+
+    def test_missing_tables_and_columns_are_skipped(self):
+        declared = [Reference("public.photos", "project_id", "public.projects"),
+                    Reference("public.tasks", "legacy_owner", "public.users")]
+        steps = graph(declared=declared).plan("public.users")
+        assert all("photos" not in s.sql and "legacy_owner" not in s.sql for s in steps)
+
+    def test_table_without_single_column_key_is_not_batched(self):
+        steps = graph(key_overrides={"public.schedule_changes": ("p", None)}).plan("public.projects")
+        step = next(s for s in steps if s.table == "public.schedule_changes")
+        assert not step.batched
+        assert step.sql == (
+            "DELETE FROM public.schedule_changes t2 USING public.tasks t1 "
+            "WHERE t1.project_id = $1 AND t2.task_id = t1.id"
+        )
+
+    def test_user_sessions_are_cleaned_up_by_deleted_keys(self):
+        steps = graph().plan("public.companies")
+        users = next(s for s in steps if s.table == "public.users" and s.action == DELETE)
+        assert users.returning and users.sql.endswith("RETURNING id::text AS key")
+
+
+class TestRestrictedReferences:
+
+    def test_not_null_restrict_key_blocks_instead_of_deleting(self):
+        g = graph()
+        assert all(s.table != "public.audit_logs" for s in g.plan("public.users"))
+        [blocker] = g.blockers("public.users")
+        assert blocker.action == BLOCK
+        assert blocker.sql == (
+            "SELECT EXISTS (SELECT 1 FROM public.audit_logs t1 WHERE t1.user_id = $1)"
+        )
+
+    def test_rows_deleted_through_another_reference_do_not_block(self):
+        # A company delete removes its audit logs via audit_logs.company_id
+        g = graph()
+        assert g.blockers("public.companies") == []
+        assert (DELETE, "public.audit_logs", ("company_id",)) in summary(g.plan("public.companies"))
+
+    def test_declared_reference_is_the_explicit_override(self):
+        declared = [Reference("public.audit_logs", "user_id", "public.users", action=DELETE)]
+        g = graph(declared=declared)
+        assert g.blockers("public.users") == []
+        assert (DELETE, "public.audit_logs", ("user_id",)) in summary(g.plan("public.users"))
+
+
+class FakeConn:
+    """Returns scripted row counts per statement prefix and records statements.
+
+    Blocker checks report rows in the tables listed in `blocked`.
+    """
+
+    def __init__(self, counts=None, blocked=()):
+        self.counts = {prefix: list(values) for prefix, values in (counts or {}).items()}
+        self.blocked = set(blocked)
+        self.statements = []
+
+    def _next(self, query):
+        for prefix, values in self.counts.items():
+            if query.startswith(prefix + " ") and values:
+                return values.pop(0)
+        return 0
+
+    async def execute(self, query, *args):
+        self.statements.append((query, args))
+        verb = query.split()[0]
+        return f"{verb} {self._next(query)}"
+
+    async def fetch(self, query, *args):
+        self.statements.append((query, args))
+        return [{"key": f"k{i}"} for i in range(self._next(query))]
+
+    async def fetchrow(self, query, *args):
+        return None
+
+    async def fetchval(self, query, *args):
+        self.statements.append((query, args))
+        if query.startswith("SELECT EXISTS"):
+            return any(f"FROM {table} " in query for table in self.blocked)
+        if query.startswith("SELECT 1"):
+            return 1
+        return "deletion-1"
+
+    def transaction(self):
+        class _Tx:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Tx()
+
+
+class TestPurge:
+
+    @pytest.mark.asyncio
+    async def test_batches_until_short_and_reports_progress(self):
+        conn = FakeConn({
+            "DELETE FROM public.tasks": [2, 2, 1],
+            "DELETE FROM public.projects": [1],
+            "DELETE FROM public.companies": [1],
+        })
+        snapshots = []
+
+        async def on_progress(progress):
+            snapshots.append(dict(progress.rows))
+
+        assert await purge(conn, graph(), "public.companies", "c1", batch_size=2, on_progress=on_progress)
+
+        task_deletes = [args for q, args in conn.statements if q.startswith("DELETE FROM public.tasks ")]
+        assert task_deletes == [("c1", 2)] * 3
+        assert snapshots[-1]["delete public.tasks"] == 5
+        assert snapshots[-1]["delete public.companies"] == 1
+
+    @pytest.mark.asyncio
+    async def test_root_not_found(self):
+        assert not await purge(FakeConn(), graph(), "public.projects", "missing")
+
+    @pytest.mark.asyncio
+    async def test_session_cleanup_gets_deleted_user_keys(self):
+        conn = FakeConn({"DELETE FROM public.users": [2]})
+        await purge(conn, graph(), "public.companies", "c1", batch_size=10)
+        cleanup = [args for q, args in conn.statements if q.startswith("DELETE FROM public.sessions")]
+        assert cleanup == [(["k0", "k1"],)]
+
+    @pytest.mark.asyncio
+    async def test_audit_logs_survive_user_force_delete(self):
+        conn = FakeConn({"DELETE FROM public.users": [1]}, blocked={"public.audit_logs"})
+        with pytest.raises(CascadeBlockedError) as exc:
+            await purge(conn, graph(), "public.users", "u1")
+
+        assert exc.value.blockers == ["public.audit_logs.user_id"]
+        assert not any(q.startswith(("DELETE", "UPDATE")) for q, _ in conn.statements)
+
+    @pytest.mark.asyncio
+    async def test_user_without_blocking_rows_is_deleted(self):
+        conn = FakeConn({"DELETE FROM public.users": [1]})
+        assert await purge(conn, graph(), "public.users", "u1")
+        assert not any(q.startswith("DELETE FROM public.audit_logs") for q, _ in conn.statements)
+
+
+class TestSchedule:
+
+    @pytest.mark.asyncio
+    async def test_tombstones_and_records_deletion(self):
+        conn = FakeConn()
+        deletion_id = await schedule_deletion(conn, graph(), "public.users", "u1", requested_by="admin")
+
+        assert deletion_id == "deletion-1"
+        queries = [q for q, _ in conn.statements]
+        assert "UPDATE public.users SET is_active = false WHERE id = $1" in queries
+        assert any(q.startswith("DELETE FROM public.sessions") for q in queries)
+        assert not any(q.startswith("DELETE FROM public.users") for q in queries)
+        insert = next(args for q, args in conn.statements if "INSERT INTO public.cascade_deletions" in q)
+        assert insert[:2] == ("public.users", "u1") and insert[3] == "admin"
+
+    @pytest.mark.asyncio
+    async def test_blocked_deletion_is_not_scheduled(self):
+        conn = FakeConn(blocked={"public.audit_logs"})
+        with pytest.raises(CascadeBlockedError):
+            await schedule_deletion(conn, graph(), "public.users", "u1")
+
+        queries = [q for q, _ in conn.statements]
+        assert not any(q.startswith(("UPDATE", "DELETE", "INSERT")) for q in queries)
+
+
+class TestDeletionStatus:
+
+    @pytest.mark.asyncio
+    async def test_malformed_id_is_not_found(self, monkeypatch):
+        from src.database import connection
+
+        async def execute_one(*args):
+            raise AssertionError("a malformed id must not reach the database")
+
+        monkeypatch.setattr(connection.db_manager, "execute_one", execute_one)
+        assert await get_deletion("not-a-uuid") is None
+
+    def test_endpoint_returns_404_for_malformed_id(self):
+        from fastapi.testclient import TestClient
+
+        from main import app
+        from src.api.auth import get_current_user_dependency
+
+        app.dependency_overrides[get_current_user_dependency] = lambda: {"id": "admin", "is_root": True}
+        try:
+            response = TestClient(app).get("/api/v1/rbac/deletions/not-a-uuid")
+        finally:
+            app.dependency_overrides.pop(get_current_user_dependency, None)
+        assert response.status_code == 404
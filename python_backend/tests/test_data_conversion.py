@@ -0,0 +1,232 @@
+"""
+Data Conversion Tests - camelCase/snake_case conversion parity and speed.
+
+Tests cover:
+1. Parity with the original recursive implementation (keys, UUIDs, nesting)
+2. Deeply nested payloads (no recursion limit)
+3. convert_rows bulk fast path
+4. Microbenchmarks: memoized/iterative converters vs the original
+"""
+import re
+import sys
+import os
+import timeit
+import uuid
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.data_conversion import (
+    camel_key,
+    snake_key,
+    to_camel_case,
+    to_snake_case,
+    convert_rows,
+    convert_response_to_camel_case,
+    convert_request_to_snake_case,
+)
+
+
+# ============================================================================
+# REFERENCE IMPLEMENTATION - the original recursive, uncached converters
+# ============================================================================
+
+def _ref_convert_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    elif isinstance(value, dict):
+        return _ref_to_camel_case(value)
+    elif isinstance(value, list):
+        return [_ref_convert_value(item) for item in value]
+    return value
+
+
+def _ref_to_camel_case(data):
+    if isinstance(data, str):
+        components = data.split('_')
+        return components[0] + ''.join(word.capitalize() for word in components[1:])
+    if isinstance(data, dict):
+        converted = {}
+        for key, value in data.items():
+            camel_key_ = _ref_to_camel_case(key) if isinstance(key, str) else key
+            converted[camel_key_] = _ref_convert_value(value)
+        return converted
+    return data
+
+
+def _ref_to_snake_case(data):
+    if isinstance(data, str):
+        s1 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', data)
+        return s1.lower()
+    if isinstance(data, dict):
+        converted = {}
+        for key, value in data.items():
+            snake_key_ = _ref_to_snake_case(key) if isinstance(key, str) else key
+            if isinstance(value, dict):
+                converted[snake_key_] = _ref_to_snake_case(value)
+            elif isinstance(value, list):
+                converted[snake_key_] = [_ref_to_snake_case(item) if isinstance(item, dict) else item for item in value]
+            else:
+                converted[snake_key_] = value
+        return converted
+    return data
+
+
+def _task_row(i: int) -> dict:
+    """A row shaped like SELECT * FROM tasks."""
+    return {
+        "id": uuid.uuid4(),
+        "project_id": uuid.uuid4(),
+        "company_id": "company-123",
+        "title": f"Task {i}",
+        "description": "Install drywall on the second floor",
+        "status": "in_progress",
+        "priority": "high",
+        "assignee_id": None,
+        "due_date": datetime(2025, 1, 1),
+        "created_at": datetime(2024, 12, 1),
+        "updated_at": datetime(2024, 12, 2),
+        "is_milestone": False,
+        "estimated_hours": 4.5,
+        "category": "project",
+    }
+
+
+# ============================================================================
+# PARITY TESTS
+# ============================================================================
+
+class TestKeyConversion:
+    """Single-key conversion matches the original string transformations."""
+
+    @pytest.mark.parametrize("key", [
+        "project_id", "created_at", "id", "is_root", "user_ID", "_private",
+        "trailing_", "a__b", "", "alreadyCamel",
+    ])
+    def test_camel_key_matches_reference(self, key):
+        assert camel_key(key) == _ref_to_camel_case(key)
+        assert to_camel_case(key) == _ref_to_camel_case(key)
+
+    @pytest.mark.parametrize("key", [
+        "projectId", "createdAt", "id", "isRoot", "HTTPStatus", "userID2Name",
+        "already_snake", "", "a1B",
+    ])
+    def test_snake_key_matches_reference(self, key):
+        assert snake_key(key) == _ref_to_snake_case(key)
+        assert to_snake_case(key) == _ref_to_snake_case(key)
+
+    def test_key_cache_is_bounded(self):
+        info = camel_key.cache_info()
+        assert info.maxsize is not None
+
+
+class TestNestedConversion:
+    """Nested structures convert identically to the original implementation."""
+
+    def _payload(self):
+        return {
+            "project_id": uuid.uuid4(),
+            "stage_list": [
+                {"stage_name": "Framing", "material_ids": [uuid.uuid4(), uuid.uuid4()]},
+                {"stage_name": "Drywall", "nested_rows": [[{"inner_key": 1}], [uuid.uuid4()]]},
+            ],
+            "meta_data": {"owner_info": {"first_name": "Ana", "user_id": uuid.uuid4()}},
+            42: "non-string key",
+            "empty_list": [],
+            "empty_dict": {},
+        }
+
+    def test_to_camel_case_matches_reference(self):
+        payload = self._payload()
+        assert to_camel_case(payload) == _ref_to_camel_case(payload)
+
+    def test_to_snake_case_matches_reference(self):
+        payload = {
+            "projectId": "p-1",
+            "stageList": [{"stageName": "Framing"}, "plainItem", [{"innerKey": 1}]],
+            "metaData": {"ownerInfo": {"firstName": "Ana"}},
+            7: "non-string key",
+        }
+        assert to_snake_case(payload) == _ref_to_snake_case(payload)
+
+    def test_response_and_request_helpers(self):
+        rows = [_task_row(1), "not-a-dict"]
+        assert convert_response_to_camel_case(rows) == [_ref_to_camel_case(rows[0]), "not-a-dict"]
+        body = [{"dueDate": "2025-01-01"}, 3]
+        assert convert_request_to_snake_case(body) == [{"due_date": "2025-01-01"}, 3]
+
+    def test_does_not_mutate_input(self):
+        payload = self._payload()
+        before = repr(payload)
+        to_camel_case(payload)
+        assert repr(payload) == before
+
+    def test_deep_nesting_does_not_recurse(self):
+        depth = sys.getrecursionlimit() * 2
+        root = node = {}
+        for _ in range(depth):
+            node["child_node"] = {}
+            node = node["child_node"]
+        converted = to_camel_case(root)
+        for _ in range(depth):
+            converted = converted["childNode"]
+        assert converted == {}
+
+
+class TestConvertRows:
+    """Bulk row conversion matches per-row conversion."""
+
+    def test_camel_rows_match_per_row(self):
+        rows = [_task_row(i) for i in range(10)]
+        assert convert_rows(rows) == [_ref_to_camel_case(r) for r in rows]
+
+    def test_snake_rows_match_per_row(self):
+        rows = [{"projectId": "p", "stageList": [{"stageName": "x"}, 1]} for _ in range(3)]
+        assert convert_rows(rows, case="snake") == [_ref_to_snake_case(r) for r in rows]
+
+    def test_heterogeneous_rows(self):
+        rows = [{"task_id": 1}, {"task_id": 2, "extra_col": uuid.UUID(int=5)}]
+        assert convert_rows(rows) == [{"taskId": 1}, {"taskId": 2, "extraCol": str(uuid.UUID(int=5))}]
+
+    def test_empty_rows(self):
+        assert convert_rows([]) == []
+
+    def test_unknown_case_raises(self):
+        with pytest.raises(ValueError):
+            convert_rows([{"a": 1}], case="kebab")
+
+
+# ============================================================================
+# MICROBENCHMARKS
+# ============================================================================
+
+def _best_of(fn, number: int = 20, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat))
+
+
+class TestConversionBenchmarks:
+    """The memoized converters must be measurably faster than the original."""
+
+    def test_camel_rows_speedup(self):
+        rows = [_task_row(i) for i in range(500)]
+        convert_rows(rows)  # warm the key cache
+
+        baseline = _best_of(lambda: [_ref_to_camel_case(r) for r in rows])
+        per_row = _best_of(lambda: [to_camel_case(r) for r in rows])
+        bulk = _best_of(lambda: convert_rows(rows))
+
+        print(f"\ncamel 500 rows: reference={baseline:.4f}s per_row={per_row:.4f}s bulk={bulk:.4f}s")
+        assert per_row < baseline
+        assert bulk * 1.5 < baseline
+
+    def test_snake_keys_speedup(self):
+        body = {f"fieldName{i}": i for i in range(50)}
+        to_snake_case(body)
+
+        baseline = _best_of(lambda: _ref_to_snake_case(body), number=200)
+        cached = _best_of(lambda: to_snake_case(body), number=200)
+
+        print(f"\nsnake 50 keys: reference={baseline:.4f}s cached={cached:.4f}s")
+        assert cached * 2 < baseline
@@ -0,0 +1,197 @@
+"""
+Export Endpoint Tests - streaming NDJSON/CSV exports.
+
+Tests cover:
+1. Route existence and auth enforcement
+2. stream_query reads through a cursor inside a transaction and chunks output
+3. NDJSON and CSV encoding of UUID/datetime/Decimal/array columns
+"""
+import csv
+import io
+import json
+import sys
+import os
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from src.api.exports import stream_query, encode_ndjson, CsvEncoder
+
+
+@pytest.fixture
+async def client():
+    """Create an async test client."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+# ============================================================================
+# FAKE CONNECTION - records cursor usage without a database
+# ============================================================================
+
+class _FakeTransaction:
+    def __init__(self, conn, readonly):
+        self.conn = conn
+        self.readonly = readonly
+
+    async def __aenter__(self):
+        self.conn.in_transaction = True
+        self.conn.readonly = self.readonly
+        return self
+
+    async def __aexit__(self, *exc):
+        self.conn.in_transaction = False
+        return False
+
+
+class _FakeCursor:
+    def __init__(self, conn, rows):
+        self.conn = conn
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        assert self.conn.in_transaction, "cursor used outside a transaction"
+        for row in self.rows:
+            self.conn.rows_read += 1
+            yield row
+
+
+class _FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.in_transaction = False
+        self.readonly = None
+        self.rows_read = 0
+        self.cursor_calls = []
+
+    def transaction(self, readonly=False):
+        return _FakeTransaction(self, readonly)
+
+    def cursor(self, query, *args, prefetch=None):
+        self.cursor_calls.append((query, args, prefetch))
+        return _FakeCursor(self, self.rows)
+
+
+class _FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Acquire()
+
+
+def _rows(n):
+    return [
+        {
+            "id": uuid.UUID(int=i),
+            "title": f"Task, \"quoted\" {i}",
+            "amount": Decimal("10.50"),
+            "created_at": datetime(2024, 1, 1, 12, 0, i % 60),
+            "photos": ["a.jpg", "b.jpg"],
+            "notes": None,
+        }
+        for i in range(n)
+    ]
+
+
+# ============================================================================
+# ROUTE EXISTENCE TESTS
+# ============================================================================
+
+class TestExportRoutes:
+    """Export endpoints are registered and require authentication."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", [
+        "/api/v1/exports/tasks",
+        "/api/v1/exports/issues",
+        "/api/v1/exports/materials",
+        "/api/v1/exports/payments",
+        "/api/v1/exports/analytics",
+    ])
+    async def test_export_requires_auth(self, client, path):
+        response = await client.get(path)
+        assert response.status_code in (401, 403), f"Expected 401/403, got {response.status_code}"
+
+
+# ============================================================================
+# STREAMING TESTS
+# ============================================================================
+
+class TestStreamQuery:
+    """stream_query uses a server-side cursor and emits bounded chunks."""
+
+    @pytest.mark.asyncio
+    async def test_ndjson_chunks(self):
+        conn = _FakeConnection(_rows(25))
+        chunks = [c async for c in stream_query(_FakePool(conn), "SELECT 1", ["p"], "ndjson", chunk_rows=10, prefetch=7)]
+
+        assert len(chunks) == 3
+        assert conn.cursor_calls == [("SELECT 1", ("p",), 7)]
+        assert conn.readonly is True
+        lines = b"".join(chunks).decode().splitlines()
+        assert len(lines) == 25
+        first = json.loads(lines[0])
+        assert first["id"] == str(uuid.UUID(int=0))
+        assert first["created_at"] == "2024-01-01T12:00:00"
+        assert first["photos"] == ["a.jpg", "b.jpg"]
+        assert first["notes"] is None
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_produced_lazily(self):
+        conn = _FakeConnection(_rows(100))
+        stream = stream_query(_FakePool(conn), "SELECT 1", [], "ndjson", chunk_rows=10)
+        await stream.__anext__()
+        # Only the first chunk's rows have been pulled from the cursor
+        assert conn.rows_read == 10
+        await stream.aclose()
+        assert conn.in_transaction is False
+
+    @pytest.mark.asyncio
+    async def test_csv_header_once(self):
+        conn = _FakeConnection(_rows(5))
+        chunks = [c async for c in stream_query(_FakePool(conn), "SELECT 1", [], "csv", chunk_rows=2)]
+
+        reader = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert reader[0] == ["id", "title", "amount", "created_at", "photos", "notes"]
+        assert len(reader) == 6
+        assert reader[1][1] == 'Task, "quoted" 0'
+        assert reader[1][2] == "10.50"
+        assert reader[1][4] == '["a.jpg","b.jpg"]'
+        assert reader[1][5] == ""
+
+    @pytest.mark.asyncio
+    async def test_empty_result(self):
+        conn = _FakeConnection([])
+        chunks = [c async for c in stream_query(_FakePool(conn), "SELECT 1", [], "csv")]
+        assert chunks == []
+
+
+class TestEncoders:
+    """Direct encoder behaviour."""
+
+    def test_encode_ndjson_one_line_per_row(self):
+        data = encode_ndjson([{"a": 1}, {"a": "x\ny"}])
+        assert data == b'{"a":1}\n{"a":"x\\ny"}\n'
+
+    def test_csv_encoder_empty_batch(self):
+        assert CsvEncoder().encode([]) == b""
@@ -0,0 +1,120 @@
+"""
+Tests for services/heartbeat_partitions.py
+
+Tests partition bound parsing, which days get created (around an attached
+legacy partition), and retention by dropping whole partitions.
+"""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from src.services.heartbeat_partitions import (
+    days_to_create,
+    expired_partitions,
+    maintain_heartbeat_partitions,
+    parse_partition,
+    partition_name,
+)
+
+TODAY = date(2026, 3, 18)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def daily(day: date):
+    name = partition_name(day)
+    return name, (
+        f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+        f"TO ('{date.fromordinal(day.toordinal() + 1).isoformat()} 00:00:00+00')"
+    )
+
+
+class FakePartitionConn:
+    def __init__(self, partitions):
+        self.partitions = dict(partitions)
+        self.statements = []
+
+    async def fetch(self, query, *args):
+        return [{"name": name, "bound": bound} for name, bound in self.partitions.items()]
+
+    async def execute(self, query, *args):
+        self.statements.append((query, args))
+        return "OK"
+
+
+class TestBounds:
+
+    def test_parse_daily_partition(self):
+        partition = parse_partition(*daily(TODAY))
+        assert partition.lower == utc(2026, 3, 18)
+        assert partition.upper == utc(2026, 3, 19)
+
+    def test_parse_legacy_and_default(self):
+        legacy = parse_partition(
+            "analytics_heartbeats_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-03-18 20:00:00-04')"
+        )
+        assert legacy.lower is None
+        assert legacy.upper == utc(2026, 3, 19)
+        assert parse_partition("analytics_heartbeats_default", "DEFAULT").is_default
+
+
+class TestPlanning:
+
+    def test_creates_missing_days_ahead(self):
+        existing = [parse_partition(*daily(TODAY))]
+        assert days_to_create(existing, TODAY, 2) == [date(2026, 3, 19), date(2026, 3, 20)]
+
+    def test_skips_days_covered_by_legacy_partition(self):
+        legacy = parse_partition(
+            "analytics_heartbeats_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-03-19 00:00:00+00')"
+        )
+        default = parse_partition("analytics_heartbeats_default", "DEFAULT")
+        assert days_to_create([legacy, default], TODAY, 1) == [date(2026, 3, 19)]
+
+    def test_expired_partitions(self):
+        existing = [parse_partition(*daily(date(2026, 2, d))) for d in (15, 16, 17)]
+        existing.append(parse_partition("analytics_heartbeats_default", "DEFAULT"))
+        assert expired_partitions(existing, utc(2026, 2, 17)) == [
+            "analytics_heartbeats_p20260215", "analytics_heartbeats_p20260216",
+        ]
+
+
+class TestMaintenance:
+
+    @pytest.mark.asyncio
+    async def test_creates_ahead_and_drops_expired(self):
+        conn = FakePartitionConn([
+            daily(date(2026, 2, 15)),
+            daily(date(2026, 2, 16)),
+            daily(TODAY),
+            ("analytics_heartbeats_default", "DEFAULT"),
+        ])
+
+        result = await maintain_heartbeat_partitions(conn, retention_days=30, days_ahead=1, today=TODAY)
+
+        assert result == {
+            "created": ["analytics_heartbeats_p20260319"],
+            "dropped": ["analytics_heartbeats_p20260215"],
+        }
+        create, drop, purge = [q for q, _ in conn.statements]
+        assert "PARTITION OF public.analytics_heartbeats" in create
+        assert "FROM ('2026-03-19T00:00:00+00:00') TO ('2026-03-20T00:00:00+00:00')" in create
+        assert drop == 'DROP TABLE IF EXISTS public."analytics_heartbeats_p20260215"'
+        # Only the (normally empty) default partition is ever purged row by row
+        assert purge.startswith("DELETE FROM public.analytics_heartbeats_default")
+        assert conn.statements[2][1] == (utc(2026, 2, 16),)
+
+    @pytest.mark.asyncio
+    async def test_failed_create_does_not_stop_retention(self):
+        class FailingConn(FakePartitionConn):
+            async def execute(self, query, *args):
+                if query.startswith("CREATE"):
+                    raise RuntimeError("updated partition constraint for default partition would be violated")
+                return await super().execute(query, *args)
+
+        conn = FailingConn([daily(date(2026, 1, 1))])
+        result = await maintain_heartbeat_partitions(conn, retention_days=30, days_ahead=0, today=TODAY)
+        assert result == {"created": [], "dropped": ["analytics_heartbeats_p20260101"]}
@@ -0,0 +1,109 @@
+"""
+JSON Response Tests - fast JSON encoding compatibility.
+
+Tests cover:
+1. FastJSONResponse output is byte-for-byte identical to Starlette's JSONResponse
+2. Native handling of UUID, datetime, Decimal and asyncpg Record
+3. SSE payloads parse to the same value as json.dumps(default=str)
+"""
+import json
+import sys
+import os
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.json_response import FastJSONResponse, dumps, dumps_lenient
+
+
+def _sample_payloads():
+    return [
+        {"id": "p-1", "name": "Via Tesoro", "progress": 42, "budget": 125000.5},
+        [{"taskId": i, "title": f"Task {i}", "done": i % 2 == 0, "assignee": None} for i in range(5)],
+        {"unicode": "Café – ñandú ✓ 日本", "quote": 'He said "hi"\n', "slash": "a/b\\c"},
+        {"nested": {"deep": [1, 2.25, -3, {"x": []}]}, "empty": {}},
+        {"createdAt": datetime(2024, 5, 1, 13, 45, 10, 123456), "due": date(2024, 6, 1)},
+        {"aware": datetime(2024, 5, 1, 13, 45, tzinfo=timezone.utc), "uid": uuid.UUID(int=1)},
+        {"amount": Decimal("1500"), "rate": Decimal("12.75")},
+        "plain string",
+        12345,
+        None,
+    ]
+
+
+class TestFastJSONResponseCompatibility:
+    """Handler output through FastJSONResponse matches the stock response."""
+
+    @pytest.mark.parametrize("payload", _sample_payloads())
+    def test_byte_for_byte_with_jsonresponse(self, payload):
+        encoded = jsonable_encoder(payload)
+        assert FastJSONResponse(encoded).body == JSONResponse(encoded).body
+
+    def test_media_type_and_headers(self):
+        response = FastJSONResponse({"ok": True}, status_code=201, headers={"X-Total-Count": "1"})
+        assert response.media_type == "application/json"
+        assert response.status_code == 201
+        assert response.headers["x-total-count"] == "1"
+        assert response.headers["content-length"] == str(len(response.body))
+
+    def test_app_uses_fast_response_by_default(self):
+        from main import app
+        assert app.router.default_response_class is FastJSONResponse
+
+
+class TestNativeTypes:
+    """Types handled without going through jsonable_encoder first."""
+
+    def test_uuid_and_datetime(self):
+        uid = uuid.uuid4()
+        when = datetime(2024, 1, 2, 3, 4, 5)
+        assert json.loads(dumps({"id": uid, "at": when})) == {"id": str(uid), "at": when.isoformat()}
+
+    def test_decimal_matches_jsonable_encoder(self):
+        payload = {"whole": Decimal("10"), "fraction": Decimal("10.50")}
+        assert dumps(payload) == JSONResponse(jsonable_encoder(payload)).body
+
+    def test_asyncpg_record(self, monkeypatch):
+        import src.core.json_response as json_response
+
+        class FakeRecord:
+            """Stand-in for asyncpg.Record, which cannot be built directly."""
+            def __init__(self, **fields):
+                self._fields = fields
+
+            def keys(self):
+                return self._fields.keys()
+
+            def __getitem__(self, key):
+                return self._fields[key]
+
+        monkeypatch.setattr(json_response.asyncpg, "Record", FakeRecord)
+        row = FakeRecord(id=uuid.UUID(int=7), name="Framing")
+        assert json.loads(dumps([row])) == [{"id": str(uuid.UUID(int=7)), "name": "Framing"}]
+        assert json.loads(dumps_lenient({"row": row})) == {"row": {"id": str(uuid.UUID(int=7)), "name": "Framing"}}
+
+    def test_big_integer_falls_back(self):
+        assert dumps({"n": 2 ** 70}) == b'{"n":%d}' % (2 ** 70)
+
+
+class TestSSEEncoding:
+    """SSE payloads stay compatible with the stdlib default=str encoding."""
+
+    def test_parses_like_default_str(self):
+        payload = {
+            "content": "Línea uno\nline two",
+            "conversation_id": uuid.uuid4(),
+            "created": datetime(2024, 3, 4, 5, 6, 7),
+            "amount": Decimal("99.90"),
+            "tools": [{"tool": "get_projects", "input": {"status": "active"}}],
+        }
+        assert json.loads(dumps_lenient(payload)) == json.loads(json.dumps(payload, default=str))
+
+    def test_single_line(self):
+        assert "\n" not in dumps_lenient({"content": "a\nb\r\nc"})
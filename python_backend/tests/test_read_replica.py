@@ -0,0 +1,303 @@
+"""
+Tests for database/connection.py read-replica routing
+
+Tests statement classification, the per-session recent-write window (and
+the cookie that carries it to other workers), and which pool db_manager
+reads use: replica for read-only statements and READ_ONLY agent tools,
+primary after a session writes, when pinned, or when the replica is
+unreachable. The last class runs against two real databases
+when TEST_DATABASE_URL and TEST_DATABASE_REPLICA_URL are set.
+"""
+
+import asyncio
+import os
+import uuid
+
+import asyncpg
+import pytest
+
+from src.database import connection
+from src.database.connection import (
+    RecentWrites,
+    db_manager,
+    get_read_pool,
+    is_read_only,
+    primary_reads,
+    replica_reads,
+    reset_session_key,
+    set_session_key,
+)
+
+
+class FakeConn:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetch(self, query, *args):
+        return await self._run(query)
+
+    async def fetchrow(self, query, *args):
+        return await self._run(query)
+
+    async def execute(self, query, *args):
+        await self._run(query)
+        return "INSERT 0 1"
+
+    async def _run(self, query):
+        if self.pool.broken:
+            raise ConnectionResetError("replica went away")
+        self.pool.queries.append(query)
+        return [{"pool": self.pool.name}]
+
+
+class FakePool:
+    def __init__(self, name, broken=False):
+        self.name = name
+        self.broken = broken
+        self.queries = []
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            async def __aenter__(self):
+                return FakeConn(pool)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Acquire()
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    primary, replica = FakePool("primary"), FakePool("replica")
+    monkeypatch.setattr(connection, "DATABASE_REPLICA_URL", "postgresql://replica/db")
+    monkeypatch.setattr(connection, "_pool", primary)
+    monkeypatch.setattr(connection, "_replica_pool", replica)
+    monkeypatch.setattr(connection, "recent_writes", RecentWrites(window_seconds=60))
+    return primary, replica
+
+
+async def in_session(session_key, coro_fn):
+    """Run coro_fn as its own task (like one request) bound to session_key."""
+    async def run():
+        token = set_session_key(session_key)
+        try:
+            return await coro_fn()
+        finally:
+            reset_session_key(token)
+
+    return await asyncio.create_task(run())
+
+
+class TestIsReadOnly:
+
+    @pytest.mark.parametrize("query", [
+        "SELECT * FROM tasks WHERE project_id = $1",
+        "  -- list\n  select id, updated_at from projects",
+        "/* cte */ WITH t AS (SELECT 1) SELECT * FROM t",
+    ])
+    def test_reads(self, query):
+        assert is_read_only(query)
+
+    @pytest.mark.parametrize("query", [
+        "INSERT INTO tasks (id) VALUES ($1) RETURNING *",
+        "UPDATE tasks SET status = $1",
+        "WITH moved AS (DELETE FROM a RETURNING *) SELECT * FROM moved",
+        "SELECT * FROM tasks WHERE id = $1 FOR UPDATE",
+        "SELECT nextval('seq')",
+        "SELECT id INTO scratch FROM tasks",
+        "SET search_path TO public",
+    ])
+    def test_writes(self, query):
+        assert not is_read_only(query)
+
+
+class TestRecentWrites:
+
+    def test_window_expires(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(connection.time, "monotonic", lambda: now[0])
+        writes = RecentWrites(window_seconds=5)
+        writes.mark("s1")
+        assert writes.active("s1") and not writes.active("s2")
+        now[0] += 5
+        assert not writes.active("s1")
+
+    def test_bounded(self):
+        writes = RecentWrites(window_seconds=60, max_sessions=10)
+        for i in range(25):
+            writes.mark(f"s{i}")
+        assert len(writes._until) <= 10
+        assert writes.active("s24")
+
+
+class TestRouting:
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica(self, pools):
+        primary, replica = pools
+        rows = await db_manager.read_query("SELECT * FROM tasks")
+        row = await db_manager.read_one("SELECT * FROM tasks LIMIT 1")
+        assert rows == [{"pool": "replica"}] and row == [{"pool": "replica"}]
+        assert primary.queries == []
+
+    @pytest.mark.asyncio
+    async def test_plain_execute_query_stays_on_primary(self, pools):
+        primary, replica = pools
+        await db_manager.execute_query("SELECT * FROM tasks")
+        assert primary.queries and not replica.queries
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_per_session(self, pools):
+        primary, replica = pools
+
+        async def write_then_read():
+            await db_manager.execute("INSERT INTO tasks (id) VALUES ($1)", "t1")
+            return await db_manager.read_query("SELECT * FROM tasks")
+
+        async def read():
+            return await db_manager.read_query("SELECT * FROM tasks")
+
+        assert await in_session("alice", write_then_read) == [{"pool": "primary"}]
+        # Alice's next request is still inside her window; Bob is unaffected
+        assert await in_session("alice", read) == [{"pool": "primary"}]
+        assert await in_session("bob", read) == [{"pool": "replica"}]
+
+    @pytest.mark.asyncio
+    async def test_write_statements_via_read_api_use_primary(self, pools):
+        primary, replica = pools
+        await db_manager.read_one("SELECT * FROM tasks WHERE id = $1 FOR UPDATE", "t1")
+        assert primary.queries and not replica.queries
+
+    @pytest.mark.asyncio
+    async def test_replica_reads_routes_agent_tool_queries(self, pools):
+        primary, replica = pools
+
+        async def tool():
+            with replica_reads():
+                await db_manager.execute_query("SELECT * FROM projects")
+                await db_manager.execute_one("INSERT INTO logs (msg) VALUES ($1) RETURNING id", "x")
+
+        await in_session("alice", tool)
+        assert replica.queries == ["SELECT * FROM projects"]
+        assert primary.queries == ["INSERT INTO logs (msg) VALUES ($1) RETURNING id"]
+
+    @pytest.mark.asyncio
+    async def test_primary_reads_pins(self, pools):
+        primary, replica = pools
+        with primary_reads():
+            await db_manager.read_query("SELECT 1")
+            assert await get_read_pool() is primary
+        assert await get_read_pool() is replica
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_falls_back(self, pools, monkeypatch):
+        primary, _ = pools
+        monkeypatch.setattr(connection, "_replica_pool", FakePool("replica", broken=True))
+        assert await db_manager.read_query("SELECT * FROM tasks") == [{"pool": "primary"}]
+
+    @pytest.mark.asyncio
+    async def test_no_replica_configured(self, pools, monkeypatch):
+        primary, replica = pools
+        monkeypatch.setattr(connection, "DATABASE_REPLICA_URL", None)
+        await db_manager.read_query("SELECT * FROM tasks")
+        assert await get_read_pool() is primary
+        assert not replica.queries
+
+
+class TestMiddleware:
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.middleware import read_routing
+
+        writes = RecentWrites(window_seconds=5)
+        monkeypatch.setattr(read_routing, "DATABASE_REPLICA_URL", "postgresql://replica/db")
+        monkeypatch.setattr(connection, "DATABASE_REPLICA_URL", "postgresql://replica/db")
+        monkeypatch.setattr(read_routing, "recent_writes", writes)
+        monkeypatch.setattr(connection, "recent_writes", writes)
+
+        app = FastAPI()
+        app.add_middleware(read_routing.ReadRoutingMiddleware)
+
+        @app.post("/write")
+        async def write():
+            return {"ok": True}
+
+        @app.get("/read")
+        async def read():
+            return {"replica": connection.reads_may_use_replica()}
+
+        client = TestClient(app, cookies={"session_id": "s1"})
+        return client, writes
+
+    def test_write_window_survives_another_worker(self, client):
+        client, writes = client
+        assert client.get("/read").json() == {"replica": True}
+
+        response = client.post("/write")
+        assert "recent_write" in response.cookies
+        # Another worker (or a restart) has no in-memory window for s1
+        writes._until.clear()
+        assert client.get("/read").json() == {"replica": False}
+
+    def test_expired_cookie_reads_replica(self, client):
+        client, _ = client
+        client.cookies.set("recent_write", "1000")
+        assert client.get("/read").json() == {"replica": True}
+        client.cookies.set("recent_write", "garbage")
+        assert client.get("/read").json() == {"replica": True}
+
+
+PRIMARY_URL = os.getenv("TEST_DATABASE_URL")
+REPLICA_URL = os.getenv("TEST_DATABASE_REPLICA_URL")
+
+
+@pytest.mark.skipif(not (PRIMARY_URL and REPLICA_URL),
+                    reason="set TEST_DATABASE_URL and TEST_DATABASE_REPLICA_URL to two databases")
+class TestTwoDatabases:
+    """Uses two independent databases standing in for primary and replica;
+    each holds a marker row naming itself, so every read shows where it went."""
+
+    @pytest.fixture
+    async def databases(self, monkeypatch):
+        table = f"replica_probe_{uuid.uuid4().hex[:8]}"
+        for url, name in ((PRIMARY_URL, "primary"), (REPLICA_URL, "replica")):
+            conn = await asyncpg.connect(url)
+            await conn.execute(f"CREATE TABLE {table} (name text)")
+            await conn.execute(f"INSERT INTO {table} VALUES ($1)", name)
+            await conn.close()
+
+        monkeypatch.setattr(connection, "DATABASE_URL", PRIMARY_URL)
+        monkeypatch.setattr(connection, "DATABASE_REPLICA_URL", REPLICA_URL)
+        monkeypatch.setattr(connection, "_pool", None)
+        monkeypatch.setattr(connection, "_replica_pool", None)
+        monkeypatch.setattr(connection, "recent_writes", RecentWrites(window_seconds=60))
+        yield table
+        await connection.close_db_pool()
+        for url in (PRIMARY_URL, REPLICA_URL):
+            conn = await asyncpg.connect(url)
+            await conn.execute(f"DROP TABLE IF EXISTS {table}")
+            await conn.close()
+
+    @pytest.mark.asyncio
+    async def test_routing(self, databases):
+        table = databases
+
+        async def read():
+            row = await db_manager.read_one(f"SELECT name FROM {table} ORDER BY name LIMIT 1")
+            return row["name"]
+
+        async def write_then_read():
+            await db_manager.execute(f"INSERT INTO {table} VALUES ('a-write')")
+            return await read()
+
+        assert await in_session("alice", read) == "replica"
+        assert await in_session("alice", write_then_read) == "a-write"
+        assert await in_session("alice", read) == "a-write"
+        assert await in_session("bob", read) == "replica"
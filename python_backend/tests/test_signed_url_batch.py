@@ -0,0 +1,175 @@
+"""
+Batch Signed URL Tests - concurrent signing for photo and object lists.
+
+Tests cover:
+1. Batch endpoints exist and require authentication
+2. generate_signed_urls dedupes names and bounds concurrency
+3. Per-object failures map to None without failing the batch
+4. resolve_photo_urls signs storage photos and falls back for legacy files
+5. /objects/signed-urls only signs objects the caller's company references,
+   and GET /photos fills signedUrl by default
+"""
+import asyncio
+import sys
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from src.core import storage
+from src.api import objects, photos
+from src.api.auth import get_current_user_dependency
+from src.models import Photo
+
+STORAGE_CONFIG = {"bucket_id": "bucket", "clean_private_dir": ".private"}
+PM = {"id": "u1", "role": "project_manager", "companyId": "c1"}
+
+
+async def fake_batch(bucket_name, object_names, method="GET", expires_minutes=60):
+    return {name: f"https://gcs/{name}" for name in object_names}
+
+
+@pytest.fixture
+async def client():
+    """Create an async test client."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+class TestBatchRoutes:
+    """Batch signed URL endpoints are registered and require authentication."""
+
+    @pytest.mark.asyncio
+    async def test_photo_signed_urls_requires_auth(self, client):
+        response = await client.post("/api/v1/photos/signed-urls", json={"photoIds": ["a"]})
+        assert response.status_code in (401, 403), f"Expected 401/403, got {response.status_code}"
+
+    @pytest.mark.asyncio
+    async def test_object_signed_urls_requires_auth(self, client):
+        response = await client.post("/api/v1/objects/signed-urls", json={"objectIds": ["a"]})
+        assert response.status_code in (401, 403), f"Expected 401/403, got {response.status_code}"
+
+
+class TestGenerateSignedUrls:
+    """generate_signed_urls signs concurrently through the shared cache."""
+
+    @pytest.mark.asyncio
+    async def test_dedupes_and_bounds_concurrency(self):
+        in_flight = 0
+        peak = 0
+        calls = []
+
+        async def fake_sign(bucket_name, object_name, method="GET", expires_minutes=60, use_cache=True):
+            nonlocal in_flight, peak
+            calls.append(object_name)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"https://gcs/{bucket_name}/{object_name}"
+
+        names = [f"obj-{i}" for i in range(40)] + ["obj-0", "obj-1", ""]
+        with patch.object(storage, "generate_signed_url", side_effect=fake_sign), \
+             patch.object(storage, "BATCH_SIGNING_CONCURRENCY", 5):
+            urls = await storage.generate_signed_urls("bucket", names)
+
+        assert len(calls) == 40
+        assert len(urls) == 40
+        assert urls["obj-3"] == "https://gcs/bucket/obj-3"
+        assert 1 < peak <= 5
+
+    @pytest.mark.asyncio
+    async def test_failures_map_to_none(self):
+        async def flaky(bucket_name, object_name, method="GET", expires_minutes=60, use_cache=True):
+            if object_name == "bad":
+                raise RuntimeError("sidecar down")
+            return f"https://gcs/{object_name}"
+
+        with patch.object(storage, "generate_signed_url", side_effect=flaky):
+            urls = await storage.generate_signed_urls("bucket", ["good", "bad"])
+
+        assert urls == {"good": "https://gcs/good", "bad": None}
+
+
+class TestResolvePhotoUrls:
+    """Photo URL resolution for list and batch endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_storage_and_legacy_photos(self):
+        storage_id = "0b7f6a1e-4d1c-4f8e-9a43-6f1f0b2c9d11"
+
+        with patch.object(photos, "get_storage_config", return_value=STORAGE_CONFIG), \
+             patch.object(photos, "generate_signed_urls", side_effect=fake_batch):
+            urls = await photos.resolve_photo_urls([
+                {"id": "p1", "filename": storage_id},
+                {"id": "p2", "filename": "legacy-photo.jpg"},
+            ])
+
+        assert urls["p1"].startswith("https://gcs/") and urls["p1"].endswith(storage_id)
+        assert urls["p2"] == "/api/v1/photos/p2/file"
+
+    def test_uuid_filename_detection(self):
+        assert photos.is_uuid_filename("0b7f6a1e-4d1c-4f8e-9a43-6f1f0b2c9d11")
+        assert not photos.is_uuid_filename("IMG_1234.jpg")
+
+
+class TestScopedSigning:
+    """Batch signing only covers objects the caller can read."""
+
+    @pytest.mark.asyncio
+    async def test_objects_outside_company_are_denied(self):
+        readable = AsyncMock(return_value=["mine"])
+        sign = AsyncMock(side_effect=fake_batch)
+        with patch.object(objects.photo_repo, "get_readable_object_ids", readable), \
+             patch.object(objects, "_get_storage_config", return_value=STORAGE_CONFIG), \
+             patch.object(objects, "generate_signed_urls", sign):
+            result = await objects.get_signed_urls(
+                objects.SignedUrlBatchRequest(objectIds=["mine", "theirs", "mine"]), PM,
+            )
+
+        readable.assert_awaited_once_with(["mine", "theirs"], "c1")
+        assert list(sign.call_args.args[1]) == [".private/uploads/mine"]
+        assert list(result["urls"]) == ["mine"]
+        assert result["denied"] == ["theirs"]
+
+    @pytest.mark.asyncio
+    async def test_readable_lookup_filters_each_branch_by_requested_ids(self):
+        from src.database import repositories
+
+        read_query = AsyncMock(return_value=[{"object_id": "mine"}])
+        with patch.object(repositories.db_manager, "read_query", read_query):
+            assert await objects.photo_repo.get_readable_object_ids(["mine"], "c1") == ["mine"]
+
+        query = read_query.call_args.args[0]
+        # Both expressions are indexed (migrations/add_object_reference_indexes.sql)
+        assert "WHERE split_part(ph.filename, '?', 1) = ANY($1::text[])" in query
+        assert "WHERE project_log_image_ids(pl.images) && $1::text[]" in query
+        migration = os.path.join(
+            os.path.dirname(repositories.__file__), "migrations", "add_object_reference_indexes.sql"
+        )
+        with open(migration) as f:
+            sql = f.read()
+        assert "ON public.photos ((split_part(filename, '?', 1)))" in sql
+        assert "USING gin (public.project_log_image_ids(images))" in sql
+
+    @pytest.mark.asyncio
+    async def test_photo_list_includes_signed_urls_by_default(self):
+        photo = Photo(id="p1", filename="0b7f6a1e-4d1c-4f8e-9a43-6f1f0b2c9d11",
+                      originalName="a.jpg", projectId="proj-1", userId="u1")
+        app.dependency_overrides[get_current_user_dependency] = lambda: PM
+        try:
+            with patch.object(photos.photo_repo, "get_all", AsyncMock(return_value=[photo])), \
+                 patch.object(photos, "get_storage_config", return_value=STORAGE_CONFIG), \
+                 patch.object(photos, "generate_signed_urls", side_effect=fake_batch):
+                async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+                    response = await ac.get("/api/v1/photos")
+        finally:
+            app.dependency_overrides.pop(get_current_user_dependency, None)
+
+        assert response.status_code == 200
+        assert response.json()[0]["signedUrl"].startswith("https://gcs/")
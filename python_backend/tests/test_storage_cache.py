@@ -0,0 +1,187 @@
+"""
+Signed URL Cache Tests - reuse, expiry margin and single-flight signing.
+
+Tests cover:
+1. Cache hits for repeated (bucket, object, method) lookups
+2. Re-signing once the remaining lifetime drops below the safety margin
+3. Single-flight: concurrent misses share one signing call
+4. Failures are not cached; the cache is bounded
+5. GCP SDK signing runs off the event loop thread
+"""
+import asyncio
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import storage
+from src.core.storage import SignedUrlCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _signer(counter: list, url: str = "https://signed/url", delay: float = 0):
+    async def sign():
+        counter.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        return f"{url}?n={len(counter)}"
+    return sign
+
+
+KEY = ("bucket", ".private/uploads/abc", "GET")
+
+
+class TestSignedUrlCache:
+    """Core caching behaviour with a fake clock."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_url_within_lifetime(self):
+        cache = SignedUrlCache(clock=FakeClock())
+        calls = []
+        first = await cache.get_or_sign(KEY, 60, _signer(calls))
+        second = await cache.get_or_sign(KEY, 60, _signer(calls))
+
+        assert first == second
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resigns_near_expiry(self):
+        clock = FakeClock()
+        cache = SignedUrlCache(clock=clock, safety_margin_seconds=300, reuse_fraction=0.5)
+        calls = []
+        await cache.get_or_sign(KEY, 60, _signer(calls))
+
+        clock.now += 29 * 60  # 31 minutes left: still >= half the lifetime
+        await cache.get_or_sign(KEY, 60, _signer(calls))
+        assert len(calls) == 1
+
+        clock.now += 2 * 60  # 29 minutes left: below half the lifetime
+        await cache.get_or_sign(KEY, 60, _signer(calls))
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_safety_margin_applies_to_short_urls(self):
+        clock = FakeClock()
+        cache = SignedUrlCache(clock=clock, safety_margin_seconds=300, reuse_fraction=0.1)
+        calls = []
+        await cache.get_or_sign(KEY, 10, _signer(calls))
+        clock.now += 6 * 60  # 4 minutes left, below the 5 minute margin
+        await cache.get_or_sign(KEY, 10, _signer(calls))
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_short_cached_url_not_served_for_long_request(self):
+        cache = SignedUrlCache(clock=FakeClock())
+        calls = []
+        await cache.get_or_sign(KEY, 60, _signer(calls))
+        # A 7-day email link must not get a URL that expires within the hour
+        await cache.get_or_sign(KEY, 60 * 24 * 7, _signer(calls))
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_long_cached_url_not_served_for_short_request(self):
+        cache = SignedUrlCache(clock=FakeClock())
+        calls = []
+        long_url = await cache.get_or_sign(KEY, 60 * 24 * 7, _signer(calls))
+        # A 5-minute preview must not get a URL that stays valid for a week
+        short_url = await cache.get_or_sign(KEY, 5, _signer(calls))
+        assert len(calls) == 2
+        assert short_url != long_url
+        # Each expiry is still reused on its own
+        assert await cache.get_or_sign(KEY, 5, _signer(calls)) == short_url
+        assert await cache.get_or_sign(KEY, 60 * 24 * 7, _signer(calls)) == long_url
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_methods_are_cached_separately(self):
+        cache = SignedUrlCache(clock=FakeClock())
+        calls = []
+        await cache.get_or_sign(KEY, 60, _signer(calls))
+        await cache.get_or_sign(("bucket", ".private/uploads/abc", "PUT"), 60, _signer(calls))
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_single_flight_on_concurrent_misses(self):
+        cache = SignedUrlCache(clock=FakeClock())
+        calls = []
+        results = await asyncio.gather(*[
+            cache.get_or_sign(KEY, 60, _signer(calls, delay=0.01)) for _ in range(20)
+        ])
+
+        assert len(calls) == 1
+        assert len(set(results)) == 1
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 19
+        assert stats["hit_rate"] == 0.95
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        cache = SignedUrlCache(clock=FakeClock())
+
+        async def fail():
+            return None
+
+        assert await cache.get_or_sign(KEY, 60, fail) is None
+        calls = []
+        assert await cache.get_or_sign(KEY, 60, _signer(calls))
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate_and_clear_inflight(self):
+        cache = SignedUrlCache(clock=FakeClock())
+
+        async def boom():
+            raise RuntimeError("sidecar down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_sign(KEY, 60, boom)
+        assert cache.stats()["errors"] == 1
+
+        calls = []
+        assert await cache.get_or_sign(KEY, 60, _signer(calls))
+
+    @pytest.mark.asyncio
+    async def test_bounded_size(self):
+        cache = SignedUrlCache(clock=FakeClock(), max_entries=3)
+        calls = []
+        for i in range(5):
+            await cache.get_or_sign(("b", f"obj-{i}", "GET"), 60, _signer(calls))
+        assert cache.stats()["entries"] == 3
+
+
+class TestGenerateSignedUrl:
+    """generate_signed_url routes through the cache and a worker thread."""
+
+    @pytest.mark.asyncio
+    async def test_gcp_signing_runs_in_thread_pool(self):
+        storage.signed_url_cache.clear()
+        threads = []
+
+        def fake_gcp(bucket_name, object_name, method, expires_minutes):
+            threads.append(threading.current_thread().name)
+            return f"https://gcs/{bucket_name}/{object_name}"
+
+        with patch.object(storage, "use_gcp_direct", return_value=True), \
+             patch.object(storage, "_generate_signed_url_gcp", side_effect=fake_gcp):
+            url = await storage.generate_signed_url("bucket", "photo-1")
+            again = await storage.generate_signed_url("bucket", "photo-1")
+            uncached = await storage.generate_signed_url("bucket", "photo-1", use_cache=False)
+
+        assert url == again == uncached == "https://gcs/bucket/photo-1"
+        assert len(threads) == 2
+        assert all(name.startswith("gcs-sign") for name in threads)
+        storage.signed_url_cache.clear()
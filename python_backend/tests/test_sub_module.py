@@ -558,3 +558,177 @@ class TestTemplateValidation:
             "/api/v1/sub/templates/fake-template/apply/fake-task"
         )
         assert response.status_code in (401, 403)
+
+
+# ============================================================================
+# CHECKLIST TREE LOADING - round trips stay constant as the tree grows
+# ============================================================================
+
+class FakeSubConn:
+    """In-memory stand-in for the sub tables that counts fetch round trips."""
+
+    def __init__(self, tasks=50, checklists=5, items=10, docs=1):
+        self.fetch_calls = 0
+        self.tasks = [{"id": f"t{t}", "status": "pending_review"} for t in range(tasks)]
+        self.checklists = [
+            {"id": f"t{t}-c{c}", "task_id": f"t{t}", "name": f"Checklist {c}", "sort_order": c}
+            for t in range(tasks) for c in range(checklists)
+        ]
+        self.items = [
+            {"id": f"{cl['id']}-i{i}", "checklist_id": cl["id"], "description": f"Item {i}", "sort_order": i}
+            for cl in self.checklists for i in range(items)
+        ]
+        self.docs = [
+            {"id": f"{item['id']}-d{d}", "checklist_item_id": item["id"], "created_at": None}
+            for item in self.items for d in range(docs)
+        ]
+
+    async def fetch(self, query, *args):
+        self.fetch_calls += 1
+        if "FROM sub_tasks st" in query:
+            return self.tasks
+        ids = set(args[0])
+        if "FROM sub_checklists" in query:
+            key = "id" if "WHERE id =" in query else "task_id"
+            return sorted((c for c in self.checklists if c[key] in ids), key=lambda c: c["sort_order"])
+        if "FROM sub_checklist_items" in query:
+            return sorted((i for i in self.items if i["checklist_id"] in ids), key=lambda i: i["sort_order"])
+        if "FROM sub_task_documents" in query:
+            return [d for d in self.docs if d["checklist_item_id"] in ids]
+        raise AssertionError(f"Unexpected query: {query}")
+
+
+class FakeSubPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        conn = self.conn
+
+        class _Acquire:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Acquire()
+
+
+class TestChecklistTreeLoading:
+    """The checklist tree is loaded with one query per level, not per row."""
+
+    @pytest.mark.asyncio
+    async def test_load_checklists_nests_items_and_documents(self):
+        from src.api.sub_module import _load_checklists
+
+        conn = FakeSubConn(tasks=2, checklists=2, items=3, docs=2)
+        checklists = await _load_checklists(conn, task_ids=["t1"])
+
+        assert [c["id"] for c in checklists] == ["t1-c0", "t1-c1"]
+        assert [i["id"] for i in checklists[0]["items"]] == ["t1-c0-i0", "t1-c0-i1", "t1-c0-i2"]
+        assert len(checklists[0]["items"][0]["documents"]) == 2
+        assert conn.fetch_calls == 3
+
+    @pytest.mark.asyncio
+    async def test_empty_task_skips_lower_levels(self):
+        from src.api.sub_module import _load_checklists
+
+        conn = FakeSubConn(tasks=1)
+        assert await _load_checklists(conn, task_ids=["missing"]) == []
+        assert conn.fetch_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_review_queue_round_trips_do_not_grow_with_tree(self):
+        from unittest.mock import AsyncMock, patch
+        from src.api import sub_module
+
+        conn = FakeSubConn(tasks=50, checklists=5, items=10)
+        admin = {"id": "u1", "role": "admin", "company_id": "company-123"}
+        with patch.object(sub_module, "get_db_pool", AsyncMock(return_value=FakeSubPool(conn))):
+            queue = await sub_module.get_review_queue(project_id=None, current_user=admin)
+
+        assert len(queue) == 50
+        assert len(queue[49]["checklists"]) == 5
+        assert queue[49]["checklists"][4]["items"][9]["id"] == "t49-c4-i9"
+        # Task rows + checklists + items + documents, instead of 1 + 50 + 250 + 2500
+        assert conn.fetch_calls == 4
+
+
+# ============================================================================
+# MILESTONE PAYABILITY - one set-based statement per evaluation
+# ============================================================================
+
+class FakeMilestoneConn:
+    """Evaluates the payability statement in memory and records each round trip."""
+
+    def __init__(self, milestones, task_status):
+        self.milestones = milestones
+        self.task_status = task_status
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        params = list(args)
+        candidates = [m for m in self.milestones if m["status"] == "pending"]
+        if "@> jsonb_build_array" in query:
+            task_id = params.pop(0)
+            candidates = [m for m in candidates if task_id in m["linked_task_ids"]]
+        if "m.id = ANY(" in query:
+            ids = params.pop(0)
+            candidates = [m for m in candidates if m["id"] in ids]
+        ready = [
+            m for m in candidates
+            if m["linked_task_ids"]
+            and all(self.task_status.get(t) == "approved" for t in m["linked_task_ids"])
+        ]
+        for m in ready:
+            m["status"] = "payable"
+        return [{"id": m["id"]} for m in ready]
+
+
+class TestMilestonePayability:
+    """Payability is recomputed with one statement, not per milestone and task."""
+
+    def _conn(self):
+        return FakeMilestoneConn(
+            milestones=[
+                {"id": "m1", "status": "pending", "linked_task_ids": ["t1", "t2"]},
+                {"id": "m2", "status": "pending", "linked_task_ids": ["t1", "t3"]},
+                {"id": "m3", "status": "pending", "linked_task_ids": ["t4"]},
+                {"id": "m4", "status": "pending", "linked_task_ids": []},
+            ],
+            task_status={"t1": "approved", "t2": "approved", "t3": "in_progress", "t4": "approved"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_incremental_check_uses_one_round_trip(self):
+        from src.api.sub_module import _check_milestone_payability
+
+        conn = self._conn()
+        assert await _check_milestone_payability("t1", conn) == ["m1"]
+
+        assert len(conn.queries) == 1
+        query, args = conn.queries[0]
+        assert args == ("t1",)
+        assert "m.linked_task_ids @> jsonb_build_array($1::text)" in query
+        assert "bool_and(" in query
+        assert "RETURNING m.id" in query
+
+    @pytest.mark.asyncio
+    async def test_full_recompute_has_no_scope(self):
+        from src.api.sub_module import _update_milestone_payability
+
+        conn = self._conn()
+        assert await _update_milestone_payability(conn) == ["m1", "m3"]
+        assert conn.queries[0][1] == ()
+
+    @pytest.mark.asyncio
+    async def test_scoped_by_milestone_ids(self):
+        from src.api.sub_module import _update_milestone_payability
+
+        conn = self._conn()
+        assert await _update_milestone_payability(conn, milestone_ids=["m2", "m3"]) == ["m3"]
+        query, args = conn.queries[0]
+        assert "m.id = ANY($1::varchar[])" in query
+        assert args == (["m2", "m3"],)
@@ -0,0 +1,273 @@
+"""
+Tests for database/connection.py UnitOfWork
+
+Tests that a request-scoped unit of work checks out one pooled connection
+for handler blocks, project access checks and db_manager/repository calls
+alike, commits or rolls back its optional transaction, and falls back to
+extra (counted) checkouts for concurrent statements.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.database import connection
+from src.database.connection import (
+    UnitOfWork,
+    db_manager,
+    get_transactional_unit_of_work,
+    get_unit_of_work,
+    unit_of_work,
+)
+from src.api.v1.stages import verify_project_access
+
+USER = {"role": "project_manager", "company_id": "c1"}
+
+
+class FakeTransaction:
+    def __init__(self, log):
+        self.log = log
+
+    async def start(self):
+        self.log.append("BEGIN")
+
+    async def commit(self):
+        self.log.append("COMMIT")
+
+    async def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+class FakeConn:
+    def __init__(self, pool, number):
+        self.pool = pool
+        self.number = number
+        self.busy = False
+
+    async def _run(self, query, result):
+        # asyncpg refuses concurrent operations on one connection
+        assert not self.busy, "another operation is in progress"
+        self.busy = True
+        try:
+            await asyncio.sleep(0)
+            self.pool.log.append(query)
+            return result
+        finally:
+            self.busy = False
+
+    async def fetchrow(self, query, *args):
+        return await self._run(query, {"company_id": "c1", "id": args[0] if args else None})
+
+    async def fetch(self, query, *args):
+        return await self._run(query, [])
+
+    async def execute(self, query, *args):
+        return await self._run(query, "OK")
+
+    def transaction(self):
+        return FakeTransaction(self.pool.log)
+
+
+class CountingPool:
+    """Pool double that counts checkouts and supports await/async-with acquire()."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.released = 0
+        self.log = []
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            async def _get(self):
+                pool.checkouts += 1
+                self.conn = FakeConn(pool, pool.checkouts)
+                return self.conn
+
+            def __await__(self):
+                return self._get().__await__()
+
+            async def __aenter__(self):
+                return await self._get()
+
+            async def __aexit__(self, *exc):
+                await pool.release(self.conn)
+                return False
+
+        return _Acquire()
+
+    async def release(self, conn):
+        self.released += 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = CountingPool()
+    monkeypatch.setattr(connection, "_pool", pool)
+    monkeypatch.setattr(connection, "DATABASE_REPLICA_URL", None)
+    return pool
+
+
+async def typical_handler(uow):
+    """Access check, repository-style calls and a handler block with a nested call."""
+    await verify_project_access("p1", USER, uow)
+    await db_manager.read_one("SELECT * FROM projects WHERE id = $1", "p1")
+    await db_manager.execute("UPDATE projects SET progress = $1 WHERE id = $2", 10, "p1")
+    async with uow.acquire() as conn:
+        await conn.fetch("SELECT * FROM project_stages WHERE project_id = $1", "p1")
+        await db_manager.execute_query("SELECT * FROM tasks WHERE project_id = $1", "p1")
+
+
+class TestUnitOfWork:
+
+    @pytest.mark.asyncio
+    async def test_one_checkout_per_request(self, pool):
+        async with unit_of_work() as uow:
+            await typical_handler(uow)
+        assert uow.checkouts == 1
+        assert pool.checkouts == 1 and pool.released == 1
+        assert len(pool.log) == 5
+
+    @pytest.mark.asyncio
+    async def test_without_unit_of_work_each_statement_checks_out(self, pool):
+        await typical_handler(pool)
+        assert pool.checkouts == 5
+
+    @pytest.mark.asyncio
+    async def test_unused_unit_of_work_never_checks_out(self, pool):
+        async with unit_of_work() as uow:
+            pass
+        assert uow.checkouts == 0 and pool.checkouts == 0
+
+    @pytest.mark.asyncio
+    async def test_transaction_commits(self, pool):
+        async with unit_of_work(transactional=True) as uow:
+            await typical_handler(uow)
+        assert pool.log[0] == "BEGIN" and pool.log[-1] == "COMMIT"
+        assert pool.checkouts == 1
+
+    @pytest.mark.asyncio
+    async def test_transaction_rolls_back_on_error(self, pool):
+        with pytest.raises(RuntimeError):
+            async with unit_of_work(transactional=True):
+                await db_manager.execute("DELETE FROM tasks WHERE id = $1", "t1")
+                raise RuntimeError("boom")
+        assert pool.log[-1] == "ROLLBACK" and "COMMIT" not in pool.log
+        assert pool.released == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_statements_get_extra_checkouts(self, pool):
+        async with unit_of_work() as uow:
+            await asyncio.gather(*(
+                db_manager.read_one("SELECT count(*) FROM tasks WHERE status = $1", s)
+                for s in ("a", "b", "c")
+            ))
+        assert uow.checkouts == pool.checkouts == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_statements_in_a_transaction_share_the_connection(self, pool):
+        async with unit_of_work(transactional=True) as uow:
+            await asyncio.gather(*(
+                db_manager.execute("UPDATE tasks SET status = $1", s) for s in ("a", "b", "c")
+            ))
+        assert uow.checkouts == pool.checkouts == 1
+
+    @pytest.mark.asyncio
+    async def test_use_after_close_checks_out_directly(self, pool):
+        uow = UnitOfWork(pool)
+        await uow.connection()
+        await uow.close()
+        async with uow.acquire() as conn:
+            await conn.execute("SELECT 1")
+        assert pool.checkouts == 2 and pool.released == 2
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_statement_in_progress(self, pool):
+        uow = UnitOfWork(pool, transactional=True)
+        started, finish = asyncio.Event(), asyncio.Event()
+
+        async def spawned():
+            async with uow.acquire() as conn:
+                started.set()
+                await finish.wait()
+                await conn.execute("UPDATE tasks SET status = 'done'")
+
+        task = asyncio.create_task(spawned())
+        await started.wait()
+        closing = asyncio.create_task(uow.close())
+        await asyncio.sleep(0.01)
+        assert not closing.done() and pool.released == 0
+
+        finish.set()
+        await asyncio.gather(task, closing)
+        assert pool.log == ["BEGIN", "UPDATE tasks SET status = 'done'", "COMMIT"]
+        assert pool.released == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_after_close_check_out_directly(self, pool):
+        uow = UnitOfWork(pool, transactional=True)
+        finish = asyncio.Event()
+
+        async def holder():
+            async with uow.acquire():
+                await finish.wait()
+
+        async def waiter():
+            async with uow.acquire() as conn:
+                await conn.execute("SELECT 1")
+                return conn
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(waiter())
+        closing = asyncio.create_task(uow.close())
+        await asyncio.sleep(0)
+        finish.set()
+        await asyncio.gather(held, closing)
+        conn = await waiting
+        # The waiter never touches the committed, released connection
+        assert conn.number == 2
+        assert pool.checkouts == pool.released == 2
+
+
+class TestDependency:
+
+    def _client(self, dependency):
+        app = FastAPI()
+        seen = {}
+
+        @app.post("/projects/{project_id}/progress")
+        async def update_progress(project_id: str, fail: bool = False, pool: UnitOfWork = Depends(dependency)):
+            await typical_handler(pool)
+            seen["uow"] = pool
+            if fail:
+                raise RuntimeError("boom")
+            return {"ok": True}
+
+        return TestClient(app, raise_server_exceptions=False), seen
+
+    def test_request_uses_one_connection(self, pool):
+        client, seen = self._client(get_unit_of_work)
+        assert client.post("/projects/p1/progress").status_code == 200
+        assert seen["uow"].checkouts == 1
+        assert pool.checkouts == 1 and pool.released == 1
+        assert connection.current_unit_of_work() is None
+
+    def test_transactional_request(self, pool):
+        client, _ = self._client(get_transactional_unit_of_work)
+        assert client.post("/projects/p1/progress").status_code == 200
+        assert pool.log[0] == "BEGIN" and pool.log[-1] == "COMMIT"
+
+        pool.log.clear()
+        assert client.post("/projects/p1/progress?fail=true").status_code == 500
+        assert pool.log[-1] == "ROLLBACK"
+        assert pool.checkouts == pool.released == 2
+
+    def test_apply_template_is_transactional(self):
+        from src.api.v1.stages import router
+
+        route = next(r for r in router.routes if r.path.endswith("/apply-template"))
+        assert get_transactional_unit_of_work in [d.call for d in route.dependant.dependencies]